@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# file: distill_apc.py
+# time: 19/10/2026 23:55
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# Copyright (C) 2026. All Rights Reserved.
+
+########################################################################################################################
+#                  distill a large APC model into a small FAST_LCF_BERT for low latency inference                      #
+########################################################################################################################
+from pyabsa import (
+    AspectPolarityClassification as APC,
+    ModelSaveOption,
+    DeviceTypeOption,
+)
+
+dataset = APC.APCDatasetList.Restaurant14
+
+# the teacher, e.g., FAST_LSA_T_V2 on deberta-v3-large, a list of checkpoints distills their mean
+teacher = APC.SentimentClassifier("fast_lsa_t_v2_restaurant14_deberta-v3-large")
+
+config = APC.APCConfigManager.get_apc_config_english()
+config.model = APC.APCModelList.FAST_LCF_BERT
+config.pretrained_bert = "microsoft/deberta-v3-small"
+config.max_seq_len = 80
+config.num_epoch = 20
+config.log_step = -1
+config.patience = 5
+config.seed = [52]
+config.distill_temperature = 2
+config.distill_alpha = 0.7
+
+trainer = APC.APCDistillationTrainer(
+    config=config,
+    dataset=dataset,
+    teacher=teacher,
+    # unlabeled_dataset=["unlabeled_restaurant_reviews.apc.inference"],
+    checkpoint_save_mode=ModelSaveOption.SAVE_MODEL_STATE_DICT,
+    auto_device=DeviceTypeOption.AUTO,
+)
+# the teacher/student agreement, accuracies and latencies on the test set
+print(trainer.config.distillation_report)
+
+student = trainer.load_trained_model()
+student.predict(
+    "The [B-ASP]food[E-ASP] was great but the [B-ASP]service[E-ASP] was slow."
+)
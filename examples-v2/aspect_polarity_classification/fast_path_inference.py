@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# file: fast_path_inference.py
+# time: 20/10/2026 00:20
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+from pyabsa import AspectPolarityClassification as APC
+
+# the model is compiled for the batch sizes 1, 2, 4, ..., 32 and warmed up at load time
+sent_classifier = APC.SentimentClassifier(
+    "english", auto_device=False, fast_path=True, fast_path_max_batch_size=32
+)
+print(sent_classifier.fast_path_metrics)
+
+sent_classifier.predict(
+    "The [B-ASP]food[E-ASP] was good, but the [B-ASP]service[E-ASP] was terrible. $LABEL$ Positive, Negative"
+)
+sent_classifier.batch_predict(target_file=APC.APCDatasetList.Laptop14)
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+# file: model_pool_inference.py
+# time: 20/10/2026 02:50
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+from pyabsa import ModelPool, AspectPolarityClassification as APC
+
+# the checkpoints are loaded on first use, the least recently used ones are evicted beyond 4GB,
+# and the checkpoints with identical backbone weights share one backbone
+pool = ModelPool(APC.SentimentClassifier, memory_budget="4GB", auto_device=False)
+
+for checkpoint in ["english", "multilingual", "english"]:
+    pool.predict(
+        checkpoint,
+        "The [B-ASP]food[E-ASP] was good, but the [B-ASP]service[E-ASP] was terrible.",
+        print_result=False,
+    )
+print(pool.metrics())
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+# file: profiled_inference.py
+# time: 20/10/2026 06:20
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+import json
+
+from pyabsa import AspectPolarityClassification as APC
+
+sent_classifier = APC.SentimentClassifier("english", auto_device=False)
+# the stats are also appended to apc.profile.jsonl by export_stats(), "torch" writes torch.profiler traces
+sent_classifier.enable_profiling(exporters=["memory", "apc.profile.jsonl"])
+
+sent_classifier.batch_predict(
+    target_file=APC.APCDatasetList.Laptop14, print_result=False
+)
+# the time, examples and tokens of featurize, tokenize, spacy_parse, lcf_vectors, tensor_conversion, h2d, forward,
+# softmax, result_assembly and save_results
+print(json.dumps(sent_classifier.stats(), indent=2))
+sent_classifier.export_stats()
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# file: quantized_inference.py
+# time: 19/10/2026 23:59
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+from pyabsa import AspectPolarityClassification as APC, QuantizationOption
+
+sent_classifier = APC.SentimentClassifier("english", auto_device=False)
+
+# the accuracy delta, agreement, latency and size of the int8 model on a labeled inference set
+sent_classifier.quantization_report(
+    target_file=APC.APCDatasetList.Laptop14, mode=QuantizationOption.DYNAMIC_INT8
+)
+
+# quantize in place and save the quantized checkpoint variant
+sent_classifier.quantize(QuantizationOption.DYNAMIC_INT8)
+quantized_checkpoint = sent_classifier.save_quantized()
+
+# the quantized checkpoint is loaded as is, a float checkpoint can also be quantized at load time:
+# APC.SentimentClassifier("english", quantize=QuantizationOption.DYNAMIC_INT8)
+sent_classifier = APC.SentimentClassifier(quantized_checkpoint)
+sent_classifier.predict(
+    "The [B-ASP]food[E-ASP] was good, but the [B-ASP]service[E-ASP] was terrible. $LABEL$ Positive, Negative"
+)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# file: sweep_apc.py
+# time: 19/10/2026 23:05
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# Copyright (C) 2026. All Rights Reserved.
+
+########################################################################################################################
+#                  sweep the models, datasets and hyperparameters instead of nesting loops over APCTrainer             #
+########################################################################################################################
+from pyabsa import (
+    AspectPolarityClassification as APC,
+    ModelSaveOption,
+    DeviceTypeOption,
+    SweepScheduler,
+    SearchSpace,
+    ASHAPruner,
+)
+
+config = APC.APCConfigManager.get_apc_config_english()
+config.pretrained_bert = "microsoft/deberta-v3-base"
+config.evaluate_begin = 0
+config.max_seq_len = 80
+config.num_epoch = 30
+config.log_step = -1
+config.patience = 5
+config.seed = [52]
+
+search_space = SearchSpace(
+    model=[
+        APC.APCModelList.FAST_LSA_T_V2,
+        APC.APCModelList.FAST_LSA_S_V2,
+        APC.APCModelList.BERT_SPC_V2,
+    ],
+    dataset=[
+        APC.APCDatasetList.Laptop14,
+        APC.APCDatasetList.Restaurant14,
+    ],
+    # the trials differing only by these fields reuse the featurized datasets
+    learning_rate=[1e-5, 2e-5],
+    dropout=[0, 0.5],
+    batch_size=[16, 32],
+)
+
+results = SweepScheduler(
+    APC.APCTrainer,
+    config,
+    search_space,
+    trainer_kwargs=dict(
+        checkpoint_save_mode=ModelSaveOption.DO_NOT_SAVE_MODEL,
+        auto_device=DeviceTypeOption.AUTO,
+    ),
+    num_workers=2,
+    # stop the trials whose dev accuracy is not in the top third at 1, 3, 9, ... evaluations
+    pruner=ASHAPruner(metric="eval", mode="max", min_resource=1, reduction_factor=3),
+    results="apc_sweep.db",
+    sweep_name="apc-english",
+).run()
+
+print(results.to_dataframe("apc-english"))
+print(results.best("max_apc_test_acc", sweep="apc-english"))
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# file: config_access_benchmark.py
+# time: 20/10/2026 00:45
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+# The cost of the config reads of the training and inference loops, e.g., in the APC loops per batch and per example
+import timeit
+
+from pyabsa import AspectPolarityClassification as APC
+from pyabsa.framework.configuration_class.configuration_template import (
+    CallCountingOption,
+    ConfigManager,
+)
+
+number = 1000000
+config = APC.APCConfigManager.get_apc_config_english()
+# the parameters set at training time
+config.device = "cpu"
+config.inputs_cols = ["text_indices", "aspect_indices", "left_indices"]
+config.label_to_index = {"Negative": 0, "Neutral": 1, "Positive": 2}
+statement = "config.device; config.inputs_cols; config.label_to_index; config.use_amp"
+
+for counting in [CallCountingOption.EXACT, CallCountingOption.USED]:
+    ConfigManager.call_counting = counting
+    elapsed = timeit.timeit(statement, globals={"config": config}, number=number)
+    print(
+        "ConfigManager ({} call counting): {:.3f}us per 4 reads".format(
+            counting, elapsed / number * 1e6
+        )
+    )
+
+view = config.frozen_view("device", "inputs_cols", "label_to_index", "use_amp")
+elapsed = timeit.timeit(statement, globals={"config": view}, number=number)
+print("FrozenConfigView: {:.3f}us per 4 reads".format(elapsed / number * 1e6))
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# file: cpu_benchmark.py
+# time: 20/10/2026 07:10
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+# The offline CPU benchmarks of some model families, compared with the report of a previous run if there is one.
+# The same as: python -m pyabsa.benchmark --tasks apc apc_glove atepc tc rnac --lengths 16 64 --aspects 1 4
+import json
+import os
+
+from pyabsa.benchmark import compare_results, run_benchmark
+
+if __name__ == "__main__":
+    report = run_benchmark(
+        tasks=["apc", "apc_glove", "atepc", "tc", "rnac"],
+        lengths=[16, 64],
+        aspects=[1, 4],
+        batch_size=16,
+    )
+    if os.path.exists("pyabsa_benchmark.json"):
+        with open("pyabsa_benchmark.json", encoding="utf8") as f:
+            for regression in compare_results(json.load(f), report, tolerance=0.2):
+                print("Regression: {}".format(regression))
+    with open("pyabsa_benchmark.json", mode="w", encoding="utf8") as f:
+        json.dump(report, f, indent=2)
@@ -10,67 +10,138 @@ __name__ = "pyabsa"
 __version__ = "2.4.1.post1"
 
 
-from pyabsa.utils.notification_utils.notification_utils import (
-    check_emergency_notification,
-)
-
-check_emergency_notification()
-
+# the flags are imported eagerly, they are light and used by most modules
 from pyabsa.framework.flag_class import *
 
-from pyabsa.utils.data_utils.dataset_item import DatasetItem
-from pyabsa.utils.absa_utils.make_absa_dataset import make_ABSA_dataset
-from pyabsa.utils.absa_utils.absa_utils import (
-    generate_inference_set_for_apc,
-    convert_apc_set_to_atepc_set,
-)
-from pyabsa.utils.data_utils.dataset_manager import (
-    download_all_available_datasets,
-    download_dataset_by_name,
-)
-from pyabsa.utils.file_utils.file_utils import load_dataset_from_file
-
-
-from pyabsa.framework.checkpoint_class.checkpoint_utils import (
-    available_checkpoints,
-    download_checkpoint,
-)
-from pyabsa.framework.dataset_class.dataset_dict_class import DatasetDict
-from pyabsa.tasks import (
-    AspectPolarityClassification,
-    AspectTermExtraction,
-    AspectSentimentTripletExtraction,
-    TextClassification,
-    TextAdversarialDefense,
-    RNAClassification,
-    RNARegression,
-    ABSAInstruction,
-)
+# the other attributes are imported on first access (PEP 562), so "import pyabsa" does not import the tasks
+_lazy_attributes = {
+    "DatasetItem": ("pyabsa.utils.data_utils.dataset_item", "DatasetItem"),
+    "make_ABSA_dataset": (
+        "pyabsa.utils.absa_utils.make_absa_dataset",
+        "make_ABSA_dataset",
+    ),
+    "generate_inference_set_for_apc": (
+        "pyabsa.utils.absa_utils.absa_utils",
+        "generate_inference_set_for_apc",
+    ),
+    "convert_apc_set_to_atepc_set": (
+        "pyabsa.utils.absa_utils.absa_utils",
+        "convert_apc_set_to_atepc_set",
+    ),
+    "download_all_available_datasets": (
+        "pyabsa.utils.data_utils.dataset_manager",
+        "download_all_available_datasets",
+    ),
+    "download_dataset_by_name": (
+        "pyabsa.utils.data_utils.dataset_manager",
+        "download_dataset_by_name",
+    ),
+    "load_dataset_from_file": (
+        "pyabsa.utils.file_utils.file_utils",
+        "load_dataset_from_file",
+    ),
+    "available_checkpoints": (
+        "pyabsa.framework.checkpoint_class.checkpoint_utils",
+        "available_checkpoints",
+    ),
+    "download_checkpoint": (
+        "pyabsa.framework.checkpoint_class.checkpoint_utils",
+        "download_checkpoint",
+    ),
+    "ModelPool": ("pyabsa.framework.prediction_class.model_pool", "ModelPool"),
+    "DatasetDict": ("pyabsa.framework.dataset_class.dataset_dict_class", "DatasetDict"),
+    "SweepScheduler": ("pyabsa.framework.sweep_class", "SweepScheduler"),
+    "SearchSpace": ("pyabsa.framework.sweep_class", "SearchSpace"),
+    "SweepResults": ("pyabsa.framework.sweep_class", "SweepResults"),
+    "MedianPruner": ("pyabsa.framework.sweep_class", "MedianPruner"),
+    "ASHAPruner": ("pyabsa.framework.sweep_class", "ASHAPruner"),
+    "meta_load": ("pyabsa.utils.file_utils.file_utils", "meta_load"),
+    "meta_save": ("pyabsa.utils.file_utils.file_utils", "meta_save"),
+    "clean": ("pyabsa.utils.cache_utils.cache_utils", "clean"),
+    "check_emergency_notification": (
+        "pyabsa.utils.notification_utils.notification_utils",
+        "check_emergency_notification",
+    ),
+    "start_remote_checks": (
+        "pyabsa.utils.notification_utils.remote_checks",
+        "start_remote_checks",
+    ),
+    "run_remote_checks": (
+        "pyabsa.utils.notification_utils.remote_checks",
+        "run_remote_checks",
+    ),
+    "validate_pyabsa_version": (
+        "pyabsa.utils.check_utils.package_version_check",
+        "validate_pyabsa_version",
+    ),
+    "query_release_notes": (
+        "pyabsa.utils.check_utils.package_version_check",
+        "query_release_notes",
+    ),
+    "check_pyabsa_update": (
+        "pyabsa.utils.check_utils.package_version_check",
+        "check_pyabsa_update",
+    ),
+    "check_package_version": (
+        "pyabsa.utils.check_utils.package_version_check",
+        "check_package_version",
+    ),
+}
+for _task in [
+    "AspectPolarityClassification",
+    "AspectTermExtraction",
+    "AspectSentimentTripletExtraction",
+    "TextClassification",
+    "TextAdversarialDefense",
+    "RNAClassification",
+    "RNARegression",
+    "ABSAInstruction",
+]:
+    _lazy_attributes[_task] = ("pyabsa.tasks." + _task, None)
 
 # for compatibility of v1.x
-from pyabsa.framework.checkpoint_class.checkpoint_template import (
-    APCCheckpointManager,
-    ATEPCCheckpointManager,
-    ASTECheckpointManager,
-    TCCheckpointManager,
-    TADCheckpointManager,
-    RNACCheckpointManager,
-    RNARCheckpointManager,
+for _checkpoint_manager in [
+    "APCCheckpointManager",
+    "ATEPCCheckpointManager",
+    "ASTECheckpointManager",
+    "TCCheckpointManager",
+    "TADCheckpointManager",
+    "RNACCheckpointManager",
+    "RNARCheckpointManager",
+]:
+    _lazy_attributes[_checkpoint_manager] = (
+        "pyabsa.framework.checkpoint_class.checkpoint_template",
+        _checkpoint_manager,
+    )
+_lazy_attributes["APCDatasetList"] = (
+    "pyabsa.tasks.AspectPolarityClassification",
+    "APCDatasetList",
 )
-from pyabsa.tasks.AspectPolarityClassification import APCDatasetList
+_lazy_attributes["ABSADatasetList"] = _lazy_attributes["APCDatasetList"]
+# for compatibility of v1.x
 
-from pyabsa.utils.file_utils.file_utils import meta_load, meta_save
+from pyabsa.utils.import_utils.lazy_import import lazy_attributes
 
-from pyabsa.utils.cache_utils.cache_utils import clean
+__getattr__, __dir__ = lazy_attributes(__name__, _lazy_attributes)
 
-ABSADatasetList = APCDatasetList
-# for compatibility of v1.x
+# the public names, the eager flags and the lazy attributes, for "from pyabsa import *", dir(pyabsa) and the IDEs
+__all__ = [
+    "TaskNameOption",
+    "TaskCodeOption",
+    "LabelPaddingOption",
+    "ModelSaveOption",
+    "ProxyAddressOption",
+    "DeviceTypeOption",
+    "QuantizationOption",
+    "PyABSAMaterialHostAddress",
+    *_lazy_attributes,
+]
 
-from pyabsa.utils.check_utils.package_version_check import (
-    validate_pyabsa_version,
-    query_release_notes,
-    check_pyabsa_update,
-    check_package_version,
+# the remote checks are opt-in (PYABSA_REMOTE_CHECKS=1) and never block the import
+from pyabsa.utils.notification_utils.remote_checks import (
+    remote_checks_enabled,
+    start_remote_checks,
 )
 
-validate_pyabsa_version()
+if remote_checks_enabled():
+    start_remote_checks()
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+# file: __init__.py
+# time: 20/10/2026 07:10
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+from .benchmark import run_benchmark, run_case, compare_results
+from .tasks import BENCHMARK_TASKS, BenchmarkTask, register_benchmark_task
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# file: __main__.py
+# time: 20/10/2026 07:10
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+Run the CPU benchmarks, e.g.,
+
+    python -m pyabsa.benchmark --tasks apc apc_glove tc --lengths 16 64 --aspects 1 4 --output benchmark.json
+    python -m pyabsa.benchmark --tasks apc --baseline benchmark.json --tolerance 0.2
+
+The report is written as JSON to --output, and the command fails if a metric regressed compared to
+the --baseline report by more than --tolerance.
+"""
+
+import argparse
+import json
+import sys
+
+from pyabsa.benchmark.benchmark import compare_results, run_benchmark
+from pyabsa.benchmark.tasks import BENCHMARK_TASKS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m pyabsa.benchmark",
+        description="Benchmark the PyABSA models on CPU, offline, with synthetic inputs and tiny backbones",
+    )
+    parser.add_argument(
+        "--tasks",
+        nargs="+",
+        choices=list(BENCHMARK_TASKS),
+        default=None,
+        help="the model families, default to all the families",
+    )
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        default=None,
+        help='the models of the families, or "all", default to the default models of each family',
+    )
+    parser.add_argument("--lengths", nargs="+", type=int, default=[32])
+    parser.add_argument("--aspects", nargs="+", type=int, default=[1])
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--train-examples", type=int, default=64)
+    parser.add_argument("--infer-examples", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--hidden-size", type=int, default=32)
+    parser.add_argument("--num-hidden-layers", type=int, default=2)
+    parser.add_argument("--num-threads", type=int, default=None)
+    parser.add_argument(
+        "--no-isolate",
+        action="store_true",
+        help="run the cases in this process instead of a fresh process per case",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--output", default="pyabsa_benchmark.json", help="the JSON report file"
+    )
+    parser.add_argument(
+        "--baseline", default=None, help="the JSON report to compare with"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    # pyabsa.utils imports torch, the benchmark suite is importable without it
+    from pyabsa.utils.pyabsa_utils import fprint
+
+    report = run_benchmark(
+        tasks=args.tasks,
+        models=args.models,
+        lengths=args.lengths,
+        aspects=args.aspects,
+        batch_size=args.batch_size,
+        train_examples=args.train_examples,
+        infer_examples=args.infer_examples,
+        repeats=args.repeats,
+        hidden_size=args.hidden_size,
+        num_hidden_layers=args.num_hidden_layers,
+        num_threads=args.num_threads,
+        isolate=not args.no_isolate,
+        seed=args.seed,
+    )
+    with open(args.output, mode="w", encoding="utf8") as f:
+        json.dump(report, f, indent=2)
+    fprint("The benchmark report is written to {}".format(args.output))
+
+    failed = [r for r in report["results"] if r["error"]]
+    for result in failed:
+        fprint(
+            "Failed: {} {}\n{}".format(
+                result["task"], result["model"], result["error"]
+            ),
+            file=sys.stderr,
+        )
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf8") as f:
+            regressions = compare_results(json.load(f), report, args.tolerance)
+        for regression in regressions:
+            fprint("Regression: {}".format(json.dumps(regression)), file=sys.stderr)
+    return 1 if failed or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,464 @@
+# -*- coding: utf-8 -*-
+# file: benchmark.py
+# time: 20/10/2026 07:10
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+The CPU benchmarks of the model families, run offline on synthetic inputs and tiny randomly initialized backbones.
+
+A case (a model, an input length and an aspect count) is run in a scratch directory: a synthetic dataset is written
+and the model is trained for an epoch by the trainer of its task with profiling enabled, then the trained predictor
+featurizes and predicts synthetic inputs. A case reports:
+
+- train: the training steps/s and examples/s, from the "train/<phase>" spans of the training loop;
+- featurize: the featurization throughput of the predictor, i.e., the inputs converted to features per second;
+- forward: the p50/p99 latencies of the forward of a batch;
+- predict: the end-to-end predict() throughput, and the time of each stage of the predictor;
+- peak_rss_mb: the peak resident memory of the process running the case.
+
+Each case runs in a fresh (spawned) process by default, so the peak RSS is the peak of the case and the cases do
+not share caches. The results are JSON, compare_results() finds the regressions of a run against a baseline run.
+
+The APC and ATEPC models need the spaCy model of config.spacy_model (en_core_web_sm), install it before running
+them offline: python -m spacy download en_core_web_sm
+"""
+
+import concurrent.futures
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+
+from pyabsa.benchmark import synthetic
+from pyabsa.benchmark.tasks import BENCHMARK_TASKS
+
+# the metrics compared by compare_results(), and whether the higher values are the better ones
+REGRESSION_METRICS = {
+    ("train", "steps_per_s"): True,
+    ("featurize", "examples_per_s"): True,
+    ("forward", "p50_ms"): False,
+    ("forward", "p99_ms"): False,
+    ("predict", "examples_per_s"): True,
+    ("peak_rss_mb",): False,
+}
+
+
+def run_benchmark(
+    tasks=None,
+    models=None,
+    lengths=(32,),
+    aspects=(1,),
+    batch_size=16,
+    train_examples=64,
+    infer_examples=64,
+    repeats=5,
+    hidden_size=32,
+    num_hidden_layers=2,
+    num_threads=None,
+    isolate=True,
+    seed=1,
+):
+    """
+    :param tasks: the names of the model families, see BENCHMARK_TASKS, default to all the families
+    :param models: the names of the models, or "all", default to the default models of each family, a name is
+        prefixed with the family if it is not a model of all the families, e.g., "apc:FAST_LCF_BERT"
+    :param lengths: the input lengths, in words (or bases or code tokens)
+    :param aspects: the numbers of aspects per input, for the aspect-based families
+    :param batch_size: the batch size of the training and of the predictions
+    :param train_examples: the number of the synthetic training examples
+    :param infer_examples: the number of the inputs predicted per repeat
+    :param repeats: the number of the timed featurization and predict() repeats
+    :param hidden_size: the hidden size of the tiny backbone and the word embeddings
+    :param num_hidden_layers: the number of the layers of the tiny backbone
+    :param num_threads: the number of the torch CPU threads, default to the torch default
+    :param isolate: run each case in a fresh process
+    :param seed: the seed of the synthetic inputs, the backbones and the training
+    :return: the benchmark report, a dict of the environment, the settings and the results of the cases
+    """
+    # pyabsa.utils imports torch, the benchmark suite is importable without it
+    from pyabsa.utils.pyabsa_utils import fprint
+
+    settings = {
+        "batch_size": batch_size,
+        "train_examples": train_examples,
+        "infer_examples": infer_examples,
+        "repeats": repeats,
+        "hidden_size": hidden_size,
+        "num_hidden_layers": num_hidden_layers,
+        "num_threads": num_threads,
+        "seed": seed,
+    }
+    results = []
+    for name in tasks or list(BENCHMARK_TASKS):
+        if name not in BENCHMARK_TASKS:
+            raise ValueError(
+                "Unknown benchmark task: {}, available tasks: {}".format(
+                    name, list(BENCHMARK_TASKS)
+                )
+            )
+        task = BENCHMARK_TASKS[name]
+        model_names = [m.__name__ for m in task.get_models(_task_models(name, models))]
+        for model, length, num_aspects in itertools.product(
+            model_names, lengths, aspects if task.aspects else [None]
+        ):
+            case = dict(
+                settings, task=name, model=model, length=length, aspects=num_aspects
+            )
+            fprint(
+                "Benchmarking {} {} (length={}, aspects={})".format(
+                    name, model, length, num_aspects
+                )
+            )
+            result = _run_isolated(case) if isolate else run_case(**case)
+            fprint(_describe(result))
+            results.append(result)
+    return {
+        "environment": environment(num_threads),
+        "settings": settings,
+        "results": results,
+    }
+
+
+def _task_models(name, models):
+    """
+    :return: the models of a family, e.g., ["FAST_LCF_BERT"] of "apc" for ["apc:FAST_LCF_BERT", "tc:BERT_MLP"]
+    """
+    if models is None or models == "all":
+        return models
+    prefix = name + ":"
+    selected = [m[len(prefix) :] for m in models if m.startswith(prefix)]
+    selected += [m for m in models if ":" not in m]
+    # the families without a selected model run their default models
+    return selected or None
+
+
+def run_case(
+    task,
+    model,
+    length,
+    aspects=None,
+    batch_size=16,
+    train_examples=64,
+    infer_examples=64,
+    repeats=5,
+    hidden_size=32,
+    num_hidden_layers=2,
+    num_threads=None,
+    seed=1,
+):
+    """
+    Run a case in this process, in a scratch working directory removed afterwards.
+
+    :return: the result of the case, see the module docstring, with "error" set if the case failed
+    """
+    result = {
+        "task": task,
+        "model": model,
+        "length": length,
+        "aspects": aspects,
+        "batch_size": batch_size,
+        "error": None,
+    }
+    cwd = os.getcwd()
+    scratch = tempfile.mkdtemp(prefix="pyabsa_benchmark_")
+    try:
+        os.chdir(scratch)
+        result.update(
+            _run_case(
+                BENCHMARK_TASKS[task],
+                model,
+                length,
+                aspects or 0,
+                batch_size,
+                train_examples,
+                infer_examples,
+                repeats,
+                hidden_size,
+                num_hidden_layers,
+                num_threads,
+                seed,
+            )
+        )
+    except Exception:
+        result["error"] = traceback.format_exc()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch, ignore_errors=True)
+    # the peak of the process so far, i.e., of the case if it runs in a fresh process
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def _run_case(
+    task,
+    model_name,
+    length,
+    num_aspects,
+    batch_size,
+    train_examples,
+    infer_examples,
+    repeats,
+    hidden_size,
+    num_hidden_layers,
+    num_threads,
+    seed,
+):
+    import torch
+
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    rng = random.Random(seed)
+    # the inputs of BERT are the words, their aspects, and the special tokens
+    max_seq_len = min(length + num_aspects + 8, 510)
+
+    backbone = synthetic.build_tiny_backbone(
+        os.path.abspath("backbone"),
+        hidden_size=hidden_size,
+        num_hidden_layers=num_hidden_layers,
+        max_position_embeddings=512,
+        seed=seed,
+    )
+    dataset = os.path.abspath(os.path.join("datasets", task.name + "_benchmark"))
+    os.makedirs(dataset)
+    synthetic.write_lines(
+        os.path.join(dataset, "benchmark.train.txt"),
+        task.train_lines(rng, train_examples, length, num_aspects),
+    )
+    synthetic.write_lines(
+        os.path.join(dataset, "benchmark.test.txt"),
+        task.train_lines(
+            rng, max(batch_size, train_examples // 4), length, num_aspects
+        ),
+    )
+
+    config = task.get_config()
+    config.model = task.get_models([model_name])[0]
+    config.pretrained_bert = backbone
+    if task.glove:
+        config.glove_or_word2vec_path = synthetic.write_embedding(
+            os.path.abspath("embedding.{}d.txt".format(hidden_size)), hidden_size, rng
+        )
+    config.hidden_dim = hidden_size
+    config.embed_dim = hidden_size
+    config.max_seq_len = max_seq_len
+    config.batch_size = batch_size
+    config.num_epoch = 1
+    config.evaluate_begin = 0
+    config.log_step = -1
+    config.seed = [seed]
+    config.cache_dataset = False
+    config.overwrite_cache = True
+    config.cross_validate_fold = -1
+    config.verbose = False
+    config.profile = True
+    config.profile_keep_timings = True
+    config.profile_exporters = [os.path.abspath("train.profile.jsonl")]
+
+    start = time.perf_counter()
+    trainer = task.get_trainer_class()(
+        config=config, dataset=dataset, checkpoint_save_mode=0, auto_device="cpu"
+    )
+    train_wall_s = time.perf_counter() - start
+    with open(config.profile_exporters[0], encoding="utf8") as f:
+        train_profile = json.loads(f.readlines()[-1])["spans"]
+
+    predictor = trainer.load_trained_model()
+    predictor.config.eval_batch_size = batch_size
+    # the inference stages are not exported, only summarized
+    predictor.enable_profiling(exporters=[])
+    texts = task.inference_texts(rng, infer_examples, length, num_aspects)
+    # warm up the allocator and the lazy initializations
+    task.predict(predictor, texts[:batch_size])
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        task.featurize(predictor, texts)
+    featurize_s = time.perf_counter() - start
+
+    predictor.reset_stats()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        task.predict(predictor, texts)
+    predict_s = time.perf_counter() - start
+    predict_profile = predictor.stats()["spans"]
+    predictor.disable_profiling()
+
+    return {
+        "train": _train_metrics(train_profile, train_wall_s),
+        "featurize": {
+            "examples": repeats * len(texts),
+            "total_s": round(featurize_s, 6),
+            "examples_per_s": repeats * len(texts) / featurize_s,
+        },
+        "forward": {
+            k: v
+            for k, v in predict_profile.get("forward", {}).items()
+            if k in ("count", "mean_ms", "p50_ms", "p99_ms", "examples_per_s")
+        },
+        "predict": {
+            "examples": repeats * len(texts),
+            "total_s": round(predict_s, 6),
+            "examples_per_s": repeats * len(texts) / predict_s,
+            "stages_ms": {
+                name: round(1000 * stats["total_s"], 4)
+                for name, stats in predict_profile.items()
+            },
+        },
+    }
+
+
+def _train_metrics(spans, wall_s):
+    """
+    :param spans: the span statistics of the training profile
+    :param wall_s: the wall time of the trainer, including the featurization and the evaluation
+    """
+    forward = spans.get("train/forward", {})
+    # the time of the training steps, without the evaluation
+    step_s = sum(
+        spans.get("train/" + phase, {}).get("total_s", 0.0)
+        for phase in ("data", "forward", "backward", "optimizer")
+    )
+    return {
+        "steps": forward.get("count", 0),
+        "steps_per_s": forward.get("count", 0) / step_s if step_s else 0.0,
+        "examples_per_s": forward.get("examples", 0) / step_s if step_s else 0.0,
+        "phases_s": {
+            name[len("train/") :]: stats["total_s"]
+            for name, stats in spans.items()
+            if name.startswith("train/")
+        },
+        "featurize_s": spans.get("featurize", {}).get("total_s", None),
+        "wall_s": round(wall_s, 6),
+    }
+
+
+def _describe(result):
+    if result["error"]:
+        return "Failed: {}".format(result["error"].strip().splitlines()[-1])
+    return (
+        "train: {:.2f} steps/s, featurize: {:.1f} examples/s, forward: p50 {} ms p99 {} ms, "
+        "predict: {:.1f} examples/s, peak RSS: {} MB".format(
+            result["train"]["steps_per_s"],
+            result["featurize"]["examples_per_s"],
+            result["forward"].get("p50_ms"),
+            result["forward"].get("p99_ms"),
+            result["predict"]["examples_per_s"],
+            result["peak_rss_mb"],
+        )
+    )
+
+
+def _run_isolated(case):
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=1, mp_context=context
+    ) as executor:
+        try:
+            return executor.submit(run_case, **case).result()
+        except Exception:
+            # e.g., the process is killed by the OOM killer
+            result = {
+                k: case[k] for k in ("task", "model", "length", "aspects", "batch_size")
+            }
+            result["error"] = traceback.format_exc()
+            return result
+
+
+def peak_rss_mb():
+    """
+    :return: the peak resident set size of this process in MB, or None if it is not available (e.g., on Windows)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # in bytes on macOS, in kilobytes on Linux
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+
+
+def environment(num_threads=None):
+    """
+    :return: the versions and the CPU of the benchmark environment
+    """
+    from pyabsa import __version__
+
+    info = {
+        "pyabsa": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    try:
+        import torch
+        import transformers
+
+        info["torch"] = torch.__version__
+        info["transformers"] = transformers.__version__
+        info["num_threads"] = num_threads or torch.get_num_threads()
+    except ImportError:
+        pass
+    return info
+
+
+def compare_results(baseline, current, tolerance=0.1):
+    """
+    :param baseline: the benchmark report of the baseline, e.g., of the previous PyABSA version
+    :param current: the benchmark report to check
+    :param tolerance: the relative change of a metric tolerated, e.g., 0.1 for 10% slower or larger
+    :return: the regressions, a list of dicts of the case, the metric, the baseline and current values and the
+        relative change
+    """
+
+    def key(result):
+        return tuple(
+            result.get(k) for k in ("task", "model", "length", "aspects", "batch_size")
+        )
+
+    baseline_results = {key(r): r for r in baseline["results"] if not r.get("error")}
+    regressions = []
+    for result in current["results"]:
+        base = baseline_results.get(key(result))
+        if base is None or result.get("error"):
+            continue
+        for metric, higher_is_better in REGRESSION_METRICS.items():
+            old, new = _get(base, metric), _get(result, metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(
+                    {
+                        "case": dict(
+                            zip(
+                                ("task", "model", "length", "aspects", "batch_size"),
+                                key(result),
+                            )
+                        ),
+                        "metric": ".".join(metric),
+                        "baseline": old,
+                        "current": new,
+                        "change": round(change, 4),
+                    }
+                )
+    return regressions
+
+
+def _get(result, metric):
+    for k in metric:
+        if not isinstance(result, dict):
+            return None
+        result = result.get(k)
+    return result
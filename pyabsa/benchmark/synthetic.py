@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+# file: synthetic.py
+# time: 20/10/2026 07:10
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+The synthetic inputs and the tiny backbones of the benchmarks.
+
+The texts are drawn from a small closed vocabulary, so a tiny BERT (a WordPiece vocabulary of these words and a
+randomly initialized BertModel) and a GloVe-format embedding file of these words cover all the tokens, and the
+models are trained and run without downloading any checkpoint, embedding or dataset. The RNA sequences are written
+as space-separated bases, as the WordPiece tokenizer maps the words longer than 100 characters to [UNK].
+"""
+
+import os
+
+WORDS = (
+    "the a is was very quite really not and but so too we they it this that had ordered tried loved hated "
+    "found good great nice bad terrible slow fast cheap expensive friendly rude fresh cold warm clean "
+    "dirty small large with for of at in on again never always here there"
+).split()
+ASPECTS = (
+    "food service price staff menu drinks pizza pasta wine dessert music atmosphere location battery "
+    "screen keyboard camera speaker delivery waiter"
+).split()
+POLARITIES = ["Negative", "Neutral", "Positive"]
+BASES = ["A", "C", "G", "U"]
+CODE_TOKENS = (
+    "int char void return if else while for free malloc memcpy buf len ptr x y i 0 1 ( ) { } [ ] ; = + - "
+    "< > *"
+).split()
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+
+
+def vocabulary():
+    """
+    :return: all the tokens of the synthetic inputs
+    """
+    return list(dict.fromkeys(WORDS + ASPECTS + BASES + CODE_TOKENS))
+
+
+def sentence(rng, length, num_aspects=0):
+    """
+    :param rng: a random.Random
+    :param length: the number of words
+    :param num_aspects: the number of aspect words placed in the sentence
+    :return: the words, and the sorted positions of the aspects
+    """
+    words = [rng.choice(WORDS) for _ in range(length)]
+    positions = sorted(rng.sample(range(length), min(num_aspects, length)))
+    for i in positions:
+        words[i] = rng.choice(ASPECTS)
+    return words, positions
+
+
+def apc_lines(rng, num_examples, length, num_aspects):
+    """
+    :return: the lines of an APC dataset file, a sentence with $T$ in place of the aspect, the aspect and the
+        polarity per example, the examples of a sentence share it
+    """
+    lines = []
+    while len(lines) < 3 * num_examples:
+        words, positions = sentence(rng, length, max(1, num_aspects))
+        for i in positions:
+            text = " ".join(words[:i] + ["$T$"] + words[i + 1 :])
+            lines.extend([text, words[i], rng.choice(POLARITIES)])
+    return lines[: 3 * num_examples]
+
+
+def apc_inference_texts(rng, num_examples, length, num_aspects):
+    """
+    :return: the sentences with the aspects marked by [B-ASP] and [E-ASP]
+    """
+    texts = []
+    for _ in range(num_examples):
+        words, positions = sentence(rng, length, max(1, num_aspects))
+        for i in positions:
+            words[i] = "[B-ASP]{}[E-ASP]".format(words[i])
+        texts.append(" ".join(words))
+    return texts
+
+
+def atepc_lines(rng, num_examples, length, num_aspects):
+    """
+    :return: the lines of an ATEPC dataset file, a token, its tag and its polarity per line, and an empty line
+        after each sentence
+    """
+    lines = []
+    for _ in range(num_examples):
+        words, positions = sentence(rng, length, num_aspects)
+        for i, word in enumerate(words):
+            if i in positions:
+                lines.append("{} B-ASP {}".format(word, rng.choice(POLARITIES)))
+            else:
+                lines.append("{} O -100".format(word))
+        lines.append("")
+    return lines
+
+
+def atepc_inference_texts(rng, num_examples, length, num_aspects):
+    return [
+        " ".join(sentence(rng, length, num_aspects)[0]) for _ in range(num_examples)
+    ]
+
+
+def text_lines(rng, num_examples, length, num_aspects=0):
+    """
+    :return: the sentences labelled with a polarity, e.g., "the food is great$LABEL$Positive"
+    """
+    return [
+        "{}$LABEL${}".format(" ".join(sentence(rng, length)[0]), rng.choice(POLARITIES))
+        for _ in range(num_examples)
+    ]
+
+
+def adversarial_text_lines(rng, num_examples, length, num_aspects=0):
+    """
+    :return: the sentences labelled with a label, the adversarial flag and the adversarial training label
+    """
+    lines = []
+    for _ in range(num_examples):
+        label = rng.choice("01")
+        is_adv = rng.choice("01")
+        lines.append(
+            "{}$LABEL${},{},{}".format(
+                " ".join(sentence(rng, length)[0]), label, is_adv, label
+            )
+        )
+    return lines
+
+
+def rna_lines(rng, num_examples, length, num_aspects=0):
+    """
+    :return: the space-separated RNA sequences of length bases, labelled with a class
+    """
+    return [
+        "{}$LABEL${}".format(
+            " ".join(rng.choice(BASES) for _ in range(length)), rng.choice("01")
+        )
+        for _ in range(num_examples)
+    ]
+
+
+def rna_regression_lines(rng, num_examples, length, num_aspects=0):
+    """
+    :return: the space-separated RNA sequences of length bases, labelled with a value in [0, 1)
+    """
+    return [
+        "{}$LABEL${:.4f}".format(
+            " ".join(rng.choice(BASES) for _ in range(length)), rng.random()
+        )
+        for _ in range(num_examples)
+    ]
+
+
+def code_lines(rng, num_examples, length, num_aspects=0):
+    """
+    :return: the C-like code snippets of length tokens, labelled as defective or not
+    """
+    return [
+        "{}$LABEL${}".format(
+            " ".join(rng.choice(CODE_TOKENS) for _ in range(length)),
+            rng.choice("01"),
+        )
+        for _ in range(num_examples)
+    ]
+
+
+def write_lines(path, lines):
+    with open(path, mode="w", encoding="utf8") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def write_embedding(path, dim, rng):
+    """
+    Write a GloVe-format embedding file of the vocabulary, with random vectors.
+
+    :param path: the embedding file
+    :param dim: the dimension of the vectors
+    :param rng: a random.Random
+    """
+    lines = []
+    for word in vocabulary():
+        for w in dict.fromkeys([word, word.lower()]):
+            vector = " ".join("{:.4f}".format(rng.uniform(-1, 1)) for _ in range(dim))
+            lines.append("{} {}".format(w, vector))
+    return write_lines(path, lines)
+
+
+def build_tiny_backbone(
+    path,
+    hidden_size=32,
+    num_hidden_layers=2,
+    num_attention_heads=2,
+    intermediate_size=64,
+    max_position_embeddings=512,
+    seed=1,
+):
+    """
+    Save a randomly initialized BERT and a WordPiece tokenizer of the vocabulary, loaded with from_pretrained().
+
+    :param path: the directory of the backbone
+    :return: the directory
+    """
+    import torch
+    from transformers import BertConfig, BertModel, BertTokenizer
+
+    os.makedirs(path, exist_ok=True)
+    vocab_file = write_lines(
+        os.path.join(path, "vocab.txt"), SPECIAL_TOKENS + vocabulary()
+    )
+    tokenizer = BertTokenizer(vocab_file, do_lower_case=False)
+    tokenizer.save_pretrained(path)
+
+    torch.manual_seed(seed)
+    config = BertConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=hidden_size,
+        num_hidden_layers=num_hidden_layers,
+        num_attention_heads=num_attention_heads,
+        intermediate_size=intermediate_size,
+        max_position_embeddings=max_position_embeddings,
+    )
+    BertModel(config).save_pretrained(path)
+    return path
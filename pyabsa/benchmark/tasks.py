@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+# file: tasks.py
+# time: 20/10/2026 07:10
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+The benchmarked model families, e.g., "apc" for APCModelList and "apc_glove" for GloVeAPCModelList.
+
+A family knows how to build the config of its models, write a synthetic dataset of its task and featurize and
+predict with its predictor. The task modules are imported when a family is benchmarked, not when it is listed.
+"""
+
+import importlib
+
+from pyabsa.benchmark import synthetic
+
+BENCHMARK_TASKS = {}
+
+
+def register_benchmark_task(task):
+    """
+    :param task: a BenchmarkTask, registered under its name
+    """
+    BENCHMARK_TASKS[task.name] = task
+    return task
+
+
+class BenchmarkTask:
+    def __init__(
+        self,
+        name,
+        task,
+        trainer,
+        config,
+        model_list,
+        models,
+        train_lines,
+        inference_texts=None,
+        glove=False,
+        aspects=False,
+    ):
+        """
+        :param name: the name of the family, e.g., "apc_glove"
+        :param task: the task package in pyabsa.tasks, e.g., "AspectPolarityClassification"
+        :param trainer: the trainer class of the task, e.g., "APCTrainer"
+        :param config: the config getter, e.g., "APCConfigManager.get_apc_config_glove"
+        :param model_list: the model list of the family, e.g., "GloVeAPCModelList"
+        :param models: the names of the models benchmarked by default
+        :param train_lines: a function(rng, num_examples, length, num_aspects) -> the lines of a dataset file
+        :param inference_texts: a function(rng, num_examples, length, num_aspects) -> the inputs of the predictor,
+            default to the lines of a dataset file, i.e., the texts with their labels
+        :param glove: True if the models use word embeddings instead of a pretrained backbone
+        :param aspects: True if the inputs have aspects, the other tasks are benchmarked at a single aspect count
+        """
+        self.name = name
+        self.task = task
+        self.trainer = trainer
+        self.config = config
+        self.model_list = model_list
+        self.models = models
+        self.train_lines = train_lines
+        self.inference_texts = inference_texts or train_lines
+        self.glove = glove
+        self.aspects = aspects
+
+    def module(self):
+        return importlib.import_module("pyabsa.tasks." + self.task)
+
+    def get_trainer_class(self):
+        return getattr(self.module(), self.trainer)
+
+    def get_config(self):
+        manager, getter = self.config.split(".")
+        return getattr(getattr(self.module(), manager), getter)()
+
+    def get_models(self, names=None):
+        """
+        :param names: the model names, or "all" for all the models of the family, default to the default models
+        :return: the model classes
+        """
+        model_list = getattr(self.module(), self.model_list)
+        if names == "all" or names == ["all"]:
+            return list(model_list())
+        models = []
+        for name in names or self.models:
+            model = getattr(model_list, name, None)
+            if not isinstance(model, type):
+                raise ValueError(
+                    "Unknown model {} of {}, available models: {}".format(
+                        name, self.model_list, [m.__name__ for m in model_list()]
+                    )
+                )
+            models.append(model)
+        return models
+
+    def featurize(self, predictor, texts):
+        """
+        Featurize the inputs as the predictor does before the forward.
+        """
+        predictor.dataset.prepare_infer_sample(texts, ignore_error=False)
+
+    def predict(self, predictor, texts):
+        return predictor.predict(texts, print_result=False, ignore_error=False)
+
+    def __repr__(self):
+        return "BenchmarkTask({}: {})".format(self.name, self.model_list)
+
+
+class ATEPCBenchmarkTask(BenchmarkTask):
+    def featurize(self, predictor, texts):
+        from pyabsa.tasks.AspectTermExtraction.dataset_utils.__lcf__.data_utils_for_inference import (
+            convert_ate_examples_to_features,
+        )
+
+        examples = predictor.processor.get_examples_for_aspect_extraction(texts)
+        convert_ate_examples_to_features(
+            examples,
+            predictor.config.label_list,
+            predictor.config.max_seq_len,
+            predictor.tokenizer,
+            predictor.config,
+        )
+
+    def predict(self, predictor, texts):
+        return predictor.predict(
+            texts,
+            save_result=False,
+            print_result=False,
+            eval_batch_size=predictor.config.eval_batch_size,
+        )
+
+
+for _task in [
+    BenchmarkTask(
+        "apc",
+        "AspectPolarityClassification",
+        "APCTrainer",
+        "APCConfigManager.get_apc_config_english",
+        "APCModelList",
+        ["FAST_LCF_BERT", "BERT_SPC"],
+        synthetic.apc_lines,
+        synthetic.apc_inference_texts,
+        aspects=True,
+    ),
+    BenchmarkTask(
+        "apc_bert_baseline",
+        "AspectPolarityClassification",
+        "APCTrainer",
+        "APCConfigManager.get_apc_config_bert_baseline",
+        "BERTBaselineAPCModelList",
+        ["IAN_BERT"],
+        synthetic.apc_lines,
+        synthetic.apc_inference_texts,
+        aspects=True,
+    ),
+    BenchmarkTask(
+        "apc_glove",
+        "AspectPolarityClassification",
+        "APCTrainer",
+        "APCConfigManager.get_apc_config_glove",
+        "GloVeAPCModelList",
+        ["LSTM", "IAN"],
+        synthetic.apc_lines,
+        synthetic.apc_inference_texts,
+        glove=True,
+        aspects=True,
+    ),
+    ATEPCBenchmarkTask(
+        "atepc",
+        "AspectTermExtraction",
+        "ATEPCTrainer",
+        "ATEPCConfigManager.get_atepc_config_english",
+        "ATEPCModelList",
+        ["FAST_LCF_ATEPC"],
+        synthetic.atepc_lines,
+        synthetic.atepc_inference_texts,
+        aspects=True,
+    ),
+    BenchmarkTask(
+        "tc",
+        "TextClassification",
+        "TCTrainer",
+        "TCConfigManager.get_tc_config_english",
+        "BERTTCModelList",
+        ["BERT_MLP"],
+        synthetic.text_lines,
+    ),
+    BenchmarkTask(
+        "tc_glove",
+        "TextClassification",
+        "TCTrainer",
+        "TCConfigManager.get_tc_config_glove",
+        "GloVeTCModelList",
+        ["LSTM"],
+        synthetic.text_lines,
+        glove=True,
+    ),
+    BenchmarkTask(
+        "tad",
+        "TextAdversarialDefense",
+        "TADTrainer",
+        "TADConfigManager.get_tad_config_english",
+        "BERTTADModelList",
+        ["TADBERT"],
+        synthetic.adversarial_text_lines,
+    ),
+    BenchmarkTask(
+        "tad_glove",
+        "TextAdversarialDefense",
+        "TADTrainer",
+        "TADConfigManager.get_tad_config_glove",
+        "GloVeTADModelList",
+        ["TADLSTM"],
+        synthetic.adversarial_text_lines,
+        glove=True,
+    ),
+    BenchmarkTask(
+        "rnac",
+        "RNAClassification",
+        "RNACTrainer",
+        "RNACConfigManager.get_rnac_config_english",
+        "BERTRNACModelList",
+        ["BERT_MLP"],
+        synthetic.rna_lines,
+    ),
+    BenchmarkTask(
+        "rnac_glove",
+        "RNAClassification",
+        "RNACTrainer",
+        "RNACConfigManager.get_rnac_config_glove",
+        "GloVeRNACModelList",
+        ["LSTM"],
+        synthetic.rna_lines,
+        glove=True,
+    ),
+    BenchmarkTask(
+        "rnar",
+        "RNARegression",
+        "RNARTrainer",
+        "RNARConfigManager.get_rnar_config_english",
+        "BERTRNARModelList",
+        ["BERT_MLP"],
+        synthetic.rna_regression_lines,
+    ),
+    BenchmarkTask(
+        "rnar_glove",
+        "RNARegression",
+        "RNARTrainer",
+        "RNARConfigManager.get_rnar_config_glove",
+        "GloVeRNARModelList",
+        ["LSTM"],
+        synthetic.rna_regression_lines,
+        glove=True,
+    ),
+    BenchmarkTask(
+        "cdd",
+        "CodeDefectDetection",
+        "CDDTrainer",
+        "CDDConfigManager.get_cdd_config_base",
+        "BERTCDDModelList",
+        ["BERT_MLP"],
+        synthetic.code_lines,
+    ),
+    BenchmarkTask(
+        "cdd_glove",
+        "CodeDefectDetection",
+        "CDDTrainer",
+        "CDDConfigManager.get_cdd_config_base",
+        "GloVeCDDModelList",
+        ["LSTM"],
+        synthetic.code_lines,
+        glove=True,
+    ),
+]:
+    register_benchmark_task(_task)
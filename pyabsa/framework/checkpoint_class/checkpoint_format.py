@@ -0,0 +1,463 @@
+# -*- coding: utf-8 -*-
+# file: checkpoint_format.py
+# time: 19/10/2026 17:20
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+The safetensors checkpoint format (save_mode=4):
+
+    {model_name}.safetensors    the weights, shared tensors are stored once
+    {model_name}.args.json      the config, i.e., the args of ConfigManager
+    {model_name}.pretrained/    the config.json of the PLM and the tokenizer in save_pretrained() layout
+    {model_name}.tokenizer      the pickled tokenizer, only for the non-pretrained (e.g., GloVe) tokenizers
+    {model_name}.args.txt       the human-readable args, same as the other formats
+
+Loading never downloads or initializes the PLM: the model is built with its parameters on the meta device,
+then the parameters are assigned the tensors of the memory-mapped safetensors file.
+"""
+
+import contextlib
+import importlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import threading
+
+import numpy as np
+import torch
+from safetensors.torch import save_file, load_file
+
+SAFETENSORS_SUFFIX = ".safetensors"
+CONFIG_SUFFIX = ".args.json"
+PRETRAINED_SUFFIX = ".pretrained"
+TOKENIZER_SUFFIX = ".tokenizer"
+
+# these args are rebuilt on loading, or are not needed for inference
+_SKIPPED_ARGS = {"tokenizer", "logger", "MV", "embedding_matrix", "dataset_dict"}
+
+_SAFETENSORS_DTYPES = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+
+# the depth of the init_empty_parameters() contexts entered by each thread
+_empty_parameters = threading.local()
+
+
+def config_to_json(config, tokenizer=None):
+    """
+    Serialize the args of a ConfigManager to a JSON string. Classes and functions (e.g., config.model) are stored
+    by their import path, the args that cannot be serialized are dropped and listed in "__skipped__".
+
+    :param config: the ConfigManager to serialize
+    :param tokenizer: the tokenizer of the model, defaults to config.tokenizer
+    :return: the JSON string
+    """
+    args = {}
+    skipped = []
+    for key, value in config.args.items():
+        if key in _SKIPPED_ARGS:
+            continue
+        try:
+            args[key] = _encode(value)
+        except TypeError:
+            skipped.append(key)
+    if config.args.get("embedding_matrix", None) is not None:
+        args["embedding_matrix_shape"] = list(np.shape(config.args["embedding_matrix"]))
+    if tokenizer is None:
+        tokenizer = config.args.get("tokenizer", None)
+    if tokenizer is not None:
+        args["tokenizer_class"] = type(tokenizer).__name__
+    return json.dumps(
+        {
+            "args": args,
+            "args_call_count": {
+                k: config.args_call_count.get(k, 0) for k in args.keys()
+            },
+            "__skipped__": skipped,
+        },
+        indent=2,
+        ensure_ascii=False,
+    )
+
+
+def config_from_json(path):
+    """
+    Load a ConfigManager from a JSON file written by config_to_json().
+
+    :param path: the path of the JSON file
+    :return: the ConfigManager
+    """
+    from pyabsa.framework.configuration_class.configuration_template import (
+        ConfigManager,
+    )
+
+    with open(path, mode="r", encoding="utf8") as f:
+        content = json.load(f)
+    config = ConfigManager({k: _decode(v) for k, v in content["args"].items()})
+    config.args_call_count.update(content.get("args_call_count", {}))
+    return config
+
+
+def save_safetensors_checkpoint(
+    config,
+    model,
+    tokenizer,
+    save_path,
+    state_dict=None,
+    config_json=None,
+    args_txt=None,
+):
+    """
+    Save a checkpoint in the safetensors format.
+
+    :param config: the config of the model
+    :param model: the model, only used to find the PLM config if state_dict is given
+    :param tokenizer: the tokenizer
+    :param save_path: the checkpoint directory
+    :param state_dict: the weights to save, defaults to model.state_dict()
+    :param config_json: the serialized config, defaults to config_to_json(config)
+    :param args_txt: the content of the .args.txt file, defaults to the args called in config
+    """
+    os.makedirs(save_path, exist_ok=True)
+    prefix = os.path.join(save_path, config.model_name)
+    if state_dict is None:
+        state_dict = model.state_dict()
+    tensors, aliases = _deduplicate(state_dict)
+    save_file(
+        tensors,
+        prefix + SAFETENSORS_SUFFIX,
+        metadata={"format": "pt", "aliases": json.dumps(aliases)},
+    )
+
+    with open(prefix + CONFIG_SUFFIX, mode="w", encoding="utf8") as f:
+        f.write(
+            config_json
+            if config_json is not None
+            else config_to_json(config, tokenizer)
+        )
+    if args_txt is None:
+        args_txt = "".join(
+            "{}: {}\n".format(arg, config.args[arg])
+            for arg in config.args
+            if config.args_call_count.get(arg, 0)
+        )
+    with open(prefix + ".args.txt", mode="w", encoding="utf8") as f:
+        f.write(args_txt)
+
+    hf_tokenizer = tokenizer.tokenizer if hasattr(tokenizer, "tokenizer") else tokenizer
+    plm = _find_plm(model)
+    if hasattr(hf_tokenizer, "save_pretrained") or plm is not None:
+        pretrained_dir = prefix + PRETRAINED_SUFFIX
+        os.makedirs(pretrained_dir, exist_ok=True)
+        if plm is not None:
+            plm.config.save_pretrained(pretrained_dir)
+        if hasattr(hf_tokenizer, "save_pretrained"):
+            hf_tokenizer.save_pretrained(pretrained_dir)
+    if not hasattr(hf_tokenizer, "save_pretrained"):
+        with open(prefix + TOKENIZER_SUFFIX, mode="wb") as f:
+            pickle.dump(tokenizer, f)
+
+
+def load_safetensors_checkpoint(checkpoint, model_class, **kwargs):
+    """
+    Load a checkpoint in the safetensors format, the weights are memory-mapped and assigned to the model
+    without being copied or initialized.
+
+    :param checkpoint: the checkpoint directory (or any file in it)
+    :param model_class: the class of the model (e.g., APCEnsembler), it is called as
+        model_class(config, load_dataset=False, tokenizer=..., pretrained_path=..., embedding_matrix=..., **kwargs)
+    :return: (model, config, tokenizer)
+    """
+    from pyabsa.framework.tokenizer_class.tokenizer_class import PretrainedTokenizer
+
+    if os.path.isfile(checkpoint):
+        checkpoint = os.path.dirname(checkpoint)
+    weights_path = _find_path(checkpoint, SAFETENSORS_SUFFIX)
+    config_path = _find_path(checkpoint, CONFIG_SUFFIX)
+    pretrained_path = _find_path(checkpoint, PRETRAINED_SUFFIX, directory=True)
+    tokenizer_path = _find_path(
+        checkpoint,
+        TOKENIZER_SUFFIX,
+        exclude_key=["__MACOSX", PRETRAINED_SUFFIX],
+    )
+    if not weights_path or not config_path:
+        raise FileNotFoundError(
+            "Can not find the {} and {} files in {}".format(
+                SAFETENSORS_SUFFIX, CONFIG_SUFFIX, checkpoint
+            )
+        )
+
+    config = config_from_json(config_path)
+    if tokenizer_path:
+        with open(tokenizer_path, mode="rb") as f:
+            tokenizer = pickle.load(f)
+    elif config.get("tokenizer_class", None) == PretrainedTokenizer.__name__:
+        tokenizer = PretrainedTokenizer(config, tokenizer_path=pretrained_path)
+    else:
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(pretrained_path)
+
+    embedding_matrix = None
+    if config.get("embedding_matrix_shape", None):
+        # the values are overwritten by the checkpoint, only the shape matters
+        embedding_matrix = np.zeros(config.embedding_matrix_shape, dtype=np.float32)
+
+    with init_empty_parameters():
+        model = model_class(
+            config,
+            load_dataset=False,
+            tokenizer=tokenizer,
+            pretrained_path=pretrained_path,
+            embedding_matrix=embedding_matrix,
+            **kwargs
+        )
+
+    load_state_dict_assign(model, mmap_safetensors(weights_path))
+    config.tokenizer = tokenizer
+    return model, config, tokenizer
+
+
+def build_task_model(
+    config, tokenizer=None, pretrained_path=None, embedding_matrix=None, **kwargs
+):
+    """
+    Build the model of a task with a single model (e.g., text classification) as its predictor does, it is the
+    model_class of load_safetensors_checkpoint() for the tasks other than APC.
+
+    :param config: the config of the model, config.model is the model class
+    :param tokenizer: the tokenizer, unused
+    :param pretrained_path: the .pretrained directory, the PLM is built from its config.json
+    :param embedding_matrix: the embedding matrix of the GloVe models
+    :return: the model
+    """
+    if embedding_matrix is not None:
+        return config.model(embedding_matrix, config)
+    from transformers import AutoConfig, AutoModel
+
+    bert = AutoModel.from_config(AutoConfig.from_pretrained(pretrained_path))
+    return config.model(bert, config)
+
+
+def mmap_safetensors(path):
+    """
+    Map a safetensors file in memory, the tensors are views of the (copy-on-write) mapping,
+    so the pages are only read from disk when they are used and nothing is copied.
+
+    :param path: the path of the safetensors file
+    :return: the state dict, including the aliases of the shared tensors
+    """
+    with open(path, mode="rb") as f:
+        header_size = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(header_size))
+        metadata = header.pop("__metadata__", None) or {}
+        if hasattr(torch, "frombuffer"):
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        else:
+            buffer = None
+
+    if buffer is None:
+        state_dict = load_file(path)
+    else:
+        state_dict = {}
+        for name, info in header.items():
+            dtype = _SAFETENSORS_DTYPES[info["dtype"]]
+            begin, end = info["data_offsets"]
+            if begin == end:
+                state_dict[name] = torch.empty(info["shape"], dtype=dtype)
+                continue
+            tensor = torch.frombuffer(
+                buffer,
+                dtype=dtype,
+                count=(end - begin) // torch.tensor([], dtype=dtype).element_size(),
+                offset=8 + header_size + begin,
+            )
+            state_dict[name] = tensor.view(info["shape"])
+    for alias, name in json.loads(metadata.get("aliases", "{}")).items():
+        state_dict[alias] = state_dict[name]
+    return state_dict
+
+
+def load_state_dict_assign(model, state_dict):
+    """
+    Assign the tensors of state_dict to the parameters of the model (built by init_empty_parameters()).
+
+    :param model: the model whose parameters may be on the meta device
+    :param state_dict: the state dict to assign
+    """
+    try:
+        model.load_state_dict(state_dict, strict=False, assign=True)
+    except TypeError:
+        # torch<2.1 has no assign, materialize the parameters (not the buffers) before copying the weights
+        for module in model.modules():
+            for name, param in module._parameters.items():
+                if param is not None and param.is_meta:
+                    module._parameters[name] = type(param)(
+                        torch.empty_like(param, device="cpu"),
+                        requires_grad=param.requires_grad,
+                    )
+        model.load_state_dict(state_dict, strict=False)
+    missing = [name for name, p in model.named_parameters() if p.is_meta]
+    if missing:
+        raise RuntimeError(
+            "The parameters are missing in the checkpoint: {}".format(missing)
+        )
+
+
+@contextlib.contextmanager
+def init_empty_parameters():
+    """
+    Create the parameters of the modules built in this context on the meta device, so that building a model
+    does not allocate or initialize its weights. The buffers (e.g., position ids) are still created normally,
+    since they are not always saved in the state dict.
+
+    Only the modules built by the current thread are affected, the models built concurrently by other threads
+    are initialized as usual. On torch<2.0 the parameters are initialized, then overwritten by the checkpoint.
+    """
+    register_hook = getattr(
+        torch.nn.modules.module, "register_module_parameter_registration_hook", None
+    )
+    if register_hook is None:
+        yield
+        return
+    handle = register_hook(_register_empty_parameter)
+    _empty_parameters.depth = getattr(_empty_parameters, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _empty_parameters.depth -= 1
+        handle.remove()
+
+
+def _register_empty_parameter(module, name, param):
+    """
+    The parameter registration hook of init_empty_parameters(), it returns the parameter moved to the meta device.
+    """
+    if not getattr(_empty_parameters, "depth", 0) or param is None or param.is_meta:
+        return None
+    kwargs = dict(param.__dict__)
+    kwargs["requires_grad"] = param.requires_grad
+    return type(param)(param.to("meta"), **kwargs)
+
+
+def is_safetensors_checkpoint(checkpoint):
+    """
+    :param checkpoint: the checkpoint path
+    :return: True if the checkpoint has been saved in the safetensors format
+    """
+    if not isinstance(checkpoint, str):
+        return False
+    if os.path.isfile(checkpoint):
+        checkpoint = os.path.dirname(checkpoint)
+    return bool(_find_path(checkpoint, SAFETENSORS_SUFFIX))
+
+
+def _find_path(checkpoint_dir, key, exclude_key=("__MACOSX",), directory=False):
+    """
+    Find a file (or a directory) of a checkpoint by walking the directory, the checkpoint directory can be anywhere,
+    e.g., in the checkpoint registry of the user cache.
+
+    :param checkpoint_dir: the checkpoint directory
+    :param key: a part of the name, e.g., ".safetensors"
+    :param exclude_key: the parts of the names of the directories to skip
+    :param directory: find a directory instead of a file
+    :return: the first path in the sorted walk whose name contains key, or None
+    """
+    for root, dirs, files in os.walk(checkpoint_dir):
+        dirs[:] = sorted(d for d in dirs if not any(k in d for k in exclude_key))
+        for name in dirs if directory else sorted(files):
+            if key in name:
+                return os.path.join(root, name)
+    return None
+
+
+def _deduplicate(state_dict):
+    """
+    Keep a single copy of the tensors sharing storage (e.g., the PLM shared by the models of an ensemble).
+    """
+    tensors = {}
+    aliases = {}
+    seen = {}
+    for name, tensor in state_dict.items():
+        key = tensor_key(tensor)
+        if key in seen:
+            aliases[name] = seen[key]
+        else:
+            seen[key] = name
+            tensors[name] = tensor.contiguous()
+    return tensors, aliases
+
+
+def tensor_key(tensor):
+    """
+    :return: a key identifying the memory viewed by the tensor, equal for the tensors sharing it
+    """
+    return (
+        tensor.device,
+        tensor.data_ptr(),
+        tuple(tensor.shape),
+        tuple(tensor.stride()),
+        tensor.dtype,
+    )
+
+
+def _find_plm(model):
+    if model is None:
+        return None
+    for module in model.modules():
+        if hasattr(module, "config") and hasattr(module.config, "save_pretrained"):
+            return module
+    return None
+
+
+def _encode(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple, set)):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value):
+            return {k: _encode(v) for k, v in value.items()}
+        return {"__dict__": [[_encode(k), _encode(v)] for k, v in value.items()]}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, torch.device):
+        return str(value)
+    if isinstance(value, type) or callable(value):
+        if hasattr(value, "__module__") and hasattr(value, "__qualname__"):
+            return {"__class__": "{}:{}".format(value.__module__, value.__qualname__)}
+    raise TypeError("Can not serialize {} to JSON".format(type(value)))
+
+
+def _decode(value):
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if isinstance(value, dict):
+        if "__class__" in value and len(value) == 1:
+            module, qualname = value["__class__"].split(":")
+            obj = importlib.import_module(module)
+            for attr in qualname.split("."):
+                obj = getattr(obj, attr)
+            return obj
+        if "__dict__" in value and len(value) == 1:
+            return {_hashable(_decode(k)): _decode(v) for k, v in value["__dict__"]}
+        return {k: _decode(v) for k, v in value.items()}
+    return value
+
+
+def _hashable(value):
+    return tuple(value) if isinstance(value, list) else value
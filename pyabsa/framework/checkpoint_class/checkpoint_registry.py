@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+# file: checkpoint_registry.py
+# time: 20/10/2026 02:10
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+The registry of the checkpoints, shared by the processes of a machine in ~/.cache/pyabsa/checkpoints (or
+PYABSA_CHECKPOINT_DIR):
+
+- manifest.json is the checkpoint manifest (checkpoints-v2.0.json), revalidated with its ETag once its TTL
+  (PYABSA_CHECKPOINT_MANIFEST_TTL seconds, one day by default) has expired, and used as is when the network is down;
+- the checkpoints are downloaded, extracted and verified once, into a directory renamed in place only when complete;
+- index.json records the extracted directories and their .state_dict, .model, .tokenizer and .config files, so a
+  resolution is a lookup, without any download, unzip or directory scan.
+
+The downloads, the extractions and the updates of the manifest and the index hold a file lock, so the workers
+started together download a checkpoint once, and the others wait for it.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import time
+import zipfile
+
+from pyabsa.framework.flag_class.flag_template import PyABSAMaterialHostAddress
+
+CHECKPOINT_DIR_ENV = "PYABSA_CHECKPOINT_DIR"
+MANIFEST_TTL_ENV = "PYABSA_CHECKPOINT_MANIFEST_TTL"
+DEFAULT_MANIFEST_TTL = 24 * 3600
+MANIFEST_URL = PyABSAMaterialHostAddress + "raw/main/checkpoints-v2.0.json"
+REQUEST_TIMEOUT = 10
+INDEX_VERSION = 1
+
+# the files of a checkpoint, by the keywords of their names
+CHECKPOINT_FILE_KEYS = {
+    "state_dict": ".state_dict",
+    "model": ".model",
+    "tokenizer": ".tokenizer",
+    "config": ".config",
+}
+
+_registries = {}
+_dir_files = {}
+
+
+def get_checkpoint_registry(cache_dir=None):
+    """
+    :param cache_dir: the registry directory, default to PYABSA_CHECKPOINT_DIR or ~/.cache/pyabsa/checkpoints
+    :return: the CheckpointRegistry of the directory, shared in the process
+    """
+    cache_dir = os.path.abspath(cache_dir or default_cache_dir())
+    if cache_dir not in _registries:
+        _registries[cache_dir] = CheckpointRegistry(cache_dir)
+    return _registries[cache_dir]
+
+
+def default_cache_dir():
+    if os.environ.get(CHECKPOINT_DIR_ENV):
+        return os.environ[CHECKPOINT_DIR_ENV]
+    cache_home = os.environ.get(
+        "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+    )
+    return os.path.join(cache_home, "pyabsa", "checkpoints")
+
+
+def find_checkpoint_files(checkpoint_dir):
+    """
+    Find the .state_dict, .model, .tokenizer and .config files of a checkpoint directory in one scan, the equivalent
+    of find_file(checkpoint_dir, key, exclude_key=["__MACOSX"]) for each of them. The results are recorded in the
+    index for the registry directories, and kept in the process for the others until the directory changes.
+
+    :param checkpoint_dir: the checkpoint directory
+    :return: a dict of the file paths (or None) by "state_dict", "model", "tokenizer" and "config"
+    """
+    registry = get_checkpoint_registry()
+    files = registry.indexed_files(checkpoint_dir)
+    if files is not None:
+        return files
+    key = os.path.abspath(checkpoint_dir)
+    try:
+        mtime = os.stat(checkpoint_dir).st_mtime
+    except OSError:
+        return dict.fromkeys(CHECKPOINT_FILE_KEYS)
+    if key not in _dir_files or _dir_files[key][0] != mtime:
+        _dir_files[key] = (mtime, _scan_checkpoint_files(checkpoint_dir))
+    return dict(_dir_files[key][1])
+
+
+class CheckpointRegistry:
+    def __init__(self, cache_dir):
+        """
+        :param cache_dir: the registry directory
+        """
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._manifest = None
+        self._manifest_time = 0
+        self._index = None
+
+    def manifest(self, ttl=None, force=False):
+        """
+        The checkpoint manifest, revalidated with the remote when its TTL has expired.
+
+        :param ttl: the lifetime of the manifest in seconds, default to PYABSA_CHECKPOINT_MANIFEST_TTL or one day
+        :param force: revalidate the manifest even if it is not expired
+        :return: the manifest, or an empty dict if it is neither cached nor reachable
+        """
+        if ttl is None:
+            ttl = float(os.environ.get(MANIFEST_TTL_ENV, DEFAULT_MANIFEST_TTL))
+        if (
+            self._manifest is not None
+            and not force
+            and time.time() - self._manifest_time <= ttl
+        ):
+            return self._manifest
+
+        cached = _load_json(self.manifest_path)
+        if not force and time.time() - cached.get("time", 0) <= ttl:
+            return self._set_manifest(cached)
+
+        with self._lock("manifest"):
+            # revalidated by another process in the meantime
+            cached = _load_json(self.manifest_path)
+            if not force and time.time() - cached.get("time", 0) <= ttl:
+                return self._set_manifest(cached)
+            try:
+                cached = self._fetch_manifest(cached)
+            except Exception as e:
+                from pyabsa.utils.pyabsa_utils import fprint
+
+                fprint(
+                    "Fail to revalidate the checkpoint manifest ({}), use the cached one".format(
+                        e
+                    )
+                )
+                if "checkpoints" not in cached:
+                    # the manifest saved in the working directory by the former versions
+                    legacy = _load_json("./checkpoints.json")
+                    cached = {"checkpoints": legacy} if legacy else {}
+                # retried after the TTL, so an unreachable remote is not queried by every process
+                cached["time"] = time.time()
+                _save_json(self.manifest_path, cached)
+                return self._set_manifest(cached)
+            _save_json(self.manifest_path, cached)
+        return self._set_manifest(cached)
+
+    def resolve(self, task_code, language, checkpoint):
+        """
+        Download, extract and verify a checkpoint of the manifest, once.
+
+        :param task_code: the task code, e.g., "APC"
+        :param language: the checkpoint name in the manifest, e.g., "english"
+        :param checkpoint: the manifest entry of the checkpoint
+        :return: the checkpoint directory
+        """
+        key = "{}/{}/{}".format(
+            task_code.upper(), language.lower(), checkpoint["Checkpoint File"]
+        )
+        path = self._indexed_path(key)
+        if path:
+            return path
+
+        # the checkpoints downloaded in the working directory by the former versions
+        legacy_dir = os.path.join(
+            "./checkpoints",
+            "{}_{}_CHECKPOINT".format(task_code.upper(), language.upper()),
+        )
+        if _is_complete(_scan_checkpoint_files(legacy_dir)):
+            return legacy_dir
+
+        with self._lock(key):
+            path = self._indexed_path(key, reload=True)
+            if path:
+                return path
+            url = (
+                PyABSAMaterialHostAddress
+                + "resolve/main/checkpoints/{}/{}/{}".format(
+                    checkpoint["Language"],
+                    task_code.upper(),
+                    checkpoint["Checkpoint File"],
+                )
+            )
+            download_dir = os.path.join(self.cache_dir, "downloads")
+            os.makedirs(download_dir, exist_ok=True)
+            zip_path = os.path.join(download_dir, _safe_name(key) + ".zip")
+            try:
+                self._download(url, zip_path)
+                path = self._extract(
+                    zip_path,
+                    os.path.join(
+                        self.cache_dir,
+                        "{}_{}_CHECKPOINT".format(task_code.upper(), language.upper()),
+                    ),
+                    sha256=checkpoint.get("SHA256", checkpoint.get("sha256")),
+                )
+            except Exception as e:
+                raise ConnectionError(
+                    "Fail to download checkpoint: {}, please download it via browser: {}".format(
+                        e, url
+                    )
+                )
+            finally:
+                if os.path.exists(zip_path):
+                    os.remove(zip_path)
+            self._record(key, path)
+        return path
+
+    def extract(self, zip_path):
+        """
+        Extract and verify a zipped checkpoint once, the extraction is reused until the zip file changes.
+
+        :param zip_path: the zipped checkpoint
+        :return: the checkpoint directory
+        """
+        stat = os.stat(zip_path)
+        key = "zip/{}/{}/{}".format(
+            os.path.abspath(zip_path), stat.st_size, stat.st_mtime
+        )
+        path = self._indexed_path(key)
+        if path:
+            return path
+        with self._lock(key):
+            path = self._indexed_path(key, reload=True)
+            if path:
+                return path
+            name = os.path.splitext(os.path.basename(zip_path))[0]
+            path = self._extract(
+                zip_path,
+                os.path.join(
+                    self.cache_dir,
+                    "extracted",
+                    "{}_{}".format(name, hashlib.md5(key.encode()).hexdigest()[:8]),
+                ),
+            )
+            self._record(key, path)
+        return path
+
+    def indexed_files(self, checkpoint_dir):
+        """
+        :return: the recorded files of a checkpoint directory extracted by the registry, or None
+        """
+        path = os.path.abspath(checkpoint_dir)
+        if not path.startswith(os.path.abspath(self.cache_dir) + os.sep):
+            return None
+        for entry in self._load_index().values():
+            if entry["path"] == path:
+                return dict(entry["files"])
+        return None
+
+    def _set_manifest(self, cached):
+        self._manifest = cached.get("checkpoints", {})
+        self._manifest_time = time.time()
+        return self._manifest
+
+    def _fetch_manifest(self, cached):
+        import requests
+
+        headers = {}
+        if cached.get("etag") and "checkpoints" in cached:
+            headers["If-None-Match"] = cached["etag"]
+        response = requests.get(MANIFEST_URL, headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304:
+            cached["time"] = time.time()
+            return cached
+        response.raise_for_status()
+        return {
+            "checkpoints": response.json(),
+            "etag": response.headers.get("ETag"),
+            "time": time.time(),
+        }
+
+    def _download(self, url, save_path):
+        import requests
+        import tqdm
+
+        response = requests.get(url, stream=True, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        size = int(response.headers.get("content-length", 0))
+        tmp_path = "{}.{}.tmp".format(save_path, os.getpid())
+        with open(tmp_path, "wb") as f:
+            for chunk in tqdm.tqdm(
+                response.iter_content(chunk_size=1024 * 1024),
+                unit="MB",
+                total=size // 1024 // 1024,
+                desc="Downloading checkpoint",
+            ):
+                f.write(chunk)
+        downloaded = os.path.getsize(tmp_path)
+        if size and downloaded != size:
+            os.remove(tmp_path)
+            raise ConnectionError(
+                "incomplete download: {} of {} bytes".format(downloaded, size)
+            )
+        os.replace(tmp_path, save_path)
+
+    def _extract(self, zip_path, dest_dir, sha256=None):
+        # extract in a temporary directory, renamed to dest_dir once verified
+        if sha256:
+            digest = hashlib.sha256()
+            with open(zip_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            if digest.hexdigest() != sha256.lower():
+                raise ValueError("{}: checksum mismatch".format(zip_path))
+        tmp_dir = "{}.{}.tmp".format(dest_dir, os.getpid())
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        with zipfile.ZipFile(zip_path, "r") as z:
+            corrupted = z.testzip()
+            if corrupted:
+                raise zipfile.BadZipfile(
+                    "{}: {} is corrupted".format(zip_path, corrupted)
+                )
+            z.extractall(tmp_dir)
+        if not _is_complete(_scan_checkpoint_files(tmp_dir)):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise ValueError(
+                "{}: no .config and .state_dict or .model file".format(zip_path)
+            )
+        shutil.rmtree(dest_dir, ignore_errors=True)
+        os.replace(tmp_dir, dest_dir)
+        return os.path.abspath(dest_dir)
+
+    def _indexed_path(self, key, reload=False):
+        entry = self._load_index(reload).get(key)
+        if entry and all(
+            os.path.exists(path) for path in entry["files"].values() if path
+        ):
+            return entry["path"]
+        return None
+
+    def _record(self, key, path):
+        # called with the lock of the checkpoint, the index has its own lock
+        with self._lock("index"):
+            index = self._load_index(reload=True)
+            index[key] = {"path": path, "files": _scan_checkpoint_files(path)}
+            _save_json(self.index_path, {"version": INDEX_VERSION, "entries": index})
+
+    def _load_index(self, reload=False):
+        if self._index is None or reload:
+            index = _load_json(self.index_path)
+            self._index = (
+                index.get("entries", {})
+                if index.get("version") == INDEX_VERSION
+                else {}
+            )
+        return self._index
+
+    @contextlib.contextmanager
+    def _lock(self, name):
+        lock_dir = os.path.join(self.cache_dir, "locks")
+        os.makedirs(lock_dir, exist_ok=True)
+        with _file_lock(os.path.join(lock_dir, _safe_name(name) + ".lock")):
+            yield
+
+
+@contextlib.contextmanager
+def _file_lock(path):
+    # an exclusive lock, released by the OS if the process dies
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after 10 seconds
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _scan_checkpoint_files(checkpoint_dir):
+    files = dict.fromkeys(CHECKPOINT_FILE_KEYS)
+    if not os.path.isdir(checkpoint_dir):
+        return files
+    for root, dirs, names in os.walk(checkpoint_dir):
+        dirs[:] = sorted(d for d in dirs if "__MACOSX" not in d)
+        for name in sorted(names):
+            for file_type, key in CHECKPOINT_FILE_KEYS.items():
+                if files[file_type] is None and key in name:
+                    files[file_type] = os.path.join(root, name)
+    return files
+
+
+def _is_complete(files):
+    return bool(files["config"] and (files["state_dict"] or files["model"]))
+
+
+def _safe_name(name):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+def _load_json(path):
+    try:
+        with open(path, mode="r", encoding="utf8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_json(path, obj):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        with open(tmp_path, mode="w", encoding="utf8") as f:
+            json.dump(obj, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
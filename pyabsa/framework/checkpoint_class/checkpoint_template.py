@@ -14,11 +14,13 @@ from findfile import find_file
 from termcolor import colored
 
 from pyabsa import TaskCodeOption
+from pyabsa.framework.checkpoint_class.checkpoint_registry import (
+    get_checkpoint_registry,
+)
 from pyabsa.framework.checkpoint_class.checkpoint_utils import (
     available_checkpoints,
     download_checkpoint,
 )
-from pyabsa.utils.file_utils.file_utils import unzip_checkpoint
 from pyabsa.utils.pyabsa_utils import fprint
 
 from pyabsa.tasks.AspectPolarityClassification import SentimentClassifier
@@ -57,33 +59,31 @@ class CheckpointManager:
         if isinstance(checkpoint, str) or isinstance(checkpoint, Path):
             # directly load checkpoint from local path
             if os.path.exists(checkpoint):
+                if str(checkpoint).endswith(".zip") and os.path.isfile(checkpoint):
+                    # extracted once, in the checkpoint registry
+                    return get_checkpoint_registry().extract(str(checkpoint))
                 return checkpoint
 
             try:
-                self._get_remote_checkpoint(checkpoint, task_code)
+                # resolved once, then looked up in the index of the checkpoint registry
+                return self._get_remote_checkpoint(checkpoint, task_code)
             except Exception as e:
                 fprint(
                     "No checkpoint found in Model Hub for task: {}".format(checkpoint)
                 )
 
-            if find_file(os.getcwd(), [checkpoint, task_code, ".config"]):
-                # load checkpoint from current working directory with task specified
-                checkpoint_config = find_file(
-                    os.getcwd(), [checkpoint, task_code, ".config"]
-                )
-            else:
-                # load checkpoint from current working directory without task specified
-                checkpoint_config = find_file(os.getcwd(), [checkpoint, ".config"])
+            # load checkpoint from current working directory with task specified, or without task specified
+            checkpoint_config = find_file(
+                os.getcwd(), [checkpoint, task_code, ".config"]
+            ) or find_file(os.getcwd(), [checkpoint, ".config"])
 
             if checkpoint_config:
                 # locate the checkpoint directory
                 checkpoint = os.path.dirname(checkpoint_config)
             elif isinstance(checkpoint, str) and checkpoint.endswith(".zip"):
-                checkpoint = unzip_checkpoint(
-                    checkpoint
-                    if os.path.exists(checkpoint)
-                    else find_file(os.getcwd(), checkpoint)
-                )
+                zip_path = find_file(os.getcwd(), checkpoint)
+                if zip_path:
+                    checkpoint = get_checkpoint_registry().extract(zip_path)
 
         return checkpoint
 
@@ -6,19 +6,16 @@
 # GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
 # ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
 # Copyright (C) 2022. All Rights Reserved.
-import json
-import os
 from distutils.version import StrictVersion
 from typing import Union, Dict, Any
 
-import requests
-import tqdm
-from findfile import find_files, find_cwd_files, find_cwd_dir
 from packaging import version
 from pyabsa.framework.flag_class import TaskCodeOption
 from termcolor import colored
-from pyabsa import __version__ as current_version, PyABSAMaterialHostAddress
-from pyabsa.utils.file_utils.file_utils import unzip_checkpoint
+from pyabsa import __version__ as current_version
+from pyabsa.framework.checkpoint_class.checkpoint_registry import (
+    get_checkpoint_registry,
+)
 from pyabsa.utils.pyabsa_utils import fprint
 
 
@@ -90,17 +87,8 @@ def available_checkpoints(
     """
     if task_code is None:
         fprint("Please specify the task code, e.g. from pyabsa import TaskCodeOption")
-    try:  # from huggingface space
-        checkpoint_url = PyABSAMaterialHostAddress + "raw/main/checkpoints-v2.0.json"
-        response = requests.get(checkpoint_url)
-        with open("./checkpoints.json", "w") as f:
-            json.dump(response.json(), f)
-    except Exception as e:
-        fprint(
-            "Fail to download checkpoints info from huggingface space, try to download from local"
-        )
-    with open("./checkpoints.json", "r", encoding="utf8") as f:
-        checkpoint_map = json.load(f)
+    # cached in the checkpoint registry, and revalidated with the remote once per TTL
+    checkpoint_map = get_checkpoint_registry().manifest()
 
     t_checkpoint_map = {}
     for c_version in checkpoint_map:
@@ -129,8 +117,9 @@ def available_checkpoints(
 def download_checkpoint(task: str, language: str, checkpoint: dict) -> str:
     """
     Download a pretrained checkpoint for a given task and language.
-    The download_checkpoint() function downloads a checkpoint from a given URL using the requests library. It saves the downloaded checkpoint to a temporary directory with a name that corresponds to the task and language. If the checkpoint has already been downloaded and saved in the temporary directory, the function simply returns the directory path.
-    The function then unzips the downloaded checkpoint file, removes the zip file and returns the directory path of the unzipped checkpoint. If the download is unsuccessful, a ConnectionError is raised.
+    The checkpoint is downloaded, extracted and verified once by the checkpoint registry (see checkpoint_registry.py),
+    in a directory shared by the processes of the machine. The checkpoints downloaded in ./checkpoints by the former
+    versions are used as they are. If the download is unsuccessful, a ConnectionError is raised.
 
     :param task: A string representing the task to download the checkpoint for (e.g. "sentiment_analysis").
     :param language: A string representing the language to download the checkpoint for (e.g. "english").
@@ -147,58 +136,4 @@ def download_checkpoint(task: str, language: str, checkpoint: dict) -> str:
             "red",
         )
     )
-    huggingface_checkpoint_url = (
-        PyABSAMaterialHostAddress
-        + "resolve/main/checkpoints/{}/{}/{}".format(
-            checkpoint["Language"], task.upper(), checkpoint["Checkpoint File"]
-        )
-    )
-
-    tmp_dir = "{}_{}_CHECKPOINT".format(task.upper(), language.upper())
-    dest_path = os.path.join("./checkpoints", tmp_dir)
-    if not os.path.exists(dest_path):
-        os.makedirs(dest_path)
-
-    if (
-        find_files(dest_path, ".model") or find_files(dest_path, ".state_dict")
-    ) and find_files(dest_path, ".config"):
-        fprint("Checkpoint already downloaded, skip")
-        return dest_path
-
-    if find_cwd_files(
-        [
-            checkpoint["Training Model"],
-            checkpoint["Checkpoint File"].strip(".zip"),
-            ".config",
-        ]
-    ):
-        return find_cwd_dir(
-            [checkpoint["Training Model"], checkpoint["Checkpoint File"].strip(".zip")]
-        )
-    save_path = os.path.join(dest_path, checkpoint["Checkpoint File"])
-
-    try:  # from Huggingface Space
-        response = requests.get(huggingface_checkpoint_url, stream=True)
-        "https://huggingface.co/spaces/yangheng/PyABSA/raw/main/checkpoints/Code/bert_mlp_all_cpdp_acc_64.52_f1_64.48.zip"
-        "https://huggingface.co/spaces/yangheng/PyABSA/resolve/main/checkpoints/Code/CDD/bert_mlp_all_cpdp_acc_64.52_f1_64.48.zip"
-        with open(save_path, "wb") as f:
-            for chunk in tqdm.tqdm(
-                response.iter_content(chunk_size=1024 * 1024),
-                unit="MB",
-                total=int(response.headers["content-length"]) // 1024 // 1024,
-                desc="Downloading checkpoint",
-            ):
-                f.write(chunk)
-    except Exception as e:
-        raise ConnectionError("Fail to download checkpoint: {}".format(e))
-    unzip_checkpoint(save_path)
-    os.remove(save_path)
-    fprint(
-        colored(
-            "If the auto-downloading failed, please download it via browser: {} ".format(
-                huggingface_checkpoint_url
-            ),
-            "yellow",
-        )
-    )
-    return dest_path
+    return get_checkpoint_registry().resolve(task, language, checkpoint)
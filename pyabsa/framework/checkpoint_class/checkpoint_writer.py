@@ -0,0 +1,451 @@
+# -*- coding: utf-8 -*-
+# file: checkpoint_writer.py
+# time: 19/10/2026 16:05
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+import copy
+import os
+import pickle
+import re
+import shutil
+import threading
+import time
+import uuid
+
+import torch
+
+from pyabsa.framework.checkpoint_class.checkpoint_format import (
+    config_to_json,
+    save_safetensors_checkpoint,
+    tensor_key,
+)
+from pyabsa.framework.flag_class.flag_template import ModelSaveOption
+from pyabsa.framework.instructor_class import distributed
+from pyabsa.utils.pyabsa_utils import fprint
+
+
+class CheckpointWriter:
+    """
+    Write checkpoints in background, atomically, and prune the old ones by policy.
+
+    On save(), the weights are copied to (pinned) CPU buffers on the training thread, which is the only cost paid by
+    the training loop. A background thread then writes the checkpoint into a temporary directory next to the target,
+    and renames it to the target path once all files are flushed, so a crash mid-write never leaves a partially
+    written checkpoint behind. The previous checkpoint is only pruned after the new one has been committed.
+
+    The files are the same as pyabsa.utils.file_utils.file_utils.save_model() writes, so the checkpoints are loaded
+    by the inference models as usual.
+
+    Two buffer sets are used: one being written and one pending. If a new checkpoint is saved while another one is
+    still pending, the pending one is superseded (e.g., a newer best model) instead of blocking the training loop.
+
+    The temporary checkpoints left behind by the writers killed mid-write are removed on startup, see
+    remove_stale_checkpoints().
+    """
+
+    def __init__(self, config, keep_best_k=None, asynchronous=None):
+        """
+        :param config: the training config, "save_mode", "model_name", "checkpoint_keep_best_k" and
+            "async_checkpoint" are used
+        :param keep_best_k: how many best checkpoints are kept on disk, defaults to config.checkpoint_keep_best_k or 1
+        :param asynchronous: write in a background thread, defaults to config.async_checkpoint or True
+        """
+        self.config = config
+        self.keep_best_k = (
+            keep_best_k
+            if keep_best_k is not None
+            else config.get("checkpoint_keep_best_k", 1)
+        )
+        self.asynchronous = (
+            asynchronous
+            if asynchronous is not None
+            else config.get("async_checkpoint", True)
+        )
+        self.saved_checkpoints = []  # (metric, path) of the committed checkpoints
+        if distributed.is_main_process():
+            remove_stale_checkpoints(config.get("model_path_to_save", None))
+
+        self._buffers = [{}, {}]
+        self._template_model = None
+        self._tokenizer_bytes = {}
+        self._pending = None
+        self._writing = None
+        self._error = None
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = None
+        if self.asynchronous:
+            self._thread = threading.Thread(target=self._write_loop, daemon=True)
+            self._thread.start()
+
+    def save(self, model, tokenizer, save_path, metric=None):
+        """
+        Snapshot the model and schedule the checkpoint to be written to save_path.
+
+        :param model: the model to save
+        :param tokenizer: the tokenizer to save
+        :param save_path: the checkpoint directory
+        :param metric: the metric of this checkpoint used by the keep-best-k policy,
+            checkpoints without metric are never pruned
+        """
+        self._raise_error()
+        if not distributed.is_main_process():
+            # the weights are identical on all the DDP ranks, only rank 0 writes
+            return
+        model_to_save = unwrap_model(model)
+        with self._condition:
+            if self._pending is not None:
+                fprint(
+                    "Checkpoint {} is superseded by {} before being written".format(
+                        self._pending["save_path"], save_path
+                    )
+                )
+                # take the pending job back, so its buffers can be overwritten safely
+                buffer_id = self._pending["buffer_id"]
+                self._pending = None
+            else:
+                buffer_id = self._free_buffer_id()
+
+        job = {
+            "save_path": save_path,
+            "metric": metric,
+            "buffer_id": buffer_id,
+            "save_mode": self.config.save_mode,
+            "model_name": self.config.model_name,
+            # the config and args are serialized now, they keep changing during training
+            "config": pickle.dumps(self.config),
+            "args": "".join(
+                "{}: {}\n".format(arg, self.config.args[arg])
+                for arg in self.config.args
+                if self.config.args_call_count.get(arg, 0)
+            ),
+        }
+        if self.config.save_mode == ModelSaveOption.SAVE_SAFETENSORS:
+            job["config_json"] = config_to_json(self.config, tokenizer)
+            job["tokenizer_object"] = tokenizer
+            job["model"] = model_to_save
+        else:
+            job["tokenizer"] = self._serialize_tokenizer(tokenizer)
+
+        if self.config.save_mode == ModelSaveOption.SAVE_FINE_TUNED_PLM:
+            plm = model_to_save
+            if hasattr(plm, "bert4global"):
+                plm = plm.bert4global
+            elif hasattr(plm, "bert"):
+                plm = plm.bert
+            job["plm_config"] = plm.config
+            job["tokenizer_object"] = (
+                tokenizer.tokenizer if hasattr(tokenizer, "tokenizer") else tokenizer
+            )
+            model_to_save = plm
+        elif self.config.save_mode == ModelSaveOption.SAVE_FULL_MODEL:
+            if self._template_model is None:
+                self._template_model = _cpu_template(model_to_save, self.config)
+            job["template_model"] = self._template_model
+
+        job["event"] = self._copy_state_dict(model_to_save, self._buffers[buffer_id])
+
+        if not self.asynchronous:
+            self._write(job)
+            return
+        with self._condition:
+            self._pending = job
+            self._condition.notify_all()
+
+    def flush(self):
+        """
+        Block until all the scheduled checkpoints are written.
+        """
+        if self.asynchronous:
+            with self._condition:
+                while self._pending is not None or self._writing is not None:
+                    self._condition.wait(timeout=1)
+        self._raise_error()
+
+    def close(self):
+        """
+        Flush the scheduled checkpoints and stop the background thread.
+        """
+        self.flush()
+        if self._thread is not None:
+            with self._condition:
+                self._closed = True
+                self._condition.notify_all()
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def best_checkpoint(self):
+        """
+        :return: the path of the committed checkpoint with the best metric (the latest one if no metric is given)
+        """
+        with self._condition:
+            if not self.saved_checkpoints:
+                return None
+            ranked = [c for c in self.saved_checkpoints if c[0] is not None]
+            if not ranked:
+                return self.saved_checkpoints[-1][1]
+            return max(ranked, key=lambda c: c[0])[1]
+
+    def _free_buffer_id(self):
+        if self._writing is None:
+            return 0
+        return 1 - self._writing["buffer_id"]
+
+    def _serialize_tokenizer(self, tokenizer):
+        # the tokenizer does not change during training, serialize it only once
+        if id(tokenizer) not in self._tokenizer_bytes:
+            self._tokenizer_bytes = {id(tokenizer): pickle.dumps(tokenizer)}
+        return self._tokenizer_bytes[id(tokenizer)]
+
+    @torch.no_grad()
+    def _copy_state_dict(self, model, buffers):
+        state_dict = model.state_dict()
+        for name in list(buffers.keys()):
+            if name not in state_dict:
+                buffers.pop(name)
+        copied = {}
+        used = set()
+        for name, tensor in state_dict.items():
+            # the tensors sharing memory (e.g., the PLM shared by the ensemble) share their buffer too
+            key = tensor_key(tensor)
+            if key in copied:
+                buffers[name] = buffers[copied[key]]
+                continue
+            copied[key] = name
+            buffer = buffers.get(name)
+            if (
+                buffer is None
+                or buffer.shape != tensor.shape
+                or buffer.dtype != tensor.dtype
+                or id(buffer) in used
+            ):
+                buffer = torch.empty(
+                    tensor.shape,
+                    dtype=tensor.dtype,
+                    pin_memory=tensor.is_cuda,
+                )
+                buffers[name] = buffer
+            used.add(id(buffer))
+            buffer.copy_(tensor, non_blocking=tensor.is_cuda)
+        if any(tensor.is_cuda for tensor in state_dict.values()):
+            # the writer thread waits on this event before reading the buffers
+            event = torch.cuda.Event()
+            event.record()
+            return event
+        return None
+
+    def _write_loop(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None and self._closed:
+                    return
+                self._writing, self._pending = self._pending, None
+            try:
+                self._write(self._writing)
+            except Exception as e:
+                self._error = e
+            finally:
+                with self._condition:
+                    self._writing = None
+                    self._condition.notify_all()
+
+    def _write(self, job):
+        if job["event"] is not None:
+            job["event"].synchronize()
+        state_dict = self._buffers[job["buffer_id"]]
+
+        save_path = job["save_path"]
+        target = save_path.rstrip("/\\")
+        # the pid tells the stale temporary checkpoints from the ones being written by the other processes
+        tmp_dir = "{}.tmp-{}-{}".format(target, os.getpid(), uuid.uuid4().hex[:8])
+        os.makedirs(tmp_dir)
+        try:
+            self._write_files(job, state_dict, tmp_dir)
+            _atomic_replace_dir(tmp_dir, target)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        with self._condition:
+            self.saved_checkpoints = [
+                c for c in self.saved_checkpoints if c[1] != save_path
+            ]
+            self.saved_checkpoints.append((job["metric"], save_path))
+            to_prune = self._checkpoints_to_prune()
+        for path in to_prune:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _write_files(self, job, state_dict, tmp_dir):
+        prefix = os.path.join(tmp_dir, job["model_name"])
+
+        if job["save_mode"] in (
+            ModelSaveOption.SAVE_MODEL_STATE_DICT,
+            ModelSaveOption.SAVE_FULL_MODEL,
+        ):
+            _write_bytes(prefix + ".config", job["config"])
+            _write_bytes(prefix + ".tokenizer", job["tokenizer"])
+            _write_bytes(prefix + ".args.txt", job["args"].encode("utf8"))
+            if job["save_mode"] == ModelSaveOption.SAVE_MODEL_STATE_DICT:
+                with open(prefix + ".state_dict", "wb") as f:
+                    torch.save(state_dict, f)
+                    _sync_file(f)
+            else:
+                template_model = job["template_model"]
+                template_model.load_state_dict(state_dict)
+                with open(prefix + ".model", "wb") as f:
+                    torch.save(template_model, f)
+                    _sync_file(f)
+        elif job["save_mode"] == ModelSaveOption.SAVE_SAFETENSORS:
+            save_safetensors_checkpoint(
+                self.config,
+                job["model"],
+                job["tokenizer_object"],
+                tmp_dir,
+                state_dict=state_dict,
+                config_json=job["config_json"],
+                args_txt=job["args"],
+            )
+        elif job["save_mode"] == ModelSaveOption.SAVE_FINE_TUNED_PLM:
+            model_output_dir = os.path.join(tmp_dir, "fine-tuned-pretrained-model")
+            os.makedirs(model_output_dir)
+            with open(os.path.join(model_output_dir, "pytorch_model.bin"), "wb") as f:
+                torch.save(state_dict, f)
+                _sync_file(f)
+            job["plm_config"].to_json_file(
+                os.path.join(model_output_dir, "config.json")
+            )
+            job["tokenizer_object"].save_pretrained(model_output_dir)
+        else:
+            raise ValueError("Invalid save_mode: {}".format(job["save_mode"]))
+
+    def _checkpoints_to_prune(self):
+        if not self.keep_best_k or self.keep_best_k < 1:
+            return []
+        ranked = [c for c in self.saved_checkpoints if c[0] is not None]
+        if len(ranked) <= self.keep_best_k:
+            return []
+        # the latest one wins ties, it has been evaluated on the most trained weights
+        order = sorted(enumerate(ranked), key=lambda c: (c[1][0], c[0]), reverse=True)
+        # the (metric, path) of the checkpoints out of the best k
+        pruned = [c for _, c in order[self.keep_best_k :]]
+        self.saved_checkpoints = [c for c in self.saved_checkpoints if c not in pruned]
+        return [path for _, path in pruned]
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Fail to write checkpoint: {}".format(error))
+
+
+def remove_stale_checkpoints(directory):
+    """
+    Remove the temporary checkpoints of the interrupted writes in a directory, i.e., the ones of the processes which
+    are not running anymore. A checkpoint moved aside by an interrupted replacement is restored if the new one was not
+    renamed to its path, and removed otherwise.
+
+    :param directory: the directory of the checkpoints, e.g., config.model_path_to_save
+    :return: the removed temporary checkpoints
+    """
+    if not directory or not os.path.isdir(directory):
+        return []
+    removed = []
+    for name in os.listdir(directory):
+        match = _STALE_CHECKPOINT.match(name)
+        path = os.path.join(directory, name)
+        if not match or not os.path.isdir(path):
+            continue
+        pid = match.group("pid")
+        if pid and _is_process_alive(int(pid)):
+            continue
+        target = os.path.join(directory, match.group("target"))
+        if match.group("kind") == "old" and not os.path.exists(target):
+            fprint(
+                "Restore the checkpoint {} moved aside by an interrupted write".format(
+                    target
+                )
+            )
+            os.rename(path, target)
+            continue
+        fprint(
+            "Remove the temporary checkpoint of an interrupted write: {}".format(path)
+        )
+        shutil.rmtree(path, ignore_errors=True)
+        removed.append(path)
+    return removed
+
+
+def unwrap_model(model):
+    """
+    Get the underlying model of DataParallel/DistributedDataParallel and torch.compile() wrappers.
+    """
+    while hasattr(model, "_orig_mod") or hasattr(model, "module"):
+        model = model._orig_mod if hasattr(model, "_orig_mod") else model.module
+    return model
+
+
+def _cpu_template(model, config):
+    # only the modules are copied, the config, tokenizer, datasets, etc. are shared with the template
+    memo = {id(config): config}
+    for key, value in model.__dict__.items():
+        if key not in ("_parameters", "_buffers", "_modules"):
+            memo[id(value)] = value
+    template_model = copy.deepcopy(model, memo=memo)
+    return template_model.cpu()
+
+
+# e.g., "fast_lsa_t_v2_laptop14_acc_80.1_f1_77.5.tmp-1234-1a2b3c4d", the pid is absent in the former versions
+_STALE_CHECKPOINT = re.compile(
+    r"^(?P<target>.+)\.(?P<kind>tmp|old)-(?:(?P<pid>\d+)-)?[0-9a-f]+$"
+)
+
+
+def _is_process_alive(pid):
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        import ctypes
+
+        # PROCESS_QUERY_LIMITED_INFORMATION, os.kill() terminates the process on Windows
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _write_bytes(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+        _sync_file(f)
+
+
+def _sync_file(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _atomic_replace_dir(src, dst):
+    """
+    Replace the directory dst by src. The old checkpoint is moved aside before the rename,
+    and removed only after the new one is in place, so there is always a complete checkpoint on disk.
+    """
+    old = None
+    if os.path.exists(dst):
+        old = "{}.old-{}-{}".format(dst, os.getpid(), int(time.time() * 1000))
+        os.rename(dst, old)
+    os.rename(src, dst)
+    if old:
+        shutil.rmtree(old, ignore_errors=True)
@@ -7,16 +7,73 @@
 # ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
 # Copyright (C) 2022. All Rights Reserved.
 
+import functools
+import keyword
 from argparse import Namespace
 from pyabsa.framework.configuration_class.config_verification import config_check
 from pyabsa.utils.pyabsa_utils import fprint
 
+_getattribute = object.__getattribute__
+
+
+class CallCountingOption:
+    USED = "used"  # count the first read of each parameter only, enough to save the parameters used
+    EXACT = "exact"  # count every read, e.g., to profile the parameters
+    OFF = "off"
+
+
+class FrozenConfigView:
+    """
+    A read-only snapshot of some parameters of a ConfigManager, for the training and inference loops. The values are
+    in the slots of a plain object, so they are read without the lookups and the call counting of the ConfigManager.
+    The values are not copied, but the view is not updated if the config is changed. The parameters of the view not
+    set in the config are None, and get() returns their default, as the ConfigManager does.
+    """
+
+    __slots__ = ()
+
+    def get(self, key, default=None):
+        try:
+            return _getattribute(self, key)
+        except AttributeError:
+            return default
+
+    def __getattr__(self, key):
+        # only called for the parameters not set in the config, or the ones not in the view
+        if key in type(self).__slots__:
+            return None
+        raise AttributeError(
+            "{} is not in the config view, add it to frozen_view()".format(key)
+        )
+
+    def __setattr__(self, key, value):
+        raise AttributeError(
+            "The config view is read-only, set {} in the config".format(key)
+        )
+
+    def __delattr__(self, key):
+        raise AttributeError("The config view is read-only")
+
+    def __repr__(self):
+        return "FrozenConfigView({})".format(
+            ", ".join("{}={!r}".format(k, getattr(self, k)) for k in self.__slots__)
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def _view_class(keys):
+    return type("FrozenConfigView", (FrozenConfigView,), {"__slots__": keys})
+
 
 class ConfigManager(Namespace):
+    # the call counting of all the configs, see CallCountingOption
+    call_counting = CallCountingOption.USED
+
     def __init__(self, args=None, **kwargs):
         """
         The ConfigManager is a subclass of argparse.Namespace and based on a parameter dict.
-        It also counts the call-frequency of each parameter.
+        It also counts the calls of each parameter, by default only whether a parameter is used, the exact counting
+        is enabled by ConfigManager.call_counting = CallCountingOption.EXACT.
 
         :param args: A parameter dict.
         :param kwargs: Same params as Namespace.
@@ -34,22 +91,21 @@ class ConfigManager(Namespace):
 
     def __getattribute__(self, arg_name):
         """
-        Get the value of an argument and increment its call count.
+        Get the value of an argument and count its call.
 
         :param arg_name: The name of the argument.
         :return: The value of the argument.
         """
         if arg_name == "args" or arg_name == "args_call_count":
-            return super().__getattribute__(arg_name)
+            return _getattribute(self, arg_name)
         try:
-            value = super().__getattribute__("args")[arg_name]
-            args_call_count = super().__getattribute__("args_call_count")
-            args_call_count[arg_name] += 1
-            super().__setattr__("args_call_count", args_call_count)
-            return value
-
-        except Exception as e:
-            return super().__getattribute__(arg_name)
+            args = _getattribute(self, "args")
+        except AttributeError:
+            return _getattribute(self, arg_name)
+        if arg_name not in args:
+            return _getattribute(self, arg_name)
+        _count_call(self, arg_name)
+        return args[arg_name]
 
     def __setattr__(self, arg_name, value):
         """
@@ -84,9 +140,36 @@ class ConfigManager(Namespace):
         :param default: The default value to return if the key is not found.
         :return: The value of the key in the parameter dict, or the default value if the key is not found.
         """
-        if key in self.args_call_count:
-            self.args_call_count[key] += 1
-        return self.args.get(key, default)
+        args = self.args
+        if key not in args:
+            return default
+        _count_call(self, key)
+        return args[key]
+
+    def frozen_view(self, *keys):
+        """
+        Get a read-only snapshot of the parameters for the hot loops, see FrozenConfigView.
+        :param keys: The parameters in the view, default to all the parameters whose names are identifiers.
+            The parameters not set in the config are None in the view.
+        :return: A FrozenConfigView of the parameters.
+        """
+        args = self.args
+        if not keys:
+            keys = [
+                k
+                for k in args
+                if isinstance(k, str)
+                and k.isidentifier()
+                and not k.startswith("__")
+                and not keyword.iskeyword(k)
+            ]
+        view_class = _view_class(tuple(keys))
+        view = view_class.__new__(view_class)
+        for key in keys:
+            if key in args:
+                _count_call(self, key)
+                object.__setattr__(view, key, args[key])
+        return view
 
     def update(self, *args, **kwargs):
         """
@@ -203,6 +286,17 @@ class ConfigManager(Namespace):
         return self.args != other
 
 
+def _count_call(config, arg_name):
+    counting = type(config).call_counting
+    if counting == CallCountingOption.USED:
+        args_call_count = _getattribute(config, "args_call_count")
+        if not args_call_count.get(arg_name):
+            args_call_count[arg_name] = 1
+    elif counting == CallCountingOption.EXACT:
+        args_call_count = _getattribute(config, "args_call_count")
+        args_call_count[arg_name] = args_call_count.get(arg_name, 0) + 1
+
+
 if __name__ == "__main__":  # test
     config = ConfigManager({"a": 1, "b": 2})
     config.a = 2
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+# file: feature_store.py
+# time: 19/10/2026 21:10
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+An in-process store of the featurized datasets.
+
+It is disabled by default. When enabled (e.g., by the multi-seed runner or the sweep scheduler), the datasets built
+or loaded once are kept in memory, so that the following instructors reuse them instead of re-featurizing or
+re-reading the dataset cache, and the worker processes forked afterwards share them read-only.
+
+The datasets are matched by their featurization args, i.e., the args set before featurizing them, except the args
+which only affect the training (seed, learning rate, epochs, etc.). So the runs of different seeds or different
+training hyperparameters share the same datasets.
+"""
+
+import re
+
+_enabled = 0
+_features = []  # (featurization args, derived args, (train_set, valid_set, test_set))
+_pending = (
+    {}
+)  # cache path -> featurization args captured by lookup() before featurizing
+
+# these args depend on the run, not on the featurized data
+_RUN_ARGS = {
+    "seed",
+    "logger",
+    "MV",
+    "device",
+    "auto_device",
+    "device_name",
+    "overwrite_cache",
+}
+
+# these args only affect the training, or are set while training
+_TRAINING_ARGS = {
+    "learning_rate",
+    "l2reg",
+    "dropout",
+    "optimizer",
+    "initializer",
+    "batch_size",
+    "num_epoch",
+    "patience",
+    "log_step",
+    "evaluate_begin",
+    "warmup_step",
+    "eta",
+    "eta_lr",
+    "use_amp",
+    "use_torch_compile",
+    "cross_validate_fold",
+    "checkpoint_save_mode",
+    "save_mode",
+    "path_to_save",
+    "model_path_to_save",
+    "from_checkpoint",
+    "inference_model",
+    "loss",
+    "metrics_of_this_checkpoint",
+    "max_test_metrics",
+    "verbose",
+}
+
+
+def enable():
+    """
+    Enable the store, the calls can be nested (e.g., a sweep running multi-seed trainings).
+    """
+    global _enabled
+    _enabled += 1
+
+
+def disable():
+    """
+    Disable the store and release the stored datasets, once every enable() has been matched.
+    """
+    global _enabled
+    _enabled = max(0, _enabled - 1)
+    if not _enabled:
+        clear()
+
+
+def clear():
+    """
+    Release the stored datasets, e.g., before featurizing the datasets of another sweep group.
+    """
+    _features.clear()
+    _pending.clear()
+
+
+def is_enabled():
+    return _enabled > 0
+
+
+def is_featurization_arg(key):
+    """
+    :param key: the name of an arg
+    :return: False if the arg does not affect the featurized datasets
+    """
+    return key not in _RUN_ARGS and key not in _TRAINING_ARGS
+
+
+def featurization_args(config):
+    """
+    :param config: a config
+    :return: the fingerprints of the args of config which affect the featurized datasets
+    """
+    return {
+        key: _fingerprint(value)
+        for key, value in config.args.items()
+        if is_featurization_arg(key)
+    }
+
+
+def store(cache_path, train_set, valid_set, test_set, config):
+    """
+    Keep the featurized datasets and the args derived while featurizing them (e.g., label_to_index, output_dim).
+
+    :param cache_path: the dataset cache path, as passed to lookup() before featurizing
+    :param train_set: the training set
+    :param valid_set: the validation set
+    :param test_set: the testing set
+    :param config: the config used to featurize the datasets
+    """
+    if not _enabled or not train_set:
+        return
+    args = _pending.pop(cache_path, None) or featurization_args(config)
+    if _match(args) is not None:
+        return
+    derived_args = {
+        k: v
+        for k, v in config.args.items()
+        if k not in args and is_featurization_arg(k)
+    }
+    _features.append((args, derived_args, (train_set, valid_set, test_set)))
+
+
+def lookup(cache_path, config):
+    """
+    Get the featurized datasets, and restore the args derived while featurizing them into config.
+
+    :param cache_path: the dataset cache path
+    :param config: the config to update
+    :return: (train_set, valid_set, test_set), or None if the datasets are not in the store
+    """
+    if not _enabled:
+        return None
+    args = featurization_args(config)
+    entry = _match(args)
+    if entry is None:
+        _pending[cache_path] = args
+        return None
+    _, derived_args, features = entry
+    for key, value in derived_args.items():
+        config.args[key] = value
+        config.args_call_count.setdefault(key, 0)
+    return features
+
+
+def _match(args):
+    # the args derived by a previous featurization may be in args, only the args of the entry are compared
+    for entry in _features:
+        if all(args.get(k) == v for k, v in entry[0].items()):
+            return entry
+    return None
+
+
+def _fingerprint(value):
+    # the classes and functions (e.g., config.model) are identified by their import paths
+    if isinstance(value, type) or callable(value) and hasattr(value, "__qualname__"):
+        return "{}.{}".format(value.__module__, value.__qualname__)
+    # the addresses in the reprs of the objects change between the instances
+    return re.sub(r" at 0x[0-9a-fA-F]+", "", str(value))
@@ -88,6 +88,7 @@ class ModelSaveOption:
     SAVE_MODEL_STATE_DICT = 1
     SAVE_FULL_MODEL = 2
     SAVE_FINE_TUNED_PLM = 3
+    SAVE_SAFETENSORS = 4
 
 
 class ProxyAddressOption:
@@ -109,4 +110,13 @@ class DeviceTypeOption:
     ALL_CUDA = "allcuda"
 
 
+class QuantizationOption:
+    """
+    A class that defines quantization options for inference.
+    """
+
+    NO_QUANTIZATION = None
+    DYNAMIC_INT8 = "dynamic_int8"
+
+
 PyABSAMaterialHostAddress = "https://huggingface.co/spaces/yangheng/PyABSA/"
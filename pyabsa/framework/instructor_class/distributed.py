@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+# file: distributed.py
+# time: 19/10/2026 22:20
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+DistributedDataParallel (DDP) training helpers.
+
+The training runs in one process per device (or per group of CPU cores with the gloo backend), either launched by
+torchrun, which sets the RANK/LOCAL_RANK/WORLD_SIZE environment variables, or spawned by the Trainer if
+config.ddp_world_size > 1 (or auto_device="allcuda", one process per visible CUDA device).
+
+Every rank trains on its shard of the training set, the gradients are all-reduced by DDP, and the training metrics
+and evaluation results are all-reduced so that every rank takes the same early-stopping decisions.
+Only rank 0 logs at INFO level and writes checkpoints.
+"""
+
+import logging
+import multiprocessing
+import os
+import socket
+import traceback
+
+import torch
+import torch.distributed as dist
+
+from pyabsa.framework.flag_class.flag_template import DeviceTypeOption
+from pyabsa.utils.pyabsa_utils import fprint
+
+
+def is_distributed():
+    """
+    :return: True if the process group of a DDP training is initialized
+    """
+    return dist.is_available() and dist.is_initialized()
+
+
+def get_rank():
+    return dist.get_rank() if is_distributed() else 0
+
+
+def get_world_size():
+    return dist.get_world_size() if is_distributed() else 1
+
+
+def is_main_process():
+    """
+    :return: True if this process is rank 0 or not in a DDP training, i.e., the process that logs and saves
+    """
+    return get_rank() == 0
+
+
+def launched_by_torchrun():
+    return int(os.environ.get("WORLD_SIZE", 1)) > 1 and "RANK" in os.environ
+
+
+def requested_world_size(config):
+    """
+    :param config: the training config
+    :return: the number of processes to spawn, config.ddp_world_size, or the number of CUDA devices if
+        auto_device="allcuda"
+    """
+    world_size = config.get("ddp_world_size", 0)
+    if not world_size and config.get("auto_device") == DeviceTypeOption.ALL_CUDA:
+        world_size = torch.cuda.device_count()
+    return world_size
+
+
+def should_spawn(config):
+    """
+    :param config: the training config
+    :return: True if the Trainer has to spawn the DDP processes itself
+    """
+    return (
+        not launched_by_torchrun()
+        and not is_distributed()
+        and requested_world_size(config) > 1
+    )
+
+
+def init_distributed(config):
+    """
+    Initialize the process group from the environment variables (set by torchrun or by launch()), and bind this
+    process to its device. It does nothing if the process is not part of a DDP training.
+
+    :param config: the training config, config.device is updated to the device of this rank
+    :return: True if the process group is initialized
+    """
+    if is_distributed():
+        return True
+    if not launched_by_torchrun():
+        return False
+    rank = int(os.environ["RANK"])
+    local_rank = int(os.environ.get("LOCAL_RANK", rank))
+    use_cuda = (
+        torch.device(config.device).type == DeviceTypeOption.CUDA
+        and torch.cuda.is_available()
+    )
+    if use_cuda:
+        device = torch.device("cuda:{}".format(local_rank % torch.cuda.device_count()))
+        torch.cuda.set_device(device)
+    else:
+        device = torch.device(DeviceTypeOption.CPU)
+    backend = config.get("ddp_backend", "nccl" if use_cuda else "gloo")
+    dist.init_process_group(backend=backend)
+    config.device = device
+    config.ddp_backend = backend
+
+    if not is_main_process() and config.get("logger", None):
+        config.logger.setLevel(logging.WARNING)
+    fprint(
+        "DDP rank {}/{} initialized on {} with backend {}".format(
+            rank, get_world_size(), device, backend
+        )
+    )
+    return True
+
+
+def wrap_model(model, config):
+    """
+    :param model: the model already moved to config.device
+    :param config: the training config, "ddp_find_unused_parameters" is used
+    :return: the model wrapped by DistributedDataParallel
+    """
+    device = torch.device(config.device)
+    return torch.nn.parallel.DistributedDataParallel(
+        model,
+        device_ids=[device.index] if device.type == DeviceTypeOption.CUDA else None,
+        # the ensembles and the LCF-based models do not use all the parameters in every forward pass
+        find_unused_parameters=config.get("ddp_find_unused_parameters", True),
+    )
+
+
+def all_reduce_tensor(tensor, average=True):
+    """
+    :param tensor: a tensor on the device of this rank
+    :param average: average the values of the ranks, otherwise sum them
+    :return: the reduced tensor (reduced in place)
+    """
+    if not is_distributed():
+        return tensor
+    dist.all_reduce(tensor, op=dist.ReduceOp.SUM)
+    if average:
+        tensor /= get_world_size()
+    return tensor
+
+
+def all_reduce_result(result, device):
+    """
+    Average the numbers of a (nested) list, tuple or dict of evaluation results over the ranks.
+
+    :param result: e.g., the (acc, f1) returned by _evaluate_acc_f1()
+    :param device: the device of this rank, the reduction runs on it
+    :return: the averaged result, in the same structure
+    """
+    if not is_distributed():
+        return result
+    values = []
+    _flatten(result, values)
+    if not values:
+        return result
+    reduced = all_reduce_tensor(
+        torch.tensor(values, dtype=torch.float64, device=device)
+    ).tolist()
+    return _unflatten(result, iter(reduced))
+
+
+def barrier():
+    if is_distributed():
+        dist.barrier()
+
+
+def launch(fn, config, *args):
+    """
+    Spawn the DDP processes on this node and run fn(*args) in each of them.
+
+    The processes are forked if possible (the datasets, model classes, etc. are inherited), CUDA must not have
+    been initialized in this process for that, otherwise they are spawned and fn must be picklable.
+
+    :param fn: the training function, e.g., a bound method of the Trainer
+    :param config: the training config
+    :param args: the arguments of fn
+    :return: what fn returns on rank 0, if it is picklable
+    """
+    world_size = requested_world_size(config)
+    if (
+        "fork" in multiprocessing.get_all_start_methods()
+        and not torch.cuda.is_initialized()
+    ):
+        ctx = multiprocessing.get_context("fork")
+    else:
+        ctx = multiprocessing.get_context("spawn")
+    fprint("Launch DDP training in {} processes".format(world_size))
+    master_port = config.get("ddp_master_port", None) or _free_port()
+    result_queue = ctx.Queue()
+    workers = []
+    for rank in range(world_size):
+        env = {
+            "MASTER_ADDR": config.get("ddp_master_addr", "127.0.0.1"),
+            "MASTER_PORT": str(master_port),
+            "RANK": str(rank),
+            "LOCAL_RANK": str(rank),
+            "WORLD_SIZE": str(world_size),
+        }
+        worker = ctx.Process(
+            target=_ddp_worker,
+            args=(fn, config, args, env, result_queue),
+            daemon=False,
+        )
+        worker.start()
+        workers.append(worker)
+
+    result = None
+    error = None
+    for _ in range(world_size):
+        rank, value, trace = result_queue.get()
+        if trace is not None:
+            error = "Rank {} failed in DDP worker process:\n{}".format(rank, trace)
+            break
+        if rank == 0:
+            result = value
+    if error:
+        for worker in workers:
+            worker.terminate()
+    for worker in workers:
+        worker.join()
+    if error:
+        raise RuntimeError(error)
+    return result
+
+
+def _ddp_worker(fn, config, args, env, result_queue):
+    """
+    Run fn(*args) as one rank of the DDP training.
+    """
+    rank = int(env["RANK"])
+    try:
+        os.environ.update(env)
+        if torch.device(config.device).type == DeviceTypeOption.CPU:
+            torch.set_num_threads(
+                max(1, (os.cpu_count() or 1) // int(env["WORLD_SIZE"]))
+            )
+        init_distributed(config)
+        result = fn(*args)
+        barrier()
+        dist.destroy_process_group()
+        # only plain results (e.g., checkpoint paths) are sent back, the trained models stay in the workers
+        result_queue.put(
+            (rank, result if rank == 0 and _is_plain(result) else None, None)
+        )
+    except Exception:
+        result_queue.put((rank, None, traceback.format_exc()))
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _is_plain(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(_is_plain(v) for v in value)
+    if isinstance(value, dict):
+        return all(_is_plain(v) for v in value.values())
+    return False
+
+
+def _flatten(result, values):
+    if isinstance(result, (list, tuple)):
+        for r in result:
+            _flatten(r, values)
+    elif isinstance(result, dict):
+        for r in result.values():
+            _flatten(r, values)
+    elif isinstance(result, (int, float)) and not isinstance(result, bool):
+        values.append(float(result))
+
+
+def _unflatten(result, values):
+    if isinstance(result, (list, tuple)):
+        return type(result)(_unflatten(r, values) for r in result)
+    if isinstance(result, dict):
+        return {k: _unflatten(r, values) for k, r in result.items()}
+    if isinstance(result, (int, float)) and not isinstance(result, bool):
+        return next(values)
+    return result
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+# file: encoder_cache.py
+# time: 19/10/2026 23:40
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import torch
+import tqdm
+from transformers import PreTrainedModel
+from transformers.modeling_outputs import BaseModelOutput
+
+from pyabsa.utils.pyabsa_utils import fprint
+
+
+class EncoderCachePoolingOption:
+    FULL = "full"  # the last hidden states of all the tokens, exact
+    CLS = "cls"  # the first token only, for the heads pooling the first token (e.g., BertPooler)
+
+
+class FrozenEncoderCache:
+    """
+    Cache the outputs of the frozen pretrained encoders of a model, so the epochs only train the heads.
+
+    The encoders (the PreTrainedModel modules of the model, e.g., the shared BERT of the APC models, or the BERT of the
+    TC and RNA models) are frozen and their forward is replaced: it returns the last hidden states cached for the
+    input ids instead of running the encoder. The features are computed once, in eval mode, for every distinct
+    sequence fed to the encoders in the train/valid/test sets, and stored in a memory-mapped fp16 file, keyed by
+    the encoder weights, so later trainings (e.g., a search over the heads) on the same backbone reuse it.
+
+    Sequences missing from the cache (and calls with attention masks or other arguments) run the encoder as usual.
+    The model's state dict is unchanged, so the checkpoints are the same as without the cache.
+
+    Options: config.encoder_cache_pooling ("full" or "cls"), config.encoder_cache_dir and
+    config.encoder_cache_batch_size.
+
+    The encoders run without attention mask, so the states of the padding positions depend on the whole sequence,
+    all the positions are cached to keep the features exact.
+    """
+
+    def __init__(self, config):
+        """
+        :param config: the training config
+        """
+        self.config = config
+        self.pooling = config.get(
+            "encoder_cache_pooling", EncoderCachePoolingOption.FULL
+        )
+        if self.pooling not in {
+            EncoderCachePoolingOption.FULL,
+            EncoderCachePoolingOption.CLS,
+        }:
+            raise ValueError(
+                "encoder_cache_pooling should be in [full, cls], got {}".format(
+                    self.pooling
+                )
+            )
+        self.cache_root = config.get("encoder_cache_dir", "encoder_feature_cache")
+        self.batch_size = config.get("encoder_cache_batch_size", 64)
+
+        self.encoders = []
+        self.stores = {}  # id(encoder) -> _FeatureStore
+        self._recording = False
+        self.hits = 0
+        self.misses = 0
+
+    def attach(self, model):
+        """
+        Freeze the pretrained encoders of the model and route their forward through the cache.
+
+        :param model: the model to train
+        :return: the number of encoders attached
+        """
+        for module in _top_level_encoders(model):
+            if any(module is encoder for encoder in self.encoders):
+                continue
+            module.requires_grad_(False)
+            module.forward = _CachedForward(self, module)
+            self.encoders.append(module)
+        return len(self.encoders)
+
+    def detach(self):
+        """
+        Restore the forward of the encoders, they stay frozen.
+        """
+        for encoder in self.encoders:
+            if isinstance(encoder.__dict__.get("forward"), _CachedForward):
+                del encoder.forward
+        self.encoders = []
+        self.stores = {}
+        if self.hits or self.misses:
+            fprint(
+                "Encoder feature cache: {} hits, {} misses".format(
+                    self.hits, self.misses
+                )
+            )
+
+    @torch.no_grad()
+    def build(self, model, dataloaders, batch_to_inputs):
+        """
+        Record the sequences fed to the encoders by the model on the dataloaders, then compute the missing features.
+
+        :param model: the model, attached to this cache
+        :param dataloaders: the dataloaders of the train/valid/test sets
+        :param batch_to_inputs: a function(batch) -> the model inputs on the device
+        """
+        self._recording = True
+        self._recorded = {id(encoder): {} for encoder in self.encoders}
+        training = model.training
+        model.eval()
+        try:
+            for dataloader in dataloaders:
+                if dataloader is None:
+                    continue
+                for batch in dataloader:
+                    model(batch_to_inputs(batch))
+        finally:
+            self._recording = False
+            model.train(training)
+
+        for encoder in self.encoders:
+            store = _FeatureStore(
+                os.path.join(self.cache_root, self._fingerprint(encoder)),
+                self.pooling,
+            )
+            store.update(encoder, self._recorded[id(encoder)], self.batch_size)
+            self.stores[id(encoder)] = store
+        del self._recorded
+
+    def _fingerprint(self, encoder):
+        # the bytes of the weights identify them, e.g., a backbone loaded from a checkpoint
+        fingerprint = hashlib.sha1()
+        for name, tensor in encoder.state_dict().items():
+            fingerprint.update(name.encode())
+            fingerprint.update(
+                tensor.detach()
+                .cpu()
+                .contiguous()
+                .reshape(-1)
+                .view(torch.uint8)
+                .numpy()
+                .tobytes()
+            )
+        fingerprint.update(
+            "{}-{}-{}".format(
+                type(encoder).__name__, encoder.config.hidden_size, self.pooling
+            ).encode()
+        )
+        return fingerprint.hexdigest()[:16]
+
+    def _forward(self, encoder, input_ids=None, *args, **kwargs):
+        if (
+            args
+            or any(v is not None for v in kwargs.values())
+            or input_ids is None
+            or input_ids.dim() != 2
+        ):
+            return type(encoder).forward(encoder, input_ids, *args, **kwargs)
+        ids = input_ids.detach().cpu().numpy()
+        if self._recording:
+            recorded = self._recorded[id(encoder)]
+            for row in ids:
+                recorded.setdefault(_row_key(row), row)
+            # the heads run on zeros while recording
+            return BaseModelOutput(
+                last_hidden_state=torch.zeros(
+                    input_ids.shape + (encoder.config.hidden_size,),
+                    device=input_ids.device,
+                )
+            )
+        store = self.stores.get(id(encoder))
+        rows = store.rows(ids) if store is not None else None
+        if rows is None:
+            self.misses += 1
+            return type(encoder).forward(encoder, input_ids)
+        self.hits += 1
+        features = torch.from_numpy(store.features[rows]).to(input_ids.device)
+        if self.pooling == EncoderCachePoolingOption.FULL:
+            features = features[:, : input_ids.size(1)]
+        return BaseModelOutput(last_hidden_state=features.float())
+
+
+class _CachedForward:
+    """
+    The forward of an attached encoder. It is kept picklable (e.g., when the whole model is saved), a copy runs the
+    encoder as usual since the cache is not copied.
+    """
+
+    def __init__(self, cache, encoder):
+        self.cache = cache
+        self.encoder = encoder
+
+    def __call__(self, *args, **kwargs):
+        if self.cache is None:
+            return type(self.encoder).forward(self.encoder, *args, **kwargs)
+        return self.cache._forward(self.encoder, *args, **kwargs)
+
+    def __getstate__(self):
+        return {"cache": None, "encoder": self.encoder}
+
+
+class _FeatureStore:
+    """
+    The memory-mapped fp16 features of an encoder (features.npy) and the row index of the sequences (index.pkl).
+    """
+
+    def __init__(self, path, pooling):
+        self.path = path
+        self.pooling = pooling
+        self.features = None
+        self.index = {}
+        if os.path.exists(os.path.join(path, "index.pkl")):
+            with open(os.path.join(path, "index.pkl"), "rb") as f:
+                self.index = pickle.load(f)
+            self.features = np.load(os.path.join(path, "features.npy"), mmap_mode="r")
+
+    def rows(self, ids):
+        """
+        :return: the rows of the sequences, or None if any is missing
+        """
+        rows = []
+        for row in ids:
+            i = self.index.get(_row_key(row))
+            if i is None:
+                return None
+            rows.append(i)
+        return np.asarray(rows)
+
+    @torch.no_grad()
+    def update(self, encoder, sequences, batch_size):
+        """
+        Compute the features of the sequences missing from the store, and rewrite the store with all of them.
+        """
+        missing = [key for key in sequences if key not in self.index]
+        if not missing:
+            fprint(
+                "Reuse {} cached encoder features from {}".format(
+                    len(self.index), self.path
+                )
+            )
+            return
+        fprint(
+            "Cache the encoder features of {} sequences to {}".format(
+                len(missing), self.path
+            )
+        )
+        max_len = max(len(sequences[key]) for key in missing)
+        if self.pooling == EncoderCachePoolingOption.CLS:
+            width = 1
+        else:
+            width = max_len
+        if self.features is not None:
+            width = max(width, self.features.shape[1])
+
+        os.makedirs(self.path, exist_ok=True)
+        num_rows = len(self.index) + len(missing)
+        tmp_path = os.path.join(self.path, "features.{}.tmp.npy".format(os.getpid()))
+        features = np.lib.format.open_memmap(
+            tmp_path,
+            mode="w+",
+            dtype=np.float16,
+            shape=(num_rows, width, encoder.config.hidden_size),
+        )
+        if self.features is not None:
+            features[: len(self.index), : self.features.shape[1]] = self.features
+
+        device = next(encoder.parameters()).device
+        training = encoder.training
+        encoder.eval()
+        # the sequences are encoded at their own length, since the encoders run without attention mask
+        by_length = {}
+        for key in missing:
+            by_length.setdefault(len(sequences[key]), []).append(key)
+        index = dict(self.index)
+        row = len(self.index)
+        progress = tqdm.tqdm(total=len(missing), desc="Caching encoder features")
+        for keys in by_length.values():
+            for i in range(0, len(keys), batch_size):
+                batch_keys = keys[i : i + batch_size]
+                input_ids = torch.from_numpy(
+                    np.stack([sequences[k] for k in batch_keys])
+                ).to(device)
+                hidden = type(encoder).forward(encoder, input_ids)["last_hidden_state"]
+                hidden = hidden[:, :width].to(torch.float16).cpu().numpy()
+                features[row : row + len(batch_keys), : hidden.shape[1]] = hidden
+                for k in batch_keys:
+                    index[k] = row
+                    row += 1
+                progress.update(len(batch_keys))
+        progress.close()
+        encoder.train(training)
+        features.flush()
+        del features
+
+        os.replace(tmp_path, os.path.join(self.path, "features.npy"))
+        with open(os.path.join(self.path, "index.pkl.tmp"), "wb") as f:
+            pickle.dump(index, f)
+        os.replace(
+            os.path.join(self.path, "index.pkl.tmp"),
+            os.path.join(self.path, "index.pkl"),
+        )
+        self.index = index
+        self.features = np.load(os.path.join(self.path, "features.npy"), mmap_mode="r")
+
+
+def _top_level_encoders(model):
+    """
+    :return: the PreTrainedModel modules of the model which are not nested in another one
+    """
+    encoders = []
+    nested = set()
+    for module in model.modules():
+        if id(module) in nested:
+            continue
+        if isinstance(module, PreTrainedModel):
+            encoders.append(module)
+            nested.update(id(m) for m in module.modules())
+    return encoders
+
+
+def _row_key(row):
+    return hashlib.blake2b(
+        np.ascontiguousarray(row, dtype=np.int64).tobytes(), digest_size=16
+    ).digest()
@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+# file: evaluation_scheduler.py
+# time: 19/10/2026 14:30
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+import copy
+import multiprocessing
+import queue
+import random
+import threading
+from collections import defaultdict
+
+import torch
+from torch.utils.data import DataLoader, Subset, SequentialSampler
+
+from pyabsa.framework.checkpoint_class.checkpoint_writer import unwrap_model
+from pyabsa.framework.flag_class.flag_template import DeviceTypeOption
+from pyabsa.framework.instructor_class import distributed
+from pyabsa.framework.sweep_class import trial_pruner
+
+
+class EvaluationStrategyOption:
+    """
+    A class that defines the evaluation strategies used during training.
+    """
+
+    FULL = "full"  # evaluate on the full valid/test set at every log_step (default)
+    SAMPLED = (
+        "sampled"  # evaluate on a fixed stratified subsample between full evaluations
+    )
+    ASYNC = "async"  # evaluate a weight snapshot in background while training continues
+
+    @staticmethod
+    def check(config, supported):
+        """
+        :param config: the training config of config.eval_strategy
+        :param supported: the evaluation strategies supported by the training loops
+        """
+        strategy = config.get("eval_strategy", EvaluationStrategyOption.FULL)
+        if strategy not in supported:
+            raise ValueError(
+                "eval_strategy={} is not supported by the training loops of {}, the supported strategies: {}".format(
+                    strategy,
+                    config.get("task_name", config.get("task_code")),
+                    list(supported),
+                )
+            )
+
+
+class EvaluationScheduler:
+    """
+    Schedule the evaluations requested by a training loop at log_step boundaries.
+
+    The results are consumed with completed(), which yields (result, is_full, model) tuples: "result" is what the
+    evaluate function returns, "is_full" tells whether the result comes from the full evaluation set (only those
+    should be used to select the best checkpoint), and "model" holds exactly the weights that were evaluated, so it
+    is the model to be saved if the result is the best so far.
+
+    The strategy is chosen with config.eval_strategy:
+        "full": evaluate the full dataloader synchronously, i.e., the original behaviour.
+        "sampled": evaluate a fixed stratified subsample (config.eval_sample_size, a ratio or a number of examples).
+            Every config.eval_full_interval evaluations, or when the subsample metric improves, the full dataloader
+            is evaluated to confirm the result.
+        "async": copy the weights to a snapshot and evaluate it in a background worker while training continues,
+            a forked process on CPU or a thread running on a separate CUDA stream on GPU.
+            At most one evaluation is in flight, a new request waits for the previous one.
+    """
+
+    def __init__(self, instructor, evaluate_fn, dataloaders=None):
+        """
+        :param instructor: the training instructor, its model and config are used
+        :param evaluate_fn: a function(dataloader) -> result evaluating instructor.model, e.g., _evaluate_acc_f1
+        :param dataloaders: the dataloaders that will be evaluated, required by the async strategy on CPU,
+            because the forked worker only sees the dataloaders that exist when it is started
+        """
+        self.instructor = instructor
+        self.config = instructor.config
+        self.evaluate_fn = evaluate_fn
+        self.strategy = self.config.get("eval_strategy", EvaluationStrategyOption.FULL)
+        if (
+            distributed.is_distributed()
+            and self.strategy == EvaluationStrategyOption.ASYNC
+        ):
+            self.config.logger.info(
+                "The async evaluation is not supported in DDP training, use the full evaluation"
+            )
+            self.strategy = EvaluationStrategyOption.FULL
+        if self.strategy not in {
+            EvaluationStrategyOption.FULL,
+            EvaluationStrategyOption.SAMPLED,
+            EvaluationStrategyOption.ASYNC,
+        }:
+            raise ValueError(
+                "eval_strategy should be in [full, sampled, async], got {}".format(
+                    self.strategy
+                )
+            )
+        self.sample_size = self.config.get("eval_sample_size", 0.2)
+        self.full_interval = max(1, self.config.get("eval_full_interval", 5))
+
+        self.num_evaluations = 0
+        self._ready = []
+        self._sampled_loaders = {}
+        self._best_sampled_metric = None
+
+        self._snapshot = None
+        self._pending = None
+        self._worker = None
+        self._stream = None
+        self._dataloaders = list(dataloaders) if dataloaders else []
+        if self.strategy == EvaluationStrategyOption.ASYNC:
+            self._start_async_worker()
+
+    def submit(self, dataloader):
+        """
+        Request an evaluation of the current weights on the given dataloader.
+
+        :param dataloader: the valid or test dataloader
+        """
+        self.num_evaluations += 1
+        if self.strategy == EvaluationStrategyOption.FULL:
+            self._ready.append(
+                (self._evaluate(dataloader), True, self.instructor.model)
+            )
+        elif self.strategy == EvaluationStrategyOption.SAMPLED:
+            if self.num_evaluations % self.full_interval == 0:
+                self._ready.append(
+                    (self._evaluate(dataloader), True, self.instructor.model)
+                )
+                return
+            result = self._evaluate(self._sampled_dataloader(dataloader))
+            self._ready.append((result, False, self.instructor.model))
+            metric = _primary_metric(result)
+            if self._best_sampled_metric is None or metric > self._best_sampled_metric:
+                self._best_sampled_metric = metric
+                self._ready.append(
+                    (self._evaluate(dataloader), True, self.instructor.model)
+                )
+        else:
+            # keep at most one evaluation in flight, the snapshot is reused
+            self._wait_pending()
+            self._copy_to_snapshot()
+            if self._worker_type == "process":
+                self._task_queue.put(self._dataloaders.index(dataloader))
+                self._pending = True
+            else:
+                self._pending = threading.Thread(
+                    target=self._thread_evaluate, args=(dataloader,), daemon=True
+                )
+                self._pending.start()
+
+    def completed(self, wait=False):
+        """
+        Yield the finished evaluations in submission order without blocking, unless wait is True.
+
+        :param wait: block until the in-flight evaluation (if any) has finished
+        """
+        if self.strategy == EvaluationStrategyOption.ASYNC:
+            if wait:
+                self._wait_pending()
+            else:
+                self._poll_pending()
+        while self._ready:
+            result, is_full, model = self._ready.pop(0)
+            if is_full:
+                # a sweep may stop the trial here, see trial_pruner
+                trial_pruner.report("eval", _primary_metric(result))
+            yield result, is_full, model
+
+    def close(self):
+        """
+        Wait for the in-flight evaluation and stop the background worker.
+        """
+        if self.strategy == EvaluationStrategyOption.ASYNC:
+            self._wait_pending()
+            if self._worker_type == "process" and self._worker.is_alive():
+                self._task_queue.put(None)
+                self._worker.join(timeout=10)
+
+    def _evaluate(self, dataloader):
+        """
+        Evaluate the current weights synchronously. In DDP training, every rank evaluates the bare module (so the
+        evaluation triggers no collective of the DDP wrapper) and the results are averaged over the ranks,
+        so all the ranks take the same checkpointing and early-stopping decisions.
+        """
+        if not distributed.is_distributed():
+            return self.evaluate_fn(dataloader)
+        result = _evaluate_with(
+            self.instructor,
+            self.evaluate_fn,
+            unwrap_model(self.instructor.model),
+            dataloader,
+        )
+        if isinstance(result, BaseException):
+            raise result
+        return distributed.all_reduce_result(result, self.config.device)
+
+    def _sampled_dataloader(self, dataloader):
+        """
+        Build (once per dataloader) a dataloader over a fixed subsample stratified by label.
+        """
+        if id(dataloader) in self._sampled_loaders:
+            return self._sampled_loaders[id(dataloader)]
+        dataset = dataloader.dataset
+        groups = defaultdict(list)
+        for i in range(len(dataset)):
+            groups[_label_of(dataset[i])].append(i)
+        if isinstance(self.sample_size, float) and self.sample_size <= 1:
+            ratio = self.sample_size
+        else:
+            ratio = min(1.0, int(self.sample_size) / max(1, len(dataset)))
+        rng = random.Random(
+            self.config.seed[0]
+            if isinstance(self.config.seed, list)
+            else self.config.seed
+        )
+        indices = []
+        for label in sorted(groups, key=str):
+            ids = groups[label]
+            indices += rng.sample(ids, max(1, round(len(ids) * ratio)))
+        subset = Subset(dataset, sorted(indices))
+        sampled_loader = DataLoader(
+            dataset=subset,
+            batch_size=dataloader.batch_size,
+            sampler=SequentialSampler(subset),
+            pin_memory=dataloader.pin_memory,
+        )
+        self.config.logger.info(
+            "Evaluate on a stratified subsample of {}/{} examples between full evaluations".format(
+                len(subset), len(dataset)
+            )
+        )
+        self._sampled_loaders[id(dataloader)] = sampled_loader
+        return sampled_loader
+
+    def _start_async_worker(self):
+        model = self.instructor.model
+        # only the modules are copied, the config, tokenizer, datasets, etc. are shared with the snapshot
+        memo = {id(self.config): self.config}
+        for key, value in model.__dict__.items():
+            if key not in ("_parameters", "_buffers", "_modules"):
+                memo[id(value)] = value
+        self._snapshot = copy.deepcopy(model, memo=memo)
+        self._snapshot.eval()
+        device = torch.device(self.config.device)
+        if (
+            device.type == DeviceTypeOption.CPU
+            and "fork" in multiprocessing.get_all_start_methods()
+        ):
+            self._worker_type = "process"
+            self._snapshot.share_memory()
+            ctx = multiprocessing.get_context("fork")
+            self._task_queue = ctx.Queue()
+            self._result_queue = ctx.Queue()
+            self._worker = ctx.Process(
+                target=_evaluation_worker,
+                args=(
+                    self.instructor,
+                    self.evaluate_fn.__name__,
+                    self._snapshot,
+                    self._dataloaders,
+                    self._task_queue,
+                    self._result_queue,
+                    self.config.get("eval_num_threads", 0),
+                ),
+                daemon=True,
+            )
+            self._worker.start()
+        else:
+            self._worker_type = "thread"
+            if device.type == DeviceTypeOption.CUDA:
+                self._stream = torch.cuda.Stream(device=device)
+            self._thread_result = None
+
+    @torch.no_grad()
+    def _copy_to_snapshot(self):
+        # the copy is issued on the training stream, so it is ordered before the next optimizer step
+        snapshot_state = self._snapshot.state_dict()
+        for name, tensor in self.instructor.model.state_dict().items():
+            snapshot_state[name].copy_(tensor, non_blocking=True)
+        if self._stream is not None:
+            self._stream.wait_stream(torch.cuda.current_stream())
+
+    def _thread_evaluate(self, dataloader):
+        if self._stream is not None:
+            with torch.cuda.stream(self._stream):
+                self._thread_result = _evaluate_with(
+                    self.instructor, self.evaluate_fn, self._snapshot, dataloader
+                )
+            self._stream.synchronize()
+        else:
+            self._thread_result = _evaluate_with(
+                self.instructor, self.evaluate_fn, self._snapshot, dataloader
+            )
+
+    def _poll_pending(self):
+        if self._pending is None:
+            return
+        if self._worker_type == "process":
+            try:
+                result = self._result_queue.get_nowait()
+            except queue.Empty:
+                return
+            self._collect(result)
+        elif not self._pending.is_alive():
+            self._collect(self._thread_result)
+
+    def _wait_pending(self):
+        if self._pending is None:
+            return
+        if self._worker_type == "process":
+            self._collect(self._result_queue.get())
+        else:
+            self._pending.join()
+            self._collect(self._thread_result)
+
+    def _collect(self, result):
+        self._pending = None
+        if isinstance(result, BaseException):
+            raise RuntimeError("Background evaluation failed: {}".format(result))
+        self._ready.append((result, True, self._snapshot))
+
+
+def _evaluate_with(instructor, evaluate_fn, model, dataloader):
+    """
+    Run the evaluate function of the instructor on another model. A shallow copy of the instructor is used,
+    so the model used by the training loop is never swapped.
+    """
+    evaluator = copy.copy(instructor)
+    evaluator.model = model
+    try:
+        return getattr(evaluator, evaluate_fn.__name__)(dataloader)
+    except Exception as e:
+        return e
+
+
+def _evaluation_worker(
+    instructor, fn_name, snapshot, dataloaders, task_queue, result_queue, num_threads
+):
+    """
+    The loop of the forked evaluation process. The snapshot lives in shared memory,
+    so the weights copied by the training process are visible here without pickling.
+    """
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    instructor.model = snapshot
+    evaluate_fn = getattr(instructor, fn_name)
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        try:
+            result_queue.put(evaluate_fn(dataloaders[task]))
+        except Exception as e:
+            result_queue.put(e)
+
+
+def _label_of(example):
+    if isinstance(example, dict):
+        for key in ("polarity", "label", "labels"):
+            if key in example:
+                label = example[key]
+                return label.item() if isinstance(label, torch.Tensor) else label
+    return None
+
+
+def _primary_metric(result):
+    """
+    The first number of an evaluation result, e.g., the accuracy of (acc, f1).
+    """
+    if isinstance(result, (list, tuple)):
+        return _primary_metric(result[0])
+    if isinstance(result, dict):
+        return _primary_metric(list(result.values())[0])
+    return float(result)
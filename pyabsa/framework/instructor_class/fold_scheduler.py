@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# file: fold_scheduler.py
+# time: 19/10/2026 19:40
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+import multiprocessing
+import os
+import traceback
+
+import torch
+
+from pyabsa.framework.flag_class.flag_template import DeviceTypeOption
+from pyabsa.framework.instructor_class.distributed import is_distributed
+from pyabsa.framework.instructor_class.fork_workers import (
+    can_fork_workers,
+    wait_for_result,
+)
+from pyabsa.utils.pyabsa_utils import fprint
+
+
+class FoldScheduler:
+    """
+    Run the folds of k-fold cross validation, sequentially in this process (default),
+    or concurrently in forked worker processes if config.fold_workers > 1.
+
+    Every fold starts from the initial weights snapshotted in memory by _prepare_env(), with a fresh optimizer state
+    and a seed derived from config.seed and the fold index, so the result of a fold does not depend on the order or
+    the process in which it runs.
+
+    On CPU, the cores are split between the workers. On CUDA, each worker takes one of config.fold_devices
+    (default: all the visible devices), so the model must not have been moved to CUDA in the parent process,
+    which _prepare_env() takes care of.
+    """
+
+    def __init__(self, instructor):
+        """
+        :param instructor: the training instructor, it provides the fold dataloaders and _reset_fold_state()
+        """
+        self.instructor = instructor
+        self.config = instructor.config
+        self.num_folds = len(instructor.train_dataloaders)
+        self.num_workers = (
+            max(1, min(self.config.get("fold_workers", 1), self.num_folds))
+            if is_parallel(self.config)
+            else 1
+        )
+
+    def run(self, train_fold_fn, criterion):
+        """
+        Train all the folds.
+
+        :param train_fold_fn: a bound method of the instructor, train_fold_fn(fold, train_dataloader, valid_dataloader,
+            criterion) -> a picklable dict of the fold results
+        :param criterion: the loss function
+        :return: the list of fold results, in fold order
+        """
+        folds = list(
+            enumerate(
+                zip(
+                    self.instructor.train_dataloaders, self.instructor.valid_dataloaders
+                )
+            )
+        )
+        devices = self._worker_devices() if self.num_workers > 1 else None
+        if devices is None:
+            self.instructor.model.to(self.config.device)
+            results = []
+            for fold, (train_dataloader, valid_dataloader) in folds:
+                self.instructor._reset_fold_state(fold)
+                results.append(
+                    train_fold_fn(fold, train_dataloader, valid_dataloader, criterion)
+                )
+            return results
+
+        self.config.logger.info(
+            "Run {} folds in {} workers on {}".format(
+                self.num_folds, self.num_workers, devices
+            )
+        )
+        num_threads = max(1, (os.cpu_count() or 1) // self.num_workers)
+        ctx = multiprocessing.get_context("fork")
+        result_queue = ctx.Queue()
+        pending = list(folds)
+        running = {}
+        results = {}
+        while pending or running:
+            while pending and devices:
+                fold, (train_dataloader, valid_dataloader) = pending.pop(0)
+                device = devices.pop(0)
+                worker = ctx.Process(
+                    target=_fold_worker,
+                    args=(
+                        self.instructor,
+                        train_fold_fn.__name__,
+                        fold,
+                        train_dataloader,
+                        valid_dataloader,
+                        criterion,
+                        device,
+                        num_threads,
+                        result_queue,
+                    ),
+                    daemon=True,
+                )
+                worker.start()
+                running[fold] = (worker, device)
+            fold, result = wait_for_result(
+                result_queue, {f: w for f, (w, _) in running.items()}, "Fold"
+            )
+            worker, device = running.pop(fold)
+            worker.join()
+            devices.append(device)
+            if isinstance(result, str):
+                for worker, _ in running.values():
+                    worker.terminate()
+                raise RuntimeError(
+                    "Fold {} failed in worker process:\n{}".format(fold, result)
+                )
+            results[fold] = result
+        return [results[fold] for fold in sorted(results)]
+
+    def _worker_devices(self):
+        """
+        :return: one device per worker slot, or None if the folds must run in this process
+        """
+        if not can_fork_workers():
+            fprint(
+                "Autograd or torch.compile() has been used in the main process, the folds run sequentially"
+            )
+            return None
+        device = torch.device(self.config.device)
+        if device.type != DeviceTypeOption.CUDA:
+            return [DeviceTypeOption.CPU] * self.num_workers
+        if torch.cuda.is_initialized():
+            fprint(
+                "CUDA has been initialized in the main process, the folds run sequentially"
+            )
+            return None
+        fold_devices = self.config.get(
+            "fold_devices",
+            ["cuda:{}".format(i) for i in range(torch.cuda.device_count())],
+        )
+        return [fold_devices[i % len(fold_devices)] for i in range(self.num_workers)]
+
+
+def is_parallel(config):
+    """
+    :param config: the training config
+    :return: True if the folds are configured to run in worker processes
+    """
+    return (
+        config.get("fold_workers", 1) > 1
+        and config.get("cross_validate_fold", -1) > 1
+        and "fork" in multiprocessing.get_all_start_methods()
+        # the DDP ranks already share the devices
+        and not is_distributed()
+    )
+
+
+def _fold_worker(
+    instructor,
+    fn_name,
+    fold,
+    train_dataloader,
+    valid_dataloader,
+    criterion,
+    device,
+    num_threads,
+    result_queue,
+):
+    """
+    Train one fold in a forked process, the forked instructor holds the datasets and the initial weights.
+    """
+    try:
+        torch.set_num_threads(num_threads)
+        instructor.config.device = torch.device(device)
+        instructor.model.to(instructor.config.device)
+        instructor._reset_fold_state(fold)
+        result = getattr(instructor, fn_name)(
+            fold, train_dataloader, valid_dataloader, criterion
+        )
+        result_queue.put((fold, result))
+    except Exception:
+        result_queue.put((fold, traceback.format_exc()))
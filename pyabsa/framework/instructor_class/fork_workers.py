@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# file: fork_workers.py
+# time: 20/10/2026 16:10
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+The helpers of the schedulers training in forked worker processes, i.e., the folds and the seeds.
+
+The autograd engine of PyTorch refuses to run in a process forked after its worker threads have been started, i.e.,
+after a backward pass (see https://github.com/pytorch/pytorch/wiki/Autograd-and-Fork), and the compile workers of
+torch.compile() do not survive a fork either. So the schedulers check that a forked process can train before forking
+their workers, and fall back to training in the process otherwise.
+"""
+
+import multiprocessing
+import os
+import queue
+import sys
+
+import torch
+
+# the interval of the liveness checks of the workers while waiting for their results, in seconds
+POLL_INTERVAL = 1
+
+
+def can_fork_workers():
+    """
+    :return: True if a forked process can train, it is checked by a backward pass in a forked probe process
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return False
+    dynamo_utils = sys.modules.get("torch._dynamo.utils")
+    if dynamo_utils is not None and getattr(dynamo_utils, "counters", {}).get(
+        "stats", {}
+    ).get("unique_graphs"):
+        # graphs have been compiled in this process
+        return False
+    probe = multiprocessing.get_context("fork").Process(target=_backward_probe)
+    probe.start()
+    probe.join()
+    return probe.exitcode == 0
+
+
+def wait_for_result(result_queue, workers, name="Job"):
+    """
+    Wait for the next result of the workers, and check that the workers are alive while waiting.
+    If a worker dies without sending its result (e.g., killed by the OOM killer), the other workers are terminated.
+
+    :param result_queue: the queue of the (key, result) sent by the workers
+    :param workers: a dict of the running worker processes by the keys of their jobs
+    :param name: the name of the jobs in the error message, e.g., "Fold"
+    :return: the (key, result) of a finished job
+    """
+    while True:
+        try:
+            return result_queue.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            pass
+        for key, worker in workers.items():
+            if worker.is_alive():
+                continue
+            # the result may have been sent right before the worker exited
+            try:
+                return result_queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                for other in workers.values():
+                    other.terminate()
+                raise RuntimeError(
+                    "{} {} died in worker process with exit code {}".format(
+                        name, key, worker.exitcode
+                    )
+                )
+
+
+def _backward_probe():
+    # the inherited exit handlers of the parent (e.g., the result sinks) must not run in the probe
+    try:
+        torch.ones(1, requires_grad=True).sum().backward()
+    except Exception:
+        os._exit(1)
+    os._exit(0)
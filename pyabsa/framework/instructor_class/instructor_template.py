@@ -7,6 +7,7 @@
 # ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
 # Copyright (C) 2022. All Rights Reserved.
 
+import json
 import math
 import os
 import pickle
@@ -26,18 +27,33 @@ from torch.utils.data import (
     RandomSampler,
     SequentialSampler,
 )
+from tqdm import tqdm
 from transformers import BertModel
 
+from pyabsa.framework.dataset_class import feature_store
 from pyabsa.framework.flag_class.flag_template import DeviceTypeOption
+from pyabsa.framework.instructor_class import distributed
+from pyabsa.framework.instructor_class.encoder_cache import FrozenEncoderCache
+from pyabsa.framework.instructor_class.evaluation_scheduler import (
+    EvaluationStrategyOption,
+)
+from pyabsa.framework.instructor_class.fold_scheduler import is_parallel
+from pyabsa.framework.sampler_class.distributed_sampler import EpochDistributedSampler
 from pyabsa.framework.sampler_class.imblanced_sampler import ImbalancedDatasetSampler
+from pyabsa.utils.profile_utils.profiler import Profiler
 from pyabsa.utils.pyabsa_utils import print_args, fprint
 
 
 class BaseTrainingInstructor:
+    # the evaluation strategies of config.eval_strategy supported by the training loops, see EvaluationScheduler
+    supported_eval_strategies = (EvaluationStrategyOption.FULL,)
+
     def __init__(self, config):
         """
         Initialize a trainer object template
         """
+        EvaluationStrategyOption.check(config, self.supported_eval_strategies)
+
         # Check if mixed precision training is enabled
         if config.use_amp:
             try:
@@ -88,6 +104,15 @@ class BaseTrainingInstructor:
         self.tokenizer = None
         self.embedding_matrix = None
 
+        # The initial weights used to restart each fold of cross validation
+        self.init_state_dict = None
+
+        # The per-stage profiler, enabled by config.profile, see pyabsa.utils.profile_utils.profiler
+        self.profiler = Profiler.from_config(config)
+
+        # The checkpoint writers and evaluation schedulers of the training loops, closed when the training ends
+        self._open_resources = []
+
     def _reset_params(self):
         """
         Reset the parameters of the model before training.
@@ -102,20 +127,44 @@ class BaseTrainingInstructor:
                             stdv = 1.0 / math.sqrt(p.shape[0])
                             torch.nn.init.uniform_(p, a=-stdv, b=stdv)
 
-    def _reload_model_state_dict(self, ckpt="./init_state_dict.bin"):
+    def _reload_model_state_dict(self, ckpt=None):
         """
         Reload the model state dictionary from a checkpoint file.
-        :param ckpt: The path to the checkpoint file.
+        :param ckpt: The path to the checkpoint file. If None, reload the initial weights snapshotted in memory.
         """
+        model = self.model.module if hasattr(self.model, "module") else self.model
+        if ckpt is None:
+            if self.init_state_dict is not None:
+                model.load_state_dict(self.init_state_dict)
+            return
+        # wait for rank 0 to write the checkpoint in DDP training
+        distributed.barrier()
         if os.path.exists(ckpt):
-            if hasattr(self.model, "module"):
-                self.model.module.load_state_dict(
-                    torch.load(find_file(ckpt, or_key=[".bin", "state_dict"]))
-                )
-            else:
-                self.model.load_state_dict(
-                    torch.load(find_file(ckpt, or_key=[".bin", "state_dict"]))
+            model.load_state_dict(
+                torch.load(
+                    find_file(ckpt, or_key=[".bin", "state_dict"]),
+                    map_location=DeviceTypeOption.CPU,
                 )
+            )
+
+    def _reset_fold_state(self, fold):
+        """
+        Reset the model, optimizer, schedulers and random seeds before training a fold of cross validation,
+        so every fold starts from the same state whatever the order in which the folds run.
+        :param fold: The index of the fold.
+        """
+        seed = self.config.seed + fold
+        random.seed(seed)
+        numpy.random.seed(seed)
+        torch.manual_seed(seed)
+        torch.cuda.manual_seed(seed)
+
+        self._reload_model_state_dict()
+        self.optimizer.state.clear()
+        if self.config.warmup_step >= 0:
+            for group in self.optimizer.param_groups:
+                group["lr"] = group.get("initial_lr", group["lr"])
+            self._init_lr_scheduler()
 
     def load_cache_dataset(self, **kwargs):
         """
@@ -140,6 +189,13 @@ class BaseTrainingInstructor:
             self.config.model_name, self.config.dataset_name, hash_tag
         )
 
+        # Reuse the datasets featurized in this process (e.g., by another seed) if any
+        features = feature_store.lookup(cache_path, self.config)
+        if features:
+            self.config.logger.info("Reuse featurized dataset of {}".format(cache_path))
+            self.train_set, self.valid_set, self.test_set = features
+            return cache_path
+
         # Load the dataset from cache if it exists and not set to overwrite the cache
         if os.path.exists(cache_path) and not self.config.overwrite_cache:
             with open(cache_path, mode="rb") as f_cache:
@@ -183,16 +239,24 @@ class BaseTrainingInstructor:
             cache_path = "{}.{}.dataset.{}.cache".format(
                 self.config.model_name, self.config.dataset_name, hash_tag
             )
+        feature_store.store(
+            cache_path, self.train_set, self.valid_set, self.test_set, self.config
+        )
         if (
-            not os.path.exists(cache_path) or self.config.overwrite_cache
-        ) and self.config.cache_dataset:
-            with open(cache_path, mode="wb") as f_cache:
+            (not os.path.exists(cache_path) or self.config.overwrite_cache)
+            and self.config.cache_dataset
+            and distributed.is_main_process()
+        ):
+            # write aside and rename, the other DDP ranks may be reading the cache meanwhile
+            tmp_path = "{}.tmp-{}".format(cache_path, os.getpid())
+            with open(tmp_path, mode="wb") as f_cache:
                 self.config.logger.info("Save cache dataset to {}".format(cache_path))
                 pickle.dump(
                     [self.train_set, self.valid_set, self.test_set, self.config],
                     f_cache,
                 )
-                return cache_path
+            os.replace(tmp_path, cache_path)
+            return cache_path
         return None
 
     def _prepare_dataloader(self):
@@ -209,6 +273,15 @@ class BaseTrainingInstructor:
             raise ValueError(
                 "train_sampler should be in [random, imbalanced, sequential]"
             )
+        if distributed.is_distributed():
+            # each rank trains on its own shard, reshuffled at every epoch
+            if self.config.get("train_sampler", "random") != "random":
+                self.logger.info(
+                    "train_sampler={} is replaced by a DistributedSampler in DDP training".format(
+                        self.config.get("train_sampler")
+                    )
+                )
+            train_sampler = self._distributed_sampler(self.train_set)
 
         # If both training and validation dataloaders are already set, use them as is
         if self.train_dataloader and self.valid_dataloader:
@@ -241,7 +314,7 @@ class BaseTrainingInstructor:
         else:
             split_dataset = self.train_set
             len_per_fold = len(split_dataset) // self.config.cross_validate_fold + 1
-            # Split the dataset into folds
+            # Split the dataset into folds, the split only depends on the seed
             folds = random_split(
                 split_dataset,
                 tuple(
@@ -251,6 +324,7 @@ class BaseTrainingInstructor:
                         - len_per_fold * (self.config.cross_validate_fold - 1)
                     ]
                 ),
+                generator=torch.Generator().manual_seed(self.config.seed),
             )
 
             # Set up dataloaders for each fold
@@ -259,7 +333,11 @@ class BaseTrainingInstructor:
                     [x for i, x in enumerate(folds) if i != f_idx]
                 )
                 val_set = folds[f_idx]
-                train_sampler = RandomSampler(train_set)
+                train_sampler = (
+                    self._distributed_sampler(train_set)
+                    if distributed.is_distributed()
+                    else RandomSampler(train_set)
+                )
                 val_sampler = SequentialSampler(val_set)
                 self.train_dataloaders.append(
                     DataLoader(
@@ -286,33 +364,53 @@ class BaseTrainingInstructor:
                 pin_memory=True,
             )
 
+    def _distributed_sampler(self, dataset):
+        """
+        :param dataset: the training set
+        :return: a sampler of the shard of the current DDP rank
+        """
+        return EpochDistributedSampler(
+            dataset,
+            num_replicas=distributed.get_world_size(),
+            rank=distributed.get_rank(),
+            shuffle=self.config.get("train_sampler", "random") != "sequential",
+            seed=self.config.seed,
+        )
+
     def _prepare_env(self):
         """
         Prepares the environment for training, including setting the tokenizer and embedding matrix,
-        removing the initial state dictionary file if it exists, and setting up the model on the appropriate device.
+        snapshotting the initial weights for k-fold cross-validation, and setting up the model on the appropriate device.
         """
         # Set the tokenizer and embedding matrix
         self.config.tokenizer = self.tokenizer
         self.config.embedding_matrix = self.embedding_matrix
 
-        # Remove initial state dictionary file if it exists
-        if os.path.exists("init_state_dict.bin"):
-            os.remove("init_state_dict.bin")
-
-        # Save the model state dict to initial state dictionary file if using k-fold cross-validation
+        # Snapshot the initial weights in memory if using k-fold cross-validation
         if self.config.cross_validate_fold > 0:
-            torch.save(self.model.state_dict(), "init_state_dict.bin")
-
-        # Use DataParallel for trainer if device count larger than 1
-        if self.config.auto_device == DeviceTypeOption.ALL_CUDA:
+            self.init_state_dict = {
+                k: v.detach().clone() for k, v in self.model.state_dict().items()
+            }
+
+        parallel_folds = is_parallel(self.config) and hasattr(self, "_train_fold")
+        if parallel_folds:
+            # The fold workers move the model to their own devices, CUDA must not be initialized before forking them,
+            # so the model stays on CPU in this process, see FoldScheduler
+            self.model.to(DeviceTypeOption.CPU)
+        # Use DistributedDataParallel if running in a DDP process group (torchrun or spawned by the Trainer)
+        elif distributed.is_distributed():
             self.model.to(self.config.device)
-            self.model = torch.nn.parallel.DataParallel(self.model).module
+            self.model = distributed.wrap_model(self.model, self.config)
         else:
+            if self.config.auto_device == DeviceTypeOption.ALL_CUDA:
+                self.logger.info(
+                    "Train on a single device, launch with the Trainer or torchrun to train on all CUDA devices"
+                )
             self.model.to(self.config.device)
 
         # Set the device and print CUDA memory if applicable
         self.config.device = torch.device(self.config.device)
-        if self.config.device.type == DeviceTypeOption.CUDA:
+        if self.config.device.type == DeviceTypeOption.CUDA and not parallel_folds:
             self.logger.info(
                 "cuda memory allocated:{}".format(
                     torch.cuda.memory_allocated(device=self.config.device)
@@ -354,18 +452,123 @@ class BaseTrainingInstructor:
 
         # Initialize the learning rate scheduler if warmup_step is specified
         if self.config.warmup_step >= 0:
-            self.lr_scheduler = torch.optim.lr_scheduler.CosineAnnealingLR(
-                self.optimizer,
-                T_max=len(self.train_dataloaders[0]) * self.config.num_epoch,
+            self._init_lr_scheduler()
+
+        encoder_cache = self._attach_encoder_cache()
+        try:
+            # the stages timed by the training loops are recorded to the profiler of this span
+            with self.profiler.span("train"):
+                # Perform k-fold cross-validation if there are multiple validation dataloaders
+                if len(self.valid_dataloaders) > 1:
+                    result = self._k_fold_train_and_evaluate(criterion)
+                # Train and evaluate the model if there is only one validation dataloader
+                else:
+                    result = self._train_and_evaluate(criterion)
+        finally:
+            self._close_resources()
+            if encoder_cache is not None:
+                encoder_cache.detach()
+            self._log_profile()
+
+        # Return the bare model instead of the DDP wrapper, e.g., (model, config, tokenizer) if not saving
+        if isinstance(result, tuple) and isinstance(
+            result[0], torch.nn.parallel.DistributedDataParallel
+        ):
+            result = (result[0].module,) + result[1:]
+        return result
+
+    def _log_profile(self):
+        """
+        Log the profiling statistics of the training as a JSON record, and export them to the profile exporters.
+        """
+        if not self.profiler.enabled:
+            return
+        stats = self.profiler.export(
+            task_code=self.config.get("task_code", None),
+            model=self.config.get("model_name", None),
+            seed=self.config.get("seed", None),
+        )
+        self.logger.info("Training profile: {}".format(json.dumps(stats)))
+        self.profiler.close()
+
+    def _closing(self, resource):
+        """
+        Register a resource of a training loop to be closed when the training ends, also if the training is stopped
+        by an exception, e.g., a trial pruned by a sweep.
+
+        :param resource: e.g., a CheckpointWriter or an EvaluationScheduler, its close() can be called twice
+        :return: the resource
+        """
+        self._open_resources.append(resource)
+        return resource
+
+    def _close_resources(self):
+        """
+        Close the registered resources, the latest first (e.g., an evaluation scheduler before its checkpoint writer).
+        """
+        while self._open_resources:
+            self._open_resources.pop().close()
+
+    def _progress_bar(self, iterable, **kwargs):
+        """
+        :param iterable: e.g., the training dataloader of an epoch
+        :param kwargs: the arguments of tqdm
+        :return: the progress bar of the iterable, only displayed by rank 0 in DDP training
+        """
+        return tqdm(iterable, disable=not distributed.is_main_process(), **kwargs)
+
+    def _model_inputs(self, sample_batched):
+        """
+        Build the model inputs of a batch, the dict of the input columns on the device.
+        The tasks whose models take a list of inputs override this method.
+
+        :param sample_batched: a batch of the dataloaders
+        """
+        return {
+            col: sample_batched[col].to(self.config.device)
+            for col in self.config.inputs_cols
+        }
+
+    def _attach_encoder_cache(self):
+        """
+        Freeze the pretrained encoder of the model and cache its features on the train/valid/test sets,
+        if config.cache_encoder_features is set, see FrozenEncoderCache.
+
+        :return: the FrozenEncoderCache to detach after training, or None
+        """
+        if not self.config.get("cache_encoder_features", False):
+            return None
+        if distributed.is_distributed():
+            self.logger.info(
+                "The encoder feature cache is disabled in distributed training"
+            )
+            return None
+        encoder_cache = FrozenEncoderCache(self.config)
+        # the compiled models run the forward of the original module
+        model = getattr(self.model, "_orig_mod", self.model)
+        if not encoder_cache.attach(model):
+            self.logger.info(
+                "No pretrained encoder found in {}, the encoder feature cache is disabled".format(
+                    self.config.model.__name__
+                )
             )
-            self.warmup_scheduler = warmup.UntunedLinearWarmup(self.optimizer)
+            return None
+        encoder_cache.build(
+            model,
+            self.train_dataloaders + self.valid_dataloaders + [self.test_dataloader],
+            self._model_inputs,
+        )
+        return encoder_cache
 
-        # Perform k-fold cross-validation if there are multiple validation dataloaders
-        if len(self.valid_dataloaders) > 1:
-            return self._k_fold_train_and_evaluate(criterion)
-        # Train and evaluate the model if there is only one validation dataloader
-        else:
-            return self._train_and_evaluate(criterion)
+    def _init_lr_scheduler(self):
+        """
+        Initialize the cosine annealing learning rate scheduler and the warmup scheduler.
+        """
+        self.lr_scheduler = torch.optim.lr_scheduler.CosineAnnealingLR(
+            self.optimizer,
+            T_max=len(self.train_dataloaders[0]) * self.config.num_epoch,
+        )
+        self.warmup_scheduler = warmup.UntunedLinearWarmup(self.optimizer)
 
     def _init_misc(self):
         """
@@ -448,7 +651,12 @@ class BaseTrainingInstructor:
                             torch.load(state_dict_path[0])
                         )
                     else:
-                        self.model.load_state_dict(
+                        model = (
+                            self.model.module
+                            if hasattr(self.model, "module")
+                            else self.model
+                        )
+                        model.load_state_dict(
                             torch.load(
                                 state_dict_path[0], map_location=self.config.device
                             ),
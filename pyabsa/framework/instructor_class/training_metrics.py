@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+# file: training_metrics.py
+# time: 19/10/2026 10:12
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+import time
+
+import torch
+
+from pyabsa.framework.instructor_class import distributed
+from pyabsa.framework.sweep_class import trial_pruner
+from pyabsa.utils.profile_utils.profiler import current_profiler
+
+
+class TrainingMetrics:
+    """
+    Sync-free metric accumulator used by the training loops.
+
+    The loss is kept as an on-device exponential moving average, so updating the metrics never forces a
+    host-device synchronization. The accumulated values are only fetched (one .item() call) at log_step boundaries,
+    where the tqdm description and the structured metrics are refreshed.
+
+    The phases are also recorded as the "train/<phase>" spans of the active profiler (see
+    pyabsa.utils.profile_utils.profiler), with the samples and tokens of the batches counted in "train/forward".
+
+    Example:
+        training_metrics = TrainingMetrics(config)
+        for sample_batched in dataloader:
+            training_metrics.mark("data")
+            ...  # forward
+            training_metrics.update(loss, sample_batched)
+            training_metrics.mark("forward")
+            ...  # backward & optimizer step
+        config.loss = training_metrics.loss
+    """
+
+    phases = ("data", "forward", "backward", "optimizer", "evaluate")
+
+    def __init__(self, config, smoothing=None):
+        """
+        :param config: the training configuration, "log_step", "loss_display" and "loss_smoothing" are used
+        :param smoothing: the EMA factor of the smooth loss, defaults to config.loss_smoothing or 0.98
+        """
+        self.config = config
+        self.smoothing = (
+            smoothing if smoothing is not None else config.get("loss_smoothing", 0.98)
+        )
+        self.loss_display = config.get("loss_display", "smooth")
+        self.log_step = None
+
+        self.step = 0
+        self.loss = 0.0
+        self.batch_loss = 0.0
+        self.samples = 0
+        self.tokens = 0
+        self.phase_time = {phase: 0.0 for phase in self.phases}
+        self.history = []
+
+        self._loss_ema = None
+        self._last_loss = None
+        self._debias = 1.0
+        self._window_samples = 0
+        self._window_tokens = 0
+        self._window_start = time.perf_counter()
+        self._lap = self._window_start
+        self._description = "Loss: N.A."
+        self._synced_step = 0
+        # the profiler of the enclosing span, e.g., BaseTrainingInstructor._train()
+        self.profiler = current_profiler()
+        self._batch_counts = (0, 0)
+
+    def mark(self, phase):
+        """
+        Attribute the wall time elapsed since the previous mark to the given phase. The marks are host-side only,
+        on CUDA devices the forward/backward timings measure the kernel dispatch unless the loop synchronizes itself.
+
+        :param phase: one of "data", "forward", "backward", "optimizer" and "evaluate"
+        """
+        now = time.perf_counter()
+        self.phase_time[phase] = self.phase_time.get(phase, 0.0) + now - self._lap
+        if self.profiler is not None:
+            if phase == "forward":
+                examples, tokens = self._batch_counts
+                self._batch_counts = (0, 0)
+            else:
+                examples, tokens = 0, 0
+            self.profiler.record(
+                "train/" + phase, now - self._lap, examples=examples, tokens=tokens
+            )
+        self._lap = now
+
+    def update(self, loss, batch=None):
+        """
+        Accumulate the loss of a training step without reading it back to the host.
+
+        :param loss: the (scalar) loss tensor of the step
+        :param batch: the input batch, used to count the processed samples and tokens
+        :return: True if the metrics have been synchronized at this step (i.e., at a log_step boundary)
+        """
+        self.step += 1
+        loss = loss.detach().float()
+        if self._loss_ema is None:
+            self._loss_ema = torch.zeros_like(loss)
+        # nan losses are skipped like np.nanmean() did, but without leaving the device
+        self._loss_ema = torch.where(
+            torch.isnan(loss),
+            self._loss_ema,
+            self._loss_ema * self.smoothing + loss * (1 - self.smoothing),
+        )
+        self._debias *= self.smoothing
+        self._last_loss = loss
+
+        if batch is not None:
+            n_samples, n_tokens = count_batch(batch, self.config.get("inputs_cols"))
+            self._window_samples += n_samples
+            self._window_tokens += n_tokens
+            self._batch_counts = (n_samples, n_tokens)
+
+        if self.log_step is None:
+            self.log_step = max(1, self.config.log_step)
+        if self.step % self.log_step == 0:
+            self.sync()
+            return True
+        return False
+
+    def sync(self):
+        """
+        Fetch the accumulated values from the device and refresh the throughput metrics and the description.
+        In DDP training the values are reduced over the ranks, so every rank must sync at the same steps.
+
+        :return: a dict of the structured metrics at this step
+        """
+        if self._loss_ema is None or self._synced_step == self.step:
+            return self.metrics()
+        self._synced_step = self.step
+        now = time.perf_counter()
+        elapsed = max(now - self._window_start, 1e-9)
+        if distributed.is_distributed():
+            # average the losses and sum the counts over the DDP ranks in a single collective
+            world_size = distributed.get_world_size()
+            loss_ema, last_loss, window_samples, window_tokens = (
+                distributed.all_reduce_tensor(
+                    torch.stack(
+                        [
+                            self._loss_ema.double(),
+                            self._last_loss.double(),
+                            torch.tensor(
+                                float(self._window_samples),
+                                dtype=torch.float64,
+                                device=self._loss_ema.device,
+                            ),
+                            torch.tensor(
+                                float(self._window_tokens),
+                                dtype=torch.float64,
+                                device=self._loss_ema.device,
+                            ),
+                        ]
+                    ),
+                    average=False,
+                ).tolist()
+            )
+            loss_ema /= world_size
+            last_loss /= world_size
+            self._window_samples = int(window_samples)
+            self._window_tokens = int(window_tokens)
+        else:
+            loss_ema, last_loss = self._loss_ema.item(), self._last_loss.item()
+        self.loss = round(loss_ema / max(1 - self._debias, 1e-12), 6)
+        self.batch_loss = round(last_loss, 6)
+        self.samples += self._window_samples
+        self.tokens += self._window_tokens
+
+        metrics = self.metrics()
+        metrics["samples_per_second"] = self._window_samples / elapsed
+        metrics["tokens_per_second"] = self._window_tokens / elapsed
+        self.history.append(metrics)
+        trial_pruner.report("loss", self.loss)
+        if self.config.get("logger", None):
+            self.config.logger.debug("Training metrics: {}".format(metrics))
+
+        self._window_samples = 0
+        self._window_tokens = 0
+        self._window_start = now
+
+        if self.loss_display == "smooth":
+            self._description = "Smooth Loss: {:>.4f}".format(self.loss)
+        else:
+            self._description = "Batch Loss: {:>.4f}".format(self.batch_loss)
+        self._description += " | {:.1f} samples/s".format(metrics["samples_per_second"])
+        return metrics
+
+    def metrics(self):
+        """
+        :return: a dict of the structured metrics synchronized at the last log_step boundary
+        """
+        metrics = {
+            "step": self.step,
+            "loss": self.loss,
+            "batch_loss": self.batch_loss,
+            "samples": self.samples,
+            "tokens": self.tokens,
+            "samples_per_second": (
+                self.history[-1]["samples_per_second"] if self.history else 0.0
+            ),
+            "tokens_per_second": (
+                self.history[-1]["tokens_per_second"] if self.history else 0.0
+            ),
+        }
+        for phase, seconds in self.phase_time.items():
+            metrics["time/{}".format(phase)] = round(seconds, 6)
+        return metrics
+
+    def description(self, epoch):
+        """
+        :param epoch: the current epoch
+        :return: the tqdm description of the last synchronized step, this never synchronizes the device
+        """
+        return "Epoch:{:>3d} | {}".format(epoch, self._description)
+
+    def summary(self):
+        """
+        :return: a one-line summary of the throughput and the time spent in each phase, for the training log
+        """
+        self.sync()
+        total = sum(self.phase_time.values()) or 1e-9
+        return "Training throughput: {} samples, {} tokens, {}".format(
+            self.samples,
+            self.tokens,
+            ", ".join(
+                "{}: {:.2f}s ({:.1f}%)".format(phase, seconds, 100 * seconds / total)
+                for phase, seconds in self.phase_time.items()
+            ),
+        )
+
+
+def count_batch(batch, inputs_cols=None):
+    """
+    Count the samples and the non-padding tokens of a batch. Only host tensors are inspected for tokens,
+    so that counting never synchronizes a device.
+
+    :param batch: a dict, list or tuple of tensors
+    :param inputs_cols: the preferred input columns to count tokens from
+    :return: (number of samples, number of tokens)
+    """
+    if isinstance(batch, dict):
+        cols = [c for c in (inputs_cols or []) if c in batch] + list(batch.keys())
+        tensors = [batch[c] for c in cols]
+    elif isinstance(batch, (list, tuple)):
+        tensors = list(batch)
+    else:
+        tensors = [batch]
+    tensors = [t for t in tensors if isinstance(t, torch.Tensor) and t.dim() > 0]
+    if not tensors:
+        return 0, 0
+    n_samples = tensors[0].size(0)
+    for t in tensors:
+        if t.dim() == 2 and not t.is_floating_point():
+            if t.device.type == "cpu":
+                return n_samples, int(torch.count_nonzero(t))
+            return n_samples, t.numel()
+    return n_samples, 0
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# file: fast_path.py
+# time: 20/10/2026 00:20
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+The compiled inference path of the predictors.
+
+The inference datasets pad the examples to max_seq_len, so the only dynamic dimension of the model inputs is the
+batch size (e.g., the last batch of a file, or the number of aspects of a sentence). The batches are padded to
+the next bucket (the powers of two up to the eval batch size), so the model is compiled once per bucket with static
+shapes, and never recompiled on new batch sizes. The padding rows are copies of the last example and are sliced off
+the outputs.
+
+Dynamo keeps at most torch._dynamo.config.cache_size_limit compiled graphs of a model, and silently runs the others
+eagerly, so the limit is raised to the number of buckets times the number of call signatures of the model (e.g., the
+two passes of ATEPC).
+"""
+
+import time
+
+import torch
+
+from pyabsa.utils.pyabsa_utils import fprint
+
+
+def batch_buckets(max_batch_size):
+    """
+    :return: the powers of two up to max_batch_size, and max_batch_size
+    """
+    buckets = []
+    bucket = 1
+    while bucket < max_batch_size:
+        buckets.append(bucket)
+        bucket *= 2
+    buckets.append(max(1, max_batch_size))
+    return buckets
+
+
+class CompiledModel:
+    """
+    Call a torch.compile()d model on batches padded to the size buckets, with any (nested) inputs and outputs.
+    """
+
+    def __init__(self, model, buckets, **compile_kwargs):
+        """
+        :param model: the model, in eval mode
+        :param buckets: the batch sizes to compile the model for, the larger batches run the model uncompiled
+        :param compile_kwargs: the arguments of torch.compile(), e.g., mode="reduce-overhead"
+        """
+        self.model = model
+        self.buckets = sorted(set(buckets))
+        self.signatures = set()
+        compile_kwargs.setdefault("dynamic", False)
+        self.compiled = torch.compile(model, **compile_kwargs)
+
+    def __call__(self, *args, **kwargs):
+        batch_size = _batch_size((args, kwargs))
+        bucket = next((b for b in self.buckets if b >= (batch_size or 0)), None)
+        if batch_size is None or bucket is None:
+            return self.model(*args, **kwargs)
+        self._reserve_cache((len(args), tuple(sorted(kwargs))))
+        if bucket == batch_size:
+            return self.compiled(*args, **kwargs)
+        args, kwargs = _pad((args, kwargs), batch_size, bucket)
+        return _slice(self.compiled(*args, **kwargs), bucket, batch_size)
+
+    def _reserve_cache(self, signature):
+        """
+        Raise the cache size limit of dynamo, so every bucket of every call signature keeps its compiled graph.
+        """
+        if signature in self.signatures:
+            return
+        self.signatures.add(signature)
+        cache_size = len(self.buckets) * len(self.signatures)
+        dynamo_config = torch._dynamo.config
+        if dynamo_config.cache_size_limit < cache_size:
+            fprint(
+                "Raise torch._dynamo.config.cache_size_limit from {} to {} to compile {} batch sizes".format(
+                    dynamo_config.cache_size_limit, cache_size, len(self.buckets)
+                )
+            )
+            dynamo_config.cache_size_limit = cache_size
+        # the limit of all the graphs of a model, in torch>=2.2
+        if (
+            getattr(dynamo_config, "accumulated_cache_size_limit", cache_size)
+            < cache_size
+        ):
+            dynamo_config.accumulated_cache_size_limit = cache_size
+
+
+def warmup(inference_model, buckets):
+    """
+    Run the predictor on a synthetic batch of every bucket, so the model is compiled before the first request.
+
+    :param inference_model: the predictor, whose warmup_text is an example in the inference format of the task
+    :param buckets: the batch sizes
+    :return: the metrics of the warmup: the compile time (the first run minus the second run of each bucket), the
+        warmup time and the latency of each bucket after compiling
+    """
+    metrics = {
+        "buckets": list(buckets),
+        "compile_time_s": 0.0,
+        "warmup_time_s": 0.0,
+        "bucket_latency_ms": {},
+    }
+    start = time.perf_counter()
+    for bucket in buckets:
+        latency = []
+        for _ in range(2):
+            t0 = time.perf_counter()
+            inference_model.predict(
+                [inference_model.warmup_text] * bucket,
+                print_result=False,
+                save_result=False,
+                ignore_error=False,
+                eval_batch_size=max(buckets),
+            )
+            latency.append(time.perf_counter() - t0)
+        metrics["compile_time_s"] += max(0.0, latency[0] - latency[1])
+        metrics["bucket_latency_ms"][bucket] = latency[1] * 1000
+    metrics["warmup_time_s"] = time.perf_counter() - start
+    fprint(
+        "Fast path warmed up on batch sizes {}: compile time {:.2f}s, warmup time {:.2f}s".format(
+            metrics["buckets"], metrics["compile_time_s"], metrics["warmup_time_s"]
+        )
+    )
+    return metrics
+
+
+def _batch_size(inputs):
+    if isinstance(inputs, torch.Tensor):
+        return inputs.size(0) if inputs.dim() else None
+    if isinstance(inputs, dict):
+        inputs = list(inputs.values())
+    if isinstance(inputs, (list, tuple)):
+        for value in inputs:
+            size = _batch_size(value)
+            if size is not None:
+                return size
+    return None
+
+
+def _pad(inputs, batch_size, bucket):
+    if isinstance(inputs, torch.Tensor):
+        if not inputs.dim() or inputs.size(0) != batch_size:
+            return inputs
+        padding = inputs[-1:].expand((bucket - batch_size,) + inputs.shape[1:])
+        return torch.cat([inputs, padding])
+    if isinstance(inputs, dict):
+        return {k: _pad(v, batch_size, bucket) for k, v in inputs.items()}
+    if isinstance(inputs, (list, tuple)):
+        return type(inputs)(_pad(v, batch_size, bucket) for v in inputs)
+    return inputs
+
+
+def _slice(outputs, bucket, batch_size):
+    if isinstance(outputs, torch.Tensor):
+        if not outputs.dim() or outputs.size(0) != bucket:
+            return outputs
+        return outputs[:batch_size]
+    if isinstance(outputs, dict):
+        return {k: _slice(v, bucket, batch_size) for k, v in outputs.items()}
+    if isinstance(outputs, (list, tuple)):
+        return type(outputs)(_slice(v, bucket, batch_size) for v in outputs)
+    return outputs
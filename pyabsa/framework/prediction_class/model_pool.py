@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+# file: model_pool.py
+# time: 20/10/2026 02:50
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+A pool of predictors keyed by checkpoint, to serve many checkpoints from one process.
+
+The predictors are loaded on first use and the least recently used ones are evicted when the pool exceeds its
+memory budget (or its maximum number of models). The checkpoints fine-tuned on the same frozen PLM have identical
+backbone weights: the backbones (the transformers.PreTrainedModel submodules) are hashed at load time, and a
+backbone identical to one already in the pool is replaced by the latter, so it is held once. The memory of the pool
+counts the shared tensors once.
+"""
+
+import gc
+import hashlib
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import torch
+from torch import cuda
+
+from pyabsa.utils.pyabsa_utils import fprint
+
+_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3, "TB": 1024**4}
+
+
+def parse_memory_size(size):
+    """
+    :param size: a number of bytes, or a string like "512MB" or "8GB"
+    :return: the number of bytes, or None if size is None
+    """
+    if size is None or isinstance(size, (int, float)):
+        return size
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMGT]?B?)\s*", str(size).upper())
+    if not match:
+        raise ValueError("Invalid memory size: {}".format(size))
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+class ModelPool:
+    def __init__(
+        self,
+        predictor_class=None,
+        memory_budget=None,
+        max_models=None,
+        share_backbones=True,
+        **kwargs
+    ):
+        """
+        :param predictor_class: the predictor of the checkpoints, default to APC.SentimentClassifier
+        :param memory_budget: the memory of the pooled models (the parameters and buffers), e.g., "8GB"
+        :param max_models: the maximum number of pooled models
+        :param share_backbones: share the identical backbones of the checkpoints
+        :param kwargs: the arguments of the predictors, e.g., auto_device
+        """
+        if predictor_class is None:
+            from pyabsa.tasks.AspectPolarityClassification import SentimentClassifier
+
+            predictor_class = SentimentClassifier
+        self.predictor_class = predictor_class
+        self.memory_budget = parse_memory_size(memory_budget)
+        self.max_models = max_models
+        self.share_backbones = share_backbones
+        self.kwargs = kwargs
+
+        self._predictors = OrderedDict()  # in the least recently used order
+        self._backbones = weakref.WeakValueDictionary()  # hash -> backbone
+        self._lock = threading.RLock()
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "shared_backbones": 0,
+            "load_time_s": 0.0,
+            "load_time_ms": {},
+        }
+
+    def get(self, checkpoint, **kwargs):
+        """
+        :param checkpoint: the checkpoint name or path
+        :param kwargs: the arguments of the predictor, if it is not loaded
+        :return: the predictor of the checkpoint, loaded if it is not in the pool
+        """
+        with self._lock:
+            if checkpoint in self._predictors:
+                self._metrics["hits"] += 1
+                self._predictors.move_to_end(checkpoint)
+                return self._predictors[checkpoint]
+
+            self._metrics["misses"] += 1
+            start = time.perf_counter()
+            predictor = self.predictor_class(checkpoint, **dict(self.kwargs, **kwargs))
+            if self.share_backbones:
+                self._share_backbones(predictor)
+            load_time = time.perf_counter() - start
+            self._metrics["load_time_s"] += load_time
+            self._metrics["load_time_ms"][checkpoint] = load_time * 1000
+
+            self._predictors[checkpoint] = predictor
+            self._evict(keep=checkpoint)
+            return predictor
+
+    def predict(self, checkpoint, text, **kwargs):
+        """
+        :param checkpoint: the checkpoint name or path
+        :param text: the text or the list of texts
+        :param kwargs: the arguments of predict()
+        """
+        return self.get(checkpoint).predict(text, **kwargs)
+
+    def batch_predict(self, checkpoint, **kwargs):
+        """
+        :param checkpoint: the checkpoint name or path
+        :param kwargs: the arguments of batch_predict()
+        """
+        return self.get(checkpoint).batch_predict(**kwargs)
+
+    def evict(self, checkpoint):
+        """
+        Remove a checkpoint from the pool, its memory is released unless its backbone is shared.
+        """
+        with self._lock:
+            predictor = self._predictors.pop(checkpoint, None)
+            if predictor is None:
+                return
+            self._metrics["evictions"] += 1
+            fprint("Evict checkpoint from the model pool: {}".format(checkpoint))
+            del predictor
+            gc.collect()
+            if cuda.is_available():
+                cuda.empty_cache()
+
+    def clear(self):
+        for checkpoint in list(self._predictors):
+            self.evict(checkpoint)
+
+    def memory(self):
+        """
+        :return: the bytes of the parameters and buffers of the pooled models, the shared tensors are counted once
+        """
+        with self._lock:
+            return _tensor_bytes(list(self._predictors.values()))
+
+    def metrics(self):
+        """
+        :return: a dict of the hits, misses, evictions, shared backbones, load times, memory and pooled checkpoints
+        """
+        with self._lock:
+            metrics = dict(
+                self._metrics, load_time_ms=dict(self._metrics["load_time_ms"])
+            )
+            requests = metrics["hits"] + metrics["misses"]
+            metrics["hit_rate"] = metrics["hits"] / requests if requests else None
+            metrics["memory_bytes"] = self.memory()
+            metrics["memory_budget"] = self.memory_budget
+            metrics["checkpoints"] = list(self._predictors)
+            return metrics
+
+    def __contains__(self, checkpoint):
+        return checkpoint in self._predictors
+
+    def __len__(self):
+        return len(self._predictors)
+
+    def _evict(self, keep):
+        # the least recently used first, the model just loaded is kept even if it exceeds the budget alone
+        while len(self._predictors) > 1:
+            over_count = self.max_models and len(self._predictors) > self.max_models
+            over_budget = self.memory_budget and self.memory() > self.memory_budget
+            if not (over_count or over_budget):
+                break
+            checkpoint = next(c for c in self._predictors if c != keep)
+            self.evict(checkpoint)
+
+    def _share_backbones(self, predictor):
+        model = getattr(predictor, "model", None)
+        if not isinstance(model, torch.nn.Module):
+            return
+        replaced = False
+        for backbone in _backbones(model):
+            key = _hash_module(backbone)
+            shared = self._backbones.get(key)
+            if shared is None:
+                self._backbones[key] = backbone
+            elif shared is not backbone:
+                _replace_module(model, backbone, shared)
+                self._metrics["shared_backbones"] += 1
+                replaced = True
+        if replaced and getattr(predictor, "_compiled_model", None) is not None:
+            # compiled with the replaced backbone
+            predictor.enable_fast_path()
+
+
+def _backbones(model):
+    # the outermost PLMs of the model
+    from transformers import PreTrainedModel
+
+    backbones = []
+    for name, module in model.named_modules():
+        if isinstance(module, PreTrainedModel) and not any(
+            name.startswith(prefix + ".") for prefix, _ in backbones
+        ):
+            backbones.append((name, module))
+    return [module for _, module in backbones]
+
+
+def _hash_module(module):
+    # the names, dtypes, devices and values of the tensors
+    digest = hashlib.sha1()
+    for name, tensor in module.state_dict().items():
+        if not isinstance(tensor, torch.Tensor) or tensor.is_quantized:
+            digest.update("{}:{}".format(name, tensor).encode())
+            continue
+        tensor = tensor.detach()
+        digest.update(
+            "{}:{}:{}:{}".format(
+                name, tensor.dtype, tensor.device, tuple(tensor.shape)
+            ).encode()
+        )
+        digest.update(tensor.cpu().contiguous().view(-1).view(torch.uint8).numpy())
+    return digest.hexdigest()
+
+
+def _replace_module(model, old, new):
+    # every reference of the model to the old module, e.g., the ensembler and its models both hold the PLM
+    for module in model.modules():
+        for name, child in list(module._modules.items()):
+            if child is old:
+                module._modules[name] = new
+
+
+def _tensor_bytes(predictors):
+    seen = set()
+    total = 0
+    for predictor in predictors:
+        for model in (
+            getattr(predictor, "model", None),
+            getattr(predictor, "MLM", None),
+        ):
+            if not isinstance(model, torch.nn.Module):
+                continue
+            for tensor in list(model.parameters()) + list(model.buffers()):
+                if tensor.data_ptr() in seen:
+                    continue
+                seen.add(tensor.data_ptr())
+                total += tensor.numel() * tensor.element_size()
+    return total
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+# file: onnx_backend.py
+# time: 19/10/2026 23:59
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+ONNX export of the inference models and the ONNX Runtime execution backend.
+
+An exported checkpoint is a directory of <model_name>.onnx (the graph, with dynamic batch and sequence axes),
+<model_name>.onnx.json (the names of the inputs and outputs), <model_name>.config and <model_name>.tokenizer, the
+latter are the same as in the PyTorch checkpoints. The predictors load it like any checkpoint, and run the graph
+with onnxruntime on CPU in place of the PyTorch model, the featurization and the result formatting are unchanged.
+"""
+
+import json
+import os
+import pickle
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader
+
+from pyabsa.framework.flag_class.flag_template import DeviceTypeOption
+from pyabsa.utils.pyabsa_utils import fprint
+
+# the label columns are in the inputs_cols of some tasks, but never fed to the models at inference
+_LABEL_COLUMNS = ("polarity", "label")
+
+
+class _ExportWrapper(nn.Module):
+    """
+    Call the model with its named inputs as positional tensors, and return its outputs as a tuple.
+    """
+
+    def __init__(self, model, input_names, output_names, inputs_as_dict):
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+        self.output_names = output_names
+        self.inputs_as_dict = inputs_as_dict
+
+    def forward(self, *tensors):
+        if self.inputs_as_dict:
+            inputs = dict(zip(self.input_names, tensors))
+        else:
+            inputs = list(tensors)
+        outputs = self.model(inputs)
+        if isinstance(outputs, dict):
+            return tuple(outputs[name] for name in self.output_names)
+        return outputs
+
+
+def export_onnx(inference_model, sample_text, save_path=None, opset_version=14):
+    """
+    Export the model of a predictor to ONNX, traced on a featurized sample.
+
+    :param inference_model: the predictor, e.g., a SentimentClassifier
+    :param sample_text: an example in the inference format of the task, used to trace the model
+    :param save_path: the checkpoint directory, default to the checkpoint path suffixed with "_onnx"
+    :param opset_version: the ONNX opset version
+    :return: the checkpoint directory
+    """
+    config = inference_model.config
+    if not save_path:
+        save_path = "{}_onnx".format(
+            inference_model.checkpoint.rstrip("/\\")
+            if isinstance(inference_model.checkpoint, str)
+            else os.path.join("checkpoints", config.model_name)
+        )
+    os.makedirs(save_path, exist_ok=True)
+    onnx_path = os.path.join(save_path, config.model_name + ".onnx")
+
+    # a batch of two examples, so that the batch axis is not specialized
+    inference_model.dataset.prepare_infer_sample(
+        [sample_text, sample_text], ignore_error=False
+    )
+    batch = next(iter(DataLoader(inference_model.dataset, batch_size=2)))
+    input_names = [col for col in config.inputs_cols if col not in _LABEL_COLUMNS]
+    tensors = tuple(batch[col].to(DeviceTypeOption.CPU) for col in input_names)
+
+    model = inference_model.model.to(DeviceTypeOption.CPU).eval()
+    inputs_as_dict = inference_model.inputs_as_dict
+    with torch.no_grad():
+        outputs = model(
+            dict(zip(input_names, tensors)) if inputs_as_dict else list(tensors)
+        )
+    if isinstance(outputs, dict):
+        # the loss is a constant at inference
+        output_names = [
+            name
+            for name, value in outputs.items()
+            if isinstance(value, torch.Tensor) and name != "loss"
+        ]
+        expected = [outputs[name] for name in output_names]
+    else:
+        output_names = ["logits"]
+        expected = [outputs]
+
+    dynamic_axes = {}
+    for name, tensor in zip(input_names, tensors):
+        dynamic_axes[name] = {0: "batch"}
+        if tensor.dim() > 1:
+            dynamic_axes[name][1] = "{}_length".format(name)
+    for name in output_names:
+        dynamic_axes[name] = {0: "batch"}
+
+    torch.onnx.export(
+        _ExportWrapper(model, input_names, output_names, inputs_as_dict),
+        tensors,
+        onnx_path,
+        input_names=input_names,
+        output_names=output_names,
+        dynamic_axes=dynamic_axes,
+        opset_version=opset_version,
+        do_constant_folding=True,
+    )
+    with open(onnx_path + ".json", mode="w", encoding="utf8") as f:
+        json.dump(
+            {
+                "input_names": input_names,
+                "output_names": output_names,
+                "outputs_as_dict": isinstance(outputs, dict),
+                "opset_version": opset_version,
+            },
+            f,
+        )
+    with open(os.path.join(save_path, config.model_name + ".config"), "wb") as f:
+        pickle.dump(config, f)
+    with open(os.path.join(save_path, config.model_name + ".tokenizer"), "wb") as f:
+        pickle.dump(inference_model.tokenizer, f)
+    inference_model.to(config.device)
+
+    # check the exported graph on the traced sample
+    onnx_outputs = OnnxModel(onnx_path)(
+        dict(zip(input_names, tensors)) if inputs_as_dict else list(tensors)
+    )
+    if not isinstance(onnx_outputs, dict):
+        onnx_outputs = {"logits": onnx_outputs}
+    max_diff = max(
+        float((onnx_outputs[name] - value).abs().max())
+        for name, value in zip(output_names, expected)
+    )
+    fprint(
+        "ONNX checkpoint saved in: {}, max abs difference to PyTorch: {:.2e}".format(
+            save_path, max_diff
+        )
+    )
+    return save_path
+
+
+def find_onnx_model(checkpoint):
+    """
+    :return: the ONNX graph of a checkpoint directory, or None
+    """
+    if not isinstance(checkpoint, str) or not os.path.isdir(checkpoint):
+        return None
+    for file in sorted(os.listdir(checkpoint)):
+        if file.endswith(".onnx"):
+            return os.path.join(checkpoint, file)
+    return None
+
+
+class OnnxModel:
+    """
+    Run an exported graph with onnxruntime in place of the PyTorch model of a predictor: it is called with the
+    inputs built by the predictor (a dict or a list of tensors) and returns the outputs of the PyTorch model.
+    """
+
+    def __init__(self, onnx_path, num_threads=None):
+        """
+        :param onnx_path: the .onnx file, with its .onnx.json description
+        :param num_threads: the number of intra-op threads of onnxruntime, default to the number of cores
+        """
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError(
+                "The ONNX backend needs onnxruntime, please install it: pip install onnxruntime"
+            )
+        with open(onnx_path + ".json", mode="r", encoding="utf8") as f:
+            meta = json.load(f)
+        self.input_names = meta["input_names"]
+        self.output_names = meta["output_names"]
+        self.outputs_as_dict = meta["outputs_as_dict"]
+
+        options = onnxruntime.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(
+            onnx_path, options, providers=["CPUExecutionProvider"]
+        )
+
+    def __call__(self, inputs):
+        if isinstance(inputs, dict):
+            tensors = [inputs[name] for name in self.input_names]
+        else:
+            tensors = inputs
+        feeds = {
+            name: tensor.detach().cpu().numpy()
+            for name, tensor in zip(self.input_names, tensors)
+        }
+        outputs = [
+            torch.from_numpy(np.asarray(output))
+            for output in self.session.run(self.output_names, feeds)
+        ]
+        if self.outputs_as_dict:
+            return dict(zip(self.output_names, outputs))
+        return outputs[0]
+
+    # the nn.Module methods called by the predictors
+    def eval(self):
+        return self
+
+    def train(self, mode=True):
+        return self
+
+    def to(self, device):
+        return self
+
+    def cpu(self):
+        return self
+
+    def parameters(self):
+        return iter(())
+
+    def modules(self):
+        return iter(())
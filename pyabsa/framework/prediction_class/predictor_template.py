@@ -6,17 +6,54 @@
 # GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
 # ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
 # Copyright (C) 2022. All Rights Reserved.
+import os
 import time
 from typing import Union
 
+import numpy as np
+import torch
 from torch import cuda
 
 import pyabsa
+from pyabsa.framework.flag_class.flag_template import QuantizationOption
+from pyabsa.framework.prediction_class.fast_path import (
+    CompiledModel,
+    batch_buckets,
+    warmup,
+    _batch_size,
+)
+from pyabsa.framework.prediction_class.onnx_backend import (
+    export_onnx,
+    find_onnx_model,
+    OnnxModel,
+)
+from pyabsa.framework.prediction_class.result_sink import (
+    ResultSink,
+    open_result_sink,
+)
+from pyabsa.framework.prediction_class.quantization import (
+    quantize_model,
+    is_quantized,
+    model_size,
+    flatten_predictions,
+    accuracy,
+)
+from pyabsa.utils.profile_utils.profiler import Profiler
+from pyabsa.utils.pyabsa_utils import fprint
 from pyabsa.utils.text_utils.mlm import get_mlm_and_tokenizer
 
 
 class InferenceModel:
     task_code = None
+    # the models of the task are called with a dict of the input columns, otherwise with a list
+    inputs_as_dict = False
+    # an example in the inference format of the task to warm up the fast path, the predictors without it are
+    # compiled on their first requests
+    warmup_text = None
+    # the inputs of the task are padded to max_seq_len, so the fast path compiles the model for static shapes
+    compile_fast_path = True
+    # the per-stage profiler, disabled until enable_profiling() is called
+    profiler = Profiler(enabled=False)
 
     def __init__(self, checkpoint: Union[str, object] = None, config=None, **kwargs):
         """
@@ -42,12 +79,20 @@ class InferenceModel:
         self.model = None
         self.dataset = None
 
+        self._compiled_model = None
+        self.fast_path_metrics = None
+
+        self.result_sink = None
+
     def to(self, device=None):
         """
         Sets the device on which the model will perform inference.
 
         :param device: the device to use for inference
         """
+        if _cpu_only(self.model) and str(device) != pyabsa.DeviceTypeOption.CPU:
+            fprint("The model only runs on CPU, ignore device: {}".format(device))
+            device = pyabsa.DeviceTypeOption.CPU
         self.config.device = device
         self.model.to(device)
         if hasattr(self, "MLM") and self.MLM is not None:
@@ -68,6 +113,9 @@ class InferenceModel:
 
         :param device: the CUDA device to use for inference
         """
+        if _cpu_only(self.model):
+            fprint("The model only runs on CPU, ignore device: {}".format(device))
+            return
         self.config.device = device
         self.model.to(device)
         if hasattr(self, "MLM"):
@@ -98,6 +146,341 @@ class InferenceModel:
 
         self.to(self.config.device)
 
+        # quantize="dynamic_int8", unless loaded from a quantized checkpoint
+        if self.config.get("quantize", None) and not _cpu_only(self.model):
+            self.quantize(self.config.quantize)
+
+        if self.config.get("fast_path", False):
+            self.enable_fast_path()
+
+        if self.config.get("profile", False):
+            self.enable_profiling()
+
+    def enable_fast_path(self, max_batch_size=None, **compile_kwargs):
+        """
+        Run the inference under torch.inference_mode() with the model compiled for the batch size buckets, and warm
+        it up on synthetic batches, see pyabsa.framework.prediction_class.fast_path. The compile and warmup times
+        are in self.fast_path_metrics. The quantized and exported models only use the inference mode.
+
+        :param max_batch_size: the largest batch size to compile, default to max(32, config.eval_batch_size)
+        :param compile_kwargs: the arguments of torch.compile()
+        :return: self
+        """
+        self.config.fast_path = True
+        if _cpu_only(self.model):
+            fprint("The model is quantized or exported, it will not be compiled")
+            return self
+        if not self.compile_fast_path:
+            fprint(
+                "The inputs of {} are not padded to static shapes, the model will not be compiled".format(
+                    type(self).__name__
+                )
+            )
+            return self
+        if not max_batch_size:
+            max_batch_size = self.config.get(
+                "fast_path_max_batch_size",
+                max(32, self.config.get("eval_batch_size", 32)),
+            )
+        buckets = batch_buckets(max_batch_size)
+        self.model.eval()
+        try:
+            self._compiled_model = CompiledModel(self.model, buckets, **compile_kwargs)
+            if self.warmup_text:
+                self.fast_path_metrics = warmup(self, buckets)
+        except Exception as e:
+            self._compiled_model = None
+            fprint("Fail to compile the model, use the eager model: {}".format(e))
+        return self
+
+    def disable_fast_path(self):
+        """
+        Run the inference with the eager model under torch.no_grad().
+        """
+        self.config.fast_path = False
+        self._compiled_model = None
+        self.fast_path_metrics = None
+
+    def _inference_context(self):
+        if self.config.get("fast_path", False):
+            return torch.inference_mode()
+        return torch.no_grad()
+
+    def _forward(self, *args, **kwargs):
+        # the compiled model is dropped if the model has been replaced, e.g., quantized
+        if (
+            self._compiled_model is not None
+            and self._compiled_model.model is self.model
+        ):
+            model = self._compiled_model
+        else:
+            model = self.model
+        if not self.profiler.enabled:
+            return model(*args, **kwargs)
+        with self.profiler.span("forward", examples=_batch_size((args, kwargs)) or 0):
+            return model(*args, **kwargs)
+
+    def enable_profiling(self, exporters=None, sync_cuda=False):
+        """
+        Time the stages of the inference (e.g., the featurization, the forward and the result assembly) and count
+        the examples and tokens of each stage, see pyabsa.utils.profile_utils.profiler. The statistics are returned
+        by stats(), and exported by export_stats().
+
+        :param exporters: the exporters of the statistics, e.g., ["memory", "predictor.profile.jsonl", "torch"],
+            default to config.profile_exporters
+        :param sync_cuda: synchronize the CUDA device at the end of each stage, for accurate device timings
+        :return: self
+        """
+        self.disable_profiling()
+        self.config.profile = True
+        self.profiler = Profiler(
+            enabled=True,
+            exporters=(
+                exporters
+                if exporters is not None
+                else self.config.get("profile_exporters", None)
+            ),
+            sync_cuda=sync_cuda or self.config.get("profile_sync_cuda", False),
+            keep_timings=self.config.get("profile_keep_timings", False),
+        )
+        return self
+
+    def disable_profiling(self):
+        """
+        Stop the profiling, the exporters are closed.
+        """
+        if self.profiler.enabled:
+            self.profiler.close()
+        self.config.profile = False
+        self.profiler = Profiler(enabled=False)
+
+    def stats(self):
+        """
+        :return: the profiling statistics of the stages since profiling was enabled or reset, empty if disabled
+        """
+        return self.profiler.summary()
+
+    def reset_stats(self):
+        """
+        Clear the profiling statistics.
+        """
+        self.profiler.reset()
+
+    def export_stats(self):
+        """
+        :return: the profiling statistics, written to the exporters of the profiler
+        """
+        return self.profiler.export(
+            task_code=self.task_code,
+            model=getattr(self.config.get("model", None), "__name__", None),
+        )
+
+    def _load_onnx_model(self, **kwargs):
+        """
+        :return: the OnnxModel of an exported checkpoint, or None if the checkpoint is not exported
+        """
+        onnx_path = find_onnx_model(self.checkpoint)
+        if not onnx_path:
+            return None
+        fprint("onnx: {}".format(onnx_path))
+        return OnnxModel(onnx_path, num_threads=kwargs.get("onnx_threads", None))
+
+    def export_onnx(self, sample_text, save_path=None, opset_version=14):
+        """
+        Export the model to ONNX, the exported checkpoint is loaded by the same class and run with onnxruntime.
+
+        :param sample_text: an example in the inference format of the task, used to trace the model
+        :param save_path: the checkpoint directory, default to the checkpoint path suffixed with "_onnx"
+        :param opset_version: the ONNX opset version
+        :return: the checkpoint directory
+        """
+        if _cpu_only(self.model):
+            raise RuntimeError("Please export the float PyTorch model")
+        return export_onnx(self, sample_text, save_path, opset_version)
+
+    def quantize(self, mode=QuantizationOption.DYNAMIC_INT8):
+        """
+        Quantize the model for CPU inference, see pyabsa.framework.prediction_class.quantization.
+
+        :param mode: the quantization mode, only "dynamic_int8" is supported
+        :return: self
+        """
+        if _cpu_only(self.model):
+            raise RuntimeError(
+                "The model is quantized or exported, please load the float model"
+            )
+        float_size = model_size(self.model)
+        self.model = quantize_model(self.model, mode)
+        self.config.quantize = mode
+        self.config.device = pyabsa.DeviceTypeOption.CPU
+        if hasattr(self, "MLM") and self.MLM is not None:
+            self.MLM.to(pyabsa.DeviceTypeOption.CPU)
+        fprint(
+            "Quantized the model ({}): {:.1f}MB -> {:.1f}MB".format(
+                mode, float_size / 1024**2, model_size(self.model) / 1024**2
+            )
+        )
+        return self
+
+    def save_quantized(self, save_path=None):
+        """
+        Save the quantized model as a checkpoint variant, which is loaded as a quantized model by the same class.
+
+        :param save_path: the checkpoint directory, default to the checkpoint path suffixed with the quantization mode
+        :return: the checkpoint directory
+        """
+        from pyabsa.utils.file_utils.file_utils import save_model
+
+        if not is_quantized(self.model):
+            raise RuntimeError(
+                "The model is not quantized, please call quantize() first"
+            )
+        if not save_path:
+            save_path = "{}_{}".format(
+                (
+                    self.checkpoint.rstrip("/\\")
+                    if isinstance(self.checkpoint, str)
+                    else os.path.join("checkpoints", self.config.model_name)
+                ),
+                self.config.quantize,
+            )
+        save_path = os.path.join(save_path, "")
+
+        # the quantized weights can not be loaded into the float model, the whole model is saved
+        save_mode = self.config.get("save_mode", None)
+        self.config.save_mode = pyabsa.ModelSaveOption.SAVE_FULL_MODEL
+        try:
+            save_model(self.config, self.model, self.tokenizer, save_path)
+        finally:
+            self.config.save_mode = save_mode
+        fprint("Quantized checkpoint saved in: {}".format(save_path))
+        return save_path
+
+    def quantization_report(
+        self, target_file, mode=QuantizationOption.DYNAMIC_INT8, **kwargs
+    ):
+        """
+        Compare the float model and the quantized model on a (labeled) inference file, the model is left unchanged.
+
+        :param target_file: the inference file, e.g., a validation set
+        :param mode: the quantization mode
+        :param kwargs: the other arguments of batch_predict()
+        :return: a dict of the accuracies, the accuracy delta, the prediction agreement, the latency per example and
+            the model sizes
+        """
+        if _cpu_only(self.model):
+            raise RuntimeError(
+                "The model is quantized or exported, please load the float model"
+            )
+        float_model, device = self.model, self.config.device
+        kwargs.update(print_result=False, save_result=False)
+
+        reports = {}
+        try:
+            for name in ("float", mode):
+                if name == mode:
+                    self.model = quantize_model(float_model, mode)
+                else:
+                    self.to(pyabsa.DeviceTypeOption.CPU)
+                start = time.perf_counter()
+                pairs = flatten_predictions(
+                    self.batch_predict(target_file=target_file, **kwargs)
+                )
+                reports[name] = {
+                    "pairs": pairs,
+                    "latency_ms": (time.perf_counter() - start)
+                    / max(1, len(pairs))
+                    * 1000,
+                    "size_mb": model_size(self.model) / 1024**2,
+                }
+        finally:
+            self.model = float_model
+            self.to(device)
+
+        float_report, quantized_report = reports["float"], reports[mode]
+        float_acc = accuracy(float_report["pairs"])
+        quantized_acc = accuracy(quantized_report["pairs"])
+        report = {
+            "mode": mode,
+            "examples": len(float_report["pairs"]),
+            "float_acc": float_acc,
+            "quantized_acc": quantized_acc,
+            "acc_delta": (
+                quantized_acc - float_acc
+                if float_acc is not None and quantized_acc is not None
+                else None
+            ),
+            "agreement": sum(
+                f[0] == q[0]
+                for f, q in zip(float_report["pairs"], quantized_report["pairs"])
+            )
+            / max(1, len(float_report["pairs"])),
+            "float_latency_ms": float_report["latency_ms"],
+            "quantized_latency_ms": quantized_report["latency_ms"],
+            "float_size_mb": float_report["size_mb"],
+            "quantized_size_mb": quantized_report["size_mb"],
+        }
+        fprint("Quantization report: {}".format(report))
+        return report
+
+    def set_result_sink(self, sink, batch_size=1024):
+        """
+        Append the results of the following predict() and batch_predict() calls to a sink, see
+        pyabsa.framework.prediction_class.result_sink. The former sink is closed.
+
+        :param sink: a ResultSink, or the path of a .json, .jsonl, .parquet or .arrow file
+        :param batch_size: the number of buffered results written at once
+        :return: the sink
+        """
+        self.close_result_sink()
+        if not isinstance(sink, ResultSink):
+            sink = open_result_sink(sink, batch_size=batch_size)
+        self.result_sink = sink
+        return sink
+
+    def close_result_sink(self):
+        """
+        Write the buffered results and close the sink.
+        """
+        sink = getattr(self, "result_sink", None)
+        if sink is not None:
+            sink.close()
+            fprint("{} results saved in: {}".format(sink.count, sink.path))
+        self.result_sink = None
+
+    def _save_results(self, results, save_path=None):
+        # to the sink of the predictor, and to the result file of a call
+        with self.profiler.span("save_results", examples=len(results)):
+            sink = getattr(self, "result_sink", None)
+            if sink is not None:
+                sink.write(results)
+            if save_path:
+                with open_result_sink(save_path) as sink:
+                    sink.write(results)
+                fprint("inference result saved in: {}".format(save_path))
+
+    def _printed_examples(self, num_results, print_result=True):
+        """
+        :param num_results: the number of results
+        :param print_result: True to print the results, up to config.print_result_limit (default 100) evenly sampled
+            ones, or the number of the sampled results to print
+        :return: the indices of the results to print
+        """
+        if not print_result or not num_results:
+            return []
+        if print_result is True:
+            limit = self.config.get("print_result_limit", 100)
+        else:
+            limit = int(print_result)
+        if limit is None or num_results <= limit:
+            return range(num_results)
+        fprint(
+            "Print {} of {} results, set config.print_result_limit to print more".format(
+                limit, num_results
+            )
+        )
+        return np.unique(np.linspace(0, num_results - 1, limit).astype(int)).tolist()
+
     def batch_predict(self, **kwargs):
         """
         Predict from a file of sentences.
@@ -134,6 +517,12 @@ class InferenceModel:
         """
         Deletes the model from memory and empties the CUDA cache.
         """
+        self.close_result_sink()
+        self.disable_profiling()
         del self.model
         cuda.empty_cache()
         time.sleep(3)
+
+
+def _cpu_only(model):
+    return isinstance(model, OnnxModel) or is_quantized(model)
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# file: quantization.py
+# time: 19/10/2026 23:59
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+Dynamic INT8 quantization of the inference models for CPU inference.
+
+The weights of all the nn.Linear layers, i.e., in the PLM backbones and in the PyABSA heads (e.g., the self-attention
+encoders of networks/sa_encoder.py, the LSA layers and the poolers), are quantized to int8 once, the activations
+are quantized on the fly. The embeddings, convolutions and RNNs stay in float32.
+"""
+
+import io
+import platform
+
+import torch
+import torch.nn as nn
+
+from pyabsa.framework.flag_class.flag_template import (
+    DeviceTypeOption,
+    LabelPaddingOption,
+    QuantizationOption,
+)
+
+
+def quantize_model(model, mode=QuantizationOption.DYNAMIC_INT8):
+    """
+    :param model: the float model, on any device
+    :param mode: the quantization mode, only "dynamic_int8" is supported
+    :return: the quantized model, on CPU
+    """
+    if mode != QuantizationOption.DYNAMIC_INT8:
+        raise ValueError(
+            "Unsupported quantization mode: {}, use {}".format(
+                mode, QuantizationOption.DYNAMIC_INT8
+            )
+        )
+    engines = torch.backends.quantized.supported_engines
+    if platform.machine().lower() in ("arm64", "aarch64") and "qnnpack" in engines:
+        torch.backends.quantized.engine = "qnnpack"
+    model = model.to(DeviceTypeOption.CPU).eval()
+    return torch.ao.quantization.quantize_dynamic(
+        model, {nn.Linear}, dtype=torch.qint8, inplace=False
+    )
+
+
+def is_quantized(model):
+    """
+    :return: True if the model has dynamically quantized layers
+    """
+    return any(
+        isinstance(module, torch.ao.nn.quantized.dynamic.Linear)
+        for module in model.modules()
+    )
+
+
+def model_size(model):
+    """
+    :return: the size of the serialized state dict of the model, in bytes
+    """
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def flatten_predictions(results):
+    """
+    Flatten the prediction results of any task to (prediction, reference) pairs, the reference is None if the
+    example is not labeled (e.g., the aspect term extraction results).
+
+    :param results: the results returned by batch_predict()
+    """
+    pairs = []
+    for result in results:
+        if "ref_sentiment" in result:
+            predictions, references = result["sentiment"], result["ref_sentiment"]
+        elif "ref_label" in result:
+            predictions, references = result["label"], result["ref_label"]
+        else:
+            predictions = [(result.get("aspect"), result.get("sentiment"))]
+            references = [None]
+        if not isinstance(predictions, list):
+            predictions, references = [predictions], [references]
+        for prediction, reference in zip(predictions, references):
+            if reference in (
+                "",
+                str(LabelPaddingOption.LABEL_PADDING),
+                LabelPaddingOption.LABEL_PADDING,
+            ):
+                reference = None
+            pairs.append(
+                (str(prediction), None if reference is None else str(reference))
+            )
+    return pairs
+
+
+def accuracy(pairs):
+    """
+    :return: the accuracy of the labeled (prediction, reference) pairs, or None if none is labeled
+    """
+    labeled = [(p, r) for p, r in pairs if r is not None]
+    if not labeled:
+        return None
+    return sum(p == r for p, r in labeled) / len(labeled)
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+# file: result_sink.py
+# time: 20/10/2026 05:30
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+The sinks of the prediction results, one record per result in JSON, JSONL, Parquet or Arrow IPC files.
+
+The results are buffered and written in batches, the probabilities (NumPy arrays or tensors) are written as float32
+arrays (lists of floats in JSONL). A sink is attached to a predictor with InferenceModel.set_result_sink(), then the
+results of all the predict() and batch_predict() calls are appended to it until it is closed; batch_predict() with
+save_result=True writes the results of a call to {task}.{model}.result.json, one JSON array as before.
+
+Parquet and Arrow need pyarrow: pip install pyarrow
+"""
+
+import atexit
+import json
+import os
+
+import numpy as np
+
+_SINKS = {}
+
+
+def register_result_sink(*extensions):
+    """
+    Register a sink class of the files with the extensions.
+    """
+
+    def decorator(sink_class):
+        for extension in extensions:
+            _SINKS[extension.lower()] = sink_class
+        return sink_class
+
+    return decorator
+
+
+def open_result_sink(path, batch_size=1024):
+    """
+    :param path: the result file, the format is inferred from its extension (.json, .jsonl, .parquet or .arrow)
+    :param batch_size: the number of buffered results written at once
+    :return: the ResultSink of the file, the file is overwritten
+    """
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension not in _SINKS:
+        raise ValueError(
+            "Unsupported result format: {}, available formats: {}".format(
+                extension, sorted(_SINKS)
+            )
+        )
+    return _SINKS[extension](path, batch_size)
+
+
+class ResultSink:
+    def __init__(self, path, batch_size=1024):
+        """
+        :param path: the result file
+        :param batch_size: the number of buffered results written at once
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.count = 0
+        self.closed = False
+        self._buffer = []
+        # the buffered results are written if the sink is not closed
+        atexit.register(self.close)
+
+    def write(self, results):
+        """
+        :param results: a result (dict) or a list of results
+        """
+        if self.closed:
+            raise RuntimeError("The result sink is closed: {}".format(self.path))
+        if isinstance(results, dict):
+            results = [results]
+        for result in results:
+            self._buffer.append(to_record(result))
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._write_batch(self._buffer)
+            self.count += len(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.closed = True
+            self._close()
+            atexit.unregister(self.close)
+
+    def _write_batch(self, records):
+        raise NotImplementedError()
+
+    def _close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+@register_result_sink(".jsonl")
+class JsonlResultSink(ResultSink):
+    def __init__(self, path, batch_size=1024):
+        super().__init__(path, batch_size)
+        self._file = open(path, mode="w", encoding="utf8")
+
+    def _write_batch(self, records):
+        self._file.write(
+            "".join(
+                json.dumps(record, ensure_ascii=False, default=_to_list) + "\n"
+                for record in records
+            )
+        )
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+@register_result_sink(".json")
+class JsonResultSink(JsonlResultSink):
+    """
+    The results in one JSON array, the format of the former result files.
+    """
+
+    def __init__(self, path, batch_size=1024):
+        super().__init__(path, batch_size)
+        self._file.write("[")
+
+    def _write_batch(self, records):
+        self._file.write(
+            "".join(
+                ("," if self.count or i else "")
+                + "\n"
+                + json.dumps(record, ensure_ascii=False, default=_to_list)
+                for i, record in enumerate(records)
+            )
+        )
+        self._file.flush()
+
+    def _close(self):
+        self._file.write("\n]\n")
+        super()._close()
+
+
+class ColumnarResultSink(ResultSink):
+    """
+    The schema of a columnar file is inferred from the results. A column whose values are all None so far has no type
+    yet (e.g., the reference labels of an unlabeled batch), so the results are held until all the columns are typed,
+    or until the sink is closed. Then the schema is fixed, the missing values of the later results are None.
+    """
+
+    def __init__(self, path, batch_size=1024):
+        super().__init__(path, batch_size)
+        self._pyarrow = _import_pyarrow()
+        self._schema = None
+        self._pending = []
+        self._pending_schema = None
+
+    def _write_batch(self, records):
+        if self._schema is None:
+            schema = self._pyarrow.Table.from_pylist(records).schema
+            self._pending.extend(records)
+            self._pending_schema = (
+                schema
+                if self._pending_schema is None
+                else self._pyarrow.unify_schemas([self._pending_schema, schema])
+            )
+            if any(_has_null_type(field.type) for field in self._pending_schema):
+                return
+            self._open_pending()
+            return
+        self._write_table(self._pyarrow.Table.from_pylist(records, schema=self._schema))
+
+    def _open_pending(self):
+        self._schema = self._pending_schema
+        self._open_writer(self._schema)
+        records, self._pending = self._pending, []
+        self._write_table(self._pyarrow.Table.from_pylist(records, schema=self._schema))
+
+    def _close(self):
+        if self._schema is None and self._pending:
+            self._open_pending()
+
+    def _open_writer(self, schema):
+        raise NotImplementedError()
+
+    def _write_table(self, table):
+        raise NotImplementedError()
+
+
+@register_result_sink(".parquet")
+class ParquetResultSink(ColumnarResultSink):
+    def __init__(self, path, batch_size=1024):
+        super().__init__(path, batch_size)
+        self._writer = None
+
+    def _open_writer(self, schema):
+        import pyarrow.parquet
+
+        self._writer = pyarrow.parquet.ParquetWriter(self.path, schema)
+
+    def _write_table(self, table):
+        self._writer.write_table(table)
+
+    def _close(self):
+        super()._close()
+        if self._writer is not None:
+            self._writer.close()
+
+
+@register_result_sink(".arrow", ".feather", ".ipc")
+class ArrowResultSink(ColumnarResultSink):
+    def __init__(self, path, batch_size=1024):
+        super().__init__(path, batch_size)
+        self._file = open(path, "wb")
+        self._writer = None
+
+    def _open_writer(self, schema):
+        import pyarrow.ipc
+
+        self._writer = pyarrow.ipc.new_file(self._file, schema)
+
+    def _write_table(self, table):
+        self._writer.write_table(table)
+
+    def _close(self):
+        super()._close()
+        if self._writer is not None:
+            self._writer.close()
+        self._file.close()
+
+
+def to_record(result):
+    """
+    :param result: a prediction result, a dict of the values, the arrays and tensors
+    :return: the result with the float arrays as float32 NumPy arrays, the NumPy scalars as Python scalars and the
+        tuples as lists
+    """
+    if hasattr(result, "detach"):
+        # a tensor
+        result = result.detach().cpu().numpy()
+    if isinstance(result, np.ndarray):
+        return result.astype(np.float32) if result.dtype.kind == "f" else result
+    if isinstance(result, np.generic):
+        return result.item()
+    if isinstance(result, dict):
+        return {str(k): to_record(v) for k, v in result.items()}
+    if isinstance(result, (list, tuple)):
+        return [to_record(v) for v in result]
+    return result
+
+
+def _to_list(value):
+    # the JSON encoding of the arrays
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError("Object of type {} is not JSON serializable".format(type(value)))
+
+
+def _has_null_type(data_type):
+    # a column, or a nested field, whose values are all None
+    if data_type.num_fields:
+        return any(
+            _has_null_type(data_type.field(i).type) for i in range(data_type.num_fields)
+        )
+    return str(data_type) == "null"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+
+        return pyarrow
+    except ImportError:
+        raise ImportError(
+            "The Parquet and Arrow result sinks need pyarrow, please install it: pip install pyarrow"
+        )
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+# file: distributed_sampler.py
+# time: 19/10/2026 22:20
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+from torch.utils.data.distributed import DistributedSampler
+
+
+class EpochDistributedSampler(DistributedSampler):
+    """
+    A DistributedSampler which advances its epoch every time it is iterated, so the shards are reshuffled at
+    every epoch without the training loops calling set_epoch(). Every rank iterates its sampler the same number
+    of times, so the ranks stay in agreement on the permutation.
+    """
+
+    def __iter__(self):
+        indices = super().__iter__()
+        self.set_epoch(self.epoch + 1)
+        return indices
@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+# file: sweep.py
+# time: 19/10/2026 23:05
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+import copy
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import time
+import traceback
+
+import numpy
+import torch
+
+from pyabsa.framework.dataset_class import feature_store
+from pyabsa.framework.flag_class.flag_template import DeviceTypeOption
+from pyabsa.framework.sweep_class import trial_pruner
+from pyabsa.framework.sweep_class.sweep_results import SweepResults
+from pyabsa.utils.pyabsa_utils import fprint
+
+# the fields of a search space passed to the trainer instead of the config
+_TRAINER_ARGS = {
+    "dataset",
+    "from_checkpoint",
+    "checkpoint_save_mode",
+    "auto_device",
+    "path_to_save",
+    "load_aug",
+}
+
+
+class SearchSpace:
+    """
+    A grid over the config fields, e.g.,
+        SearchSpace(
+            model=[APC.APCModelList.FAST_LSA_T_V2, APC.APCModelList.BERT_SPC_V2],
+            dataset=[APC.APCDatasetList.Laptop14, APC.APCDatasetList.Restaurant14],
+            learning_rate=[1e-5, 2e-5],
+            dropout=[0, 0.5],
+        )
+    "dataset", "checkpoint_save_mode", "auto_device", "path_to_save", "from_checkpoint" and "load_aug" are passed to
+    the trainer, the other fields are set in the config of the trial.
+    """
+
+    def __init__(self, grid=None, **kwargs):
+        """
+        :param grid: a dict of field -> list of values, a single value is a fixed field
+        :param kwargs: more fields
+        """
+        self.grid = dict(grid or {})
+        self.grid.update(kwargs)
+        for key, values in self.grid.items():
+            if not isinstance(values, (list, tuple)):
+                self.grid[key] = [values]
+
+    def trials(self):
+        """
+        :return: the list of the params of every trial, in grid order
+        """
+        keys = list(self.grid)
+        return [
+            dict(zip(keys, values))
+            for values in itertools.product(*[self.grid[k] for k in keys])
+        ]
+
+    def __len__(self):
+        return int(numpy.prod([len(v) for v in self.grid.values()]))
+
+
+class SweepScheduler:
+    """
+    Train a trainer (e.g., APCTrainer) for every trial of a search space, and store the results in one table.
+
+    The trials sharing the fields that affect the featurized datasets (the model, the dataset, max_seq_len, etc.)
+    form a group, and the trials of a group run one after another in the same process, so the datasets are
+    featurized once per group and reused by the following trials (see feature_store).
+
+    If num_workers > 1, the trials run in a pool of forked worker processes, each bounded to its share of the CPU
+    cores or to one of the devices. A worker takes the next trial of the group it has just run if any, so the groups
+    are spread over the workers and featurized once per worker.
+
+    If a pruner (MedianPruner or ASHAPruner) is given, the metrics reported by the training loops at log_step
+    boundaries are judged against the other trials, and the bad trials are stopped early.
+    """
+
+    def __init__(
+        self,
+        trainer_class,
+        config,
+        search_space,
+        trainer_kwargs=None,
+        num_workers=1,
+        devices=None,
+        pruner=None,
+        results="sweep_results.db",
+        sweep_name=None,
+    ):
+        """
+        :param trainer_class: the trainer of the task, e.g., APC.APCTrainer
+        :param config: the base config, it is copied for every trial
+        :param search_space: a SearchSpace, or a dict of field -> list of values
+        :param trainer_kwargs: the fixed arguments of the trainer, e.g., dict(dataset=..., checkpoint_save_mode=0)
+        :param num_workers: the number of worker processes, the trials run in this process if num_workers <= 1
+        :param devices: the devices of the workers, defaults to all the CUDA devices if CUDA is available
+        :param pruner: a MedianPruner or ASHAPruner to stop the bad trials early, or None
+        :param results: a SweepResults, or the path of its database
+        :param sweep_name: the name of the sweep in the results, defaults to a timestamp
+        """
+        self.trainer_class = trainer_class
+        self.config = config
+        self.search_space = (
+            search_space
+            if isinstance(search_space, SearchSpace)
+            else SearchSpace(search_space)
+        )
+        self.trainer_kwargs = dict(trainer_kwargs or {})
+        self.num_workers = max(1, num_workers)
+        self.devices = devices
+        self.pruner = pruner
+        self.results = (
+            results if isinstance(results, SweepResults) else SweepResults(results)
+        )
+        self.sweep_name = sweep_name or "sweep-{}".format(
+            time.strftime("%Y%m%d-%H%M%S")
+        )
+
+    def run(self):
+        """
+        Run all the trials.
+
+        :return: the SweepResults, query it with results.to_dataframe(sweep_name) or results.best(metric)
+        """
+        trials = [
+            {"trial_id": i, "params": params, "group": _group_key(params)}
+            for i, params in enumerate(self.search_space.trials())
+        ]
+        # keep the trials of a group together, in grid order
+        group_order = {}
+        for trial in trials:
+            group_order.setdefault(trial["group"], len(group_order))
+        trials.sort(key=lambda t: (group_order[t["group"]], t["trial_id"]))
+        fprint(
+            "Sweep {}: {} trials in {} featurization groups".format(
+                self.sweep_name, len(trials), len(group_order)
+            )
+        )
+
+        feature_store.enable()
+        try:
+            devices = self._worker_devices()
+            if devices is None:
+                self._run_sequential(trials)
+            else:
+                self._run_parallel(trials, devices)
+        finally:
+            feature_store.disable()
+        return self.results
+
+    def _run_sequential(self, trials):
+        last_group = None
+        for trial in trials:
+            if trial["group"] != last_group:
+                feature_store.clear()
+                last_group = trial["group"]
+            self._record(self._run_trial(trial, self.pruner))
+
+    def _run_parallel(self, trials, devices):
+        fprint("Run the sweep in {} workers on {}".format(len(devices), devices))
+        num_threads = max(1, (os.cpu_count() or 1) // len(devices))
+        ctx = multiprocessing.get_context("fork")
+        request_queue = ctx.Queue()
+        inboxes = [ctx.Queue() for _ in devices]
+        workers = [
+            ctx.Process(
+                target=_sweep_worker,
+                args=(self, wid, device, num_threads, inboxes[wid], request_queue),
+                # not daemonic, so the trials may fork their own workers (e.g., async evaluation)
+                daemon=False,
+            )
+            for wid, device in enumerate(devices)
+        ]
+        for worker in workers:
+            worker.start()
+
+        pending = list(trials)
+        last_group = [None] * len(workers)
+        running = {}
+        try:
+            for wid in range(len(workers)):
+                self._dispatch(wid, pending, last_group, running, inboxes)
+            while running:
+                try:
+                    message = request_queue.get(timeout=10)
+                except queue.Empty:
+                    for wid in running:
+                        if not workers[wid].is_alive():
+                            raise RuntimeError(
+                                "Sweep worker {} died while running trial {}".format(
+                                    wid, running[wid]["trial_id"]
+                                )
+                            )
+                    continue
+                if message[0] == "report":
+                    _, wid, trial_id, report_index, value = message
+                    inboxes[wid].put(bool(self.pruner(trial_id, report_index, value)))
+                else:
+                    _, wid, result = message
+                    running.pop(wid)
+                    self._record(result)
+                    self._dispatch(wid, pending, last_group, running, inboxes)
+        finally:
+            for inbox in inboxes:
+                inbox.put(None)
+            for worker in workers:
+                worker.join(timeout=10)
+                if worker.is_alive():
+                    worker.terminate()
+
+    @staticmethod
+    def _dispatch(wid, pending, last_group, running, inboxes):
+        """
+        Give the worker the next trial of its last group, or the first trial of a group no other worker is running.
+        """
+        if not pending:
+            return
+        running_groups = {t["group"] for t in running.values()}
+        candidates = (
+            [t for t in pending if t["group"] == last_group[wid]]
+            or [t for t in pending if t["group"] not in running_groups]
+            or pending
+        )
+        trial = candidates[0]
+        pending.remove(trial)
+        last_group[wid] = trial["group"]
+        running[wid] = trial
+        inboxes[wid].put(trial)
+
+    def _run_trial(self, trial, should_prune):
+        """
+        Train the trial in this process.
+
+        :param trial: the trial
+        :param should_prune: a function(trial_id, report_index, value) -> bool, or None
+        :return: the trial result
+        """
+        config = copy.deepcopy(self.config)
+        trainer_kwargs = dict(self.trainer_kwargs)
+        for key, value in trial["params"].items():
+            if key in _TRAINER_ARGS:
+                trainer_kwargs[key] = value
+            else:
+                config[key] = value
+
+        reporter = trial_pruner.TrialReporter(
+            trial["trial_id"],
+            self.pruner.metric if self.pruner else None,
+            should_prune,
+        )
+        trial_pruner.set_reporter(reporter)
+        result = {
+            "trial_id": trial["trial_id"],
+            "group": trial["group"],
+            "params": {k: _jsonable(v) for k, v in trial["params"].items()},
+            "status": "completed",
+            "metrics": {},
+            "checkpoint": None,
+            "error": None,
+        }
+        start = time.time()
+        try:
+            trainer = self.trainer_class(config=config, **trainer_kwargs)
+            result["metrics"] = _trial_metrics(trainer)
+            if isinstance(trainer.inference_model, str):
+                result["checkpoint"] = trainer.inference_model
+            del trainer
+        except trial_pruner.TrialPruned as e:
+            result["status"] = "pruned"
+            result["error"] = str(e)
+        except Exception:
+            result["status"] = "failed"
+            result["error"] = traceback.format_exc()
+        finally:
+            trial_pruner.set_reporter(None)
+            # the trainer removes the handlers of its logger unless the trial is stopped
+            logger = config.get("logger", None)
+            while logger is not None and logger.handlers:
+                logger.removeHandler(logger.handlers[0])
+        result["duration"] = time.time() - start
+        result["reports"] = reporter.reports
+        # the best value of each reported metric, e.g., to rank the pruned trials
+        for name, _, value in reporter.reports:
+            key = "best_reported_{}".format(name)
+            better = min if name == "loss" else max
+            result["metrics"][key] = better(result["metrics"].get(key, value), value)
+        return result
+
+    def _record(self, result):
+        self.results.add(self.sweep_name, result)
+        fprint(
+            "Trial {} {} in {:.1f}s: {}".format(
+                result["trial_id"],
+                result["status"],
+                result["duration"],
+                result["metrics"] or result["error"],
+            )
+        )
+
+    def _worker_devices(self):
+        """
+        :return: one device per worker, or None if the trials run in this process
+        """
+        if (
+            self.num_workers <= 1
+            or "fork" not in multiprocessing.get_all_start_methods()
+        ):
+            return None
+        if self.devices:
+            return [
+                self.devices[i % len(self.devices)] for i in range(self.num_workers)
+            ]
+        if not torch.cuda.is_available():
+            return [DeviceTypeOption.CPU] * self.num_workers
+        if torch.cuda.is_initialized():
+            fprint(
+                "CUDA has been initialized in the main process, the trials run sequentially"
+            )
+            return None
+        return [
+            "cuda:{}".format(i % torch.cuda.device_count())
+            for i in range(self.num_workers)
+        ]
+
+
+def _sweep_worker(scheduler, wid, device, num_threads, inbox, request_queue):
+    """
+    The loop of a sweep worker process, it runs the trials sent to its inbox until it receives None.
+    """
+    torch.set_num_threads(num_threads)
+    scheduler.trainer_kwargs["auto_device"] = device
+
+    def should_prune(trial_id, report_index, value):
+        # the pruner lives in the sweep process, which sees the reports of all the workers
+        request_queue.put(("report", wid, trial_id, report_index, value))
+        return inbox.get()
+
+    last_group = None
+    while True:
+        trial = inbox.get()
+        if trial is None:
+            break
+        if trial["group"] != last_group:
+            feature_store.clear()
+            last_group = trial["group"]
+        result = scheduler._run_trial(trial, should_prune if scheduler.pruner else None)
+        request_queue.put(("done", wid, result))
+
+
+def _trial_metrics(trainer):
+    """
+    :return: the max test metrics of the trial, averaged over the seeds if several seeds are trained
+    """
+    seed_results = getattr(trainer, "seed_results", None) or []
+    metrics = {}
+    if seed_results:
+        for key in seed_results[0]["metrics"]:
+            values = [r["metrics"][key] for r in seed_results if key in r["metrics"]]
+            if values and all(isinstance(v, (int, float)) for v in values):
+                metrics[key] = float(numpy.mean(values))
+    else:
+        for key, value in (trainer.config.get("max_test_metrics", None) or {}).items():
+            if isinstance(value, (int, float)):
+                metrics[key] = float(value)
+    loss = trainer.config.get("loss", None)
+    if isinstance(loss, (int, float)):
+        metrics["loss"] = float(loss)
+    return metrics
+
+
+def _group_key(params):
+    """
+    :return: the key of the featurization group of a trial, i.e., its params which affect the featurized datasets
+    """
+    return json.dumps(
+        sorted(
+            (k, _jsonable(v))
+            for k, v in params.items()
+            if k == "dataset"
+            or (k not in _TRAINER_ARGS and feature_store.is_featurization_arg(k))
+        )
+    )
+
+
+def _jsonable(value):
+    if isinstance(value, type):
+        return value.__name__
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    return str(value)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# file: sweep_results.py
+# time: 19/10/2026 23:05
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+import contextlib
+import json
+import sqlite3
+import time
+
+import pandas as pd
+
+
+class SweepResults:
+    """
+    The results of the sweeps, in one SQLite database which can be queried with SQL or loaded as a DataFrame.
+
+    Two tables are stored:
+        trials(sweep, trial_id, group_key, status, params, metrics, checkpoint, duration, error, finished):
+            one row per trial, "params" and "metrics" are JSON objects (use json_extract() in SQL queries),
+            "status" is "completed", "pruned" or "failed".
+        reports(sweep, trial_id, name, report_index, value): the intermediate metrics reported at log_step boundaries.
+    """
+
+    def __init__(self, path="sweep_results.db"):
+        """
+        :param path: the database file, results of several sweeps can be stored in the same file
+        """
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS trials ("
+                "sweep TEXT, trial_id INTEGER, group_key TEXT, status TEXT, params TEXT, metrics TEXT, "
+                "checkpoint TEXT, duration REAL, error TEXT, finished REAL, PRIMARY KEY (sweep, trial_id))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reports ("
+                "sweep TEXT, trial_id INTEGER, name TEXT, report_index INTEGER, value REAL)"
+            )
+
+    def add(self, sweep, result):
+        """
+        :param sweep: the sweep name
+        :param result: a trial result returned by SweepScheduler
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    sweep,
+                    result["trial_id"],
+                    result["group"],
+                    result["status"],
+                    json.dumps(result["params"]),
+                    json.dumps(result["metrics"]),
+                    result["checkpoint"],
+                    result["duration"],
+                    result["error"],
+                    time.time(),
+                ),
+            )
+            conn.execute(
+                "DELETE FROM reports WHERE sweep = ? AND trial_id = ?",
+                (sweep, result["trial_id"]),
+            )
+            conn.executemany(
+                "INSERT INTO reports VALUES (?, ?, ?, ?, ?)",
+                [
+                    (sweep, result["trial_id"], name, index, value)
+                    for name, index, value in result["reports"]
+                ],
+            )
+
+    def query(self, sql, parameters=()):
+        """
+        :param sql: a SQL query over the "trials" and "reports" tables
+        :param parameters: the parameters of the query
+        :return: a list of dicts, one per row
+        """
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute(sql, parameters)]
+
+    def to_dataframe(self, sweep=None):
+        """
+        :param sweep: only return the trials of this sweep
+        :return: a DataFrame of the trials, with one column per param ("param.<name>") and per metric
+        """
+        rows = self.query(
+            "SELECT * FROM trials"
+            + (" WHERE sweep = ?" if sweep else "")
+            + " ORDER BY sweep, trial_id",
+            (sweep,) if sweep else (),
+        )
+        records = []
+        for row in rows:
+            record = {k: v for k, v in row.items() if k not in ("params", "metrics")}
+            record.update(
+                {"param.{}".format(k): v for k, v in json.loads(row["params"]).items()}
+            )
+            record.update(json.loads(row["metrics"]))
+            records.append(record)
+        return pd.DataFrame(records)
+
+    def best(self, metric, mode="max", sweep=None):
+        """
+        :param metric: a metric of the completed trials, e.g., "max_apc_test_acc"
+        :param mode: "max" or "min"
+        :param sweep: only consider the trials of this sweep
+        :return: the row of the best completed trial, or None
+        """
+        rows = self.query(
+            "SELECT * FROM trials WHERE status = 'completed'"
+            + " AND json_extract(metrics, ?) IS NOT NULL"
+            + (" AND sweep = ?" if sweep else "")
+            + " ORDER BY json_extract(metrics, ?) "
+            + ("DESC" if mode == "max" else "ASC")
+            + " LIMIT 1",
+            ("$." + metric,) + ((sweep,) if sweep else ()) + ("$." + metric,),
+        )
+        return rows[0] if rows else None
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# file: trial_pruner.py
+# time: 19/10/2026 23:05
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+Early termination of the bad trials of a sweep.
+
+The training loops report their metrics at log_step boundaries with report(): the smoothed training loss is reported
+as "loss" by TrainingMetrics, and the full evaluation results as "eval" (e.g., the accuracy, or the F1 of ASTE and
+the R2 of RNAR) by the training loops of every task. Outside a sweep, report() does nothing. In a sweep, every report of the metric watched by the
+pruner is judged against the other trials, and TrialPruned is raised in the training loop if the trial should stop.
+"""
+
+import statistics
+from collections import defaultdict
+
+_reporter = None
+
+
+class TrialPruned(Exception):
+    """
+    Raised in the training loop of a trial stopped by the pruner of the sweep.
+    """
+
+
+def report(name, value):
+    """
+    Report an intermediate metric of the running trial, if any.
+
+    :param name: the metric name, e.g., "loss" or "eval"
+    :param value: the metric value
+    """
+    if _reporter is not None:
+        _reporter(name, value)
+
+
+def set_reporter(reporter):
+    """
+    :param reporter: a TrialReporter receiving the reports of this process, or None
+    """
+    global _reporter
+    _reporter = reporter
+
+
+class TrialReporter:
+    """
+    Collect the reports of a trial and ask the pruner whether to stop it at every report of the watched metric.
+    """
+
+    def __init__(self, trial_id, metric=None, should_prune=None):
+        """
+        :param trial_id: the id of the trial
+        :param metric: the name of the metric watched by the pruner
+        :param should_prune: a function(trial_id, report_index, value) -> bool, e.g., the pruner itself, or a proxy
+            asking the pruner in the sweep process
+        """
+        self.trial_id = trial_id
+        self.metric = metric
+        self.should_prune = should_prune
+        self.reports = []  # (name, index, value)
+        self._counts = defaultdict(int)
+
+    def __call__(self, name, value):
+        value = float(value)
+        self._counts[name] += 1
+        self.reports.append((name, self._counts[name], value))
+        if (
+            self.should_prune is not None
+            and name == self.metric
+            and self.should_prune(self.trial_id, self._counts[name], value)
+        ):
+            raise TrialPruned(
+                "Trial {} pruned at report {} of {}={}".format(
+                    self.trial_id, self._counts[name], name, value
+                )
+            )
+
+
+class MedianPruner:
+    """
+    Stop a trial if its best value so far is worse than the median of the other trials at the same report.
+    """
+
+    def __init__(self, metric="eval", mode="max", warmup_reports=2, min_trials=3):
+        """
+        :param metric: the reported metric to watch, "eval" or "loss"
+        :param mode: "max" or "min"
+        :param warmup_reports: never stop a trial before this number of reports
+        :param min_trials: never stop a trial before this number of other trials have reached the same report
+        """
+        self.metric = metric
+        self.mode = mode
+        self.warmup_reports = warmup_reports
+        self.min_trials = min_trials
+        self._best = defaultdict(dict)  # report index -> trial id -> best value so far
+
+    def __call__(self, trial_id, report_index, value):
+        best = self._best_so_far(trial_id, report_index, value)
+        if report_index <= self.warmup_reports:
+            return False
+        others = [v for t, v in self._best[report_index].items() if t != trial_id]
+        if len(others) < self.min_trials:
+            return False
+        median = statistics.median(others)
+        return best < median if self.mode == "max" else best > median
+
+    def _best_so_far(self, trial_id, report_index, value):
+        previous = self._best[report_index - 1].get(trial_id, value)
+        best = max(previous, value) if self.mode == "max" else min(previous, value)
+        self._best[report_index][trial_id] = best
+        return best
+
+
+class ASHAPruner:
+    """
+    Asynchronous successive halving: the rungs are at min_resource * reduction_factor ** k reports, a trial reaching
+    a rung continues only if its value is in the top 1 / reduction_factor of the values recorded at that rung so far.
+    The trials are never waited for, so the workers are always busy.
+    """
+
+    def __init__(self, metric="eval", mode="max", min_resource=1, reduction_factor=3):
+        """
+        :param metric: the reported metric to watch, "eval" or "loss"
+        :param mode: "max" or "min"
+        :param min_resource: the number of reports of the first rung
+        :param reduction_factor: the ratio of trials stopped at each rung
+        """
+        self.metric = metric
+        self.mode = mode
+        self.min_resource = max(1, min_resource)
+        self.reduction_factor = max(2, reduction_factor)
+        self._rungs = defaultdict(dict)  # rung report index -> trial id -> value
+
+    def __call__(self, trial_id, report_index, value):
+        if not self._is_rung(report_index):
+            return False
+        rung = self._rungs[report_index]
+        rung[trial_id] = value
+        num_promoted = len(rung) // self.reduction_factor
+        if num_promoted < 1:
+            return False
+        ranked = sorted(rung.values(), reverse=self.mode == "max")
+        threshold = ranked[num_promoted - 1]
+        return value < threshold if self.mode == "max" else value > threshold
+
+    def _is_rung(self, report_index):
+        resource = self.min_resource
+        while resource < report_index:
+            resource *= self.reduction_factor
+        return resource == report_index
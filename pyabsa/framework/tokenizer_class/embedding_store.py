@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+# file: embedding_store.py
+# time: 20/10/2026 03:30
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+The binary store of a text embedding file (e.g., glove.840B.300d.txt or a word2vec text file), used by
+build_embedding_matrix() in place of parsing the text file for every dataset.
+
+The text file is converted once, streaming, into a directory next to it (<embedding file>.store):
+
+- vectors.npy: the vectors in float32 (or float16), opened with mmap;
+- words.bin and offsets.npy: the UTF-8 words and their offsets;
+- hashes.npy and rows.npy: the sorted 64-bit hashes of the words and their rows, the vocabulary index.
+
+The rows of the words of a dataset are looked up with a binary search of their hashes, and the embedding matrix is
+gathered from the memory-mapped vectors, so only the vectors of the dataset are read. The store is converted again
+if the text file changes.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import tqdm
+
+STORE_VERSION = 1
+_CHUNK_SIZE = 64 * 1024 * 1024
+_BATCH_SIZE = 4096
+
+
+def open_embedding_store(path, embed_dim, dtype="float32", store_dir=None):
+    """
+    :param path: the text embedding file, one word and its vector per line
+    :param embed_dim: the dimension of the vectors
+    :param dtype: the dtype of the stored vectors, "float32" or "float16"
+    :param store_dir: the store directory, default to <path>.store
+    :return: the EmbeddingStore, converted from the text file if it is missing or outdated
+    """
+    store_dir = store_dir or path + ".store"
+    store = EmbeddingStore(store_dir)
+    if not store.is_valid(path, embed_dim, dtype):
+        convert_embedding_file(path, store_dir, embed_dim, dtype)
+        store = EmbeddingStore(store_dir)
+    return store
+
+
+def convert_embedding_file(path, store_dir, embed_dim, dtype="float32"):
+    """
+    Convert a text embedding file to a store, streaming: the peak memory is a line and the vocabulary index.
+
+    :param path: the text embedding file
+    :param store_dir: the store directory
+    :param embed_dim: the dimension of the vectors
+    :param dtype: the dtype of the stored vectors, "float32" or "float16"
+    :return: the number of vectors
+    """
+    tmp_dir = "{}.{}.tmp".format(store_dir.rstrip("/\\"), os.getpid())
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    num_lines = _count_lines(path)
+    vectors = np.lib.format.open_memmap(
+        os.path.join(tmp_dir, "vectors.npy"),
+        mode="w+",
+        dtype=dtype,
+        shape=(max(1, num_lines), embed_dim),
+    )
+    offsets = [0]
+    hashes = []
+    count = 0
+    with open(path, "rb") as fin, open(
+        os.path.join(tmp_dir, "words.bin"), "wb"
+    ) as fwords:
+        words, values = [], []
+        for line in tqdm.tqdm(fin, total=num_lines, desc="Converting embedding file"):
+            tokens = line.rstrip().rsplit(None, embed_dim)
+            # the header line of the word2vec files and the malformed lines
+            if len(tokens) <= embed_dim:
+                continue
+            words.append(tokens[0])
+            values.append(b" ".join(tokens[1:]))
+            if len(words) == _BATCH_SIZE:
+                count = _write_batch(
+                    vectors, count, words, values, fwords, offsets, hashes
+                )
+                words, values = [], []
+        count = _write_batch(vectors, count, words, values, fwords, offsets, hashes)
+    vectors.flush()
+    del vectors
+
+    hashes = np.array(hashes, dtype=np.uint64)
+    # stable, so the duplicated words keep the order of the file, the last one is used as in a dict
+    rows = np.argsort(hashes, kind="stable")
+    np.save(os.path.join(tmp_dir, "hashes.npy"), hashes[rows])
+    np.save(os.path.join(tmp_dir, "rows.npy"), rows.astype(np.int64))
+    np.save(os.path.join(tmp_dir, "offsets.npy"), np.array(offsets, dtype=np.int64))
+    stat = os.stat(path)
+    with open(os.path.join(tmp_dir, "meta.json"), mode="w", encoding="utf8") as f:
+        json.dump(
+            {
+                "version": STORE_VERSION,
+                "source": os.path.abspath(path),
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "embed_dim": embed_dim,
+                "dtype": str(np.dtype(dtype)),
+                "count": count,
+            },
+            f,
+        )
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(tmp_dir, store_dir)
+    return count
+
+
+class EmbeddingStore:
+    def __init__(self, store_dir):
+        """
+        :param store_dir: the store directory, the arrays are opened on first use
+        """
+        self.store_dir = store_dir
+        try:
+            with open(
+                os.path.join(store_dir, "meta.json"), mode="r", encoding="utf8"
+            ) as f:
+                self.meta = json.load(f)
+        except (OSError, ValueError):
+            self.meta = {}
+        self._arrays = {}
+
+    def is_valid(self, path, embed_dim, dtype="float32"):
+        """
+        :return: True if the store is converted from the current text file, with the dimension and dtype
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        return (
+            self.meta.get("version") == STORE_VERSION
+            and self.meta.get("size") == stat.st_size
+            and self.meta.get("mtime") == stat.st_mtime
+            and self.meta.get("embed_dim") == embed_dim
+            and self.meta.get("dtype") == str(np.dtype(dtype))
+        )
+
+    def __len__(self):
+        return self.meta.get("count", 0)
+
+    def lookup(self, words):
+        """
+        :param words: the words
+        :return: the rows of the words in the vectors, -1 for the missing words
+        """
+        hashes = self._array("hashes")
+        rows = self._array("rows")
+        offsets = self._array("offsets")
+        data = self._array("words", raw=True)
+
+        encoded = [str(word).encode("utf-8") for word in words]
+        queries = np.fromiter(
+            (_hash(w) for w in encoded), dtype=np.uint64, count=len(encoded)
+        )
+        lows = np.searchsorted(hashes, queries, side="left")
+        highs = np.searchsorted(hashes, queries, side="right")
+
+        found = np.full(len(encoded), -1, dtype=np.int64)
+        for i in np.nonzero(highs > lows)[0]:
+            # the last duplicate first, and the hash collisions are told apart by the words
+            for j in range(highs[i] - 1, lows[i] - 1, -1):
+                row = rows[j]
+                if bytes(data[offsets[row] : offsets[row + 1]]) == encoded[i]:
+                    found[i] = row
+                    break
+        return found
+
+    def vectors(self):
+        """
+        :return: the memory-mapped vectors
+        """
+        return self._array("vectors")[: len(self)]
+
+    def build_matrix(self, word2idx, embed_dim=None):
+        """
+        Gather the embedding matrix of a vocabulary, the missing words and the index 0 are zeros.
+
+        :param word2idx: the vocabulary of a tokenizer, the indices start from 1
+        :param embed_dim: the dimension of the vectors, default to the store's
+        :return: a float32 matrix of shape (len(word2idx) + 1, embed_dim)
+        """
+        embed_dim = embed_dim or self.meta["embed_dim"]
+        matrix = np.zeros((len(word2idx) + 1, embed_dim), dtype=np.float32)
+        if not word2idx:
+            return matrix
+        words = list(word2idx.keys())
+        indices = np.fromiter(word2idx.values(), dtype=np.int64, count=len(words))
+        rows = self.lookup(words)
+        hit = rows >= 0
+        # in the file order, so the mmap is read forward
+        order = np.argsort(rows[hit])
+        matrix[indices[hit][order]] = self.vectors()[rows[hit][order]]
+        return matrix
+
+    def _array(self, name, raw=False):
+        if name not in self._arrays:
+            if raw:
+                path = os.path.join(self.store_dir, name + ".bin")
+                self._arrays[name] = (
+                    np.memmap(path, dtype=np.uint8, mode="r")
+                    if os.path.getsize(path)
+                    else np.zeros(0, dtype=np.uint8)
+                )
+            else:
+                self._arrays[name] = np.load(
+                    os.path.join(self.store_dir, name + ".npy"), mmap_mode="r"
+                )
+        return self._arrays[name]
+
+
+def _write_batch(vectors, count, words, values, fwords, offsets, hashes):
+    # the vectors of a batch of lines are parsed at once, and line by line if any of them is malformed
+    if not words:
+        return count
+    embed_dim = vectors.shape[1]
+    batch = np.fromstring(
+        b" ".join(values).decode("ascii", "ignore"), dtype=np.float32, sep=" "
+    )
+    if batch.size == len(words) * embed_dim:
+        batch = batch.reshape(len(words), embed_dim)
+    else:
+        batch = [
+            np.fromstring(value.decode("ascii", "ignore"), dtype=np.float32, sep=" ")
+            for value in values
+        ]
+    for word, vector in zip(words, batch):
+        if vector.size != embed_dim:
+            continue
+        vectors[count] = vector
+        fwords.write(word)
+        offsets.append(offsets[-1] + len(word))
+        hashes.append(_hash(word))
+        count += 1
+    return count
+
+
+def _hash(word):
+    return int.from_bytes(hashlib.blake2b(word, digest_size=8).digest(), "little")
+
+
+def _count_lines(path):
+    count = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            count += chunk.count(b"\n")
+            last = chunk[-1:]
+    return count + (last != b"\n")
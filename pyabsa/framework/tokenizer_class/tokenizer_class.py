@@ -7,8 +7,10 @@
 # ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
 # Copyright (C) 2022. All Rights Reserved.
 
+import itertools
 import os
 import pickle
+from collections import Counter
 from typing import Union, List
 
 import numpy as np
@@ -17,6 +19,7 @@ from numpy import ndarray
 from termcolor import colored
 from transformers import AutoTokenizer
 
+from pyabsa.framework.tokenizer_class.embedding_store import open_embedding_store
 from pyabsa.utils.file_utils.file_utils import prepare_glove840_embedding
 from pyabsa.utils.pyabsa_utils import fprint
 
@@ -48,7 +51,10 @@ class Tokenizer(object):
             config.logger.info("Loading tokenizer on {}".format(tokenizer_path))
             tokenizer = pickle.load(open(tokenizer_path, "rb"))
         else:
-            words = set()
+            # the word frequencies, counted line by line
+            counter = Counter()
+            lower = config.get("do_lower_case", False)
+            tokenize = pre_tokenizer.tokenize if pre_tokenizer else str.split
             if hasattr(config, "dataset_file"):
                 config.logger.info(
                     "Building tokenizer for {} on {}".format(
@@ -57,18 +63,14 @@ class Tokenizer(object):
                 )
                 for dataset_type in config.dataset_file:
                     for file in config.dataset_file[dataset_type]:
-                        # Open the file and tokenize each line
-                        fin = open(
+                        with open(
                             file, "r", encoding="utf-8", newline="\n", errors="ignore"
-                        )
-                        lines = fin.readlines()
-                        fin.close()
-                        for i in range(0, len(lines)):
-                            # Tokenize the line using the pre tokenizer or split by spaces
-                            if pre_tokenizer:
-                                words.update(pre_tokenizer.tokenize(lines[i].strip()))
-                            else:
-                                words.update(lines[i].strip().split())
+                        ) as fin:
+                            for line in fin:
+                                line = line.strip()
+                                counter.update(
+                                    tokenize(line.lower() if lower else line)
+                                )
             elif hasattr(config, "dataset_dict"):
                 config.logger.info(
                     "Building tokenizer for {} on {}".format(
@@ -77,20 +79,37 @@ class Tokenizer(object):
                 )
                 for dataset_type in ["train", "test", "valid"]:
                     for i, data in enumerate(config.dataset_dict[dataset_type]):
-                        # Tokenize each sample in the data
-                        if pre_tokenizer:
-                            words.update(pre_tokenizer.tokenize(data["data"]))
-                        else:
-                            words.update(data["data"].split())
+                        text = data["data"]
+                        counter.update(tokenize(text.lower() if lower else text))
             tokenizer = Tokenizer(config)
             tokenizer.pre_tokenizer = pre_tokenizer
-            tokenizer.fit_on_text(list(words))
+            tokenizer.fit_on_counter(
+                counter,
+                min_freq=config.get("vocab_min_freq", 1),
+                max_size=config.get("vocab_max_size", None),
+            )
             # Cache the tokenizer if required
             if config.cache_dataset:
                 pickle.dump(tokenizer, open(tokenizer_path, "wb"))
 
         return tokenizer
 
+    def fit_on_counter(self, counter, min_freq=1, max_size=None):
+        """
+        Add the words of a Counter to the vocabulary, the most frequent first.
+
+        :param counter: the word frequencies
+        :param min_freq: the minimum frequency of the words
+        :param max_size: the maximum number of words in the vocabulary
+        """
+        words = sorted(
+            (w for w, freq in counter.items() if freq >= min_freq),
+            key=lambda w: (-counter[w], w),
+        )
+        if max_size is not None:
+            words = words[:max_size]
+        self.fit_on_text(words)
+
     def fit_on_text(self, text: Union[str, List[str]], **kwargs):
         # Tokenize the given text and fit it to the tokenizer
         if isinstance(text, str):
@@ -130,30 +149,59 @@ class Tokenizer(object):
             Sequence of token IDs or list of sequences of token IDs, depending on whether the input text is a string or a list of strings.
         """
         if isinstance(text, str):
-            if self.config.do_lower_case:
-                text = text.lower()
-            if self.pre_tokenizer:
-                words = self.pre_tokenizer.tokenize(text)
-            else:
-                words = text.split()
-            sequence = [self.word2idx[w] if w in self.word2idx else 0 for w in words]
-            if len(sequence) == 0:
-                sequence = [0]
-            if kwargs.get("reverse", False):
-                sequence = sequence[::-1]
+            sequence = self._encode(text, kwargs.get("reverse", False))
             if padding == "max_length":
                 return pad_and_truncate(sequence, self.max_seq_len, self.pad_token_id)
             else:
                 return sequence
 
         elif isinstance(text, list):
-            sequences = []
-            for t in text:
-                sequences.append(self.text_to_sequence(t, **kwargs))
-            return sequences
+            if padding == "max_length":
+                return self.encode_batch(text, **kwargs).tolist()
+            return [self._encode(t, kwargs.get("reverse", False)) for t in text]
         else:
             raise ValueError("text_to_sequence only support str or list of str")
 
+    def encode_batch(
+        self,
+        texts: List[str],
+        max_seq_len=None,
+        padding="max_length",
+        reverse=False,
+        dtype=np.int32,
+        **kwargs
+    ):
+        """
+        Convert a list of texts to one array of token IDs, padded and truncated on the right.
+
+        :param texts: the texts
+        :param max_seq_len: the length of the sequences, default to config.max_seq_len
+        :param padding: "max_length" to pad to max_seq_len, otherwise to the longest sequence (up to max_seq_len)
+        :param reverse: reverse the sequences before padding
+        :param dtype: the dtype of the array
+        :return: an array of shape (len(texts), max_seq_len)
+        """
+        max_seq_len = max_seq_len or self.max_seq_len
+        sequences = [self._encode(text, reverse) for text in texts]
+        if padding != "max_length":
+            longest = max(map(len, sequences), default=0)
+            max_seq_len = min(max_seq_len, longest)
+        ids, _, _ = pad_batch(
+            sequences, max_seq_len, value=self.pad_token_id, dtype=dtype
+        )
+        return ids
+
+    def _encode(self, text, reverse=False):
+        # the token IDs of a text, 0 for the unknown words
+        if self.config.do_lower_case:
+            text = text.lower()
+        words = (
+            self.pre_tokenizer.tokenize(text) if self.pre_tokenizer else text.split()
+        )
+        get = self.word2idx.get
+        sequence = [get(w, 0) for w in words] or [0]
+        return sequence[::-1] if reverse else sequence
+
     def sequence_to_text(self, sequence):
         """
         Convert a sequence of token IDs to text.
@@ -170,27 +218,50 @@ class Tokenizer(object):
         # Join the words to form a sentence
         return " ".join(words)
 
+    def __getstate__(self):
+        # the vocabulary is pickled as one UTF-8 string of the words in the order of their IDs, not as two dicts
+        state = dict(self.__dict__)
+        words = [self.idx2word.get(i) for i in range(1, self.idx)]
+        if len(words) == len(self.word2idx) and not any(
+            w is None or "\n" in w for w in words
+        ):
+            del state["word2idx"], state["idx2word"]
+            state["vocab"] = "\n".join(words).encode("utf-8")
+        return state
+
+    def __setstate__(self, state):
+        # the tokenizers pickled by the former versions have the dicts
+        vocab = state.pop("vocab", None)
+        self.__dict__.update(state)
+        if vocab is not None:
+            words = vocab.decode("utf-8").split("\n") if vocab else []
+            self.word2idx = {w: i for i, w in enumerate(words, 1)}
+            self.idx2word = {i: w for i, w in enumerate(words, 1)}
+
 
 class PretrainedTokenizer:
-    def __init__(self, config, **kwargs):
+
+    def __init__(self, config, tokenizer_path=None, **kwargs):
         """
         Constructor for PretrainedTokenizer class
             Args:
             - config: A configuration object that includes parameters for the tokenizer
+            - tokenizer_path: A local tokenizer directory to load instead of config.pretrained_bert
             - **kwargs: Other keyword arguments to be passed to the AutoTokenizer class
 
             Returns:
             - None
         """
         self.config = config
+        tokenizer_path = tokenizer_path if tokenizer_path else config.pretrained_bert
         try:
             self.tokenizer = AutoTokenizer.from_pretrained(
-                config.pretrained_bert, trust_remote_code=True, **kwargs
+                tokenizer_path, trust_remote_code=True, **kwargs
             )
         except:
             # try to load use_fast=False
             self.tokenizer = AutoTokenizer.from_pretrained(
-                config.pretrained_bert, use_fast=False, trust_remote_code=True, **kwargs
+                tokenizer_path, use_fast=False, trust_remote_code=True, **kwargs
             )
         self.max_seq_len = self.config.max_seq_len
         self.pad_token_id = self.tokenizer.pad_token_id
@@ -363,29 +434,28 @@ def build_embedding_matrix(config, tokenizer, cache_path=None):
                 "green",
             )
         )
-        embedding_matrix = pickle.load(open(embed_matrix_path, "rb"))
+        try:
+            embedding_matrix = np.load(embed_matrix_path)
+        except ValueError:
+            # pickled by the former versions
+            embedding_matrix = pickle.load(open(embed_matrix_path, "rb"))
     else:
         glove_path = prepare_glove840_embedding(
             embed_matrix_path, config.embed_dim, config=config
         )
-        embedding_matrix = np.zeros(
-            (len(tokenizer.word2idx) + 1, config.embed_dim)
-        )  # idx 0 and len(word2idx)+1 are all-zeros
-
-        word_vec = _load_word_vec(
-            glove_path, word2idx=tokenizer.word2idx, embed_dim=config.embed_dim
+        # converted once to a binary store, the vectors of the vocabulary are gathered from its mmap
+        store = open_embedding_store(
+            glove_path,
+            config.embed_dim,
+            dtype=config.get("embedding_store_dtype", "float32"),
+            store_dir=config.get("embedding_store_dir", None),
         )
-
-        for word, i in tqdm.tqdm(
-            tokenizer.word2idx.items(),
-            desc=colored("Building embedding_matrix {}".format(cache_path), "yellow"),
-        ):
-            vec = word_vec.get(word)
-            if vec is not None:
-                # words not found in embedding index will be all-zeros.
-                embedding_matrix[i] = vec
+        fprint(colored("Building embedding_matrix {}".format(cache_path), "yellow"))
+        # idx 0 and the words not found in the embedding file are all-zeros
+        embedding_matrix = store.build_matrix(tokenizer.word2idx, config.embed_dim)
         if config.cache_dataset:
-            pickle.dump(embedding_matrix, open(embed_matrix_path, "wb"))
+            with open(embed_matrix_path, "wb") as f:
+                np.save(f, embedding_matrix)
     return embedding_matrix
 
 
@@ -403,34 +473,84 @@ def pad_and_truncate(sequence, max_seq_len, value, **kwargs):
         np.ndarray or list: The padded or truncated sequence, as a list or numpy array, depending on the type of the input sequence.
     """
     padding = kwargs.pop("padding", "right")
+    if isinstance(sequence, ndarray):
+        # padded and truncated as an array
+        padded = np.full(
+            (max_seq_len,) + sequence.shape[1:],
+            value,
+            dtype=np.result_type(sequence, value),
+        )
+        length = min(len(sequence), max_seq_len)
+        if padding == "right":
+            padded[:length] = sequence[:length]
+        elif padding == "left":
+            padded[max_seq_len - length :] = sequence[len(sequence) - length :]
+        return padded
     if padding == "right":
-        if isinstance(sequence, ndarray):
-            sequence = list(sequence)
-            if len(sequence) > max_seq_len:
-                sequence = sequence[:max_seq_len]
-            else:
-                sequence = sequence + [value] * (max_seq_len - len(sequence))
-            return np.array(sequence)
+        if len(sequence) > max_seq_len:
+            sequence = sequence[:max_seq_len]
         else:
-            if len(sequence) > max_seq_len:
-                sequence = sequence[:max_seq_len]
-            else:
-                sequence = sequence + [value] * (max_seq_len - len(sequence))
-            return sequence
+            sequence = sequence + [value] * (max_seq_len - len(sequence))
+        return sequence
     elif padding == "left":
-        if isinstance(sequence, ndarray):
-            sequence = list(sequence)
-            if len(sequence) > max_seq_len:
-                sequence = sequence[-max_seq_len:]
-            else:
-                sequence = [value] * (max_seq_len - len(sequence)) + sequence
-            return np.array(sequence)
+        if len(sequence) > max_seq_len:
+            sequence = sequence[-max_seq_len:]
         else:
-            if len(sequence) > max_seq_len:
-                sequence = sequence[-max_seq_len:]
-            else:
-                sequence = [value] * (max_seq_len - len(sequence)) + sequence
-            return sequence
+            sequence = [value] * (max_seq_len - len(sequence)) + sequence
+        return sequence
+
+
+def pad_batch(
+    sequences,
+    max_seq_len=None,
+    value=0,
+    padding="right",
+    truncation="right",
+    dtype=np.int64,
+):
+    """
+    Pad and truncate a batch of variable-length sequences into one array, filled at once instead of per sequence.
+
+    :param sequences: the sequences of IDs, lists or 1-D arrays
+    :param max_seq_len: the length of the padded sequences, default to the longest sequence
+    :param value: the padding value
+    :param padding: "right" or "left", the side to pad
+    :param truncation: "right" or "left", the side to truncate
+    :param dtype: the dtype of the array
+    :return: the padded IDs of shape (len(sequences), max_seq_len), the lengths of the truncated sequences and the
+        boolean mask of their positions
+    """
+    if padding not in ("right", "left") or truncation not in ("right", "left"):
+        raise ValueError(
+            "Invalid padding or truncation: {}, {}".format(padding, truncation)
+        )
+    lengths = np.fromiter(map(len, sequences), dtype=np.int64, count=len(sequences))
+    if max_seq_len is None:
+        max_seq_len = int(lengths.max()) if len(lengths) else 0
+    if len(lengths) and lengths.max() > max_seq_len:
+        sequences = [
+            (
+                seq[:max_seq_len]
+                if truncation == "right"
+                else seq[max(0, len(seq) - max_seq_len) :]
+            )
+            for seq in sequences
+        ]
+        lengths = np.minimum(lengths, max_seq_len)
+
+    positions = np.arange(max_seq_len)
+    if padding == "right":
+        mask = positions < lengths[:, None]
+    else:
+        mask = positions >= (max_seq_len - lengths)[:, None]
+    ids = np.full((len(sequences), max_seq_len), value, dtype=dtype)
+    # the positions of the mask are filled row by row, i.e., in the order of the concatenated sequences
+    ids[mask] = np.fromiter(
+        itertools.chain.from_iterable(sequences),
+        dtype=dtype,
+        count=int(lengths.sum()),
+    )
+    return ids, lengths, mask
 
 
 def _load_word_vec(path, word2idx=None, embed_dim=300):
@@ -445,18 +565,12 @@ def _load_word_vec(path, word2idx=None, embed_dim=300):
     Returns:
         word_vec (dict): A dictionary containing word to vector mappings.
     """
-    fin = open(path, "r", encoding="utf-8", newline="\n", errors="ignore")
-    # Open the embedding file for reading
     word_vec = {}
-    # Initialize an empty dictionary to store word to vector mappings
-    for line in tqdm.tqdm(fin.readlines(), desc="Loading embedding file"):
-        # Iterate over each line of the file
-        tokens = line.rstrip().split()
-        # Split the line by space characters and strip the newline character
-        word, vec = " ".join(tokens[:-embed_dim]), tokens[-embed_dim:]
-        # Split the tokens into word and vector
-        if word in word2idx.keys():
-            # Check if the word is in the given word to index mappings
-            word_vec[word] = np.asarray(vec, dtype="float32")
-            # Add the word to vector mapping to the dictionary
+    # streamed, the file is not held in memory
+    with open(path, "r", encoding="utf-8", newline="\n", errors="ignore") as fin:
+        for line in tqdm.tqdm(fin, desc="Loading embedding file"):
+            tokens = line.rstrip().split()
+            word, vec = " ".join(tokens[:-embed_dim]), tokens[-embed_dim:]
+            if word2idx is None or word in word2idx:
+                word_vec[word] = np.asarray(vec, dtype="float32")
     return word_vec
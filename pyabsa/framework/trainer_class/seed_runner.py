@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+# file: seed_runner.py
+# time: 19/10/2026 21:35
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+import copy
+import multiprocessing
+import os
+import traceback
+
+import torch
+
+from pyabsa.framework.dataset_class import feature_store
+from pyabsa.framework.flag_class.flag_template import DeviceTypeOption
+from pyabsa.framework.instructor_class import distributed
+from pyabsa.framework.instructor_class.fork_workers import (
+    can_fork_workers,
+    wait_for_result,
+)
+from pyabsa.utils.pyabsa_utils import fprint
+
+
+class SeedRunner:
+    """
+    Train a model with each of the seeds and collect the per-seed metrics.
+
+    The datasets are featurized once and kept in the in-process feature store, so the instructors of the following
+    seeds reuse them instead of re-featurizing or re-reading the dataset cache.
+
+    If config.seed_workers > 1, the seeds are trained concurrently in forked processes, which share the featurized
+    datasets read-only. Each worker is bounded to its share of the CPU cores, or to one of config.seed_devices
+    (default: all the visible CUDA devices). This requires checkpoint saving, since the trained models are returned
+    as checkpoint paths.
+    """
+
+    def __init__(self, training_instructor, config):
+        """
+        :param training_instructor: the training instructor class of the task
+        :param config: the training config, config.seed is the list of seeds
+        """
+        self.training_instructor = training_instructor
+        self.config = config
+        self.num_workers = max(1, self.config.get("seed_workers", 1))
+
+    def run(self, seeds):
+        """
+        :param seeds: the list of seeds
+        :return: a list of dicts (seed, checkpoint, metrics) in seed order, checkpoint is what the instructor returns
+        """
+        feature_store.enable()
+        try:
+            devices = self._worker_devices(seeds)
+            if devices is None:
+                return [self._run_seed(seed) for seed in seeds]
+            return self._run_parallel(seeds, devices)
+        finally:
+            feature_store.disable()
+
+    def _run_seed(self, seed, config=None):
+        """
+        :param seed: the seed
+        :param config: the config of the training, defaults to the config of the runner
+        """
+        config = self.config if config is None else config
+        config.seed = seed
+        checkpoint = self.training_instructor(config).run()
+        return {
+            "seed": seed,
+            "checkpoint": checkpoint,
+            "metrics": dict(config.get("max_test_metrics", None) or {}),
+        }
+
+    def _run_parallel(self, seeds, devices):
+        # featurize once in this process, the forked workers inherit the feature store,
+        # the config of the caller is left unchanged and every worker trains with its own copy
+        config = copy.deepcopy(self.config)
+        config.seed = seeds[0]
+        config.device = DeviceTypeOption.CPU
+        instructor = self.training_instructor(config)
+        del instructor
+        config.device = self.config.device
+        config.overwrite_cache = False
+
+        self.config.logger.info(
+            "Train {} seeds in {} workers on {}".format(
+                len(seeds), len(devices), devices
+            )
+        )
+        num_threads = max(1, (os.cpu_count() or 1) // len(devices))
+        ctx = multiprocessing.get_context("fork")
+        result_queue = ctx.Queue()
+        pending = list(seeds)
+        running = {}
+        results = {}
+        while pending or running:
+            while pending and devices:
+                seed = pending.pop(0)
+                device = devices.pop(0)
+                worker = ctx.Process(
+                    target=_seed_worker,
+                    args=(self, config, seed, device, num_threads, result_queue),
+                    daemon=True,
+                )
+                worker.start()
+                running[seed] = (worker, device)
+            seed, result = wait_for_result(
+                result_queue, {s: w for s, (w, _) in running.items()}, "Seed"
+            )
+            worker, device = running.pop(seed)
+            worker.join()
+            devices.append(device)
+            if isinstance(result, str):
+                for worker, _ in running.values():
+                    worker.terminate()
+                raise RuntimeError(
+                    "Seed {} failed in worker process:\n{}".format(seed, result)
+                )
+            results[seed] = result
+            for key, value in result["metrics"].items():
+                if isinstance(value, (int, float)):
+                    self.config.MV.log_metric(
+                        self.config.model_name,
+                        "Seed{}-{}".format(seed, key),
+                        value * 100,
+                    )
+        return [results[seed] for seed in seeds]
+
+    def _worker_devices(self, seeds):
+        """
+        :return: one device per worker slot, or None if the seeds must run sequentially in this process
+        """
+        num_workers = min(self.num_workers, len(seeds))
+        if (
+            num_workers <= 1
+            or not self.config.get("checkpoint_save_mode", 0)
+            or "fork" not in multiprocessing.get_all_start_methods()
+            # the DDP ranks already share the devices
+            or distributed.is_distributed()
+        ):
+            return None
+        if not can_fork_workers():
+            fprint(
+                "Autograd or torch.compile() has been used in the main process, the seeds run sequentially"
+            )
+            return None
+        device = torch.device(self.config.device)
+        if device.type != DeviceTypeOption.CUDA:
+            return [DeviceTypeOption.CPU] * num_workers
+        if torch.cuda.is_initialized():
+            fprint(
+                "CUDA has been initialized in the main process, the seeds run sequentially"
+            )
+            return None
+        seed_devices = self.config.get(
+            "seed_devices",
+            ["cuda:{}".format(i) for i in range(torch.cuda.device_count())],
+        )
+        return [seed_devices[i % len(seed_devices)] for i in range(num_workers)]
+
+
+def select_best_checkpoint(seed_results, metric=None):
+    """
+    Select the checkpoint of the best seed by metric, the last existing checkpoint is used if no metric is available.
+
+    :param seed_results: the list returned by SeedRunner.run()
+    :param metric: the metric to maximize, defaults to the first metric of the results (e.g., max_apc_test_acc)
+    :return: the best checkpoint path, or None if there is no checkpoint
+    """
+    candidates = [
+        r
+        for r in seed_results
+        if isinstance(r["checkpoint"], str) and os.path.exists(r["checkpoint"])
+    ]
+    if not candidates:
+        return None
+    if metric is None:
+        metric = next(iter(candidates[0]["metrics"]), None)
+    ranked = [r for r in candidates if metric in r["metrics"]]
+    if not ranked:
+        return candidates[-1]["checkpoint"]
+    return max(ranked, key=lambda r: r["metrics"][metric])["checkpoint"]
+
+
+def _seed_worker(runner, config, seed, device, num_threads, result_queue):
+    """
+    Train one seed in a forked process, with a copy of the featurized config.
+    """
+    try:
+        torch.set_num_threads(num_threads)
+        config = copy.deepcopy(config)
+        config.device = device
+        result_queue.put((seed, runner._run_seed(seed, config)))
+    except Exception:
+        result_queue.put((seed, traceback.format_exc()))
@@ -26,6 +26,8 @@ from ..configuration_class.config_verification import config_check
 from ..configuration_class.configuration_template import ConfigManager
 from ..dataset_class.dataset_dict_class import DatasetDict
 from ..flag_class.flag_template import DeviceTypeOption, ModelSaveOption
+from .seed_runner import SeedRunner, select_best_checkpoint
+from ..instructor_class import distributed
 from ...utils.check_utils import query_local_datasets_version
 from ...utils.data_utils.dataset_item import DatasetItem
 from ...utils.data_utils.dataset_manager import detect_dataset
@@ -151,7 +153,9 @@ class Trainer:
             "checkpoint_save_mode=3" to save the fine-tuned BERT,
             otherwise avoid saving checkpoint but return the trained model after trainer
         :param auto_device: Union[str, bool]
-            True or False, otherwise 'allcuda', 'cuda:1', 'cpu' works
+            True or False, otherwise 'allcuda', 'cuda:1', 'cpu' works,
+            'allcuda' trains with DistributedDataParallel in one process per CUDA device,
+            set config.ddp_world_size to train with DDP in that many processes (e.g., on CPU with the gloo backend)
         :param path_to_save: Union[Path, str], optional
             Specify path to save checkpoints
         :param load_aug: bool, optional
@@ -183,6 +187,7 @@ class Trainer:
         self.training_instructor = None  # Training instructor
         self.inference_model_class = None  # Inference model class
         self.inference_model = None  # Inference model
+        self.seed_results = []  # The checkpoint and metrics of each seed
 
     def _run(self):
         """
@@ -231,30 +236,49 @@ class Trainer:
             self.config.seed = [self.config.seed]
         seeds = self.config.seed
 
-        # trainer using all random seeds
-        model_path = []
-        model = None
-        for i, s in enumerate(seeds):
-            self.config.seed = s
-            if self.config.checkpoint_save_mode:
-                model_path.append(self.training_instructor(self.config).run())
-            else:
-                # always return the last trained model if you don't save trained model
-                model = self.inference_model_class(
-                    checkpoint=self.training_instructor(self.config).run()
+        if distributed.should_spawn(self.config):
+            # spawn one DDP process per device, rank 0 returns the checkpoint path of the best seed
+            self.inference_model = distributed.launch(
+                self._train_seeds, self.config, seeds
+            )
+            if self.inference_model is None:
+                fprint(
+                    "The trained model stays in the DDP processes, set checkpoint_save_mode to get it back"
                 )
+        else:
+            # join the process group if launched by torchrun
+            distributed.init_distributed(self.config)
+            self.inference_model = self._train_seeds(seeds)
         self.config.seed = seeds
 
         # remove logger
         while self.config.logger.handlers:
             self.config.logger.removeHandler(self.config.logger.handlers[0])
 
-        # set inference model load path
+    def _train_seeds(self, seeds):
+        """
+        Train a model with each of the seeds.
+
+        :param seeds: the list of seeds
+        :return: the checkpoint of the best seed if saving checkpoints, otherwise the model of the last seed
+        """
         if self.config.checkpoint_save_mode:
-            if os.path.exists(max(model_path)):
-                self.inference_model = max(model_path)
-        else:
-            self.inference_model = model
+            # the datasets are featurized once, and the seeds run concurrently if config.seed_workers > 1
+            self.seed_results = SeedRunner(self.training_instructor, self.config).run(
+                seeds
+            )
+            # set inference model load path, i.e., the checkpoint of the best seed
+            return select_best_checkpoint(
+                self.seed_results, self.config.get("seed_selection_metric", None)
+            )
+        model = None
+        for i, s in enumerate(seeds):
+            self.config.seed = s
+            # always return the last trained model if you don't save trained model
+            model = self.inference_model_class(
+                checkpoint=self.training_instructor(self.config).run()
+            )
+        return model
 
     def load_trained_model(self):
         """
@@ -9,6 +9,7 @@
 
 # for Aspect-based Sentiment Classification
 from .trainer.apc_trainer import APCTrainer
+from .trainer.apc_distillation_trainer import APCDistillationTrainer
 from .configuration.apc_configuration import APCConfigManager
 from .models import APCModelList, BERTBaselineAPCModelList, GloVeAPCModelList
 from .models import LCFAPCModelList, PLMAPCModelList, ClassicAPCModelList
@@ -62,6 +62,7 @@ class GloVeABSADataset(PyABSADataset):
                 )
             )
 
+        examples = []
         for i in tqdm.tqdm(range(0, len(lines), 3), desc="preparing dataloader"):
             if lines[i].count("$T$") > 1:
                 continue
@@ -77,24 +78,34 @@ class GloVeABSADataset(PyABSADataset):
 
             if validate_absa_example(text_raw, aspect, polarity, self.config):
                 continue
-
-            text_indices = self.tokenizer.text_to_sequence(
-                text_left + " " + aspect + " " + text_right
-            )
-            context_indices = self.tokenizer.text_to_sequence(
-                text_left + " " + text_right
-            )
-            left_indices = self.tokenizer.text_to_sequence(text_left)
-            left_with_aspect_indices = self.tokenizer.text_to_sequence(
-                text_left + " " + aspect
-            )
-            right_indices = self.tokenizer.text_to_sequence(text_right)
-            right_with_aspect_indices = self.tokenizer.text_to_sequence(
-                aspect + " " + text_right
-            )
-            aspect_indices = self.tokenizer.text_to_sequence(aspect)
-            left_len = np.count_nonzero(left_indices)
-            aspect_len = np.count_nonzero(aspect_indices)
+            examples.append((text_left, aspect, text_right, text_raw, polarity))
+
+        # the sequences of all the examples are encoded at once, one array per input
+        def encode(texts):
+            return self.tokenizer.encode_batch(texts, dtype=np.int64)
+
+        all_text_indices = encode([e[3] for e in examples])
+        all_context_indices = encode([e[0] + " " + e[2] for e in examples])
+        all_left_indices = encode([e[0] for e in examples])
+        all_left_with_aspect_indices = encode([e[0] + " " + e[1] for e in examples])
+        all_right_indices = encode([e[2] for e in examples])
+        all_right_with_aspect_indices = encode([e[1] + " " + e[2] for e in examples])
+        all_aspect_indices = encode([e[1] for e in examples])
+        all_left_len = np.count_nonzero(all_left_indices, axis=1)
+        all_aspect_len = np.count_nonzero(all_aspect_indices, axis=1)
+
+        for i, (text_left, aspect, text_right, text_raw, polarity) in enumerate(
+            examples
+        ):
+            text_indices = all_text_indices[i]
+            context_indices = all_context_indices[i]
+            left_indices = all_left_indices[i]
+            left_with_aspect_indices = all_left_with_aspect_indices[i]
+            right_indices = all_right_indices[i]
+            right_with_aspect_indices = all_right_with_aspect_indices[i]
+            aspect_indices = all_aspect_indices[i]
+            left_len = int(all_left_len[i])
+            aspect_len = int(all_aspect_len[i])
             aspect_boundary = np.asarray(
                 [left_len, min(left_len + aspect_len - 1, self.config.max_seq_len)]
             )
@@ -110,10 +121,8 @@ class GloVeABSADataset(PyABSADataset):
             dependency_graph = dependency_graph[:, range(0, self.config.max_seq_len)]
             dependency_graph = dependency_graph[range(0, self.config.max_seq_len), :]
 
-            aspect_begin = np.count_nonzero(self.tokenizer.text_to_sequence(text_left))
-            aspect_position = set(
-                range(aspect_begin, aspect_begin + np.count_nonzero(aspect_indices))
-            )
+            aspect_begin = left_len
+            aspect_position = set(range(aspect_begin, aspect_begin + aspect_len))
             if len(aspect_position) < 1:
                 raise RuntimeError("Invalid Input: {}".format(text_raw))
             data = {
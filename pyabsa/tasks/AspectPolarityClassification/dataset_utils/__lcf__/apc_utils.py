@@ -14,6 +14,7 @@ import spacy
 import termcolor
 
 from pyabsa.framework.tokenizer_class.tokenizer_class import pad_and_truncate
+from pyabsa.utils.profile_utils.profiler import profile_span, profiled
 from pyabsa.utils.pyabsa_utils import fprint
 
 
@@ -112,13 +113,16 @@ def prepare_input_for_apc(
     text_spc = (
         bos_token + " " + text_raw + " " + eos_token + " " + aspect + " " + eos_token
     )
-    text_indices = text_to_sequence(tokenizer, text_spc, config.max_seq_len)
-    text_raw_bert_indices = text_to_sequence(
-        tokenizer, bos_token + " " + text_raw + " " + eos_token, config.max_seq_len
-    )
-    aspect_bert_indices = text_to_sequence(tokenizer, aspect, config.max_seq_len)
+    with profile_span("tokenize", examples=1) as span:
+        text_indices = text_to_sequence(tokenizer, text_spc, config.max_seq_len)
+        text_raw_bert_indices = text_to_sequence(
+            tokenizer, bos_token + " " + text_raw + " " + eos_token, config.max_seq_len
+        )
+        aspect_bert_indices = text_to_sequence(tokenizer, aspect, config.max_seq_len)
 
-    aspect_begin = len(tokenizer.tokenize(bos_token + " " + text_left))
+        aspect_begin = len(tokenizer.tokenize(bos_token + " " + text_left))
+        if span.enabled:
+            span.add(tokens=int(np.count_nonzero(text_indices)))
     aspect_position = set(
         range(aspect_begin, aspect_begin + np.count_nonzero(aspect_bert_indices))
     )
@@ -185,6 +189,7 @@ def text_to_sequence(tokenizer, text, max_seq_len):
     )
 
 
+@profiled("spacy_parse")
 def get_syntax_distance(text_raw, aspect, tokenizer, config):
     # Find distance in dependency parsing tree
     if isinstance(text_raw, list):
@@ -222,6 +227,7 @@ def get_syntax_distance(text_raw, aspect, tokenizer, config):
     return syntactical_dist, max_dist
 
 
+@profiled("lcf_vectors")
 def get_lca_ids_and_cdm_vec(
     config, bert_spc_indices, aspect_indices, aspect_begin, syntactical_dist=None
 ):
@@ -242,6 +248,7 @@ def get_lca_ids_and_cdm_vec(
     return cdm_vec
 
 
+@profiled("lcf_vectors")
 def get_cdw_vec(
     config, bert_spc_indices, aspect_indices, aspect_begin, syntactical_dist=None
 ):
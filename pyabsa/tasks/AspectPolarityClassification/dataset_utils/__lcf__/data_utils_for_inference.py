@@ -15,6 +15,7 @@ from pyabsa.utils.file_utils.file_utils import load_dataset_from_file
 from torch.utils.data import Dataset
 import tqdm
 
+from pyabsa.utils.profile_utils.profiler import profile_span
 from pyabsa.utils.pyabsa_utils import fprint
 from .apc_utils import (
     build_sentiment_window,
@@ -114,7 +115,7 @@ class ABSAInferenceDataset(Dataset):
             self.process_data(examples, ignore_error=ignore_error)
 
     def prepare_infer_dataset(self, infer_file, ignore_error):
-        lines = load_dataset_from_file(infer_file, config=self.config)
+        lines = load_dataset_from_file(infer_file, config=self.config, inference=True)
         samples = []
         for sample in lines:
             if sample:
@@ -294,7 +295,8 @@ class ABSAInferenceDataset(Dataset):
 
         self.data = all_data
 
-        self.data = PyABSADataset.covert_to_tensor(self.data)
+        with profile_span("tensor_conversion", examples=len(self.data)):
+            self.data = PyABSADataset.covert_to_tensor(self.data)
 
         return self.data
 
@@ -8,6 +8,7 @@ import tqdm
 
 from pyabsa.framework.flag_class.flag_template import LabelPaddingOption
 from pyabsa.framework.dataset_class.dataset_template import PyABSADataset
+from pyabsa.utils.profile_utils.profiler import profile_span
 from pyabsa.utils.pyabsa_utils import validate_absa_example, fprint
 from .classic_bert_apc_utils import prepare_input_for_apc, build_sentiment_window
 from .dependency_graph import dependency_adj_matrix, configure_spacy_model
@@ -196,7 +197,8 @@ class BERTABSAInferenceDataset(ABSAInferenceDataset):
             data["side_ex_ids"] = np.array(0)
             data["aspect_position"] = np.array(0)
 
-        self.data = PyABSADataset.covert_to_tensor(self.data)
+        with profile_span("tensor_conversion", examples=len(self.data)):
+            self.data = PyABSADataset.covert_to_tensor(self.data)
 
         return self.data
 
@@ -7,6 +7,7 @@ import termcolor
 import tqdm
 from spacy.tokens import Doc
 
+from pyabsa.utils.profile_utils.profiler import profiled
 from pyabsa.utils.pyabsa_utils import fprint
 
 
@@ -49,6 +50,7 @@ def configure_spacy_model(config):
     nlp.tokenizer = WhitespaceTokenizer(nlp.vocab)
 
 
+@profiled("spacy_parse")
 def dependency_adj_matrix(text):
     # https://spacy.io/docs/usage/processing-text
     tokens = nlp(text)
@@ -6,26 +6,35 @@
 # Copyright (C) 2021. All Rights Reserved.
 
 import os
-import shutil
 import time
 
 import numpy
-import numpy as np
-import pandas
 import torch
 import torch.nn as nn
 from sklearn import metrics
 from torch import cuda
-from tqdm import tqdm
 
 from pyabsa.framework.flag_class.flag_template import DeviceTypeOption
+from pyabsa.framework.instructor_class import distributed
 from pyabsa.framework.instructor_class.instructor_template import BaseTrainingInstructor
+from pyabsa.framework.instructor_class.training_metrics import TrainingMetrics
+from pyabsa.framework.instructor_class.evaluation_scheduler import (
+    EvaluationScheduler,
+    EvaluationStrategyOption,
+)
+from pyabsa.framework.instructor_class.fold_scheduler import FoldScheduler
 from ..instructor.ensembler import APCEnsembler
-from pyabsa.utils.file_utils.file_utils import save_model
+from pyabsa.framework.checkpoint_class.checkpoint_writer import CheckpointWriter
 from pyabsa.utils.pyabsa_utils import init_optimizer, fprint
 
 
 class APCTrainingInstructor(BaseTrainingInstructor):
+    supported_eval_strategies = (
+        EvaluationStrategyOption.FULL,
+        EvaluationStrategyOption.SAMPLED,
+        EvaluationStrategyOption.ASYNC,
+    )
+
     def _load_dataset_and_prepare_dataloader(self):
         self.model = APCEnsembler(self.config)
         self.tokenizer = self.model.tokenizer
@@ -39,7 +48,9 @@ class APCTrainingInstructor(BaseTrainingInstructor):
     def __init__(self, config):
         super().__init__(config)
 
-        self._load_dataset_and_prepare_dataloader()
+        with self.profiler.span("featurize") as span:
+            self._load_dataset_and_prepare_dataloader()
+            span.add(examples=len(self.train_set))
 
         self._init_misc()
 
@@ -56,7 +67,8 @@ class APCTrainingInstructor(BaseTrainingInstructor):
         self.config.metrics_of_this_checkpoint = {"acc": 0, "f1": 0}
         self.config.max_test_metrics = {"max_apc_test_acc": 0, "max_apc_test_f1": 0}
 
-        losses = []
+        training_metrics = TrainingMetrics(self.config)
+        checkpoint_writer = self._closing(CheckpointWriter(self.config))
 
         Total_params = 0
         Trainable_params = 0
@@ -100,137 +112,159 @@ class APCTrainingInstructor(BaseTrainingInstructor):
             * self.config.num_epoch,
         )
 
+        eval_dataloader = (
+            self.valid_dataloaders[0]
+            if len(self.valid_dataloaders) > 1
+            else self.test_dataloader
+        )
+        evaluator = self._closing(
+            EvaluationScheduler(
+                self, self._evaluate_acc_f1, dataloaders=[eval_dataloader]
+            )
+        )
+
+        # the parameters read per batch, see ConfigManager.frozen_view()
+        config = self.config.frozen_view(
+            "device",
+            "inputs_cols",
+            "use_amp",
+            "auto_device",
+            "warmup_step",
+            "log_step",
+            "evaluate_begin",
+        )
         for epoch in range(self.config.num_epoch):
             # self.config.ETA_MV.log_metric(self.config.model_name,r'$\eta_{l}^{*}$'+str(self.config.seed), self.model.models[0].eta1.item())
             # self.config.ETA_MV.log_metric(self.config.model_name,r'$\eta_{r}^{*}$'+str(self.config.seed), self.model.models[0].eta2.item())
             # self.config.ETA_MV.next_trial()
             patience -= 1
             description = "Epoch:{} | Loss:{}".format(epoch, 0)
-            iterator = tqdm(self.train_dataloaders[0], desc=description)
+            iterator = self._progress_bar(
+                self.train_dataloaders[0],
+                desc=description,
+            )
             for i_batch, sample_batched in enumerate(iterator):
+                training_metrics.mark("data")
                 global_step += 1
                 # switch model to trainer mode, clear gradient accumulators
                 self.model.train()
                 self.optimizer.zero_grad()
                 inputs = {
-                    col: sample_batched[col].to(self.config.device)
-                    for col in self.config.inputs_cols
+                    col: sample_batched[col].to(config.device)
+                    for col in config.inputs_cols
                 }
 
-                if self.config.use_amp:
+                if config.use_amp:
                     with torch.cuda.amp.autocast():
                         outputs = self.model(inputs)
                 else:
                     outputs = self.model(inputs)
 
-                targets = sample_batched["polarity"].to(self.config.device)
-
-                if (
-                    isinstance(outputs, dict)
-                    and "loss" in outputs
-                    and outputs["loss"] != 0
-                ):
-                    loss = outputs["loss"]
-                else:
-                    loss = criterion(outputs["logits"], targets)
+                loss = self._compute_loss(criterion, outputs, sample_batched)
 
-                if self.config.auto_device == DeviceTypeOption.ALL_CUDA:
+                if config.auto_device == DeviceTypeOption.ALL_CUDA:
                     loss = loss.mean()
 
-                losses.append(loss.item())
+                training_metrics.update(loss, sample_batched)
+                training_metrics.mark("forward")
 
-                if self.config.use_amp and self.scaler:
+                if config.use_amp and self.scaler:
                     self.scaler.scale(loss).backward()
+                    training_metrics.mark("backward")
                     self.scaler.step(self.optimizer)
                     self.scaler.update()
                 else:
                     loss.backward()
+                    training_metrics.mark("backward")
                     self.optimizer.step()
 
-                if self.config.warmup_step >= 0:
+                if config.warmup_step >= 0:
                     with self.warmup_scheduler.dampening():
                         self.lr_scheduler.step()
+                training_metrics.mark("optimizer")
 
                 # evaluate if test set is available
-                if global_step % self.config.log_step == 0:
-                    if self.test_dataloader and epoch >= self.config.evaluate_begin:
-                        if len(self.valid_dataloaders) > 1:
-                            test_acc, f1 = self._evaluate_acc_f1(
-                                self.valid_dataloaders[0]
-                            )
-                        else:
-                            test_acc, f1 = self._evaluate_acc_f1(self.test_dataloader)
-                        self.config.metrics_of_this_checkpoint["acc"] = test_acc
-                        self.config.metrics_of_this_checkpoint["f1"] = f1
-
-                        if test_acc > max_fold_acc or f1 > max_fold_f1:
-                            if test_acc > max_fold_acc:
-                                patience = self.config.patience - 1
-                                max_fold_acc = test_acc
-
-                            if f1 > max_fold_f1:
-                                max_fold_f1 = f1
-                                patience = self.config.patience - 1
-
-                            if self.config.model_path_to_save:
-                                if not os.path.exists(self.config.model_path_to_save):
-                                    os.makedirs(self.config.model_path_to_save)
-                                if save_path:
-                                    try:
-                                        shutil.rmtree(save_path)
-                                        # logger.info('Remove sub-optimal trained model:', save_path)
-                                    except:
-                                        # logger.info('Can not remove sub-optimal trained model:', save_path)
-                                        pass
-                                save_path = "{0}/{1}_{2}_acc_{3}_f1_{4}/".format(
-                                    self.config.model_path_to_save,
-                                    self.config.model_name,
-                                    self.config.dataset_name,
-                                    round(test_acc * 100, 2),
-                                    round(f1 * 100, 2),
-                                )
-
-                                if (
-                                    test_acc
-                                    > self.config.max_test_metrics["max_apc_test_acc"]
-                                ):
-                                    self.config.max_test_metrics[
-                                        "max_apc_test_acc"
-                                    ] = test_acc
-                                if f1 > self.config.max_test_metrics["max_apc_test_f1"]:
-                                    self.config.max_test_metrics["max_apc_test_f1"] = f1
-
-                                save_model(
-                                    self.config, self.model, self.tokenizer, save_path
-                                )
-
-                        postfix = "Dev Acc:{:>.2f}(max:{:>.2f}) Dev F1:{:>.2f}(max:{:>.2f})".format(
-                            test_acc * 100,
-                            max_fold_acc * 100,
-                            f1 * 100,
-                            max_fold_f1 * 100,
-                        )
-                        iterator.set_postfix_str(postfix)
+                if global_step % config.log_step == 0:
+                    if self.test_dataloader and epoch >= config.evaluate_begin:
+                        evaluator.submit(eval_dataloader)
                     elif self.config.save_mode and epoch >= self.config.evaluate_begin:
-                        save_model(
-                            self.config,
+                        checkpoint_writer.save(
                             self.model,
                             self.tokenizer,
                             save_path + "_{}/".format(loss.item()),
                         )
                 else:
-                    if self.config.get("loss_display", "smooth") == "smooth":
-                        description = "Epoch:{:>3d} | Smooth Loss: {:>.4f}".format(
-                            epoch, round(np.nanmean(losses), 4)
-                        )
-                    else:
-                        description = "Epoch:{:>3d} | Batch Loss: {:>.4f}".format(
-                            epoch, round(loss.item(), 4)
+                    description = training_metrics.description(epoch)
+
+                # consume the finished evaluations, wait for the in-flight one at the end of each epoch
+                for (test_acc, f1), is_full, eval_model in evaluator.completed(
+                    wait=i_batch + 1 == len(self.train_dataloaders[0])
+                ):
+                    if not is_full:
+                        postfix = "Sampled Dev Acc:{:>.2f} Dev F1:{:>.2f}".format(
+                            test_acc * 100, f1 * 100
                         )
+                        iterator.set_postfix_str(postfix)
+                        continue
+
+                    self.config.metrics_of_this_checkpoint["acc"] = test_acc
+                    self.config.metrics_of_this_checkpoint["f1"] = f1
+
+                    if test_acc > max_fold_acc or f1 > max_fold_f1:
+                        if test_acc > max_fold_acc:
+                            patience = self.config.patience - 1
+                            max_fold_acc = test_acc
+
+                        if f1 > max_fold_f1:
+                            max_fold_f1 = f1
+                            patience = self.config.patience - 1
+
+                        if self.config.model_path_to_save:
+                            os.makedirs(self.config.model_path_to_save, exist_ok=True)
+                            # the sub-optimal checkpoints are pruned by the writer once the new one is committed
+                            save_path = "{0}/{1}_{2}_acc_{3}_f1_{4}/".format(
+                                self.config.model_path_to_save,
+                                self.config.model_name,
+                                self.config.dataset_name,
+                                round(test_acc * 100, 2),
+                                round(f1 * 100, 2),
+                            )
+
+                            if (
+                                test_acc
+                                > self.config.max_test_metrics["max_apc_test_acc"]
+                            ):
+                                self.config.max_test_metrics["max_apc_test_acc"] = (
+                                    test_acc
+                                )
+                            if f1 > self.config.max_test_metrics["max_apc_test_f1"]:
+                                self.config.max_test_metrics["max_apc_test_f1"] = f1
+
+                            # eval_model holds the evaluated weights, i.e., a snapshot in async evaluation.
+                            # a checkpoint is only saved on improvement, so the latest one ranks the best
+                            checkpoint_writer.save(
+                                eval_model,
+                                self.tokenizer,
+                                save_path,
+                                metric=global_step,
+                            )
+
+                    postfix = "Dev Acc:{:>.2f}(max:{:>.2f}) Dev F1:{:>.2f}(max:{:>.2f})".format(
+                        test_acc * 100,
+                        max_fold_acc * 100,
+                        f1 * 100,
+                        max_fold_f1 * 100,
+                    )
+                    iterator.set_postfix_str(postfix)
+                training_metrics.mark("evaluate")
                 iterator.set_description(description)
                 iterator.refresh()
             if patience == 0:
                 break
+        evaluator.close()
+        # the best checkpoint is reloaded below, wait for it to be committed (by rank 0 in DDP training)
+        checkpoint_writer.close()
+        distributed.barrier()
 
         if not self.valid_dataloaders:
             self.config.MV.log_metric(
@@ -306,13 +340,8 @@ class APCTrainingInstructor(BaseTrainingInstructor):
         self.logger.info(self.config.MV.summary(no_print=True))
         # self.logger.info(self.config.MV.short_summary(no_print=True))
 
-        rolling_intv = 5
-        df = pandas.DataFrame(losses)
-        losses = list(
-            numpy.hstack(df.rolling(rolling_intv, min_periods=1).mean().values)
-        )
-        self.config.loss = losses[-1]
-        # self.config.loss = np.average(losses)
+        self.config.loss = training_metrics.loss
+        self.logger.info(training_metrics.summary())
 
         if self.valid_dataloader or self.config.save_mode:
             del self.train_dataloaders
@@ -331,218 +360,44 @@ class APCTrainingInstructor(BaseTrainingInstructor):
             return self.model, self.config, self.tokenizer
 
     def _k_fold_train_and_evaluate(self, criterion):
-        fold_test_acc = []
-        fold_test_f1 = []
-
-        save_path_k_fold = ""
-        max_fold_acc_k_fold = 0
-
-        losses = []
-
         self.config.metrics_of_this_checkpoint = {"acc": 0, "f1": 0}
         self.config.max_test_metrics = {"max_apc_test_acc": 0, "max_apc_test_f1": 0}
 
-        for f, (train_dataloader, valid_dataloader) in enumerate(
-            zip(self.train_dataloaders, self.valid_dataloaders)
-        ):
-            patience = self.config.patience + self.config.evaluate_begin
-            if self.config.log_step < 0:
-                self.config.log_step = (
-                    len(self.train_dataloaders[0])
-                    if self.config.log_step < 0
-                    else self.config.log_step
-                )
-
-            self.logger.info(
-                "***** Running training for {} *****".format(self.config.task_name)
-            )
-            self.logger.info("Training set examples = %d", len(self.train_set))
-            if self.valid_set:
-                self.logger.info("Valid set examples = %d", len(self.valid_set))
-            if self.test_set:
-                self.logger.info("Test set examples = %d", len(self.test_set))
-            self.logger.info("Batch size = %d", self.config.batch_size)
-            self.logger.info(
-                "Num steps = %d",
-                len(train_dataloader) // self.config.batch_size * self.config.num_epoch,
-            )
-            if len(self.train_dataloaders) > 1:
-                self.logger.info(
-                    "No. {} trainer in {} folds".format(
-                        f + 1, self.config.cross_validate_fold
-                    )
-                )
-            global_step = 0
-            max_fold_acc = 0
-            max_fold_f1 = 0
-            save_path = "{0}/{1}_{2}".format(
-                self.config.model_path_to_save,
-                self.config.model_name,
-                self.config.dataset_name,
-            )
-            for epoch in range(self.config.num_epoch):
-                patience -= 1
-                description = "Epoch:{} | Loss:{}".format(epoch, 0)
-                iterator = tqdm(train_dataloader, desc=description)
-                for i_batch, sample_batched in enumerate(iterator):
-                    global_step += 1
-                    # switch model to train mode, clear gradient accumulators
-                    self.model.train()
-                    self.optimizer.zero_grad()
-                    inputs = {
-                        col: sample_batched[col].to(self.config.device)
-                        for col in self.config.inputs_cols
-                    }
-
-                    if self.config.use_amp:
-                        with torch.cuda.amp.autocast():
-                            outputs = self.model(inputs)
-                    else:
-                        outputs = self.model(inputs)
+        if self.config.log_step < 0:
+            self.config.log_step = len(self.train_dataloaders[0])
 
-                    targets = sample_batched["polarity"].to(self.config.device)
-
-                    if (
-                        isinstance(outputs, dict)
-                        and "loss" in outputs
-                        and outputs["loss"] != 0
-                    ):
-                        loss = outputs["loss"]
-                    else:
-                        loss = criterion(outputs["logits"], targets)
-
-                    if self.config.auto_device == DeviceTypeOption.ALL_CUDA:
-                        loss = loss.mean()
-
-                    losses.append(loss.item())
-
-                    if self.config.use_amp and self.scaler:
-                        self.scaler.scale(loss).backward()
-                        self.scaler.step(self.optimizer)
-                        self.scaler.update()
-                    else:
-                        loss.backward()
-                        self.optimizer.step()
-
-                    if self.config.warmup_step >= 0:
-                        with self.warmup_scheduler.dampening():
-                            self.lr_scheduler.step()
-
-                    # evaluate if test set is available
-                    if global_step % self.config.log_step == 0:
-                        if self.test_dataloader and epoch >= self.config.evaluate_begin:
-                            test_acc, f1 = self._evaluate_acc_f1(valid_dataloader)
-
-                            self.config.metrics_of_this_checkpoint["acc"] = test_acc
-                            self.config.metrics_of_this_checkpoint["f1"] = f1
-
-                            if test_acc > max_fold_acc or f1 > max_fold_f1:
-                                if test_acc > max_fold_acc:
-                                    patience = self.config.patience - 1
-                                    max_fold_acc = test_acc
-
-                                if f1 > max_fold_f1:
-                                    max_fold_f1 = f1
-                                    patience = self.config.patience - 1
-
-                                if self.config.model_path_to_save:
-                                    if not os.path.exists(
-                                        self.config.model_path_to_save
-                                    ):
-                                        os.makedirs(self.config.model_path_to_save)
-                                    if save_path:
-                                        try:
-                                            shutil.rmtree(save_path)
-                                            # logger.info('Remove sub-optimal trained model:', save_path)
-                                        except:
-                                            # logger.info('Can not remove sub-optimal trained model:', save_path)
-                                            pass
-                                    save_path = "{0}/{1}_{2}_acc_{3}_f1_{4}/".format(
-                                        self.config.model_path_to_save,
-                                        self.config.model_name,
-                                        self.config.dataset_name,
-                                        round(test_acc * 100, 2),
-                                        round(f1 * 100, 2),
-                                    )
-
-                                    if (
-                                        test_acc
-                                        > self.config.max_test_metrics[
-                                            "max_apc_test_acc"
-                                        ]
-                                    ):
-                                        self.config.max_test_metrics[
-                                            "max_apc_test_acc"
-                                        ] = test_acc
-                                    if (
-                                        f1
-                                        > self.config.max_test_metrics[
-                                            "max_apc_test_f1"
-                                        ]
-                                    ):
-                                        self.config.max_test_metrics[
-                                            "max_apc_test_f1"
-                                        ] = f1
-
-                                    save_model(
-                                        self.config,
-                                        self.model,
-                                        self.tokenizer,
-                                        save_path,
-                                    )
-
-                            postfix = "Dev Acc:{:>.2f}(max:{:>.2f}) Dev F1:{:>.2f}(max:{:>.2f})".format(
-                                test_acc * 100,
-                                max_fold_acc * 100,
-                                f1 * 100,
-                                max_fold_f1 * 100,
-                            )
-                            iterator.set_postfix_str(postfix)
-                        if (
-                            self.config.save_mode
-                            and epoch >= self.config.evaluate_begin
-                        ):
-                            save_model(
-                                self.config,
-                                self.model,
-                                self.tokenizer,
-                                save_path + "_{}/".format(loss.item()),
-                            )
-                    else:
-                        if self.config.get("loss_display", "smooth") == "smooth":
-                            description = "Epoch:{:>3d} | Smooth Loss: {:>.4f}".format(
-                                epoch, round(np.nanmean(losses), 4)
-                            )
-                        else:
-                            description = "Epoch:{:>3d} | Batch Loss: {:>.4f}".format(
-                                epoch, round(loss.item(), 4)
-                            )
+        # the folds run in this process, or concurrently in worker processes if config.fold_workers > 1
+        fold_results = FoldScheduler(self).run(self._train_fold, criterion)
 
-                    iterator.set_description(description)
-                    iterator.refresh()
-                if patience == 0:
-                    break
-            max_fold_acc, max_fold_f1 = self._evaluate_acc_f1(self.test_dataloader)
-            if max_fold_acc > max_fold_acc_k_fold:
-                save_path_k_fold = save_path
-            fold_test_acc.append(max_fold_acc)
-            fold_test_f1.append(max_fold_f1)
+        fold_test_acc = []
+        fold_test_f1 = []
+        save_path_k_fold = ""
+        max_fold_acc_k_fold = 0
+        for f, fold_result in enumerate(fold_results):
+            fold_test_acc.append(fold_result["test_acc"])
+            fold_test_f1.append(fold_result["test_f1"])
+            if fold_result["test_acc"] > max_fold_acc_k_fold:
+                max_fold_acc_k_fold = fold_result["test_acc"]
+                save_path_k_fold = fold_result["save_path"]
+            for key in self.config.max_test_metrics:
+                self.config.max_test_metrics[key] = max(
+                    self.config.max_test_metrics[key],
+                    fold_result["max_test_metrics"][key],
+                )
 
             self.config.MV.log_metric(
                 self.config.model_name,
                 "Fold{}-Max-Test-Acc".format(f),
-                max_fold_acc * 100,
+                fold_result["test_acc"] * 100,
             )
             self.config.MV.log_metric(
                 self.config.model_name,
                 "Fold{}-Max-Test-F1".format(f),
-                max_fold_f1 * 100,
+                fold_result["test_f1"] * 100,
             )
 
-            # self.logger.info(self.config.MV.summary(no_print=True))
-            self.logger.info(self.config.MV.raw_summary(no_print=True))
-
-            self._reload_model_state_dict(save_path_k_fold)
+        # self.logger.info(self.config.MV.summary(no_print=True))
+        self.logger.info(self.config.MV.raw_summary(no_print=True))
 
         max_test_acc = numpy.max(fold_test_acc)
         max_test_f1 = numpy.max(fold_test_f1)
@@ -570,16 +425,8 @@ class APCTrainingInstructor(BaseTrainingInstructor):
         # self.logger.info(self.config.MV.short_summary(no_print=True))
         self._reload_model_state_dict(save_path_k_fold)
 
-        rolling_intv = 5
-        df = pandas.DataFrame(losses)
-        losses = list(
-            numpy.hstack(df.rolling(rolling_intv, min_periods=1).mean().values)
-        )
-        self.config.loss = losses[-1]
-        # self.config.loss = np.average(losses)
+        self.config.loss = float(numpy.mean([r["loss"] for r in fold_results]))
 
-        if os.path.exists("./init_state_dict.bin"):
-            os.remove("./init_state_dict.bin")
         if self.valid_dataloaders or self.config.save_mode:
             del self.train_dataloaders
             del self.test_dataloader
@@ -587,7 +434,7 @@ class APCTrainingInstructor(BaseTrainingInstructor):
             del self.model
             cuda.empty_cache()
             time.sleep(3)
-            return save_path
+            return save_path_k_fold
         else:
             del self.train_dataloaders
             del self.test_dataloader
@@ -596,19 +443,233 @@ class APCTrainingInstructor(BaseTrainingInstructor):
             time.sleep(3)
             return self.model, self.config, self.tokenizer
 
+    def _train_fold(self, f, train_dataloader, valid_dataloader, criterion):
+        """
+        Train a fold of cross validation, the model has been reset to the initial weights by the FoldScheduler.
+
+        :param f: the index of the fold
+        :param train_dataloader: the training dataloader of the fold
+        :param valid_dataloader: the validation dataloader of the fold
+        :param criterion: the loss function
+        :return: a dict of the fold results
+        """
+        training_metrics = TrainingMetrics(self.config)
+        checkpoint_writer = self._closing(CheckpointWriter(self.config))
+        self.config.max_test_metrics = {"max_apc_test_acc": 0, "max_apc_test_f1": 0}
+
+        patience = self.config.patience + self.config.evaluate_begin
+
+        self.logger.info(
+            "***** Running training for {} *****".format(self.config.task_name)
+        )
+        self.logger.info("Training set examples = %d", len(self.train_set))
+        if self.valid_set:
+            self.logger.info("Valid set examples = %d", len(self.valid_set))
+        if self.test_set:
+            self.logger.info("Test set examples = %d", len(self.test_set))
+        self.logger.info("Batch size = %d", self.config.batch_size)
+        self.logger.info(
+            "Num steps = %d",
+            len(train_dataloader) // self.config.batch_size * self.config.num_epoch,
+        )
+        if len(self.train_dataloaders) > 1:
+            self.logger.info(
+                "No. {} trainer in {} folds".format(
+                    f + 1, self.config.cross_validate_fold
+                )
+            )
+        global_step = 0
+        max_fold_acc = 0
+        max_fold_f1 = 0
+        save_path = "{0}/{1}_{2}_fold{3}".format(
+            self.config.model_path_to_save,
+            self.config.model_name,
+            self.config.dataset_name,
+            f,
+        )
+        evaluator = self._closing(
+            EvaluationScheduler(
+                self, self._evaluate_acc_f1, dataloaders=[valid_dataloader]
+            )
+        )
+
+        # the parameters read per batch, see ConfigManager.frozen_view()
+        config = self.config.frozen_view(
+            "device",
+            "inputs_cols",
+            "use_amp",
+            "auto_device",
+            "warmup_step",
+            "log_step",
+            "evaluate_begin",
+        )
+        for epoch in range(self.config.num_epoch):
+            patience -= 1
+            description = "Epoch:{} | Loss:{}".format(epoch, 0)
+            iterator = self._progress_bar(
+                train_dataloader,
+                desc=description,
+            )
+            for i_batch, sample_batched in enumerate(iterator):
+                training_metrics.mark("data")
+                global_step += 1
+                # switch model to train mode, clear gradient accumulators
+                self.model.train()
+                self.optimizer.zero_grad()
+                inputs = {
+                    col: sample_batched[col].to(config.device)
+                    for col in config.inputs_cols
+                }
+
+                if config.use_amp:
+                    with torch.cuda.amp.autocast():
+                        outputs = self.model(inputs)
+                else:
+                    outputs = self.model(inputs)
+
+                loss = self._compute_loss(criterion, outputs, sample_batched)
+
+                if config.auto_device == DeviceTypeOption.ALL_CUDA:
+                    loss = loss.mean()
+
+                training_metrics.update(loss, sample_batched)
+                training_metrics.mark("forward")
+
+                if config.use_amp and self.scaler:
+                    self.scaler.scale(loss).backward()
+                    training_metrics.mark("backward")
+                    self.scaler.step(self.optimizer)
+                    self.scaler.update()
+                else:
+                    loss.backward()
+                    training_metrics.mark("backward")
+                    self.optimizer.step()
+
+                if config.warmup_step >= 0:
+                    with self.warmup_scheduler.dampening():
+                        self.lr_scheduler.step()
+                training_metrics.mark("optimizer")
+
+                # evaluate if test set is available
+                if global_step % config.log_step == 0:
+                    if self.test_dataloader and epoch >= config.evaluate_begin:
+                        evaluator.submit(valid_dataloader)
+                    if self.config.save_mode and epoch >= self.config.evaluate_begin:
+                        checkpoint_writer.save(
+                            self.model,
+                            self.tokenizer,
+                            save_path + "_{}/".format(loss.item()),
+                        )
+                else:
+                    description = training_metrics.description(epoch)
+
+                # consume the finished evaluations, wait for the in-flight one at the end of each epoch
+                for (test_acc, f1), is_full, eval_model in evaluator.completed(
+                    wait=i_batch + 1 == len(train_dataloader)
+                ):
+                    if not is_full:
+                        postfix = "Sampled Dev Acc:{:>.2f} Dev F1:{:>.2f}".format(
+                            test_acc * 100, f1 * 100
+                        )
+                        iterator.set_postfix_str(postfix)
+                        continue
+
+                    self.config.metrics_of_this_checkpoint["acc"] = test_acc
+                    self.config.metrics_of_this_checkpoint["f1"] = f1
+
+                    if test_acc > max_fold_acc or f1 > max_fold_f1:
+                        if test_acc > max_fold_acc:
+                            patience = self.config.patience - 1
+                            max_fold_acc = test_acc
+
+                        if f1 > max_fold_f1:
+                            max_fold_f1 = f1
+                            patience = self.config.patience - 1
+
+                        if self.config.model_path_to_save:
+                            os.makedirs(self.config.model_path_to_save, exist_ok=True)
+                            # the sub-optimal checkpoints are pruned by the writer once the new one is committed
+                            save_path = "{0}/{1}_{2}_fold{3}_acc_{4}_f1_{5}/".format(
+                                self.config.model_path_to_save,
+                                self.config.model_name,
+                                self.config.dataset_name,
+                                f,
+                                round(test_acc * 100, 2),
+                                round(f1 * 100, 2),
+                            )
+
+                            if (
+                                test_acc
+                                > self.config.max_test_metrics["max_apc_test_acc"]
+                            ):
+                                self.config.max_test_metrics["max_apc_test_acc"] = (
+                                    test_acc
+                                )
+                            if f1 > self.config.max_test_metrics["max_apc_test_f1"]:
+                                self.config.max_test_metrics["max_apc_test_f1"] = f1
+
+                            # eval_model holds the evaluated weights, i.e., a snapshot in async evaluation
+                            checkpoint_writer.save(
+                                eval_model,
+                                self.tokenizer,
+                                save_path,
+                                metric=global_step,
+                            )
+
+                    postfix = "Dev Acc:{:>.2f}(max:{:>.2f}) Dev F1:{:>.2f}(max:{:>.2f})".format(
+                        test_acc * 100,
+                        max_fold_acc * 100,
+                        f1 * 100,
+                        max_fold_f1 * 100,
+                    )
+                    iterator.set_postfix_str(postfix)
+                training_metrics.mark("evaluate")
+                iterator.set_description(description)
+                iterator.refresh()
+            if patience == 0:
+                break
+        evaluator.close()
+        # the best checkpoint of the fold is reloaded after the folds, wait for it to be committed (by rank 0)
+        checkpoint_writer.close()
+        distributed.barrier()
+        self.logger.info(training_metrics.summary())
+        test_acc, test_f1 = self._evaluate_acc_f1(self.test_dataloader)
+        return {
+            "fold": f,
+            "test_acc": test_acc,
+            "test_f1": test_f1,
+            "save_path": save_path,
+            "max_test_metrics": dict(self.config.max_test_metrics),
+            "loss": training_metrics.loss,
+        }
+
+    def _compute_loss(self, criterion, outputs, sample_batched):
+        """
+        Compute the training loss of a batch, the loss returned by the model if any, otherwise the criterion.
+
+        :param criterion: the loss function
+        :param outputs: the outputs of the model
+        :param sample_batched: the batch
+        """
+        if isinstance(outputs, dict) and "loss" in outputs and outputs["loss"] != 0:
+            return outputs["loss"]
+        targets = sample_batched["polarity"].to(self.config.device)
+        return criterion(outputs["logits"], targets)
+
     def _evaluate_acc_f1(self, test_dataloader):
         # switch model to evaluation mode
         self.model.eval()
         n_test_correct, n_test_total = 0, 0
         t_targets_all, t_outputs_all = None, None
+        config = self.config.frozen_view("device", "inputs_cols")
         with torch.no_grad():
             for t_batch, t_sample_batched in enumerate(test_dataloader):
                 t_inputs = {
-                    col: t_sample_batched[col].to(self.config.device)
-                    for col in self.config.inputs_cols
+                    col: t_sample_batched[col].to(config.device)
+                    for col in config.inputs_cols
                 }
 
-                t_targets = t_sample_batched["polarity"].to(self.config.device)
+                t_targets = t_sample_batched["polarity"].to(config.device)
 
                 t_outputs = self.model(t_inputs)
 
@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+# file: distillation_instructor.py
+# time: 19/10/2026 23:55
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+import os
+import pickle
+import time
+from hashlib import sha256
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from torch.utils.data import DataLoader, Dataset, RandomSampler
+
+from pyabsa.framework.flag_class.flag_template import LabelPaddingOption
+from pyabsa.framework.instructor_class import distributed
+from pyabsa.utils.file_utils.file_utils import load_dataset_from_file
+from pyabsa.utils.pyabsa_utils import fprint
+from .apc_instructor import APCTrainingInstructor
+from ..dataset_utils.__lcf__.data_utils_for_inference import ABSAInferenceDataset
+from ..prediction.sentiment_classifier import SentimentClassifier
+
+
+def load_teachers(teacher, auto_device=True):
+    """
+    :param teacher: a SentimentClassifier or a checkpoint, or a list of them to distill an ensemble
+    :param auto_device: the device of the teachers loaded from checkpoints
+    :return: the list of teacher SentimentClassifiers
+    """
+    if teacher is None:
+        raise ValueError("Please specify the teacher to distill from")
+    teachers = teacher if isinstance(teacher, (list, tuple)) else [teacher]
+    return [
+        SentimentClassifier(t, auto_device=auto_device) if isinstance(t, str) else t
+        for t in teachers
+    ]
+
+
+class APCDistillationInstructor(APCTrainingInstructor):
+    """
+    Train an APC model (the student) to mimic a teacher SentimentClassifier, or the mean of several ones.
+
+    The teacher probabilities (soft labels) of the training set, and of the unlabeled examples if any, are computed
+    once and cached in config.distill_cache_dir. The student is trained with
+        distill_alpha * T^2 * KL(teacher || student at temperature T) + (1 - distill_alpha) * CE(student, label),
+    where T is config.distill_temperature, the unlabeled examples only contribute to the KL term.
+
+    After training, the agreement of the teacher and the student on the test set and their latency per example are
+    logged and stored in config.distillation_report.
+
+    The student should be featurized by the LCF datasets (i.e., a model of APCModelList, e.g., FAST_LCF_BERT),
+    whose examples keep the text and aspect used to match the soft labels.
+    """
+
+    def __init__(self, config, teacher=None, unlabeled_dataset=None):
+        """
+        :param config: the training config of the student
+        :param teacher: a SentimentClassifier or a checkpoint, or a list of them to distill an ensemble
+        :param unlabeled_dataset: the inference files, or a list of texts, in the inference format
+            (e.g., "the [B-ASP]food[E-ASP] is great"), labeled by the teacher only
+        """
+        self.teachers = load_teachers(teacher, config.get("auto_device", True))
+        self.unlabeled_dataset = unlabeled_dataset
+        super().__init__(config)
+
+    def _load_dataset_and_prepare_dataloader(self):
+        super()._load_dataset_and_prepare_dataloader()
+
+        if not all(
+            "text_raw" in sample and "aspect" in sample
+            for sample in self.train_set.data[:1]
+        ):
+            raise ValueError(
+                "Distillation needs a student featurized by the LCF datasets (APCModelList), got {}".format(
+                    self.config.model_name
+                )
+            )
+
+        unlabeled_texts = _read_texts(self.unlabeled_dataset)
+        soft_labels = self._soft_labels(
+            _read_examples(self.config.dataset_file["train"], self.config)
+            + unlabeled_texts
+        )
+
+        # the featurized datasets may be shared with other trainings, e.g., by the seeds, so they are copied
+        samples = []
+        num_missing = 0
+        for sample in self.train_set.data:
+            probs = soft_labels.get(_example_key(sample["text_raw"], sample["aspect"]))
+            if probs is None:
+                # the teacher failed on the example, fall back to the label
+                num_missing += 1
+                probs = np.zeros(self.config.output_dim, dtype=np.float32)
+                probs[int(sample["polarity"])] = 1
+            samples.append(dict(sample, teacher_probs=torch.tensor(probs)))
+        if num_missing:
+            self.logger.info(
+                "{} training examples are not labeled by the teacher".format(
+                    num_missing
+                )
+            )
+
+        if unlabeled_texts:
+            template = self.train_set.data[0]
+            unlabeled_set = ABSAInferenceDataset(self.config, self.tokenizer)
+            unlabeled_set.prepare_infer_sample(unlabeled_texts, ignore_error=True)
+            for sample in unlabeled_set.data:
+                probs = soft_labels.get(
+                    _example_key(sample["text_raw"], sample["aspect"])
+                )
+                if probs is None:
+                    continue
+                unlabeled = dict(template)
+                unlabeled.update(
+                    {
+                        col: torch.as_tensor(sample[col])
+                        for col in self.config.inputs_cols
+                    }
+                )
+                unlabeled["text_raw"] = sample["text_raw"]
+                unlabeled["aspect"] = sample["aspect"]
+                unlabeled["polarity"] = torch.tensor(
+                    LabelPaddingOption.SENTIMENT_PADDING
+                )
+                unlabeled["teacher_probs"] = torch.tensor(probs)
+                samples.append(unlabeled)
+            self.logger.info(
+                "Unlabeled examples = {}".format(len(samples) - len(self.train_set))
+            )
+
+        self.train_set = DistillationDataset(samples)
+        self.train_dataloader = DataLoader(
+            self.train_set,
+            batch_size=self.config.batch_size,
+            pin_memory=True,
+            sampler=(
+                self._distributed_sampler(self.train_set)
+                if distributed.is_distributed()
+                else RandomSampler(self.train_set)
+            ),
+        )
+
+    def _compute_loss(self, criterion, outputs, sample_batched):
+        temperature = self.config.get("distill_temperature", 2.0)
+        alpha = self.config.get("distill_alpha", 0.5)
+
+        logits = outputs["logits"]
+        teacher_probs = sample_batched["teacher_probs"].to(self.config.device)
+        # the teacher probabilities at temperature T, i.e., softmax(teacher logits / T)
+        soft_targets = torch.softmax(
+            torch.log(teacher_probs.clamp_min(1e-8)) / temperature, dim=-1
+        )
+        kd_loss = F.kl_div(
+            F.log_softmax(logits / temperature, dim=-1),
+            soft_targets,
+            reduction="batchmean",
+        ) * (temperature**2)
+
+        targets = sample_batched["polarity"]
+        if (targets != LabelPaddingOption.SENTIMENT_PADDING).any():
+            ce_loss = super()._compute_loss(criterion, outputs, sample_batched)
+        else:
+            ce_loss = logits.new_zeros(())
+        return alpha * kd_loss + (1 - alpha) * ce_loss
+
+    def _soft_labels(self, texts):
+        """
+        :param texts: the examples in the inference format
+        :return: a dict of the example keys to the mean probabilities of the teachers, in the label order of the student
+        """
+        labels = [self.config.index_to_label[i] for i in range(self.config.output_dim)]
+        cache_path = None
+        fingerprints = [_teacher_fingerprint(t) for t in self.teachers]
+        # the weights of the ONNX teachers are not readable, their soft labels are not cached
+        if all(fingerprints):
+            fingerprint = sha256(
+                "\n".join(fingerprints + labels + texts).encode()
+            ).hexdigest()
+            cache_path = os.path.join(
+                self.config.get("distill_cache_dir", "distillation_cache"),
+                "{}.{}.soft_labels".format(self.config.dataset_name, fingerprint[:16]),
+            )
+            if os.path.exists(cache_path):
+                fprint("Load the soft labels from {}".format(cache_path))
+                with open(cache_path, mode="rb") as f:
+                    return pickle.load(f)
+
+        soft_labels = {}
+        counts = {}
+        for teacher in self.teachers:
+            missing = [l for l in labels if l not in teacher.config.label_to_index]
+            if missing:
+                raise ValueError(
+                    "The labels {} are not predicted by the teacher {}".format(
+                        missing, teacher.checkpoint
+                    )
+                )
+            order = [teacher.config.label_to_index[l] for l in labels]
+            results = teacher.predict(
+                texts,
+                print_result=False,
+                ignore_error=True,
+                merge_results=False,
+                eval_batch_size=self.config.get("distill_batch_size", 64),
+            )
+            for result in results:
+                key = _example_key(result["text"], result["aspect"])
+                probs = np.asarray(result["probs"], dtype=np.float32)[order]
+                soft_labels[key] = soft_labels.get(key, 0) + probs
+                counts[key] = counts.get(key, 0) + 1
+        soft_labels = {
+            key: (probs / counts[key]).astype(np.float32)
+            for key, probs in soft_labels.items()
+        }
+
+        if cache_path and distributed.is_main_process():
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path + ".tmp", mode="wb") as f:
+                pickle.dump(soft_labels, f)
+            os.replace(cache_path + ".tmp", cache_path)
+        return soft_labels
+
+    def run(self):
+        result = super().run()
+        if distributed.is_main_process() and self.config.dataset_file.get("test"):
+            self.config.distillation_report = self._distillation_report(result)
+        return result
+
+    def _distillation_report(self, checkpoint):
+        """
+        Compare the trained student with the teacher on the test set.
+
+        :param checkpoint: the checkpoint returned by the training, a path or (model, config, tokenizer)
+        :return: a dict of the agreement, accuracies and latencies
+        """
+        texts = _read_examples(self.config.dataset_file["test"], self.config)
+        teacher_labels = self._soft_labels(texts)
+        student = SentimentClassifier(
+            checkpoint, auto_device=self.config.get("auto_device", True)
+        )
+        batch_size = self.config.get("distill_batch_size", 64)
+
+        n_agree = n_labeled = n_student_correct = n_teacher_correct = n_total = 0
+        for result in student.predict(
+            texts,
+            print_result=False,
+            ignore_error=True,
+            merge_results=False,
+            eval_batch_size=batch_size,
+        ):
+            probs = teacher_labels.get(_example_key(result["text"], result["aspect"]))
+            if probs is None:
+                continue
+            teacher_sentiment = self.config.index_to_label[int(np.argmax(probs))]
+            n_total += 1
+            n_agree += teacher_sentiment == result["sentiment"]
+            if self.config.label_to_index.get(result["ref_sentiment"], -1) >= 0:
+                n_labeled += 1
+                n_teacher_correct += teacher_sentiment == result["ref_sentiment"]
+                n_student_correct += result["sentiment"] == result["ref_sentiment"]
+
+        latency_texts = texts[: self.config.get("distill_latency_samples", 256)]
+        teacher_latency = sum(
+            _latency(teacher, latency_texts, batch_size) for teacher in self.teachers
+        )
+        student_latency = _latency(student, latency_texts, batch_size)
+
+        report = {
+            "agreement": n_agree / n_total if n_total else None,
+            "teacher_test_acc": n_teacher_correct / n_labeled if n_labeled else None,
+            "student_test_acc": n_student_correct / n_labeled if n_labeled else None,
+            "teacher_latency_ms": teacher_latency * 1000,
+            "student_latency_ms": student_latency * 1000,
+            "speedup": teacher_latency / student_latency if student_latency else None,
+        }
+        self.logger.info(
+            "Distillation report (test set, {} examples): {}".format(n_total, report)
+        )
+        return report
+
+
+class DistillationDataset(Dataset):
+    """
+    The training examples of the student, with the soft labels of the teacher.
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+    def __getitem__(self, index):
+        return self.data[index]
+
+    def __len__(self):
+        return len(self.data)
+
+
+def _read_examples(dataset_file, config):
+    """
+    :return: the examples of APC training files in the inference format, with the reference labels
+    """
+    lines = load_dataset_from_file(dataset_file, config=config)
+    texts = []
+    for i in range(0, len(lines) - 2, 3):
+        if lines[i].count("$T$") > 1:
+            continue
+        text_left, _, text_right = [s.strip() for s in lines[i].partition("$T$")]
+        texts.append(
+            "{} [B-ASP]{}[E-ASP] {} $LABEL$ {}".format(
+                text_left, lines[i + 1].strip(), text_right, lines[i + 2].strip()
+            )
+        )
+    return texts
+
+
+def _read_texts(dataset):
+    """
+    :param dataset: None, an inference file, or a list of files or texts
+    """
+    if not dataset:
+        return []
+    texts = []
+    for item in [dataset] if isinstance(dataset, str) else dataset:
+        if os.path.isfile(item):
+            with open(item, mode="r", encoding="utf-8") as f:
+                texts.extend(line.strip() for line in f if line.strip())
+        else:
+            texts.append(item)
+    return texts
+
+
+def _teacher_fingerprint(teacher):
+    """
+    :return: the hash of the weights and the inference settings of the teacher, or None if its weights are not readable
+    """
+    if not hasattr(teacher.model, "state_dict"):
+        return None
+    # the bytes of the weights identify the teacher, wherever it is loaded from, e.g., a re-trained checkpoint
+    fingerprint = sha256()
+    for name, value in teacher.model.state_dict().items():
+        fingerprint.update(name.encode())
+        # the packed weights of the quantized layers are tuples of tensors
+        for tensor in value if isinstance(value, (list, tuple)) else [value]:
+            if not isinstance(tensor, torch.Tensor):
+                fingerprint.update(repr(tensor).encode())
+                continue
+            if tensor.is_quantized:
+                tensor = tensor.dequantize()
+            fingerprint.update(
+                tensor.detach()
+                .cpu()
+                .contiguous()
+                .reshape(-1)
+                .view(torch.uint8)
+                .numpy()
+                .tobytes()
+            )
+    fingerprint.update(
+        "{}-{}-{}".format(
+            sorted(teacher.config.label_to_index.items()),
+            teacher.config.get("max_seq_len"),
+            teacher.config.get("pretrained_bert"),
+        ).encode()
+    )
+    return fingerprint.hexdigest()
+
+
+def _example_key(text, aspect):
+    # the datasets of the teacher and the student may differ in whitespace and case
+    return "".join(text.lower().split()) + "\t" + "".join(aspect.lower().split())
+
+
+def _latency(predictor, texts, batch_size):
+    """
+    :return: the end-to-end prediction time per example of the predictor, in seconds
+    """
+    if not texts:
+        return 0
+    # warm up
+    predictor.predict(texts[:1], print_result=False, merge_results=False)
+    start = time.perf_counter()
+    predictor.predict(
+        texts, print_result=False, merge_results=False, eval_batch_size=batch_size
+    )
+    return (time.perf_counter() - start) / len(texts)
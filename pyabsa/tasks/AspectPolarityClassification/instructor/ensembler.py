@@ -17,8 +17,9 @@ from torch.nn import ModuleList
 
 import torch
 from torch.utils.data import DataLoader, RandomSampler, SequentialSampler
-from transformers import AutoTokenizer, AutoModel
+from transformers import AutoTokenizer, AutoModel, AutoConfig
 
+from pyabsa.framework.dataset_class import feature_store
 from pyabsa.utils.pyabsa_utils import fprint
 from ..models.__classic__ import GloVeAPCModelList
 from ..models.__lcf__ import APCModelList
@@ -47,6 +48,13 @@ def model_pool_check(models):
 
 class APCEnsembler(nn.Module):
     def __init__(self, config, load_dataset=True, **kwargs):
+        """
+        :param config: the config of the models
+        :param load_dataset: load the datasets and build the dataloaders
+        :param kwargs: "tokenizer" and "embedding_matrix" reuse a loaded tokenizer and embedding matrix,
+            "pretrained_path" builds the PLM from the local config.json in this directory without loading its weights,
+            e.g., when the weights are loaded from a checkpoint afterwards
+        """
         super(APCEnsembler, self).__init__()
         self.config = config
 
@@ -61,9 +69,10 @@ class APCEnsembler(nn.Module):
 
         self.models = ModuleList()
 
-        self.tokenizer = None
+        self.tokenizer = kwargs.get("tokenizer", None)
         self.bert = None
-        self.embedding_matrix = None
+        self.embedding_matrix = kwargs.get("embedding_matrix", None)
+        pretrained_path = kwargs.get("pretrained_path", None)
         self.train_set = None
         self.test_set = None
         self.valid_set = None
@@ -89,7 +98,13 @@ class APCEnsembler(nn.Module):
                 self.config.model_name, self.config.dataset_name, hash_tag
             )
 
-            if (
+            features = (
+                feature_store.lookup(cache_path, self.config) if load_dataset else None
+            )
+            if features:
+                # reuse the datasets featurized in this process, e.g., by another seed
+                self.train_set, self.valid_set, self.test_set = features
+            elif (
                 load_dataset
                 and os.path.exists(cache_path)
                 and not self.config.overwrite_cache
@@ -106,7 +121,20 @@ class APCEnsembler(nn.Module):
                     config.args_call_count.update(self.config.args_call_count)
             if hasattr(APCModelList, models[i].__name__):
                 try:
-                    if kwargs.get("offline", False):
+                    if pretrained_path:
+                        self.tokenizer = (
+                            AutoTokenizer.from_pretrained(pretrained_path)
+                            if not self.tokenizer
+                            else self.tokenizer
+                        )
+                        self.bert = (
+                            AutoModel.from_config(
+                                AutoConfig.from_pretrained(pretrained_path)
+                            )
+                            if not self.bert
+                            else self.bert
+                        )
+                    elif kwargs.get("offline", False):
                         self.tokenizer = AutoTokenizer.from_pretrained(
                             find_cwd_dir(self.config.pretrained_bert.split("/")[-1]),
                             do_lower_case="uncased" in self.config.pretrained_bert,
@@ -160,11 +188,20 @@ class APCEnsembler(nn.Module):
                     if not self.tokenizer
                     else self.tokenizer
                 )
-                self.bert = (
-                    AutoModel.from_pretrained(self.config.pretrained_bert)
-                    if not self.bert
-                    else self.bert
-                )
+                if pretrained_path:
+                    self.bert = (
+                        AutoModel.from_config(
+                            AutoConfig.from_pretrained(pretrained_path)
+                        )
+                        if not self.bert
+                        else self.bert
+                    )
+                else:
+                    self.bert = (
+                        AutoModel.from_pretrained(self.config.pretrained_bert)
+                        if not self.bert
+                        else self.bert
+                    )
 
                 if (
                     load_dataset
@@ -220,7 +257,7 @@ class APCEnsembler(nn.Module):
                             str(config.embed_dim), os.path.basename(config.dataset_name)
                         ),
                     )
-                    if not self.embedding_matrix
+                    if self.embedding_matrix is None
                     else self.embedding_matrix
                 )
 
@@ -279,6 +316,13 @@ class APCEnsembler(nn.Module):
                     )
 
             if load_dataset:
+                feature_store.store(
+                    cache_path,
+                    self.train_set,
+                    self.valid_set,
+                    self.test_set,
+                    self.config,
+                )
                 train_sampler = RandomSampler(self.train_set)
                 self.train_dataloader = DataLoader(
                     self.train_set,
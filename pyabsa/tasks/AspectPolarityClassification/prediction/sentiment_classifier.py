@@ -2,7 +2,6 @@
 # file: sentiment_classifier.py
 # author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
 # Copyright (C) 2020. All Rights Reserved.
-import json
 import os
 import pickle
 from typing import Union
@@ -10,7 +9,6 @@ from typing import Union
 import numpy as np
 import torch
 import tqdm
-from findfile import find_file
 from sklearn import metrics
 from termcolor import colored
 from torch.utils.data import DataLoader
@@ -21,6 +19,10 @@ from pyabsa.framework.flag_class.flag_template import (
     DeviceTypeOption,
 )
 from pyabsa.framework.prediction_class.predictor_template import InferenceModel
+from pyabsa.framework.checkpoint_class.checkpoint_format import (
+    is_safetensors_checkpoint,
+    load_safetensors_checkpoint,
+)
 from ..models.__plm__ import BERTBaselineAPCModelList
 from ..models.__classic__ import GloVeAPCModelList
 from ..models.__lcf__ import APCModelList
@@ -32,10 +34,13 @@ from ..dataset_utils.__plm__.data_utils_for_inference import BERTABSAInferenceDa
 from ..instructor.ensembler import APCEnsembler
 from pyabsa.utils.data_utils.dataset_manager import detect_infer_dataset
 from pyabsa.utils.pyabsa_utils import set_device, print_args, fprint, rprint
+from pyabsa.framework.checkpoint_class.checkpoint_registry import find_checkpoint_files
 
 
 class SentimentClassifier(InferenceModel):
     task_code = TaskCodeOption.Aspect_Polarity_Classification
+    inputs_as_dict = True
+    warmup_text = "The [B-ASP]food[E-ASP] is good"
 
     def __init__(self, checkpoint=None, **kwargs):
         super().__init__(checkpoint, task_code=self.task_code, **kwargs)
@@ -55,46 +60,54 @@ class SentimentClassifier(InferenceModel):
                     )
                 fprint("Load sentiment classifier from", self.checkpoint)
 
-                state_dict_path = find_file(
-                    self.checkpoint, ".state_dict", exclude_key=["__MACOSX"]
-                )
-                model_path = find_file(
-                    self.checkpoint, ".model", exclude_key=["__MACOSX"]
-                )
-                tokenizer_path = find_file(
-                    self.checkpoint, ".tokenizer", exclude_key=["__MACOSX"]
-                )
-                config_path = find_file(
-                    self.checkpoint, ".config", exclude_key=["__MACOSX"]
-                )
-
-                fprint("config: {}".format(config_path))
-                fprint("state_dict: {}".format(state_dict_path))
-                fprint("model: {}".format(model_path))
-                fprint("tokenizer: {}".format(tokenizer_path))
-
-                with open(config_path, mode="rb") as f:
-                    self.config = pickle.load(f)
+                if is_safetensors_checkpoint(self.checkpoint):
+                    # the weights are memory-mapped, the PLM is neither downloaded nor initialized
+                    (
+                        self.model,
+                        self.config,
+                        self.tokenizer,
+                    ) = load_safetensors_checkpoint(
+                        self.checkpoint, APCEnsembler, **kwargs
+                    )
                     self.config.auto_device = kwargs.get("auto_device", True)
                     set_device(self.config, self.config.auto_device)
+                else:
+                    checkpoint_files = find_checkpoint_files(self.checkpoint)
+                    state_dict_path = checkpoint_files["state_dict"]
+                    model_path = checkpoint_files["model"]
+                    tokenizer_path = checkpoint_files["tokenizer"]
+                    config_path = checkpoint_files["config"]
+
+                    fprint("config: {}".format(config_path))
+                    fprint("state_dict: {}".format(state_dict_path))
+                    fprint("model: {}".format(model_path))
+                    fprint("tokenizer: {}".format(tokenizer_path))
+
+                    with open(config_path, mode="rb") as f:
+                        self.config = pickle.load(f)
+                        self.config.auto_device = kwargs.get("auto_device", True)
+                        set_device(self.config, self.config.auto_device)
+
+                    if state_dict_path or model_path:
+                        if state_dict_path:
+                            self.model = APCEnsembler(
+                                self.config, load_dataset=False, **kwargs
+                            )
+                            self.model.load_state_dict(
+                                torch.load(
+                                    state_dict_path, map_location=DeviceTypeOption.CPU
+                                ),
+                                strict=False,
+                            )
+                        elif model_path:
+                            self.model = torch.load(
+                                model_path, map_location=DeviceTypeOption.CPU
+                            )
+                    else:
+                        # an exported checkpoint, run with onnxruntime
+                        self.model = self._load_onnx_model(**kwargs)
 
-                if state_dict_path or model_path:
-                    if state_dict_path:
-                        self.model = APCEnsembler(
-                            self.config, load_dataset=False, **kwargs
-                        )
-                        self.model.load_state_dict(
-                            torch.load(
-                                state_dict_path, map_location=DeviceTypeOption.CPU
-                            ),
-                            strict=False,
-                        )
-                    elif model_path:
-                        self.model = torch.load(
-                            model_path, map_location=DeviceTypeOption.CPU
-                        )
-
-                self.tokenizer = self.config.tokenizer
+                    self.tokenizer = self.config.tokenizer
 
                 if kwargs.get("verbose", False):
                     fprint("Config used in Training:")
@@ -208,7 +221,9 @@ class SentimentClassifier(InferenceModel):
         if not target_file:
             raise FileNotFoundError("Can not find inference datasets!")
 
-        self.dataset.prepare_infer_dataset(target_file, ignore_error=ignore_error)
+        with self.profiler.span("featurize") as span:
+            self.dataset.prepare_infer_dataset(target_file, ignore_error=ignore_error)
+            span.add(examples=len(self.dataset))
         self.infer_dataloader = DataLoader(
             dataset=self.dataset,
             batch_size=self.config.eval_batch_size,
@@ -238,7 +253,9 @@ class SentimentClassifier(InferenceModel):
             dataset=self.dataset, batch_size=self.config.eval_batch_size, shuffle=False
         )
         if text:
-            self.dataset.prepare_infer_sample(text, ignore_error=ignore_error)
+            with self.profiler.span("featurize") as span:
+                self.dataset.prepare_infer_sample(text, ignore_error=ignore_error)
+                span.add(examples=len(self.dataset))
         else:
             raise RuntimeError("Please specify your datasets path!")
         if isinstance(text, str):
@@ -291,7 +308,7 @@ class SentimentClassifier(InferenceModel):
         correct = {True: "Correct", False: "Wrong"}
         results = []
 
-        with torch.no_grad():
+        with self._inference_context():
             self.model.eval()
             n_correct = 0
             n_labeled = 0
@@ -302,93 +319,111 @@ class SentimentClassifier(InferenceModel):
                 it = tqdm.tqdm(self.infer_dataloader, desc="run inference")
             else:
                 it = self.infer_dataloader
+            # the parameters read per batch and per example, see ConfigManager.frozen_view()
+            config = self.config.frozen_view(
+                "device", "label_to_index", "index_to_label", "max_seq_len"
+            )
+            input_cols = [col for col in self.config.inputs_cols if col != "polarity"]
+            profiler = self.profiler
             for _, sample in enumerate(it):
-                inputs = {
-                    col: sample[col].to(self.config.device)
-                    for col in self.config.inputs_cols
-                    if col != "polarity"
-                }
-                self.model.eval()
-                outputs = self.model(inputs)
+                batch_size = len(sample["polarity"])
+                with profiler.span("h2d", examples=batch_size):
+                    inputs = {col: sample[col].to(config.device) for col in input_cols}
+                outputs = self._forward(inputs)
                 sen_logits = outputs["logits"]
 
-                if t_targets_all is None:
-                    t_targets_all = np.array(
-                        [
-                            self.config.label_to_index[x]
-                            if x in self.config.label_to_index
-                            else LabelPaddingOption.SENTIMENT_PADDING
-                            for x in sample["polarity"]
-                        ]
-                    )
-                    t_outputs_all = np.array(sen_logits.cpu()).astype(np.float32)
-                else:
-                    t_targets_all = np.concatenate(
-                        (
-                            t_targets_all,
+                with profiler.span("softmax", examples=batch_size):
+                    t_probs = torch.softmax(sen_logits, dim=-1)
+                with profiler.span("result_assembly", examples=batch_size):
+                    if t_targets_all is None:
+                        t_targets_all = np.array(
                             [
-                                self.config.label_to_index[x]
-                                if x in self.config.label_to_index
-                                else LabelPaddingOption.SENTIMENT_PADDING
+                                (
+                                    config.label_to_index[x]
+                                    if x in config.label_to_index
+                                    else LabelPaddingOption.SENTIMENT_PADDING
+                                )
                                 for x in sample["polarity"]
-                            ],
-                        ),
-                        axis=0,
-                    )
-                    t_outputs_all = np.concatenate(
-                        (t_outputs_all, np.array(sen_logits.cpu()).astype(np.float32)),
-                        axis=0,
-                    )
-
-                t_probs = torch.softmax(sen_logits, dim=-1)
-                for i, i_probs in enumerate(t_probs):
-                    sent = self.config.index_to_label[int(i_probs.argmax(axis=-1))]
-                    real_sent = sample["polarity"][i]
-                    if real_sent != LabelPaddingOption.SENTIMENT_PADDING:
-                        n_labeled += 1
-                    if sent == real_sent:
-                        n_correct += 1
-
-                    confidence = float(max(i_probs))
-
-                    aspect = sample["aspect"][i]
-                    text_raw = sample["text_raw"][i]
-
-                    if self.cal_perplexity:
-                        ids = self.MLM_tokenizer(
-                            text_raw,
-                            truncation=True,
-                            padding="max_length",
-                            max_length=self.config.max_seq_len,
-                            return_tensors="pt",
+                            ]
                         )
-                        ids["labels"] = ids["input_ids"].clone()
-                        ids = ids.to(self.config.device)
-                        loss = self.MLM(**ids)["loss"]
-                        perplexity = float(torch.exp(loss / ids["input_ids"].size(1)))
+                        t_outputs_all = np.array(sen_logits.cpu()).astype(np.float32)
                     else:
-                        perplexity = "N.A."
-
-                    results.append(
-                        {
-                            "text": text_raw,
-                            "aspect": aspect,
-                            "sentiment": sent,
-                            "confidence": confidence,
-                            "probs": i_probs.cpu().numpy(),
-                            "ref_sentiment": real_sent,
-                            "ref_check": correct[sent == real_sent]
-                            if real_sent != str(LabelPaddingOption.LABEL_PADDING)
-                            else "",
-                            "perplexity": perplexity,
-                        }
-                    )
-                    n_total += 1
+                        t_targets_all = np.concatenate(
+                            (
+                                t_targets_all,
+                                [
+                                    (
+                                        config.label_to_index[x]
+                                        if x in config.label_to_index
+                                        else LabelPaddingOption.SENTIMENT_PADDING
+                                    )
+                                    for x in sample["polarity"]
+                                ],
+                            ),
+                            axis=0,
+                        )
+                        t_outputs_all = np.concatenate(
+                            (
+                                t_outputs_all,
+                                np.array(sen_logits.cpu()).astype(np.float32),
+                            ),
+                            axis=0,
+                        )
+
+                    for i, i_probs in enumerate(t_probs):
+                        sent = config.index_to_label[int(i_probs.argmax(axis=-1))]
+                        real_sent = sample["polarity"][i]
+                        if real_sent != LabelPaddingOption.SENTIMENT_PADDING:
+                            n_labeled += 1
+                        if sent == real_sent:
+                            n_correct += 1
+
+                        confidence = float(max(i_probs))
+
+                        aspect = sample["aspect"][i]
+                        text_raw = sample["text_raw"][i]
+
+                        if self.cal_perplexity:
+                            ids = self.MLM_tokenizer(
+                                text_raw,
+                                truncation=True,
+                                padding="max_length",
+                                max_length=config.max_seq_len,
+                                return_tensors="pt",
+                            )
+                            ids["labels"] = ids["input_ids"].clone()
+                            ids = ids.to(config.device)
+                            loss = self.MLM(**ids)["loss"]
+                            perplexity = float(
+                                torch.exp(loss / ids["input_ids"].size(1))
+                            )
+                        else:
+                            perplexity = "N.A."
+
+                        results.append(
+                            {
+                                "text": text_raw,
+                                "aspect": aspect,
+                                "sentiment": sent,
+                                "confidence": confidence,
+                                "probs": i_probs.cpu().numpy(),
+                                "ref_sentiment": real_sent,
+                                "ref_check": (
+                                    correct[sent == real_sent]
+                                    if real_sent
+                                    != str(LabelPaddingOption.LABEL_PADDING)
+                                    else ""
+                                ),
+                                "perplexity": perplexity,
+                            }
+                        )
+                        n_total += 1
         if kwargs.get("merge_results", True):
             results = self.merge_results(results)
         try:
             if print_result:
-                for ex_id, result in enumerate(results):
+                for ex_id in self._printed_examples(len(results), print_result):
+                    result = results[ex_id]
                     # flag = False  # only print error cases
                     # for ref_check in result['ref_check']:
                     #     if ref_check == 'Wrong':
@@ -437,10 +472,7 @@ class SentimentClassifier(InferenceModel):
                             "yellow",
                         )
                     fprint("Example {}: {}".format(ex_id, text_printing))
-            if save_path:
-                with open(save_path, "w", encoding="utf8") as fout:
-                    json.dump(str(results), fout, ensure_ascii=False)
-                    fprint("inference result saved in: {}".format(save_path))
+            self._save_results(results, save_path)
         except Exception as e:
             fprint("Can not save result: {}, Exception: {}".format(text_raw, e))
 
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# file: apc_distillation_trainer.py
+# time: 19/10/2026 23:55
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+import functools
+from typing import Union
+
+from pyabsa.framework.flag_class.flag_template import (
+    DeviceTypeOption,
+    ModelSaveOption,
+    TaskCodeOption,
+    TaskNameOption,
+)
+from pyabsa.framework.trainer_class.trainer_template import Trainer
+from ..configuration.apc_configuration import APCConfigManager
+from ..prediction.sentiment_classifier import SentimentClassifier
+from ..instructor.distillation_instructor import (
+    APCDistillationInstructor,
+    load_teachers,
+)
+
+
+class APCDistillationTrainer(Trainer):
+    def __init__(
+        self,
+        config: APCConfigManager = None,
+        dataset=None,
+        teacher=None,
+        unlabeled_dataset=None,
+        from_checkpoint: str = None,
+        checkpoint_save_mode: int = ModelSaveOption.SAVE_MODEL_STATE_DICT,
+        auto_device: Union[bool, str] = DeviceTypeOption.AUTO,
+        path_to_save=None,
+        load_aug=False,
+    ):
+        """
+        Init a trainer for distilling a APC model (e.g., a large one or an ensemble) into a smaller APC model,
+        after trainer, you need to call load_trained_model() to get the trained model for inference.
+        The distillation options are config.distill_temperature (default 2), config.distill_alpha (the weight of the
+        KL loss, default 0.5) and config.distill_cache_dir (the cache of the soft labels).
+
+        :param config: PyABSA.config.ConfigManager of the student
+        :param dataset: Dataset name, or a dataset_manager path, or a list of dataset_manager paths
+        :param teacher: A SentimentClassifier or a checkpoint, or a list of them to distill an ensemble
+        :param unlabeled_dataset: Inference files, or a list of texts in the inference format, labeled by the teacher
+        :param from_checkpoint: A checkpoint path to train based on
+        :param checkpoint_save_mode: Save trained model to checkpoint,
+                                     "checkpoint_save_mode=1" to save the state_dict,
+                                     "checkpoint_save_mode=2" to save the whole model,
+                                     "checkpoint_save_mode=3" to save the fine-tuned BERT,
+                                     otherwise avoid saving checkpoint but return the trained model after trainer
+        :param auto_device: True or False, otherwise 'allcuda', 'cuda:1', 'cpu' works
+        :param path_to_save=None: Specify path to save checkpoints
+        :param load_aug=False: Load the available augmentation dataset if any
+
+        """
+        super(APCDistillationTrainer, self).__init__(
+            config=config,
+            dataset=dataset,
+            from_checkpoint=from_checkpoint,
+            checkpoint_save_mode=checkpoint_save_mode,
+            auto_device=auto_device,
+            path_to_save=path_to_save,
+            load_aug=load_aug,
+        )
+
+        # the teachers are loaded once for all the seeds
+        self.training_instructor = functools.partial(
+            APCDistillationInstructor,
+            teacher=load_teachers(teacher, auto_device),
+            unlabeled_dataset=unlabeled_dataset,
+        )
+        self.inference_model_class = SentimentClassifier
+        self.config.task_code = TaskCodeOption.Aspect_Polarity_Classification
+        self.config.task_name = TaskNameOption().get(
+            TaskCodeOption.Aspect_Polarity_Classification
+        )
+
+        self._run()
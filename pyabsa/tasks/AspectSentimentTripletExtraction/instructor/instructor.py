@@ -7,7 +7,6 @@
 import os
 import pickle
 import random
-import shutil
 import time
 
 import numpy as np
@@ -22,14 +21,15 @@ from pyabsa.tasks.AspectSentimentTripletExtraction.dataset_utils.aste_utils impo
 )
 from pyabsa.utils.pyabsa_utils import fprint, init_optimizer, print_args
 
-from pyabsa.utils.file_utils.file_utils import save_model
 
 from pyabsa.framework.flag_class import DeviceTypeOption
-from tqdm import tqdm
 
 from pyabsa.framework.tokenizer_class.tokenizer_class import PretrainedTokenizer
 
+from pyabsa.framework.checkpoint_class.checkpoint_writer import CheckpointWriter
 from pyabsa.framework.instructor_class.instructor_template import BaseTrainingInstructor
+from pyabsa.framework.sweep_class import trial_pruner
+from pyabsa.framework.instructor_class.training_metrics import TrainingMetrics
 from pyabsa.tasks.AspectSentimentTripletExtraction.dataset_utils.data_utils_for_training import (
     ASTEDataset,
 )
@@ -162,7 +162,8 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
         self.config.metrics_of_this_checkpoint = {"f1": 0}
         self.config.max_test_metrics = {"max_apc_test_f1": 0}
 
-        losses = []
+        training_metrics = TrainingMetrics(self.config)
+        checkpoint_writer = self._closing(CheckpointWriter(self.config))
 
         Total_params = 0
         Trainable_params = 0
@@ -212,8 +213,9 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
         for epoch in range(self.config.num_epoch):
             patience -= 1
             description = "Epoch:{} | Loss:{}".format(epoch, 0)
-            iterator = tqdm(self.train_dataloaders[0], desc=description)
+            iterator = self._progress_bar(self.train_dataloaders[0], desc=description)
             for i_batch, sample_batched in enumerate(iterator):
+                training_metrics.mark("data")
                 global_step += 1
                 # switch model to trainer mode, clear gradient accumulators
                 self.model.train()
@@ -337,19 +339,23 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
                 if self.config.auto_device == DeviceTypeOption.ALL_CUDA:
                     loss = loss.mean()
 
-                losses.append(loss.item())
+                training_metrics.update(loss, sample_batched)
+                training_metrics.mark("forward")
 
                 if self.config.use_amp and self.scaler:
                     self.scaler.scale(loss).backward()
+                    training_metrics.mark("backward")
                     self.scaler.step(self.optimizer)
                     self.scaler.update()
                 else:
                     loss.backward()
+                    training_metrics.mark("backward")
                     self.optimizer.step()
 
                 if self.config.warmup_step >= 0:
                     with self.warmup_scheduler.dampening():
                         self.lr_scheduler.step()
+                training_metrics.mark("optimizer")
 
                 # evaluate if test set is available
                 if global_step % self.config.log_step == 0:
@@ -363,6 +369,8 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
                             joint_precision, joint_recall, joint_f1 = self._evaluate_f1(
                                 self.test_dataloader
                             )
+                        # a sweep may stop the trial here, see trial_pruner
+                        trial_pruner.report("eval", joint_f1)
                         self.config.metrics_of_this_checkpoint["f1"] = joint_f1
 
                         if joint_f1 > max_fold_f1:
@@ -371,15 +379,10 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
                                 patience = self.config.patience - 1
 
                             if self.config.model_path_to_save:
-                                if not os.path.exists(self.config.model_path_to_save):
-                                    os.makedirs(self.config.model_path_to_save)
-                                if save_path:
-                                    try:
-                                        shutil.rmtree(save_path)
-                                        # logger.info('Remove sub-optimal trained model:', save_path)
-                                    except:
-                                        # logger.info('Can not remove sub-optimal trained model:', save_path)
-                                        pass
+                                os.makedirs(
+                                    self.config.model_path_to_save, exist_ok=True
+                                )
+                                # the sub-optimal checkpoints are pruned by the writer once the new one is committed
                                 save_path = "{0}/{1}_{2}_f1_{3}/".format(
                                     self.config.model_path_to_save,
                                     self.config.model_name,
@@ -395,8 +398,11 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
                                         "max_apc_test_f1"
                                     ] = joint_f1
 
-                                save_model(
-                                    self.config, self.model, self.tokenizer, save_path
+                                checkpoint_writer.save(
+                                    self.model,
+                                    self.tokenizer,
+                                    save_path,
+                                    metric=global_step,
                                 )
 
                         postfix = "Dev F1:{:>.2f}(max:{:>.2f})".format(
@@ -405,25 +411,20 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
                         )
                         iterator.set_postfix_str(postfix)
                     elif self.config.save_mode and epoch >= self.config.evaluate_begin:
-                        save_model(
-                            self.config,
+                        checkpoint_writer.save(
                             self.model,
                             self.tokenizer,
                             save_path + "_{}/".format(loss.item()),
                         )
                 else:
-                    if self.config.get("loss_display", "smooth") == "smooth":
-                        description = "Epoch:{:>3d} | Smooth Loss: {:>.4f}".format(
-                            epoch, round(np.nanmean(losses), 4)
-                        )
-                    else:
-                        description = "Epoch:{:>3d} | Batch Loss: {:>.4f}".format(
-                            epoch, round(loss.item(), 4)
-                        )
+                    description = training_metrics.description(epoch)
+                training_metrics.mark("evaluate")
                 iterator.set_description(description)
                 iterator.refresh()
             if patience == 0:
                 break
+        # the best checkpoint is reloaded or returned below, wait for it to be committed
+        checkpoint_writer.close()
 
         if not self.valid_dataloaders:
             self.config.MV.log_metric(
@@ -482,7 +483,7 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
         save_path_k_fold = ""
         max_fold_acc_k_fold = 0
 
-        losses = []
+        training_metrics = TrainingMetrics(self.config)
 
         self.config.metrics_of_this_checkpoint = {"acc": 0, "f1": 0}
         self.config.max_test_metrics = {"max_apc_test_acc": 0, "max_apc_test_f1": 0}
@@ -518,6 +519,7 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
                     )
                 )
             global_step = 0
+            checkpoint_writer = self._closing(CheckpointWriter(self.config))
             max_fold_acc = 0
             max_fold_f1 = 0
             save_path = "{0}/{1}_{2}".format(
@@ -528,8 +530,9 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
             for epoch in range(self.config.num_epoch):
                 patience -= 1
                 description = "Epoch:{} | Loss:{}".format(epoch, 0)
-                iterator = tqdm(train_dataloader, desc=description)
+                iterator = self._progress_bar(train_dataloader, desc=description)
                 for i_batch, sample_batched in enumerate(iterator):
+                    training_metrics.mark("data")
                     global_step += 1
                     # switch model to train mode, clear gradient accumulators
                     self.model.train()
@@ -559,25 +562,31 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
                     if self.config.auto_device == DeviceTypeOption.ALL_CUDA:
                         loss = loss.mean()
 
-                    losses.append(loss.item())
+                    training_metrics.update(loss, sample_batched)
+                    training_metrics.mark("forward")
 
                     if self.config.use_amp and self.scaler:
                         self.scaler.scale(loss).backward()
+                        training_metrics.mark("backward")
                         self.scaler.step(self.optimizer)
                         self.scaler.update()
                     else:
                         loss.backward()
+                        training_metrics.mark("backward")
                         self.optimizer.step()
 
                     if self.config.warmup_step >= 0:
                         with self.warmup_scheduler.dampening():
                             self.lr_scheduler.step()
+                    training_metrics.mark("optimizer")
 
                     # evaluate if test set is available
                     if global_step % self.config.log_step == 0:
                         if self.test_dataloader and epoch >= self.config.evaluate_begin:
                             test_acc, f1 = self._evaluate_acc_f1(valid_dataloader)
 
+                            # a sweep may stop the trial here, see trial_pruner
+                            trial_pruner.report("eval", test_acc)
                             self.config.metrics_of_this_checkpoint["acc"] = test_acc
                             self.config.metrics_of_this_checkpoint["f1"] = f1
 
@@ -591,17 +600,10 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
                                     patience = self.config.patience - 1
 
                                 if self.config.model_path_to_save:
-                                    if not os.path.exists(
-                                        self.config.model_path_to_save
-                                    ):
-                                        os.makedirs(self.config.model_path_to_save)
-                                    if save_path:
-                                        try:
-                                            shutil.rmtree(save_path)
-                                            # logger.info('Remove sub-optimal trained model:', save_path)
-                                        except:
-                                            # logger.info('Can not remove sub-optimal trained model:', save_path)
-                                            pass
+                                    os.makedirs(
+                                        self.config.model_path_to_save, exist_ok=True
+                                    )
+                                    # the sub-optimal checkpoints are pruned by the writer once the new one is committed
                                     save_path = "{0}/{1}_{2}_acc_{3}_f1_{4}/".format(
                                         self.config.model_path_to_save,
                                         self.config.model_name,
@@ -629,11 +631,11 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
                                             "max_apc_test_f1"
                                         ] = f1
 
-                                    save_model(
-                                        self.config,
+                                    checkpoint_writer.save(
                                         self.model,
                                         self.tokenizer,
                                         save_path,
+                                        metric=global_step,
                                     )
 
                             postfix = "Dev Acc:{:>.2f}(max:{:>.2f}) Dev F1:{:>.2f}(max:{:>.2f})".format(
@@ -647,26 +649,21 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
                             self.config.save_mode
                             and epoch >= self.config.evaluate_begin
                         ):
-                            save_model(
-                                self.config,
+                            checkpoint_writer.save(
                                 self.model,
                                 self.tokenizer,
                                 save_path + "_{}/".format(loss.item()),
                             )
                     else:
-                        if self.config.get("loss_display", "smooth") == "smooth":
-                            description = "Epoch:{:>3d} | Smooth Loss: {:>.4f}".format(
-                                epoch, round(np.nanmean(losses), 4)
-                            )
-                        else:
-                            description = "Epoch:{:>3d} | Batch Loss: {:>.4f}".format(
-                                epoch, round(loss.item(), 4)
-                            )
+                        description = training_metrics.description(epoch)
 
+                    training_metrics.mark("evaluate")
                     iterator.set_description(description)
                     iterator.refresh()
                 if patience == 0:
                     break
+            # the best checkpoint of the fold is reloaded below, wait for it to be committed
+            checkpoint_writer.close()
             max_fold_acc, max_fold_f1 = self._evaluate_acc_f1(self.test_dataloader)
             if max_fold_acc > max_fold_acc_k_fold:
                 save_path_k_fold = save_path
@@ -715,8 +712,6 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
         # self.logger.info(self.config.MV.short_summary(no_print=True))
         self._reload_model_state_dict(save_path_k_fold)
 
-        if os.path.exists("./init_state_dict.bin"):
-            os.remove("./init_state_dict.bin")
         if self.valid_dataloaders or self.config.save_mode:
             del self.train_dataloaders
             del self.test_dataloader
@@ -880,7 +875,10 @@ class ASTETrainingInstructor(BaseTrainingInstructor):
             )
             self.warmup_scheduler = warmup.UntunedLinearWarmup(self.optimizer)
 
-        if len(self.valid_dataloaders) > 1:
-            return self._k_fold_train_and_evaluate(criterion)
-        else:
-            return self._train_and_evaluate(criterion)
+        try:
+            if len(self.valid_dataloaders) > 1:
+                return self._k_fold_train_and_evaluate(criterion)
+            else:
+                return self._train_and_evaluate(criterion)
+        finally:
+            self._close_resources()
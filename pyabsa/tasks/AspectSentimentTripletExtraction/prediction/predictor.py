@@ -8,7 +8,6 @@ import string
 from typing import Union
 
 import torch
-from findfile import find_file
 
 from pyabsa.utils.data_utils.dataset_manager import detect_infer_dataset
 from torch import nn
@@ -28,10 +27,13 @@ from pyabsa.tasks.AspectSentimentTripletExtraction.dataset_utils.aste_utils impo
     DataIterator,
     Metric,
 )
+from pyabsa.framework.checkpoint_class.checkpoint_registry import find_checkpoint_files
 
 
 class AspectSentimentTripletExtractor(InferenceModel):
     task_code = TaskCodeOption.Aspect_Sentiment_Triplet_Extraction
+    # the batches are padded to their longest sentence
+    compile_fast_path = False
 
     def __init__(self, checkpoint=None, **kwargs):
         super().__init__(checkpoint, task_code=self.task_code, **kwargs)
@@ -51,18 +53,11 @@ class AspectSentimentTripletExtractor(InferenceModel):
                     )
                 fprint("Load sentiment classifier from", self.checkpoint)
 
-                state_dict_path = find_file(
-                    self.checkpoint, ".state_dict", exclude_key=["__MACOSX"]
-                )
-                model_path = find_file(
-                    self.checkpoint, ".model", exclude_key=["__MACOSX"]
-                )
-                tokenizer_path = find_file(
-                    self.checkpoint, ".tokenizer", exclude_key=["__MACOSX"]
-                )
-                config_path = find_file(
-                    self.checkpoint, ".config", exclude_key=["__MACOSX"]
-                )
+                checkpoint_files = find_checkpoint_files(self.checkpoint)
+                state_dict_path = checkpoint_files["state_dict"]
+                model_path = checkpoint_files["model"]
+                tokenizer_path = checkpoint_files["tokenizer"]
+                config_path = checkpoint_files["config"]
 
                 fprint("config: {}".format(config_path))
                 fprint("state_dict: {}".format(state_dict_path))
@@ -225,7 +220,7 @@ class AspectSentimentTripletExtractor(InferenceModel):
     def _run_prediction(self, save_path=None, print_result=True, **kwargs):
         self.model.eval()
         all_results = []
-        with torch.no_grad():
+        with self._inference_context():
             data_loader = DataIterator(
                 self.dataset.convert_examples_to_features(), self.config
             )
@@ -260,7 +255,7 @@ class AspectSentimentTripletExtractor(InferenceModel):
                     "word_pair_synpost": word_pair_synpost,
                 }
 
-                preds = self.model(inputs)[-1]
+                preds = self._forward(inputs)[-1]
                 preds = nn.functional.softmax(preds, dim=-1)
                 preds = torch.argmax(preds, dim=3)
 
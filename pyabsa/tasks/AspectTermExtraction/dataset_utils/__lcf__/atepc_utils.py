@@ -14,6 +14,11 @@ from pyabsa.tasks.AspectPolarityClassification.dataset_utils.__lcf__.apc_utils i
     get_lca_ids_and_cdm_vec,
     get_cdw_vec,
 )
+from pyabsa.utils.file_utils.dataset_readers import (
+    is_columnar_file,
+    iter_dataset_records,
+    records_to_lines,
+)
 from pyabsa.utils.pyabsa_utils import fprint
 
 
@@ -136,22 +141,31 @@ def prepare_input_for_atepc(config, tokenizer, text_left, text_right, aspect):
     return inputs
 
 
-def load_atepc_inference_datasets(fname):
+def load_atepc_inference_datasets(fname, config=None):
+    """
+    :param fname: the inference file or the list of files, the columnar files (JSONL, Parquet and Arrow) are read
+        as the ATEPC records of the tokens, see dataset_readers.py
+    :param config: the config of config.dataset_columns of the columnar files
+    :return: the texts of the examples
+    """
     lines = []
     if isinstance(fname, str):
         fname = [fname]
 
     for f in fname:
         fprint("loading: {}".format(f))
+        if is_columnar_file(f):
+            records = iter_dataset_records(f, config, "ATEPC", inference=True)
+            lines.extend(records_to_lines(records, "ATEPC", inference=True))
+            continue
         fin = open(f, "r", encoding="utf-8")
-        lines.extend(fin.readlines())
+        for line in fin.readlines():
+            lines.append(
+                line[: line.find("$LABEL$")]
+                .replace("[ASP]", "")
+                .replace("[B-ASP]", "")
+                .replace("[E-ASP]", "")
+                .strip()
+            )
         fin.close()
-    for i in range(len(lines)):
-        lines[i] = (
-            lines[i][: lines[i].find("$LABEL$")]
-            .replace("[ASP]", "")
-            .replace("[B-ASP]", "")
-            .replace("[E-ASP]", "")
-            .strip()
-        )
     return sorted(set(lines), key=lines.index)
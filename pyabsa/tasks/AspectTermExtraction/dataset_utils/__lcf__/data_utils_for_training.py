@@ -8,6 +8,10 @@
 import tqdm
 
 from pyabsa.framework.flag_class.flag_template import LabelPaddingOption
+from pyabsa.utils.file_utils.dataset_readers import (
+    is_columnar_file,
+    iter_dataset_records,
+)
 from pyabsa.tasks.AspectPolarityClassification.dataset_utils.__lcf__.apc_utils import (
     configure_spacy_model,
 )
@@ -81,10 +85,21 @@ class InputFeatures(object):
         self.lcf_cdw_vec = lcf_cdw_vec
 
 
-def readfile(filename):
+def readfile(filename, config=None):
     """
-    read file
+    read file, the columnar files (JSONL, Parquet and Arrow) are read as the records of tokens, tags and polarities
     """
+    if is_columnar_file(filename):
+        data = []
+        for record in iter_dataset_records(filename, config, task_code="ATEPC"):
+            sentence, tag, polarity = (
+                [str(x) for x in (v.split() if isinstance(v, str) else v)]
+                for v in (record["tokens"], record["tags"], record["polarities"])
+            )
+            Labels.update(tag)
+            data.append((sentence, tag, polarity))
+        return _prepare_data(data)
+
     with open(filename, "r", encoding="utf-8") as f:
         lines = f.readlines()
     data = []
@@ -110,6 +125,10 @@ def readfile(filename):
         polarity.append(splits[-1])
         Labels.add(splits[-2])
     f.close()
+    return _prepare_data(data)
+
+
+def _prepare_data(data):
     prepared_data = []
     for s, t, p in data:
         if len(s) > 0:
@@ -197,19 +216,20 @@ class DataProcessor(object):
         raise NotImplementedError()
 
     @classmethod
-    def _read_tsv(cls, input_file, quotechar=None):
+    def _read_tsv(cls, input_file, quotechar=None, config=None):
         """Reads a tab separated value file."""
         data = []
         for file in input_file:
-            data += readfile(file)
+            data += readfile(file, config)
         return data
 
 
 class ATEPCProcessor(DataProcessor):
     """Processor for the CoNLL-2003 raw_data set."""
 
-    def __init__(self, tokenizer):
+    def __init__(self, tokenizer, config=None):
         self.tokenizer = tokenizer
+        self.config = config
         self.tokenizer.bos_token = (
             tokenizer.bos_token if tokenizer.bos_token else "[CLS]"
         )
@@ -219,15 +239,21 @@ class ATEPCProcessor(DataProcessor):
 
     def get_train_examples(self, data_dir, set_tag):
         """See base class."""
-        return self._create_examples(self._read_tsv(data_dir), set_tag)
+        return self._create_examples(
+            self._read_tsv(data_dir, config=self.config), set_tag
+        )
 
     def get_valid_examples(self, data_dir, set_tag):
         """See base class."""
-        return self._create_examples(self._read_tsv(data_dir), set_tag)
+        return self._create_examples(
+            self._read_tsv(data_dir, config=self.config), set_tag
+        )
 
     def get_test_examples(self, data_dir, set_tag):
         """See base class."""
-        return self._create_examples(self._read_tsv(data_dir), set_tag)
+        return self._create_examples(
+            self._read_tsv(data_dir, config=self.config), set_tag
+        )
 
     def get_labels(self):
         return sorted(
@@ -8,26 +8,24 @@
 import os
 import time
 
-import numpy
-import numpy as np
-import pandas
 import sklearn.metrics as metrics
 import torch
 import torch.nn.functional as F
-import tqdm
 from seqeval.metrics import classification_report
 from sklearn.metrics import f1_score
 from torch import cuda
 from torch.utils.data import DataLoader, RandomSampler, SequentialSampler, TensorDataset
 from transformers import AutoTokenizer, AutoModel
 
+from pyabsa.framework.checkpoint_class.checkpoint_writer import CheckpointWriter
 from pyabsa.framework.flag_class.flag_template import DeviceTypeOption
 from pyabsa.framework.instructor_class.instructor_template import BaseTrainingInstructor
+from pyabsa.framework.sweep_class import trial_pruner
+from pyabsa.framework.instructor_class.training_metrics import TrainingMetrics
 from ..dataset_utils.__lcf__.data_utils_for_training import (
     ATEPCProcessor,
     convert_examples_to_features,
 )
-from pyabsa.utils.file_utils.file_utils import save_model
 from pyabsa.utils.pyabsa_utils import print_args, init_optimizer, fprint, rprint
 
 import pytorch_warmup as warmup
@@ -47,7 +45,7 @@ class ATEPCTrainingInstructor(BaseTrainingInstructor):
             do_lower_case="uncased" in self.config.pretrained_bert,
         )
 
-        processor = ATEPCProcessor(self.tokenizer)
+        processor = ATEPCProcessor(self.tokenizer, config=self.config)
         cache_path = self.load_cache_dataset()
         if not os.path.exists(cache_path):
             self.train_examples = processor.get_train_examples(
@@ -248,7 +246,8 @@ class ATEPCTrainingInstructor(BaseTrainingInstructor):
         self.model = self.config.model(self.bert_base_model, config=self.config)
 
     def _train_and_evaluate(self, criterion):
-        losses = []
+        training_metrics = TrainingMetrics(self.config)
+        checkpoint_writer = self._closing(CheckpointWriter(self.config))
 
         patience = self.config.patience + self.config.evaluate_begin
         if self.config.log_step < 0:
@@ -270,7 +269,6 @@ class ATEPCTrainingInstructor(BaseTrainingInstructor):
         self.logger.info("  Num examples = %d", len(self.train_set))
         self.logger.info("  Batch size = %d", self.config.batch_size)
         self.logger.info("  Num steps = %d", self.num_train_optimization_steps)
-        sum_loss = 0
         sum_apc_test_acc = 0
         sum_apc_test_f1 = 0
         sum_ate_test_f1 = 0
@@ -292,10 +290,11 @@ class ATEPCTrainingInstructor(BaseTrainingInstructor):
         )
         for epoch in range(int(self.config.num_epoch)):
             nb_tr_examples, nb_tr_steps = 0, 0
-            iterator = tqdm.tqdm(self.train_dataloader)
+            iterator = self._progress_bar(self.train_dataloader)
             description = "Epoch:{} | Loss:{}".format(epoch, 0)
             patience -= 1
             for step, batch in enumerate(iterator):
+                training_metrics.mark("data")
                 self.model.train()
                 (
                     input_ids_spc,
@@ -351,21 +350,23 @@ class ATEPCTrainingInstructor(BaseTrainingInstructor):
                     loss_ate + ate_loss_weight * loss_apc
                 )  # the optimal weight of loss may be different according to dataset
 
-                sum_loss += loss.item()
-
-                losses.append(loss.item())
+                training_metrics.update(loss, batch)
+                training_metrics.mark("forward")
 
                 if self.config.use_amp and self.scaler:
                     self.scaler.scale(loss).backward()
+                    training_metrics.mark("backward")
                     self.scaler.step(self.optimizer)
                     self.scaler.update()
                 else:
                     loss.backward()
+                    training_metrics.mark("backward")
                     self.optimizer.step()
 
                 if self.config.warmup_step >= 0:
                     with self.warmup_scheduler.dampening():
                         self.lr_scheduler.step()
+                training_metrics.mark("optimizer")
 
                 nb_tr_examples += input_ids_spc.size(0)
                 nb_tr_steps += 1
@@ -385,6 +386,8 @@ class ATEPCTrainingInstructor(BaseTrainingInstructor):
                         sum_apc_test_acc += apc_result["apc_test_acc"]
                         sum_apc_test_f1 += apc_result["apc_test_f1"]
                         sum_ate_test_f1 += ate_result
+                        # a sweep may stop the trial here, see trial_pruner
+                        trial_pruner.report("eval", apc_result["apc_test_acc"])
                         self.config.metrics_of_this_checkpoint["apc_acc"] = apc_result[
                             "apc_test_acc"
                         ]
@@ -442,8 +445,8 @@ class ATEPCTrainingInstructor(BaseTrainingInstructor):
                                     round(ate_result, 2),
                                 )
 
-                                save_model(
-                                    self.config, self.model, self.tokenizer, save_path
+                                checkpoint_writer.save(
+                                    self.model, self.tokenizer, save_path
                                 )
 
                         current_apc_test_acc = apc_result["apc_test_acc"]
@@ -468,26 +471,21 @@ class ATEPCTrainingInstructor(BaseTrainingInstructor):
                         iterator.set_postfix_str(postfix)
 
                     elif self.config.save_mode and epoch >= self.config.evaluate_begin:
-                        save_model(
-                            self.config,
+                        checkpoint_writer.save(
                             self.model,
                             self.tokenizer,
                             save_path + "_{}/".format(loss.item()),
                         )
                 else:
-                    if self.config.get("loss_display", "smooth") == "smooth":
-                        description = "Epoch:{:>3d} | Smooth Loss: {:>.4f}".format(
-                            epoch, round(np.nanmean(losses), 4)
-                        )
-                    else:
-                        description = "Epoch:{:>3d} | Batch Loss: {:>.4f}".format(
-                            epoch, round(loss.item(), 4)
-                        )
+                    description = training_metrics.description(epoch)
+                training_metrics.mark("evaluate")
                 iterator.set_description(description)
                 iterator.refresh()
 
             if patience == 0:
                 break
+        # the saved checkpoints are returned below, wait for them to be committed
+        checkpoint_writer.close()
 
         apc_result, ate_result = self._evaluate_acc_f1(self.test_dataloader)
 
@@ -552,13 +550,8 @@ class ATEPCTrainingInstructor(BaseTrainingInstructor):
         self.logger.info(self.config.MV.summary(no_print=True))
         # self.logger.info(self.config.MV.short_summary(no_print=True))
 
-        rolling_intv = 5
-        df = pandas.DataFrame(losses)
-        losses = list(
-            numpy.hstack(df.rolling(rolling_intv, min_periods=1).mean().values)
-        )
-        self.config.loss = losses[-1]
-        # self.config.loss = np.average(losses)
+        self.config.loss = training_metrics.loss
+        self.logger.info(training_metrics.summary())
 
         print_args(self.config, self.logger)
 
@@ -743,10 +736,8 @@ class ATEPCTrainingInstructor(BaseTrainingInstructor):
             self.config.batch_size // self.config.gradient_accumulation_steps
         )
 
-        if self.config.model_path_to_save and not os.path.exists(
-            self.config.model_path_to_save
-        ):
-            os.makedirs(self.config.model_path_to_save)
+        if self.config.model_path_to_save:
+            os.makedirs(self.config.model_path_to_save, exist_ok=True)
 
         param_optimizer = list(self.model.named_parameters())
         no_decay = ["bias", "LayerNorm.bias", "LayerNorm.weight"]
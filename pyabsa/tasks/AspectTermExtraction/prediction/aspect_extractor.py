@@ -5,7 +5,6 @@
 # github: https://github.com/yangheng95
 # Copyright (C) 2021. All Rights Reserved.
 
-import json
 import os
 import pickle
 from collections import OrderedDict
@@ -15,7 +14,7 @@ from typing import Union, List
 import torch
 import torch.nn.functional as F
 import tqdm
-from findfile import find_file, find_cwd_dir
+from findfile import find_cwd_dir
 from termcolor import colored
 from torch.utils.data import DataLoader, SequentialSampler, TensorDataset
 from transformers import AutoTokenizer, AutoModel
@@ -29,6 +28,12 @@ from pyabsa.framework.prediction_class.predictor_template import InferenceModel
 from pyabsa.utils.data_utils.dataset_item import DatasetItem
 from pyabsa.utils.data_utils.dataset_manager import detect_infer_dataset
 from pyabsa.utils.pyabsa_utils import set_device, print_args, fprint
+from pyabsa.framework.checkpoint_class.checkpoint_registry import find_checkpoint_files
+from pyabsa.framework.checkpoint_class.checkpoint_format import (
+    build_task_model,
+    is_safetensors_checkpoint,
+    load_safetensors_checkpoint,
+)
 from ..dataset_utils.__lcf__.atepc_utils import (
     load_atepc_inference_datasets,
     process_iob_tags,
@@ -44,6 +49,8 @@ from ..models import ATEPCModelList
 
 class AspectExtractor(InferenceModel):
     task_code = TaskCodeOption.Aspect_Term_Extraction_and_Classification
+    # the aspects are extracted by the first pass, so both passes of the model are warmed up
+    warmup_text = "The food is good but the service is slow"
 
     def __init__(self, checkpoint=None, **kwargs):
         # load from a trainer
@@ -61,71 +68,76 @@ class AspectExtractor(InferenceModel):
                 )
             fprint("Load aspect extractor from", self.checkpoint)
             try:
-                state_dict_path = find_file(
-                    self.checkpoint, ".state_dict", exclude_key=["__MACOSX"]
-                )
-                model_path = find_file(
-                    self.checkpoint, ".model", exclude_key=["__MACOSX"]
-                )
-                tokenizer_path = find_file(
-                    self.checkpoint, ".tokenizer", exclude_key=["__MACOSX"]
-                )
-                config_path = find_file(
-                    self.checkpoint, ".config", exclude_key=["__MACOSX"]
-                )
-
-                fprint("config: {}".format(config_path))
-                fprint("state_dict: {}".format(state_dict_path))
-                fprint("model: {}".format(model_path))
-                fprint("tokenizer: {}".format(tokenizer_path))
-
-                with open(config_path, mode="rb") as f:
-                    self.config = pickle.load(f)
+                if is_safetensors_checkpoint(self.checkpoint):
+                    # the weights are memory-mapped, the PLM is neither downloaded nor initialized
+                    (
+                        self.model,
+                        self.config,
+                        self.tokenizer,
+                    ) = load_safetensors_checkpoint(
+                        self.checkpoint, build_task_model, **kwargs
+                    )
                     self.config.auto_device = kwargs.get("auto_device", True)
                     set_device(self.config, self.config.auto_device)
-
-                if state_dict_path or model_path:
-                    if state_dict_path:
-                        if kwargs.get("offline", False):
-                            self.bert = AutoModel.from_pretrained(
-                                find_cwd_dir(
-                                    self.config.pretrained_bert.split("/")[-1]
-                                ),
-                            )
-                        else:
-                            self.bert = AutoModel.from_pretrained(
-                                self.config.pretrained_bert,
-                            )
-
-                        self.model = self.config.model(self.bert, self.config)
-                        self.model.load_state_dict(
-                            torch.load(
-                                state_dict_path, map_location=DeviceTypeOption.CPU
-                            ),
-                            strict=False,
-                        )
-                    elif model_path:
-                        self.model = torch.load(
-                            model_path, map_location=DeviceTypeOption.CPU
-                        )
-                    with open(tokenizer_path, mode="rb") as f:
-                        try:
+                else:
+                    checkpoint_files = find_checkpoint_files(self.checkpoint)
+                    state_dict_path = checkpoint_files["state_dict"]
+                    model_path = checkpoint_files["model"]
+                    tokenizer_path = checkpoint_files["tokenizer"]
+                    config_path = checkpoint_files["config"]
+
+                    fprint("config: {}".format(config_path))
+                    fprint("state_dict: {}".format(state_dict_path))
+                    fprint("model: {}".format(model_path))
+                    fprint("tokenizer: {}".format(tokenizer_path))
+
+                    with open(config_path, mode="rb") as f:
+                        self.config = pickle.load(f)
+                        self.config.auto_device = kwargs.get("auto_device", True)
+                        set_device(self.config, self.config.auto_device)
+
+                    if state_dict_path or model_path:
+                        if state_dict_path:
                             if kwargs.get("offline", False):
-                                self.tokenizer = AutoTokenizer.from_pretrained(
+                                self.bert = AutoModel.from_pretrained(
                                     find_cwd_dir(
                                         self.config.pretrained_bert.split("/")[-1]
                                     ),
-                                    do_lower_case="uncased"
-                                    in self.config.pretrained_bert,
                                 )
                             else:
-                                self.tokenizer = AutoTokenizer.from_pretrained(
+                                self.bert = AutoModel.from_pretrained(
                                     self.config.pretrained_bert,
-                                    do_lower_case="uncased"
-                                    in self.config.pretrained_bert,
                                 )
-                        except ValueError:
-                            self.tokenizer = pickle.load(f)
+
+                            self.model = self.config.model(self.bert, self.config)
+                            self.model.load_state_dict(
+                                torch.load(
+                                    state_dict_path, map_location=DeviceTypeOption.CPU
+                                ),
+                                strict=False,
+                            )
+                        elif model_path:
+                            self.model = torch.load(
+                                model_path, map_location=DeviceTypeOption.CPU
+                            )
+                        with open(tokenizer_path, mode="rb") as f:
+                            try:
+                                if kwargs.get("offline", False):
+                                    self.tokenizer = AutoTokenizer.from_pretrained(
+                                        find_cwd_dir(
+                                            self.config.pretrained_bert.split("/")[-1]
+                                        ),
+                                        do_lower_case="uncased"
+                                        in self.config.pretrained_bert,
+                                    )
+                                else:
+                                    self.tokenizer = AutoTokenizer.from_pretrained(
+                                        self.config.pretrained_bert,
+                                        do_lower_case="uncased"
+                                        in self.config.pretrained_bert,
+                                    )
+                            except ValueError:
+                                self.tokenizer = pickle.load(f)
 
             except Exception as e:
                 raise RuntimeError(
@@ -302,7 +314,7 @@ class AspectExtractor(InferenceModel):
             inference_set = detect_infer_dataset(
                 target_file, task_code=TaskCodeOption.Aspect_Polarity_Classification
             )
-            target_file = load_atepc_inference_datasets(inference_set)
+            target_file = load_atepc_inference_datasets(inference_set, self.config)
 
         elif isinstance(target_file, list):
             pass
@@ -338,6 +350,7 @@ class AspectExtractor(InferenceModel):
                     results["extraction_res"]
                 )
             results = self.merge_result(sentence_res, results)
+            save_path = None
             if save_result:
                 save_path = os.path.join(
                     os.getcwd(),
@@ -345,15 +358,10 @@ class AspectExtractor(InferenceModel):
                         self.config.task_name, self.config.model.__name__
                     ),
                 )
-                fprint(
-                    "The results of aspect term extraction have been saved in {}".format(
-                        save_path
-                    )
-                )
-                with open(save_path, "w", encoding="utf8") as f:
-                    json.dump(results, f, ensure_ascii=False)
+            self._save_results(results, save_path)
             if print_result:
-                for ex_id, r in enumerate(results):
+                for ex_id in self._printed_examples(len(results), print_result):
+                    r = results[ex_id]
                     colored_text = r["sentence"][:]
                     for aspect, sentiment, confidence in zip(
                         r["aspect"], r["sentiment"], r["confidence"]
@@ -475,8 +483,8 @@ class AspectExtractor(InferenceModel):
             polarity = polarity.to(self.config.device)
             valid_ids = valid_ids.to(self.config.device)
             l_mask = l_mask.to(self.config.device)
-            with torch.no_grad():
-                ate_logits, apc_logits = self.model(
+            with self._inference_context():
+                ate_logits, apc_logits = self._forward(
                     input_ids_spc,
                     token_type_ids=segment_ids,
                     attention_mask=input_mask,
@@ -647,8 +655,8 @@ class AspectExtractor(InferenceModel):
             l_mask = l_mask.to(self.config.device)
             lcf_cdm_vec = lcf_cdm_vec.to(self.config.device)
             lcf_cdw_vec = lcf_cdw_vec.to(self.config.device)
-            with torch.no_grad():
-                ate_logits, apc_logits = self.model(
+            with self._inference_context():
+                ate_logits, apc_logits = self._forward(
                     input_ids_spc,
                     token_type_ids=segment_ids,
                     attention_mask=input_mask,
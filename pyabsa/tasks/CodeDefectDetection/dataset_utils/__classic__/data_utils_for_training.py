@@ -6,6 +6,7 @@
 # GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
 # ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
 # Copyright (C) 2022. All Rights Reserved.
+import numpy as np
 import tqdm
 
 from pyabsa.framework.dataset_class.dataset_template import PyABSADataset
@@ -23,6 +24,7 @@ class GloVeCDDDataset(PyABSADataset):
         )
 
         all_data = []
+        texts = []
 
         label_set = set()
 
@@ -31,10 +33,9 @@ class GloVeCDDDataset(PyABSADataset):
             text, label = line[0], line[1]
             text = text.strip().lower()
             label = label.strip().lower()
-            text_indices = self.tokenizer.text_to_sequence(text)
+            texts.append(text)
 
             data = {
-                "text_indices": text_indices,
                 "label": label,
             }
 
@@ -42,6 +43,11 @@ class GloVeCDDDataset(PyABSADataset):
 
             all_data.append(data)
 
+        # the texts are encoded at once
+        all_text_indices = self.tokenizer.encode_batch(texts, dtype=np.int64)
+        for data, text_indices in zip(all_data, all_text_indices):
+            data["text_indices"] = text_indices
+
         check_and_fix_labels(label_set, "label", all_data, self.config)
         self.config.output_dim = len(label_set)
 
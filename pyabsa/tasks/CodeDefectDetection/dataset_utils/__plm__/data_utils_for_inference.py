@@ -11,10 +11,9 @@ import tqdm
 from torch.utils.data import Dataset
 
 from pyabsa.framework.dataset_class.dataset_template import PyABSADataset
-from pyabsa.framework.tokenizer_class.tokenizer_class import pad_and_truncate
 from pyabsa.utils.file_utils.file_utils import load_dataset_from_file
 from pyabsa.utils.pyabsa_utils import fprint
-from ..cdd_utils import read_defect_examples
+from ..cdd_utils import read_defect_examples, prepare_token_ids
 
 
 class BERTCDDInferenceDataset(Dataset):
@@ -33,7 +32,7 @@ class BERTCDDInferenceDataset(Dataset):
             self.process_data(self.parse_sample(text), ignore_error=ignore_error)
 
     def prepare_infer_dataset(self, infer_file, ignore_error):
-        lines = load_dataset_from_file(infer_file, config=self.config)
+        lines = load_dataset_from_file(infer_file, config=self.config, inference=True)
         samples = []
         for sample in lines:
             if sample:
@@ -96,52 +95,9 @@ class BERTCDDInferenceDataset(Dataset):
         return self.data
 
     def prepare_token_ids(self, code_ids, sliding_window=False):
-        all_code_ids = []
-        code_ids = code_ids[1:-1]
-        if sliding_window is False:
-            code_ids = pad_and_truncate(
-                code_ids,
-                self.config.max_seq_len - 2,
-                value=self.tokenizer.pad_token_id,
-            )
-            all_code_ids.append(
-                [self.tokenizer.cls_token_id] + code_ids + [self.tokenizer.eos_token_id]
-            )
-            if all_code_ids[-1].count(self.tokenizer.eos_token_id) != 1:
-                raise ValueError("last token id is not eos token id")
-            return all_code_ids
-
-        else:
-            code_ids = pad_and_truncate(
-                code_ids,
-                self.config.max_seq_len - 2,
-                value=self.tokenizer.pad_token_id,
-            )
-            # for x in range(len(code_ids) // ((self.config.max_seq_len - 2) // 2) + 1):
-            #     _code_ids = code_ids[x * (self.config.max_seq_len - 2) // 2:
-            #                          (x + 1) * (self.config.max_seq_len - 2) // 2 + (self.config.max_seq_len - 2) // 2]
-            #     print(x * (self.config.max_seq_len - 2) // 2)
-            #     print((x + 1) * (self.config.max_seq_len - 2) // 2 + (self.config.max_seq_len - 2) // 2)
-            for x in range(len(code_ids) // (self.config.max_seq_len - 2) + 1):
-                _code_ids = code_ids[
-                    x
-                    * (self.config.max_seq_len - 2) : (x + 1)
-                    * (self.config.max_seq_len - 2)
-                ]
-                _code_ids = pad_and_truncate(
-                    _code_ids,
-                    self.config.max_seq_len - 2,
-                    value=self.tokenizer.pad_token_id,
-                )
-                if _code_ids:
-                    all_code_ids.append(
-                        [self.tokenizer.cls_token_id]
-                        + _code_ids
-                        + [self.tokenizer.eos_token_id]
-                    )
-                if all_code_ids[-1].count(self.tokenizer.eos_token_id) != 1:
-                    raise ValueError("last token id is not eos token id")
-            return all_code_ids
+        return prepare_token_ids(
+            code_ids, self.tokenizer, self.config.max_seq_len, sliding_window
+        )
 
     def __getitem__(self, index):
         return self.data[index]
@@ -9,10 +9,13 @@
 import random
 
 import tqdm
-from pyabsa.framework.tokenizer_class.tokenizer_class import pad_and_truncate
 
 from pyabsa.framework.dataset_class.dataset_template import PyABSADataset
-from ..cdd_utils import read_defect_examples, _prepare_corrupt_code
+from ..cdd_utils import (
+    read_defect_examples,
+    _prepare_corrupt_code,
+    prepare_token_ids,
+)
 from pyabsa.utils.file_utils.file_utils import load_dataset_from_file
 from pyabsa.utils.pyabsa_utils import check_and_fix_labels, fprint
 
@@ -56,10 +59,10 @@ class BERTCDDDataset(PyABSADataset):
             else:
                 over_sampling = 1
 
+            code_ids = self.prepare_token_ids(
+                code_ids, self.config.get("sliding_window", False)
+            )
             for _ in range(over_sampling):
-                code_ids = self.prepare_token_ids(
-                    code_ids, self.config.get("sliding_window", False)
-                )
                 for ids in code_ids:
                     all_data.append(
                         {
@@ -121,52 +124,9 @@ class BERTCDDDataset(PyABSADataset):
         self.data = all_data
 
     def prepare_token_ids(self, code_ids, sliding_window=False):
-        all_code_ids = []
-        code_ids = code_ids[1:-1]
-        if sliding_window is False:
-            code_ids = pad_and_truncate(
-                code_ids,
-                self.config.max_seq_len - 2,
-                value=self.tokenizer.pad_token_id,
-            )
-            all_code_ids.append(
-                [self.tokenizer.cls_token_id] + code_ids + [self.tokenizer.eos_token_id]
-            )
-            if all_code_ids[-1].count(self.tokenizer.eos_token_id) != 1:
-                raise ValueError("last token id is not eos token id")
-            return all_code_ids
-
-        else:
-            code_ids = pad_and_truncate(
-                code_ids,
-                self.config.max_seq_len - 2,
-                value=self.tokenizer.pad_token_id,
-            )
-            # for x in range(len(code_ids) // ((self.config.max_seq_len - 2) // 2) + 1):
-            #     _code_ids = code_ids[x * (self.config.max_seq_len - 2) // 2:
-            #                          (x + 1) * (self.config.max_seq_len - 2) // 2 + (self.config.max_seq_len - 2) // 2]
-            #     print(x * (self.config.max_seq_len - 2) // 2)
-            #     print((x + 1) * (self.config.max_seq_len - 2) // 2 + (self.config.max_seq_len - 2) // 2)
-            for x in range(len(code_ids) // (self.config.max_seq_len - 2) + 1):
-                _code_ids = code_ids[
-                    x
-                    * (self.config.max_seq_len - 2) : (x + 1)
-                    * (self.config.max_seq_len - 2)
-                ]
-                _code_ids = pad_and_truncate(
-                    _code_ids,
-                    self.config.max_seq_len - 2,
-                    value=self.tokenizer.pad_token_id,
-                )
-                if _code_ids:
-                    all_code_ids.append(
-                        [self.tokenizer.cls_token_id]
-                        + _code_ids
-                        + [self.tokenizer.eos_token_id]
-                    )
-                if all_code_ids[-1].count(self.tokenizer.eos_token_id) != 1:
-                    raise ValueError("last token id is not eos token id")
-            return all_code_ids
+        return prepare_token_ids(
+            code_ids, self.tokenizer, self.config.max_seq_len, sliding_window
+        )
 
     def __init__(self, config, tokenizer, dataset_type="train", **kwargs):
         super().__init__(config, tokenizer, dataset_type, **kwargs)
@@ -11,6 +11,7 @@ import random
 import re
 import numpy as np
 
+from pyabsa.framework.tokenizer_class.tokenizer_class import pad_batch
 from pyabsa.utils.pyabsa_utils import fprint
 
 
@@ -182,6 +183,30 @@ def read_defect_examples(lines, data_num, remove_comments=True, tokenizer=None):
     return examples
 
 
+def prepare_token_ids(code_ids, tokenizer, max_seq_len, sliding_window=False):
+    """
+    :param code_ids: the token IDs of a code, with the special tokens and not padded
+    :param tokenizer: the tokenizer of the code
+    :param max_seq_len: the length of the source IDs
+    :param sliding_window: split the code into windows of max_seq_len, otherwise truncate it
+    :return: an array of the source IDs of shape (num_windows, max_seq_len), the windows padded at once
+    """
+    code_ids = code_ids[1:-1]
+    window = max_seq_len - 2
+    if sliding_window and len(code_ids) > window:
+        windows = [code_ids[i : i + window] for i in range(0, len(code_ids), window)]
+    else:
+        windows = [code_ids]
+    ids, _, _ = pad_batch(windows, window, value=tokenizer.pad_token_id)
+    source_ids = np.empty((len(windows), max_seq_len), dtype=ids.dtype)
+    source_ids[:, 0] = tokenizer.cls_token_id
+    source_ids[:, 1:-1] = ids
+    source_ids[:, -1] = tokenizer.eos_token_id
+    if np.any((source_ids == tokenizer.eos_token_id).sum(axis=1) != 1):
+        raise ValueError("last token id is not eos token id")
+    return source_ids
+
+
 def calc_stats(examples, tokenizer=None, is_tokenize=False):
     avg_src_len = []
     avg_trg_len = []
@@ -7,7 +7,6 @@
 
 import os
 import random
-import shutil
 import time
 
 import numpy as np
@@ -16,15 +15,16 @@ import torch.nn as nn
 from findfile import find_file
 from sklearn import metrics
 from torch import cuda
-from tqdm import tqdm
 
 from pyabsa.framework.flag_class.flag_template import DeviceTypeOption
+from pyabsa.framework.checkpoint_class.checkpoint_writer import CheckpointWriter
 from pyabsa.framework.instructor_class.instructor_template import BaseTrainingInstructor
+from pyabsa.framework.sweep_class import trial_pruner
+from pyabsa.framework.instructor_class.training_metrics import TrainingMetrics
 from ..dataset_utils.__classic__.data_utils_for_training import GloVeCDDDataset
 from ..dataset_utils.__plm__.data_utils_for_training import BERTCDDDataset
 from ..models import GloVeCDDModelList, BERTCDDModelList
 
-from pyabsa.utils.file_utils.file_utils import save_model
 from pyabsa.utils.pyabsa_utils import init_optimizer, fprint, rprint
 from pyabsa.framework.tokenizer_class.tokenizer_class import (
     PretrainedTokenizer,
@@ -67,10 +67,10 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
         self.train_dataloaders = []
         self.valid_dataloaders = []
 
-        if os.path.exists("./init_state_dict.bin"):
-            os.remove("./init_state_dict.bin")
         if self.config.cross_validate_fold > 0:
-            torch.save(self.model.state_dict(), "./init_state_dict.bin")
+            self.init_state_dict = {
+                k: v.detach().clone() for k, v in self.model.state_dict().items()
+            }
 
         self.config.device = torch.device(self.config.device)
         if self.config.device.type == DeviceTypeOption.CUDA:
@@ -144,8 +144,11 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
         self.config.tokenizer = self.tokenizer
         self.save_cache_dataset(cache_path)
 
-    def reload_model(self, ckpt="./init_state_dict.bin"):
-        if os.path.exists(ckpt):
+    def reload_model(self, ckpt=None):
+        if ckpt is None:
+            if self.init_state_dict is not None:
+                self.model.load_state_dict(self.init_state_dict, strict=False)
+        elif os.path.exists(ckpt):
             self.model.load_state_dict(
                 torch.load(find_file(ckpt, or_key=[".bin", "state_dict"])),
                 strict=False,
@@ -162,7 +165,8 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
             self.config.dataset_name,
         )
 
-        losses = []
+        training_metrics = TrainingMetrics(self.config)
+        checkpoint_writer = self._closing(CheckpointWriter(self.config))
 
         self.config.metrics_of_this_checkpoint = {"acc": 0, "f1": 0}
         self.config.max_test_metrics = {"max_test_acc": 0, "max_test_f1": 0}
@@ -195,8 +199,9 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
         for epoch in range(self.config.num_epoch):
             patience -= 1
             description = "Epoch:{} | Loss:{}".format(epoch, 0)
-            iterator = tqdm(self.train_dataloaders[0], desc=description)
+            iterator = self._progress_bar(self.train_dataloaders[0], desc=description)
             for i_batch, sample_batched in enumerate(iterator):
+                training_metrics.mark("data")
                 global_step += 1
                 # switch model to train mode, clear gradient accumulators
                 self.model.train()
@@ -221,19 +226,23 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
                 if self.config.auto_device == DeviceTypeOption.ALL_CUDA:
                     loss = loss.mean()
 
-                losses.append(loss.item())
+                training_metrics.update(loss, sample_batched)
+                training_metrics.mark("forward")
 
                 if self.scaler:
                     self.scaler.scale(loss).backward()
+                    training_metrics.mark("backward")
                     self.scaler.step(self.optimizer)
                     self.scaler.update()
                 else:
                     loss.backward()
+                    training_metrics.mark("backward")
                     self.optimizer.step()
 
                 if self.config.warmup_step >= 0:
                     with self.warmup_scheduler.dampening():
                         self.lr_scheduler.step()
+                training_metrics.mark("optimizer")
 
                 # evaluate if test set is available
                 if global_step % self.config.log_step == 0:
@@ -247,6 +256,8 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
                                 self.test_dataloader
                             )
 
+                        # a sweep may stop the trial here, see trial_pruner
+                        trial_pruner.report("eval", test_acc)
                         self.config.metrics_of_this_checkpoint["acc"] = test_acc
                         self.config.metrics_of_this_checkpoint["f1"] = f1
 
@@ -260,15 +271,10 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
                                 patience = self.config.patience - 1
 
                             if self.config.model_path_to_save:
-                                if not os.path.exists(self.config.model_path_to_save):
-                                    os.makedirs(self.config.model_path_to_save)
-                                if save_path:
-                                    try:
-                                        shutil.rmtree(save_path)
-                                        # logger.info('Remove sub-optimal trained model:', save_path)
-                                    except:
-                                        # logger.info('Can not remove sub-optimal trained model:', save_path)
-                                        pass
+                                os.makedirs(
+                                    self.config.model_path_to_save, exist_ok=True
+                                )
+                                # the sub-optimal checkpoints are pruned by the writer once the new one is committed
                                 save_path = "{0}/{1}_{2}_{3}_acc_{4}_f1_{5}/".format(
                                     self.config.model_path_to_save,
                                     self.config.model_name,
@@ -288,8 +294,11 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
                                 if f1 > self.config.max_test_metrics["max_test_f1"]:
                                     self.config.max_test_metrics["max_test_f1"] = f1
 
-                                save_model(
-                                    self.config, self.model, self.tokenizer, save_path
+                                checkpoint_writer.save(
+                                    self.model,
+                                    self.tokenizer,
+                                    save_path,
+                                    metric=global_step,
                                 )
 
                         postfix = "Dev Acc:{:>.2f}(max:{:>.2f}) Dev F1:{:>.2f}(max:{:>.2f}), Dev AUC:{:>.2f}".format(
@@ -301,26 +310,21 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
                         )
                         iterator.set_postfix_str(postfix)
                     elif self.config.save_mode and epoch >= self.config.evaluate_begin:
-                        save_model(
-                            self.config,
+                        checkpoint_writer.save(
                             self.model,
                             self.tokenizer,
                             save_path + "_{}/".format(loss.item()),
                         )
                 else:
-                    if self.config.get("loss_display", "smooth") == "smooth":
-                        description = "Epoch:{:>3d} | Smooth Loss: {:>.4f}".format(
-                            epoch, round(np.nanmean(losses), 4)
-                        )
-                    else:
-                        description = "Epoch:{:>3d} | Batch Loss: {:>.4f}".format(
-                            epoch, round(loss.item(), 4)
-                        )
+                    description = training_metrics.description(epoch)
 
+                training_metrics.mark("evaluate")
                 iterator.set_description(description)
                 iterator.refresh()
             if patience == 0:
                 break
+        # the best checkpoint is reloaded or returned below, wait for it to be committed
+        checkpoint_writer.close()
 
         if not self.valid_dataloader:
             self.config.MV.log_metric(
@@ -415,7 +419,7 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
         self.config.metrics_of_this_checkpoint = {"acc": 0, "f1": 0}
         self.config.max_test_metrics = {"max_test_acc": 0, "max_test_f1": 0}
 
-        losses = []
+        training_metrics = TrainingMetrics(self.config)
 
         for f, (train_dataloader, valid_dataloader) in enumerate(
             zip(self.train_dataloaders, self.valid_dataloaders)
@@ -450,6 +454,7 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
                     )
                 )
             global_step = 0
+            checkpoint_writer = self._closing(CheckpointWriter(self.config))
             max_fold_acc = 0
             max_fold_f1 = 0
             save_path = "{0}/{1}_{2}".format(
@@ -460,8 +465,9 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
             for epoch in range(self.config.num_epoch):
                 patience -= 1
                 description = "Epoch:{} | Loss:{}".format(epoch, 0)
-                iterator = tqdm(train_dataloader, desc=description)
+                iterator = self._progress_bar(train_dataloader, desc=description)
                 for i_batch, sample_batched in enumerate(iterator):
+                    training_metrics.mark("data")
                     global_step += 1
                     # switch model to train mode, clear gradient accumulators
                     self.model.train()
@@ -486,25 +492,31 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
                     if self.config.auto_device == DeviceTypeOption.ALL_CUDA:
                         loss = loss.mean()
 
-                    losses.append(loss.item())
+                    training_metrics.update(loss, sample_batched)
+                    training_metrics.mark("forward")
 
                     if self.config.use_amp and self.scaler:
                         self.scaler.scale(loss).backward()
+                        training_metrics.mark("backward")
                         self.scaler.step(self.optimizer)
                         self.scaler.update()
                     else:
                         loss.backward()
+                        training_metrics.mark("backward")
                         self.optimizer.step()
 
                     if self.config.warmup_step >= 0:
                         with self.warmup_scheduler.dampening():
                             self.lr_scheduler.step()
+                    training_metrics.mark("optimizer")
 
                     # evaluate if test set is available
                     if global_step % self.config.log_step == 0:
                         if self.test_dataloader and epoch >= self.config.evaluate_begin:
                             test_acc, f1, auc = self._evaluate_acc_f1(valid_dataloader)
 
+                            # a sweep may stop the trial here, see trial_pruner
+                            trial_pruner.report("eval", test_acc)
                             self.config.metrics_of_this_checkpoint["acc"] = test_acc
                             self.config.metrics_of_this_checkpoint["f1"] = f1
 
@@ -518,17 +530,10 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
                                     patience = self.config.patience - 1
 
                                 if self.config.model_path_to_save:
-                                    if not os.path.exists(
-                                        self.config.model_path_to_save
-                                    ):
-                                        os.makedirs(self.config.model_path_to_save)
-                                    if save_path:
-                                        try:
-                                            shutil.rmtree(save_path)
-                                            # logger.info('Remove sub-optimal trained model:', save_path)
-                                        except:
-                                            # logger.info('Can not remove sub-optimal trained model:', save_path)
-                                            pass
+                                    os.makedirs(
+                                        self.config.model_path_to_save, exist_ok=True
+                                    )
+                                    # the sub-optimal checkpoints are pruned by the writer once the new one is committed
                                     save_path = (
                                         "{0}/{1}_{2}_{3}_acc_{4}_f1_{5}/".format(
                                             self.config.model_path_to_save,
@@ -550,11 +555,11 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
                                     if f1 > self.config.max_test_metrics["max_test_f1"]:
                                         self.config.max_test_metrics["max_test_f1"] = f1
 
-                                    save_model(
-                                        self.config,
+                                    checkpoint_writer.save(
                                         self.model,
                                         self.tokenizer,
                                         save_path,
+                                        metric=global_step,
                                     )
 
                             postfix = "Dev Acc:{:>.2f}(max:{:>.2f}) Dev F1:{:>.2f}(max:{:>.2f})".format(
@@ -568,26 +573,21 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
                             self.config.save_mode
                             and epoch >= self.config.evaluate_begin
                         ):
-                            save_model(
-                                self.config,
+                            checkpoint_writer.save(
                                 self.model,
                                 self.tokenizer,
                                 save_path + "_{}/".format(loss.item()),
                             )
                     else:
-                        if self.config.get("loss_display", "smooth") == "smooth":
-                            description = "Epoch:{:>3d} | Smooth Loss: {:>.4f}".format(
-                                epoch, round(np.nanmean(losses), 4)
-                            )
-                        else:
-                            description = "Epoch:{:>3d} | Batch Loss: {:>.4f}".format(
-                                epoch, round(loss.item(), 4)
-                            )
+                        description = training_metrics.description(epoch)
 
+                    training_metrics.mark("evaluate")
                     iterator.set_description(description)
                     iterator.refresh()
                 if patience == 0:
                     break
+            # the best checkpoint of the fold is reloaded below, wait for it to be committed
+            checkpoint_writer.close()
 
             max_fold_acc, max_fold_f1, auc = self._evaluate_acc_f1(self.test_dataloader)
             if max_fold_acc > max_fold_acc_k_fold:
@@ -613,8 +613,7 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
 
             # self.logger.info(self.config.MV.summary(no_print=True))
             self.logger.info(self.config.MV.raw_summary(no_print=True))
-            if os.path.exists("./init_state_dict.bin"):
-                self.reload_model()
+            self.reload_model()
 
         max_test_acc = np.max(fold_test_acc)
         max_test_f1 = np.mean(fold_test_f1)
@@ -669,7 +668,9 @@ class CDDTrainingInstructor(BaseTrainingInstructor):
                     self.config.model_path_to_save,
                     self.config.model_name,
                 )
-                save_model(self.config, self.model, self.tokenizer, save_path_k_fold)
+                CheckpointWriter(self.config, asynchronous=False).save(
+                    self.model, self.tokenizer, save_path_k_fold
+                )
             del self.train_dataloaders
             del self.test_dataloader
             del self.valid_dataloaders
@@ -32,7 +32,7 @@ class BERTRNACInferenceDataset(Dataset):
             self.process_data(self.parse_sample(text), ignore_error=ignore_error)
 
     def prepare_infer_dataset(self, infer_file, ignore_error):
-        lines = load_dataset_from_file(infer_file, config=self.config)
+        lines = load_dataset_from_file(infer_file, config=self.config, inference=True)
         samples = []
         for sample in lines:
             if sample:
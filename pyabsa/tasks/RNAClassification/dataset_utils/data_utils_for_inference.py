@@ -36,7 +36,7 @@ class RNACInferenceDataset(Dataset):
             self.process_data(examples, ignore_error=ignore_error)
 
     def prepare_infer_dataset(self, infer_file, ignore_error):
-        lines = load_dataset_from_file(infer_file, config=self.config)
+        lines = load_dataset_from_file(infer_file, config=self.config, inference=True)
         samples = []
         for sample in lines:
             if sample:
@@ -8,7 +8,6 @@
 # Copyright (C) 2022. All Rights Reserved.
 
 import os
-import shutil
 import time
 
 import numpy as np
@@ -16,17 +15,18 @@ import torch
 import torch.nn as nn
 from sklearn import metrics
 from torch import cuda
-from tqdm import tqdm
 from transformers import AutoModel, AutoTokenizer
 
 from pyabsa.framework.flag_class.flag_template import DeviceTypeOption
+from pyabsa.framework.checkpoint_class.checkpoint_writer import CheckpointWriter
 from pyabsa.framework.instructor_class.instructor_template import BaseTrainingInstructor
+from pyabsa.framework.sweep_class import trial_pruner
+from pyabsa.framework.instructor_class.training_metrics import TrainingMetrics
 from pyabsa.framework.tokenizer_class.tokenizer_class import (
     Tokenizer,
     build_embedding_matrix,
     PretrainedTokenizer,
 )
-from pyabsa.utils.file_utils.file_utils import save_model
 from pyabsa.utils.pyabsa_utils import init_optimizer, fprint, rprint
 from ..dataset_utils.data_utils_for_training import BERTRNACDataset, GloVeRNACDataset
 from ..models import GloVeRNACModelList, BERTRNACModelList
@@ -57,7 +57,9 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
         self.train_dataloaders = []
         self.valid_dataloaders = []
 
-        torch.save(self.model.state_dict(), "./init_state_dict.bin")
+        self.init_state_dict = {
+            k: v.detach().clone() for k, v in self.model.state_dict().items()
+        }
 
         self.config.device = torch.device(self.config.device)
         if self.config.device.type == DeviceTypeOption.CUDA:
@@ -70,6 +72,12 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
     def _cache_or_load_dataset(self):
         pass
 
+    def _model_inputs(self, sample_batched):
+        return [
+            sample_batched[col].to(self.config.device)
+            for col in self.config.inputs_cols
+        ]
+
     def _train_and_evaluate(self, criterion):
         global_step = 0
         max_fold_acc = 0
@@ -80,7 +88,8 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
             self.config.dataset_name,
         )
 
-        losses = []
+        training_metrics = TrainingMetrics(self.config)
+        checkpoint_writer = self._closing(CheckpointWriter(self.config))
 
         self.config.metrics_of_this_checkpoint = {"acc": 0, "f1": 0}
         self.config.max_test_metrics = {"max_test_acc": 0, "max_test_f1": 0}
@@ -111,8 +120,9 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
         for epoch in range(self.config.num_epoch):
             patience -= 1
             description = "Epoch:{} | Loss:{}".format(epoch, 0)
-            iterator = tqdm(self.train_dataloaders[0], desc=description)
+            iterator = self._progress_bar(self.train_dataloaders[0], desc=description)
             for i_batch, sample_batched in enumerate(iterator):
+                training_metrics.mark("data")
                 global_step += 1
                 # switch model to train mode, clear gradient accumulators
                 self.model.train()
@@ -135,18 +145,22 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
                 else:
                     loss = criterion(outputs, targets)
 
-                losses.append(loss.item())
+                training_metrics.update(loss, sample_batched)
+                training_metrics.mark("forward")
                 if self.config.use_amp and self.scaler:
                     self.scaler.scale(loss).backward()
+                    training_metrics.mark("backward")
                     self.scaler.step(self.optimizer)
                     self.scaler.update()
                 else:
                     loss.backward()
+                    training_metrics.mark("backward")
                     self.optimizer.step()
 
                 if self.config.warmup_step >= 0:
                     with self.warmup_scheduler.dampening():
                         self.lr_scheduler.step()
+                training_metrics.mark("optimizer")
 
                 # evaluate if test set is available
                 if global_step % self.config.log_step == 0:
@@ -156,6 +170,8 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
                         else:
                             test_acc, f1 = self._evaluate_acc_f1(self.test_dataloader)
 
+                        # a sweep may stop the trial here, see trial_pruner
+                        trial_pruner.report("eval", test_acc)
                         self.config.metrics_of_this_checkpoint["acc"] = test_acc
                         self.config.metrics_of_this_checkpoint["f1"] = f1
 
@@ -169,15 +185,10 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
                                 patience = self.config.patience - 1
 
                             if self.config.model_path_to_save:
-                                if not os.path.exists(self.config.model_path_to_save):
-                                    os.makedirs(self.config.model_path_to_save)
-                                if save_path:
-                                    try:
-                                        shutil.rmtree(save_path)
-                                        # logger.info('Remove sub-optimal trained model:', save_path)
-                                    except:
-                                        # logger.info('Can not remove sub-optimal trained model:', save_path)
-                                        pass
+                                os.makedirs(
+                                    self.config.model_path_to_save, exist_ok=True
+                                )
+                                # the sub-optimal checkpoints are pruned by the writer once the new one is committed
                                 save_path = "{0}/{1}_{2}_acc_{3}_f1_{4}/".format(
                                     self.config.model_path_to_save,
                                     self.config.model_name,
@@ -196,8 +207,11 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
                                 if f1 > self.config.max_test_metrics["max_test_f1"]:
                                     self.config.max_test_metrics["max_test_f1"] = f1
 
-                                save_model(
-                                    self.config, self.model, self.tokenizer, save_path
+                                checkpoint_writer.save(
+                                    self.model,
+                                    self.tokenizer,
+                                    save_path,
+                                    metric=global_step,
                                 )
 
                         postfix = "Dev Acc:{:>.2f}(max:{:>.2f}) Dev F1:{:>.2f}(max:{:>.2f})".format(
@@ -208,25 +222,20 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
                         )
                         iterator.set_postfix_str(postfix)
                     elif self.config.save_mode and epoch >= self.config.evaluate_begin:
-                        save_model(
-                            self.config,
+                        checkpoint_writer.save(
                             self.model,
                             self.tokenizer,
                             save_path + "_{}/".format(loss.item()),
                         )
                 else:
-                    if self.config.get("loss_display", "smooth") == "smooth":
-                        description = "Epoch:{:>3d} | Smooth Loss: {:>.4f}".format(
-                            epoch, round(np.nanmean(losses), 4)
-                        )
-                    else:
-                        description = "Epoch:{:>3d} | Batch Loss: {:>.4f}".format(
-                            epoch, round(loss.item(), 4)
-                        )
+                    description = training_metrics.description(epoch)
+                training_metrics.mark("evaluate")
                 iterator.set_description(description)
                 iterator.refresh()
             if patience == 0:
                 break
+        # the best checkpoint is reloaded or returned below, wait for it to be committed
+        checkpoint_writer.close()
 
         if not self.valid_dataloader:
             self.config.MV.log_metric(
@@ -300,7 +309,7 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
         save_path_k_fold = ""
         max_fold_acc_k_fold = 0
 
-        losses = []
+        training_metrics = TrainingMetrics(self.config)
 
         self.config.metrics_of_this_checkpoint = {"acc": 0, "f1": 0}
         self.config.max_test_metrics = {"max_test_acc": 0, "max_test_f1": 0}
@@ -336,6 +345,7 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
                     )
                 )
             global_step = 0
+            checkpoint_writer = self._closing(CheckpointWriter(self.config))
             max_fold_acc = 0
             max_fold_f1 = 0
             save_path = "{0}/{1}_{2}".format(
@@ -346,8 +356,9 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
             for epoch in range(self.config.num_epoch):
                 patience -= 1
                 description = "Epoch:{} | Loss:{}".format(epoch, 0)
-                iterator = tqdm(train_dataloader, desc=description)
+                iterator = self._progress_bar(train_dataloader, desc=description)
                 for i_batch, sample_batched in enumerate(iterator):
+                    training_metrics.mark("data")
                     global_step += 1
                     # switch model to train mode, clear gradient accumulators
                     self.model.train()
@@ -369,19 +380,23 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
                     else:
                         loss = criterion(outputs, targets)
 
-                    losses.append(loss.item())
+                    training_metrics.update(loss, sample_batched)
+                    training_metrics.mark("forward")
 
                     if self.config.use_amp and self.scaler:
                         self.scaler.scale(loss).backward()
+                        training_metrics.mark("backward")
                         self.scaler.step(self.optimizer)
                         self.scaler.update()
                     else:
                         loss.backward()
+                        training_metrics.mark("backward")
                         self.optimizer.step()
 
                     if self.config.warmup_step >= 0:
                         with self.warmup_scheduler.dampening():
                             self.lr_scheduler.step()
+                    training_metrics.mark("optimizer")
 
                     # evaluate if test set is available
                     if global_step % self.config.log_step == 0:
@@ -391,6 +406,8 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
                         ):
                             test_acc, f1 = self._evaluate_acc_f1(valid_dataloader)
 
+                            # a sweep may stop the trial here, see trial_pruner
+                            trial_pruner.report("eval", test_acc)
                             self.config.metrics_of_this_checkpoint["acc"] = test_acc
                             self.config.metrics_of_this_checkpoint["f1"] = f1
                             if test_acc > max_fold_acc or f1 > max_fold_f1:
@@ -403,17 +420,10 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
                                     patience = self.config.patience - 1
 
                                 if self.config.model_path_to_save:
-                                    if not os.path.exists(
-                                        self.config.model_path_to_save
-                                    ):
-                                        os.makedirs(self.config.model_path_to_save)
-                                    if save_path:
-                                        try:
-                                            shutil.rmtree(save_path)
-                                            # logger.info('Remove sub-optimal trained model:', save_path)
-                                        except:
-                                            # logger.info('Can not remove sub-optimal trained model:', save_path)
-                                            pass
+                                    os.makedirs(
+                                        self.config.model_path_to_save, exist_ok=True
+                                    )
+                                    # the sub-optimal checkpoints are pruned by the writer once the new one is committed
                                     save_path = "{0}/{1}_{2}_acc_{3}_f1_{4}/".format(
                                         self.config.model_path_to_save,
                                         self.config.model_name,
@@ -432,11 +442,11 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
                                     if f1 > self.config.max_test_metrics["max_test_f1"]:
                                         self.config.max_test_metrics["max_test_f1"] = f1
 
-                                    save_model(
-                                        self.config,
+                                    checkpoint_writer.save(
                                         self.model,
                                         self.tokenizer,
                                         save_path,
+                                        metric=global_step,
                                     )
 
                             postfix = "Dev Acc:{:>.2f}(max:{:>.2f}) Dev F1:{:>.2f}(max:{:>.2f})".format(
@@ -450,26 +460,21 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
                             self.config.save_mode
                             and epoch >= self.config.evaluate_begin
                         ):
-                            save_model(
-                                self.config,
+                            checkpoint_writer.save(
                                 self.model,
                                 self.tokenizer,
                                 save_path + "_{}/".format(loss.item()),
                             )
                     else:
-                        if self.config.get("loss_display", "smooth") == "smooth":
-                            description = "Epoch:{:>3d} | Smooth Loss: {:>.4f}".format(
-                                epoch, round(np.nanmean(losses), 4)
-                            )
-                        else:
-                            description = "Epoch:{:>3d} | Batch Loss: {:>.4f}".format(
-                                epoch, round(loss.item(), 4)
-                            )
+                        description = training_metrics.description(epoch)
 
+                    training_metrics.mark("evaluate")
                     iterator.set_description(description)
                     iterator.refresh()
                 if patience == 0:
                     break
+            # the best checkpoint of the fold is reloaded below, wait for it to be committed
+            checkpoint_writer.close()
 
             max_fold_acc, max_fold_f1 = self._evaluate_acc_f1(self.test_dataloader)
             if max_fold_acc > max_fold_acc_k_fold:
@@ -490,7 +495,7 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
 
             # self.logger.info(self.config.MV.summary(no_print=True))
             self.logger.info(self.config.MV.raw_summary(no_print=True))
-            self._reload_model_state_dict("./init_state_dict.bin")
+            self._reload_model_state_dict()
 
         max_test_acc = np.max(fold_test_acc)
         max_test_f1 = np.mean(fold_test_f1)
@@ -524,7 +529,9 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
                     self.config.model_path_to_save,
                     self.config.model_name,
                 )
-                save_model(self.config, self.model, self.tokenizer, save_path_k_fold)
+                CheckpointWriter(self.config, asynchronous=False).save(
+                    self.model, self.tokenizer, save_path_k_fold
+                )
             del self.train_dataloaders
             del self.test_dataloader
             del self.valid_dataloaders
@@ -2,7 +2,6 @@
 # file: rna_classifier.py
 # author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
 # Copyright (C) 2020. All Rights Reserved.
-import json
 import os
 import pickle
 from typing import Union
@@ -10,7 +9,7 @@ from typing import Union
 import numpy as np
 import torch
 import tqdm
-from findfile import find_file, find_cwd_dir
+from findfile import find_cwd_dir
 from sklearn import metrics
 from termcolor import colored
 from torch.utils.data import DataLoader
@@ -20,6 +19,12 @@ from pyabsa import TaskCodeOption, LabelPaddingOption, DeviceTypeOption
 from pyabsa.framework.prediction_class.predictor_template import InferenceModel
 from pyabsa.utils.data_utils.dataset_manager import detect_infer_dataset
 from pyabsa.utils.pyabsa_utils import set_device, print_args, fprint, rprint
+from pyabsa.framework.checkpoint_class.checkpoint_registry import find_checkpoint_files
+from pyabsa.framework.checkpoint_class.checkpoint_format import (
+    build_task_model,
+    is_safetensors_checkpoint,
+    load_safetensors_checkpoint,
+)
 from ..dataset_utils.data_utils_for_inference import BERTRNACInferenceDataset
 from ..dataset_utils.data_utils_for_inference import GloVeRNACInferenceDataset
 from ..models import BERTRNACModelList, GloVeRNACModelList
@@ -27,6 +32,7 @@ from ..models import BERTRNACModelList, GloVeRNACModelList
 
 class RNAClassifier(InferenceModel):
     task_code = TaskCodeOption.RNASequenceClassification
+    warmup_text = "AUGGCUACGAUCGAUGCAUCGAUGCUAGCUAGCUAGCAUGC$LABEL$"
 
     def __init__(self, checkpoint=None, cal_perplexity=False, **kwargs):
         """
@@ -48,69 +54,79 @@ class RNAClassifier(InferenceModel):
                         "Do not support to directly load a fine-tuned model, please load a .state_dict or .model instead!"
                     )
                 fprint("Load text classifier from", self.checkpoint)
-                state_dict_path = find_file(
-                    self.checkpoint, key=".state_dict", exclude_key=["__MACOSX"]
-                )
-                model_path = find_file(
-                    self.checkpoint, key=".model", exclude_key=["__MACOSX"]
-                )
-                tokenizer_path = find_file(
-                    self.checkpoint, key=".tokenizer", exclude_key=["__MACOSX"]
-                )
-                config_path = find_file(
-                    self.checkpoint, key=".config", exclude_key=["__MACOSX"]
-                )
-
-                fprint("config: {}".format(config_path))
-                fprint("state_dict: {}".format(state_dict_path))
-                fprint("model: {}".format(model_path))
-                fprint("tokenizer: {}".format(tokenizer_path))
-
-                with open(config_path, mode="rb") as f:
-                    self.config = pickle.load(f)
+                if is_safetensors_checkpoint(self.checkpoint):
+                    # the weights are memory-mapped, the PLM is neither downloaded nor initialized
+                    (
+                        self.model,
+                        self.config,
+                        self.tokenizer,
+                    ) = load_safetensors_checkpoint(
+                        self.checkpoint, build_task_model, **kwargs
+                    )
                     self.config.auto_device = kwargs.get("auto_device", True)
                     set_device(self.config, self.config.auto_device)
-
-                if state_dict_path or model_path:
-                    if hasattr(BERTRNACModelList, self.config.model.__name__):
-                        if state_dict_path:
-                            if kwargs.get("offline", False):
-                                self.bert = AutoModel.from_pretrained(
-                                    find_cwd_dir(
-                                        self.config.pretrained_bert.split("/")[-1]
+                else:
+                    checkpoint_files = find_checkpoint_files(self.checkpoint)
+                    state_dict_path = checkpoint_files["state_dict"]
+                    model_path = checkpoint_files["model"]
+                    tokenizer_path = checkpoint_files["tokenizer"]
+                    config_path = checkpoint_files["config"]
+
+                    fprint("config: {}".format(config_path))
+                    fprint("state_dict: {}".format(state_dict_path))
+                    fprint("model: {}".format(model_path))
+                    fprint("tokenizer: {}".format(tokenizer_path))
+
+                    with open(config_path, mode="rb") as f:
+                        self.config = pickle.load(f)
+                        self.config.auto_device = kwargs.get("auto_device", True)
+                        set_device(self.config, self.config.auto_device)
+
+                    if state_dict_path or model_path:
+                        if hasattr(BERTRNACModelList, self.config.model.__name__):
+                            if state_dict_path:
+                                if kwargs.get("offline", False):
+                                    self.bert = AutoModel.from_pretrained(
+                                        find_cwd_dir(
+                                            self.config.pretrained_bert.split("/")[-1]
+                                        )
                                     )
+                                else:
+                                    self.bert = AutoModel.from_pretrained(
+                                        self.config.pretrained_bert
+                                    )
+                                self.model = self.config.model(self.bert, self.config)
+                                self.model.load_state_dict(
+                                    torch.load(
+                                        state_dict_path,
+                                        map_location=DeviceTypeOption.CPU,
+                                    ),
+                                    strict=False,
                                 )
-                            else:
-                                self.bert = AutoModel.from_pretrained(
-                                    self.config.pretrained_bert
+                            elif model_path:
+                                self.model = torch.load(
+                                    model_path, map_location=DeviceTypeOption.CPU
                                 )
-                            self.model = self.config.model(self.bert, self.config)
-                            self.model.load_state_dict(
-                                torch.load(
-                                    state_dict_path, map_location=DeviceTypeOption.CPU
-                                ),
-                                strict=False,
-                            )
-                        elif model_path:
-                            self.model = torch.load(
-                                model_path, map_location=DeviceTypeOption.CPU
-                            )
 
-                    else:
-                        self.embedding_matrix = self.config.embedding_matrix
-                        if model_path:
-                            self.model = torch.load(
-                                model_path, map_location=DeviceTypeOption.CPU
-                            )
                         else:
-                            self.model = self.config.model(
-                                self.embedding_matrix, self.config
-                            ).to(self.config.device)
-                            self.model.load_state_dict(
-                                torch.load(
-                                    state_dict_path, map_location=DeviceTypeOption.CPU
+                            self.embedding_matrix = self.config.embedding_matrix
+                            if model_path:
+                                self.model = torch.load(
+                                    model_path, map_location=DeviceTypeOption.CPU
                                 )
-                            )
+                            else:
+                                self.model = self.config.model(
+                                    self.embedding_matrix, self.config
+                                ).to(self.config.device)
+                                self.model.load_state_dict(
+                                    torch.load(
+                                        state_dict_path,
+                                        map_location=DeviceTypeOption.CPU,
+                                    )
+                                )
+                    else:
+                        # an exported checkpoint, run with onnxruntime
+                        self.model = self._load_onnx_model(**kwargs)
 
                 self.tokenizer = self.config.tokenizer
 
@@ -236,7 +252,7 @@ class RNAClassifier(InferenceModel):
         correct = {True: "Correct", False: "Wrong"}
         results = []
 
-        with torch.no_grad():
+        with self._inference_context():
             self.model.eval()
             n_correct = 0
             n_labeled = 0
@@ -254,7 +270,7 @@ class RNAClassifier(InferenceModel):
                     if col != "label"
                 ]
 
-                outputs = self.model(inputs)
+                outputs = self._forward(inputs)
                 sen_logits = outputs
                 t_probs = torch.softmax(sen_logits, dim=-1)
 
@@ -331,7 +347,8 @@ class RNAClassifier(InferenceModel):
 
         try:
             if print_result:
-                for ex_id, result in enumerate(results):
+                for ex_id in self._printed_examples(len(results), print_result):
+                    result = results[ex_id]
                     text_printing = result["text"][:]
                     if result["ref_label"] != LabelPaddingOption.LABEL_PADDING:
                         if result["label"] == result["ref_label"]:
@@ -366,10 +383,7 @@ class RNAClassifier(InferenceModel):
                     text_printing = text_info + text_printing
 
                     fprint("Example :{}".format(text_printing))
-            if save_path:
-                with open(save_path, "w", encoding="utf8") as fout:
-                    json.dump(str(results), fout, ensure_ascii=False)
-                    fprint("inference result saved in: {}".format(save_path))
+            self._save_results(results, save_path)
         except Exception as e:
             fprint("Can not save result: {}, Exception: {}".format(text_raw, e))
 
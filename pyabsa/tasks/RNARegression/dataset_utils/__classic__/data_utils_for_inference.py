@@ -12,7 +12,10 @@ import tqdm
 from torch.utils.data import Dataset
 
 from pyabsa.framework.dataset_class.dataset_template import PyABSADataset
-from pyabsa.framework.tokenizer_class.tokenizer_class import pad_and_truncate
+from pyabsa.framework.tokenizer_class.tokenizer_class import (
+    pad_and_truncate,
+    pad_batch,
+)
 from pyabsa.utils.file_utils.file_utils import load_dataset_from_file
 from pyabsa.utils.pyabsa_utils import fprint
 
@@ -33,7 +36,7 @@ class GloVeRNARDataset(Dataset):
             self.process_data(self.parse_sample(text), ignore_error=ignore_error)
 
     def prepare_infer_dataset(self, infer_file, ignore_error):
-        lines = load_dataset_from_file(infer_file, config=self.config)
+        lines = load_dataset_from_file(infer_file, config=self.config, inference=True)
         samples = []
         for sample in lines:
             if sample:
@@ -73,19 +76,18 @@ class GloVeRNARDataset(Dataset):
                     # r2r3_label = float(r2r3_label.strip())
                     # if len(seq) > 2 * self.config.max_seq_len:
                     #     continue
-                    for x in range(len(seq) // (self.config.max_seq_len * 3) + 1):
-                        _seq = seq[
-                            x
-                            * (self.config.max_seq_len * 3) : (x + 1)
-                            * (self.config.max_seq_len * 3)
-                        ]
-                        rna_indices = self.tokenizer.text_to_sequence(_seq)
-                        rna_indices = pad_and_truncate(
-                            rna_indices,
-                            self.config.max_seq_len,
-                            value=self.tokenizer.pad_token_id,
-                        )
-
+                    # the windows of the sequence are padded at once
+                    window = self.config.max_seq_len * 3
+                    windows = [
+                        self.tokenizer.text_to_sequence(seq[x : x + window])
+                        for x in range(0, len(seq) + 1, window)
+                    ]
+                    windows, _, _ = pad_batch(
+                        windows,
+                        self.config.max_seq_len,
+                        value=self.tokenizer.pad_token_id,
+                    )
+                    for rna_indices in windows:
                         data = {
                             "ex_id": torch.tensor(ex_id, dtype=torch.long),
                             "text_raw": seq,
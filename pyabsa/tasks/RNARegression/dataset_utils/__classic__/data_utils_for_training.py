@@ -12,7 +12,10 @@ import tqdm
 
 from pyabsa.framework.dataset_class.dataset_template import PyABSADataset
 from pyabsa.utils.file_utils.file_utils import load_dataset_from_file
-from pyabsa.framework.tokenizer_class.tokenizer_class import pad_and_truncate
+from pyabsa.framework.tokenizer_class.tokenizer_class import (
+    pad_and_truncate,
+    pad_batch,
+)
 
 
 class GloVeRNARDataset(PyABSADataset):
@@ -54,19 +57,18 @@ class GloVeRNARDataset(PyABSADataset):
                 #     continue
                 # for x in range(len(seq) // (config.max_seq_len * 2) + 1):
                 #     _seq = seq[x * (config.max_seq_len * 2):(x + 1) * (config.max_seq_len * 2)]
-                for x in range(len(seq) // (self.config.max_seq_len * 3) + 1):
-                    _seq = seq[
-                        x
-                        * (self.config.max_seq_len * 3) : (x + 1)
-                        * (self.config.max_seq_len * 3)
-                    ]
-                    rna_indices = self.tokenizer.text_to_sequence(_seq)
-                    rna_indices = pad_and_truncate(
-                        rna_indices,
-                        self.config.max_seq_len,
-                        value=self.tokenizer.pad_token_id,
-                    )
-
+                # the windows of the sequence are padded at once
+                window = self.config.max_seq_len * 3
+                windows = [
+                    self.tokenizer.text_to_sequence(seq[x : x + window])
+                    for x in range(0, len(seq) + 1, window)
+                ]
+                windows, _, _ = pad_batch(
+                    windows,
+                    self.config.max_seq_len,
+                    value=self.tokenizer.pad_token_id,
+                )
+                for rna_indices in windows:
                     if any(rna_indices):
                         data = {
                             "ex_id": torch.tensor(ex_id, dtype=torch.long),
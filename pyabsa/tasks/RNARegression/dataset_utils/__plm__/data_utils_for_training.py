@@ -11,7 +11,10 @@ import torch
 import tqdm
 
 from pyabsa.framework.dataset_class.dataset_template import PyABSADataset
-from pyabsa.framework.tokenizer_class.tokenizer_class import pad_and_truncate
+from pyabsa.framework.tokenizer_class.tokenizer_class import (
+    pad_and_truncate,
+    pad_batch,
+)
 from pyabsa.utils.file_utils.file_utils import load_dataset_from_file
 
 
@@ -45,18 +48,18 @@ class BERTRNARDataset(PyABSADataset):
                 )
                 label = float(label.strip())
 
-                for x in range(len(seq) // (self.config.max_seq_len * 2) + 1):
-                    _seq = seq[
-                        x
-                        * (self.config.max_seq_len * 2) : (x + 1)
-                        * (self.config.max_seq_len * 2)
-                    ]
-                    rna_indices = self.tokenizer.text_to_sequence(_seq)
-                    rna_indices = pad_and_truncate(
-                        rna_indices,
-                        self.config.max_seq_len,
-                        value=self.tokenizer.pad_token_id,
-                    )
+                # the windows of the sequence are padded at once
+                window = self.config.max_seq_len * 2
+                windows = [
+                    self.tokenizer.text_to_sequence(seq[x : x + window])
+                    for x in range(0, len(seq) + 1, window)
+                ]
+                windows, _, _ = pad_batch(
+                    windows,
+                    self.config.max_seq_len,
+                    value=self.tokenizer.pad_token_id,
+                )
+                for rna_indices in windows:
                     data = {
                         "ex_id": torch.tensor(ex_id, dtype=torch.long),
                         "text_indices": torch.tensor(rna_indices, dtype=torch.long),
@@ -6,11 +6,9 @@
 # Copyright (C) 2021. All Rights Reserved.
 import math
 import os
-import shutil
 import time
 
 import numpy
-import numpy as np
 import torch
 import torch.nn as nn
 from findfile import find_file
@@ -23,17 +21,18 @@ from torch.utils.data import (
     RandomSampler,
     SequentialSampler,
 )
-from tqdm import tqdm
 from transformers import AutoModel, AutoTokenizer
 
 from pyabsa.framework.flag_class.flag_template import DeviceTypeOption
+from pyabsa.framework.checkpoint_class.checkpoint_writer import CheckpointWriter
 from pyabsa.framework.instructor_class.instructor_template import BaseTrainingInstructor
+from pyabsa.framework.sweep_class import trial_pruner
+from pyabsa.framework.instructor_class.training_metrics import TrainingMetrics
 from pyabsa.framework.tokenizer_class.tokenizer_class import (
     Tokenizer,
     build_embedding_matrix,
     PretrainedTokenizer,
 )
-from pyabsa.utils.file_utils.file_utils import save_model
 from pyabsa.utils.pyabsa_utils import init_optimizer, fprint
 from ..dataset_utils.__classic__.data_utils_for_training import GloVeRNARDataset
 from ..dataset_utils.__plm__.data_utils_for_training import BERTRNARDataset
@@ -58,10 +57,10 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
         self.train_dataloaders = []
         self.valid_dataloaders = []
 
-        if os.path.exists("./init_state_dict.bin"):
-            os.remove("./init_state_dict.bin")
         if self.config.cross_validate_fold > 0:
-            torch.save(self.model.state_dict(), "./init_state_dict.bin")
+            self.init_state_dict = {
+                k: v.detach().clone() for k, v in self.model.state_dict().items()
+            }
 
         self.config.device = torch.device(self.config.device)
         if self.config.device.type == DeviceTypeOption.CUDA:
@@ -74,6 +73,12 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
     def _cache_or_load_dataset(self):
         pass
 
+    def _model_inputs(self, sample_batched):
+        return [
+            sample_batched[col].to(self.config.device)
+            for col in self.config.inputs_cols
+        ]
+
     def _evaluate_acc_f1(self, test_dataloader):
         pass
 
@@ -154,8 +159,11 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
 
         self._init_misc()
 
-    def reload_model(self, ckpt="./init_state_dict.bin"):
-        if os.path.exists(ckpt):
+    def reload_model(self, ckpt=None):
+        if ckpt is None:
+            if self.init_state_dict is not None:
+                self.model.load_state_dict(self.init_state_dict, strict=False)
+        elif os.path.exists(ckpt):
             self.model.load_state_dict(
                 torch.load(find_file(ckpt, or_key=[".bin", "state_dict"])),
                 strict=False,
@@ -253,7 +261,8 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
             self.config.dataset_name,
         )
 
-        losses = []
+        training_metrics = TrainingMetrics(self.config)
+        checkpoint_writer = self._closing(CheckpointWriter(self.config))
 
         self.config.metrics_of_this_checkpoint = {"r2": 0}
         self.config.max_test_metrics = {"max_test_r2": 0}
@@ -284,8 +293,9 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
         for epoch in range(self.config.num_epoch):
             patience -= 1
             description = "Epoch:{} | Loss: {}".format(epoch, 0)
-            iterator = tqdm(self.train_dataloaders[0], desc=description)
+            iterator = self._progress_bar(self.train_dataloaders[0], desc=description)
             for i_batch, sample_batched in enumerate(iterator):
+                training_metrics.mark("data")
                 global_step += 1
                 # switch model to train mode, clear gradient accumulators
                 self.model.train()
@@ -307,18 +317,22 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
                 else:
                     loss = criterion(outputs.view(-1), targets)
 
-                losses.append(loss.item())
+                training_metrics.update(loss, sample_batched)
+                training_metrics.mark("forward")
                 if self.config.use_amp and self.scaler:
                     self.scaler.scale(loss).backward()
+                    training_metrics.mark("backward")
                     self.scaler.step(self.optimizer)
                     self.scaler.update()
                 else:
                     loss.backward()
+                    training_metrics.mark("backward")
                     self.optimizer.step()
 
                 if self.config.warmup_step >= 0:
                     with self.warmup_scheduler.dampening():
                         self.lr_scheduler.step()
+                training_metrics.mark("optimizer")
 
                 # evaluate if test set is available
                 if global_step % self.config.log_step == 0:
@@ -330,6 +344,8 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
                         else:
                             test_r2 = self._evaluate_r2(self.test_dataloader, criterion)
 
+                        # a sweep may stop the trial here, see trial_pruner
+                        trial_pruner.report("eval", test_r2)
                         self.config.metrics_of_this_checkpoint["r2"] = test_r2
 
                         if test_r2 > max_fold_r2:
@@ -338,15 +354,10 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
                                 max_fold_r2 = test_r2
 
                             if self.config.model_path_to_save:
-                                if not os.path.exists(self.config.model_path_to_save):
-                                    os.makedirs(self.config.model_path_to_save)
-                                if save_path and self.config.save_last_ckpt_only:
-                                    try:
-                                        shutil.rmtree(save_path)
-                                        # logger.info('Remove sub-optimal trained model:', save_path)
-                                    except:
-                                        # logger.info('Can not remove sub-optimal trained model:', save_path)
-                                        pass
+                                os.makedirs(
+                                    self.config.model_path_to_save, exist_ok=True
+                                )
+                                # the sub-optimal checkpoints are pruned by the writer once the new one is committed
                                 save_path = "{0}/{1}_{2}_r2_{3}/".format(
                                     self.config.model_path_to_save,
                                     self.config.model_name,
@@ -362,33 +373,31 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
                                         "max_test_r2"
                                     ] = test_r2
 
-                                save_model(
-                                    self.config, self.model, self.tokenizer, save_path
+                                checkpoint_writer.save(
+                                    self.model,
+                                    self.tokenizer,
+                                    save_path,
+                                    metric=global_step,
                                 )
 
                         description = "Epoch:{} | Loss:{:.4f} | Dev R2 Score:{:.4f}(max:{:.4f})".format(
                             epoch, loss.item(), test_r2, max_fold_r2
                         )
                     elif self.config.save_mode and epoch >= self.config.evaluate_begin:
-                        save_model(
-                            self.config,
+                        checkpoint_writer.save(
                             self.model,
                             self.tokenizer,
                             save_path + "_{}/".format(loss.item()),
                         )
                 else:
-                    if self.config.get("loss_display", "smooth") == "smooth":
-                        description = "Epoch:{:>3d} | Smooth Loss: {:>.4f}".format(
-                            epoch, round(np.nanmean(losses), 4)
-                        )
-                    else:
-                        description = "Epoch:{:>3d} | Batch Loss: {:>.4f}".format(
-                            epoch, round(loss.item(), 4)
-                        )
+                    description = training_metrics.description(epoch)
+                training_metrics.mark("evaluate")
                 iterator.set_description(description)
                 iterator.refresh()
             if patience == 0:
                 break
+        # the best checkpoint is reloaded or returned below, wait for it to be committed
+        checkpoint_writer.close()
 
         if not self.valid_dataloader:
             self.config.MV.log_metric(
@@ -443,7 +452,7 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
         save_path_k_fold = ""
         max_fold_r2_k_fold = 0
 
-        losses = []
+        training_metrics = TrainingMetrics(self.config)
 
         self.config.metrics_of_this_checkpoint = {"r2": 0}
         self.config.max_test_metrics = {"max_test_r2": 0}
@@ -479,6 +488,7 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
                     )
                 )
             global_step = 0
+            checkpoint_writer = self._closing(CheckpointWriter(self.config))
             max_fold_r2 = 0
             save_path = "{0}/{1}_{2}".format(
                 self.config.model_path_to_save,
@@ -488,8 +498,9 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
             for epoch in range(self.config.num_epoch):
                 patience -= 1
                 description = "Epoch:{} | Loss:{}".format(epoch, 0)
-                iterator = tqdm(train_dataloader, desc=description)
+                iterator = self._progress_bar(train_dataloader, desc=description)
                 for i_batch, sample_batched in enumerate(iterator):
+                    training_metrics.mark("data")
                     global_step += 1
                     # switch model to train mode, clear gradient accumulators
                     self.model.train()
@@ -514,21 +525,26 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
 
                     if self.config.use_amp and self.scaler:
                         self.scaler.scale(loss).backward()
+                        training_metrics.mark("backward")
                         self.scaler.step(self.optimizer)
                         self.scaler.update()
                     else:
                         loss.backward()
+                        training_metrics.mark("backward")
                         self.optimizer.step()
 
                     if self.config.warmup_step >= 0:
                         with self.warmup_scheduler.dampening():
                             self.lr_scheduler.step()
+                    training_metrics.mark("optimizer")
 
                     # evaluate if test set is available
                     if global_step % self.config.log_step == 0:
                         if self.test_dataloader and epoch >= self.config.evaluate_begin:
                             test_r2 = self._evaluate_r2(valid_dataloader, criterion)
 
+                            # a sweep may stop the trial here, see trial_pruner
+                            trial_pruner.report("eval", test_r2)
                             self.config.metrics_of_this_checkpoint["r2"] = test_r2
                             if test_r2 > max_fold_r2:
                                 if test_r2 > max_fold_r2:
@@ -536,17 +552,10 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
                                     max_fold_r2 = test_r2
 
                                 if self.config.model_path_to_save:
-                                    if not os.path.exists(
-                                        self.config.model_path_to_save
-                                    ):
-                                        os.makedirs(self.config.model_path_to_save)
-                                    if save_path:
-                                        try:
-                                            shutil.rmtree(save_path)
-                                            # logger.info('Remove sub-optimal trained model:', save_path)
-                                        except:
-                                            # logger.info('Can not remove sub-optimal trained model:', save_path)
-                                            pass
+                                    os.makedirs(
+                                        self.config.model_path_to_save, exist_ok=True
+                                    )
+                                    # the sub-optimal checkpoints are pruned by the writer once the new one is committed
                                     save_path = "{0}/{1}_{2}_r2_{3}/".format(
                                         self.config.model_path_to_save,
                                         self.config.model_name,
@@ -562,11 +571,11 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
                                             "max_test_r2"
                                         ] = test_r2
 
-                                    save_model(
-                                        self.config,
+                                    checkpoint_writer.save(
                                         self.model,
                                         self.tokenizer,
                                         save_path,
+                                        metric=global_step,
                                     )
 
                             description = "Epoch:{} | Loss:{:.4f} | Dev R2 Score:{:>.2f}(max:{:>.2f})".format(
@@ -576,26 +585,21 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
                             self.config.save_mode
                             and epoch >= self.config.evaluate_begin
                         ):
-                            save_model(
-                                self.config,
+                            checkpoint_writer.save(
                                 self.model,
                                 self.tokenizer,
                                 save_path + "_{}/".format(loss.item()),
                             )
                     else:
-                        if self.config.get("loss_display", "smooth") == "smooth":
-                            description = "Epoch:{:>3d} | Smooth Loss: {:>.4f}".format(
-                                epoch, round(np.nanmean(losses), 4)
-                            )
-                        else:
-                            description = "Epoch:{:>3d} | Batch Loss: {:>.4f}".format(
-                                epoch, round(loss.item(), 4)
-                            )
+                        description = training_metrics.description(epoch)
 
+                    training_metrics.mark("evaluate")
                     iterator.set_description(description)
                     iterator.refresh()
                 if patience == 0:
                     break
+            # the best checkpoint of the fold is reloaded below, wait for it to be committed
+            checkpoint_writer.close()
 
             max_fold_r2 = self._evaluate_r2(self.test_dataloader, criterion)
             if max_fold_r2 > max_fold_r2_k_fold:
@@ -610,8 +614,7 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
 
             # self.logger.info(self.config.MV.summary(no_print=True))
             self.logger.info(self.config.MV.raw_summary(no_print=True))
-            if os.path.exists("./init_state_dict.bin"):
-                self.reload_model()
+            self.reload_model()
 
         max_test_r2 = numpy.max(fold_test_r2)
 
@@ -647,7 +650,9 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
                     self.config.model_path_to_save,
                     self.config.model_name,
                 )
-                save_model(self.config, self.model, self.tokenizer, save_path_k_fold)
+                CheckpointWriter(self.config, asynchronous=False).save(
+                    self.model, self.tokenizer, save_path_k_fold
+                )
             del self.train_dataloaders
             del self.test_dataloader
             del self.valid_dataloaders
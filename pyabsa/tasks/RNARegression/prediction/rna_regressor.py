@@ -2,7 +2,6 @@
 # file: rna_regressor.py
 # author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
 # Copyright (C) 2020. All Rights Reserved.
-import json
 import os
 import pickle
 from typing import Union
@@ -10,7 +9,7 @@ from typing import Union
 import numpy as np
 import torch
 import tqdm
-from findfile import find_file, find_cwd_dir
+from findfile import find_cwd_dir
 from sklearn import metrics
 from termcolor import colored
 from torch.utils.data import DataLoader
@@ -23,6 +22,12 @@ from pyabsa.framework.tokenizer_class.tokenizer_class import (
 )
 from pyabsa.utils.data_utils.dataset_manager import detect_infer_dataset
 from pyabsa.utils.pyabsa_utils import set_device, print_args, fprint
+from pyabsa.framework.checkpoint_class.checkpoint_registry import find_checkpoint_files
+from pyabsa.framework.checkpoint_class.checkpoint_format import (
+    build_task_model,
+    is_safetensors_checkpoint,
+    load_safetensors_checkpoint,
+)
 from ..dataset_utils.__classic__.data_utils_for_inference import GloVeRNARDataset
 from ..dataset_utils.__plm__.data_utils_for_inference import BERTRNARDataset
 from ..models import BERTRNARModelList, GloVeRNARModelList
@@ -30,6 +35,7 @@ from ..models import BERTRNARModelList, GloVeRNARModelList
 
 class RNARegressor(InferenceModel):
     task_code = TaskCodeOption.RNASequenceRegression
+    warmup_text = "AUGGCUACGAUCGAUGCAUCGAUGCUAGCUAGCUAGCAUGC$LABEL$0"
 
     def __init__(self, checkpoint=None, **kwargs):
         """
@@ -51,79 +57,86 @@ class RNARegressor(InferenceModel):
                         "Do not support to directly load a fine-tuned model, please load a .state_dict or .model instead!"
                     )
                 fprint("Load text classifier from", self.checkpoint)
-                state_dict_path = find_file(
-                    self.checkpoint, key=".state_dict", exclude_key=["__MACOSX"]
-                )
-                model_path = find_file(
-                    self.checkpoint, key=".model", exclude_key=["__MACOSX"]
-                )
-                tokenizer_path = find_file(
-                    self.checkpoint, key=".tokenizer", exclude_key=["__MACOSX"]
-                )
-                config_path = find_file(
-                    self.checkpoint, key=".config", exclude_key=["__MACOSX"]
-                )
-
-                fprint("config: {}".format(config_path))
-                fprint("state_dict: {}".format(state_dict_path))
-                fprint("model: {}".format(model_path))
-                fprint("tokenizer: {}".format(tokenizer_path))
-
-                with open(config_path, mode="rb") as f:
-                    self.config = pickle.load(f)
+                if is_safetensors_checkpoint(self.checkpoint):
+                    # the weights are memory-mapped, the PLM is neither downloaded nor initialized
+                    (
+                        self.model,
+                        self.config,
+                        self.tokenizer,
+                    ) = load_safetensors_checkpoint(
+                        self.checkpoint, build_task_model, **kwargs
+                    )
                     self.config.auto_device = kwargs.get("auto_device", True)
                     set_device(self.config, self.config.auto_device)
-
-                if state_dict_path or model_path:
-                    if hasattr(BERTRNARModelList, self.config.model.__name__):
-                        if state_dict_path:
-                            if kwargs.get("offline", False):
-                                self.bert = AutoModel.from_pretrained(
-                                    find_cwd_dir(
-                                        self.config.pretrained_bert.split("/")[-1]
+                else:
+                    checkpoint_files = find_checkpoint_files(self.checkpoint)
+                    state_dict_path = checkpoint_files["state_dict"]
+                    model_path = checkpoint_files["model"]
+                    tokenizer_path = checkpoint_files["tokenizer"]
+                    config_path = checkpoint_files["config"]
+
+                    fprint("config: {}".format(config_path))
+                    fprint("state_dict: {}".format(state_dict_path))
+                    fprint("model: {}".format(model_path))
+                    fprint("tokenizer: {}".format(tokenizer_path))
+
+                    with open(config_path, mode="rb") as f:
+                        self.config = pickle.load(f)
+                        self.config.auto_device = kwargs.get("auto_device", True)
+                        set_device(self.config, self.config.auto_device)
+
+                    if state_dict_path or model_path:
+                        if hasattr(BERTRNARModelList, self.config.model.__name__):
+                            if state_dict_path:
+                                if kwargs.get("offline", False):
+                                    self.bert = AutoModel.from_pretrained(
+                                        find_cwd_dir(
+                                            self.config.pretrained_bert.split("/")[-1]
+                                        )
                                     )
+                                else:
+                                    self.bert = AutoModel.from_pretrained(
+                                        self.config.pretrained_bert
+                                    )
+                                self.model = self.config.model(self.bert, self.config)
+                                self.model.load_state_dict(
+                                    torch.load(
+                                        state_dict_path,
+                                        map_location=DeviceTypeOption.CPU,
+                                    ),
+                                    strict=False,
                                 )
-                            else:
-                                self.bert = AutoModel.from_pretrained(
-                                    self.config.pretrained_bert
+                            elif model_path:
+                                self.model = torch.load(
+                                    model_path, map_location=DeviceTypeOption.CPU
                                 )
-                            self.model = self.config.model(self.bert, self.config)
-                            self.model.load_state_dict(
-                                torch.load(
-                                    state_dict_path, map_location=DeviceTypeOption.CPU
-                                ),
-                                strict=False,
-                            )
-                        elif model_path:
-                            self.model = torch.load(
-                                model_path, map_location=DeviceTypeOption.CPU
-                            )
 
-                        try:
-                            self.tokenizer = PretrainedTokenizer(
-                                config=self.config, **kwargs
-                            )
-                        except ValueError:
-                            if tokenizer_path:
-                                with open(tokenizer_path, mode="rb") as f:
-                                    self.tokenizer = pickle.load(f)
-                    else:
-                        self.embedding_matrix = self.config.embedding_matrix
-                        self.tokenizer = self.config.tokenizer
-                        if model_path:
-                            self.model = torch.load(
-                                model_path, map_location=DeviceTypeOption.CPU
-                            )
+                            try:
+                                self.tokenizer = PretrainedTokenizer(
+                                    config=self.config, **kwargs
+                                )
+                            except ValueError:
+                                if tokenizer_path:
+                                    with open(tokenizer_path, mode="rb") as f:
+                                        self.tokenizer = pickle.load(f)
                         else:
-                            self.model = self.config.model(
-                                self.embedding_matrix, self.config
-                            ).to(self.config.device)
-                            self.model.load_state_dict(
-                                torch.load(
-                                    state_dict_path, map_location=DeviceTypeOption.CPU
-                                ),
-                                strict=False,
-                            )
+                            self.embedding_matrix = self.config.embedding_matrix
+                            self.tokenizer = self.config.tokenizer
+                            if model_path:
+                                self.model = torch.load(
+                                    model_path, map_location=DeviceTypeOption.CPU
+                                )
+                            else:
+                                self.model = self.config.model(
+                                    self.embedding_matrix, self.config
+                                ).to(self.config.device)
+                                self.model.load_state_dict(
+                                    torch.load(
+                                        state_dict_path,
+                                        map_location=DeviceTypeOption.CPU,
+                                    ),
+                                    strict=False,
+                                )
 
                 self.tokenizer = self.config.tokenizer
 
@@ -247,7 +260,7 @@ class RNARegressor(InferenceModel):
         correct = {True: "Correct", False: "Wrong"}
         results = []
         perplexity = "N.A."
-        with torch.no_grad():
+        with self._inference_context():
             self.model.eval()
             n_total = 0
             t_targets_all, t_outputs_all = None, None
@@ -267,7 +280,7 @@ class RNARegressor(InferenceModel):
                     if col != "label"
                 ]
 
-                outputs = self.model(inputs)
+                outputs = self._forward(inputs)
                 sen_logits = outputs
 
                 for i, i_probs in enumerate(sen_logits):
@@ -350,7 +363,8 @@ class RNARegressor(InferenceModel):
 
         try:
             if print_result:
-                for ex_id, result in enumerate(results):
+                for ex_id in self._printed_examples(len(results), print_result):
+                    result = results[ex_id]
                     text_printing = result["text"][:]
                     if result["ref_label"] != LabelPaddingOption.LABEL_PADDING:
                         if (
@@ -387,10 +401,7 @@ class RNARegressor(InferenceModel):
                     text_printing = text_info + text_printing
 
                     fprint("Example :{} ".format(text_printing))
-            if save_path:
-                with open(save_path, "w", encoding="utf8") as fout:
-                    json.dump(str(results), fout, ensure_ascii=False)
-                    fprint("inference result saved in: {}".format(save_path))
+            self._save_results(results, save_path)
         except Exception as e:
             fprint("Can not save result: {}, Exception: {}".format(text_raw, e))
 
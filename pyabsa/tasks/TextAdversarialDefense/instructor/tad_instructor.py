@@ -6,11 +6,9 @@
 # Copyright (C) 2021. All Rights Reserved.
 import os
 import random
-import shutil
 import time
 
 import numpy as np
-import pandas
 import pytorch_warmup as warmup
 import torch
 import torch.nn as nn
@@ -24,17 +22,18 @@ from torch.utils.data import (
     RandomSampler,
     SequentialSampler,
 )
-from tqdm import tqdm
 from transformers import AutoModel
 
 from pyabsa.framework.flag_class.flag_template import DeviceTypeOption
+from pyabsa.framework.checkpoint_class.checkpoint_writer import CheckpointWriter
 from pyabsa.framework.instructor_class.instructor_template import BaseTrainingInstructor
+from pyabsa.framework.sweep_class import trial_pruner
+from pyabsa.framework.instructor_class.training_metrics import TrainingMetrics
 from pyabsa.framework.tokenizer_class.tokenizer_class import (
     PretrainedTokenizer,
     Tokenizer,
     build_embedding_matrix,
 )
-from pyabsa.utils.file_utils.file_utils import save_model
 from pyabsa.utils.pyabsa_utils import init_optimizer, fprint
 from ..dataset_utils.__classic__.data_utils_for_training import GloVeTADDataset
 from ..dataset_utils.__plm__.data_utils_for_training import BERTTADDataset
@@ -68,10 +67,10 @@ class TADTrainingInstructor(BaseTrainingInstructor):
         self.train_dataloaders = []
         self.valid_dataloaders = []
 
-        if os.path.exists("./init_state_dict.bin"):
-            os.remove("./init_state_dict.bin")
         if self.config.cross_validate_fold > 0:
-            torch.save(self.model.state_dict(), "./init_state_dict.bin")
+            self.init_state_dict = {
+                k: v.detach().clone() for k, v in self.model.state_dict().items()
+            }
 
         self.config.device = torch.device(self.config.device)
         if self.config.device.type == DeviceTypeOption.CUDA:
@@ -151,10 +150,14 @@ class TADTrainingInstructor(BaseTrainingInstructor):
 
         self._init_misc()
 
-    def reload_model_state_dict(self, ckpt="./init_state_dict.bin"):
-        if os.path.exists(ckpt):
+    def reload_model_state_dict(self, ckpt=None):
+        if ckpt is None:
+            if self.init_state_dict is not None:
+                self.model.load_state_dict(self.init_state_dict, strict=False)
+        elif os.path.exists(ckpt):
             self.model.load_state_dict(
-                torch.load(find_file(ckpt, or_key=[".bin", "state_dict"])), strict=False
+                torch.load(find_file(ckpt, or_key=[".bin", "state_dict"])),
+                strict=False,
             )
 
     def prepare_dataloader(self, train_set):
@@ -235,10 +238,13 @@ class TADTrainingInstructor(BaseTrainingInstructor):
             )
             self.warmup_scheduler = warmup.UntunedLinearWarmup(self.optimizer)
 
-        if len(self.valid_dataloaders) > 1:
-            return self._k_fold_train_and_evaluate(criterion)
-        else:
-            return self._train_and_evaluate(criterion)
+        try:
+            if len(self.valid_dataloaders) > 1:
+                return self._k_fold_train_and_evaluate(criterion)
+            else:
+                return self._train_and_evaluate(criterion)
+        finally:
+            self._close_resources()
 
     def _train_and_evaluate(self, criterion):
         global_step = 0
@@ -249,7 +255,8 @@ class TADTrainingInstructor(BaseTrainingInstructor):
         max_adv_tr_fold_acc = 0
         max_adv_tr_fold_f1 = 0
 
-        losses = []
+        training_metrics = TrainingMetrics(self.config)
+        checkpoint_writer = self._closing(CheckpointWriter(self.config))
 
         save_path = "{0}/{1}_{2}".format(
             self.config.model_path_to_save,
@@ -290,8 +297,9 @@ class TADTrainingInstructor(BaseTrainingInstructor):
         for epoch in range(self.config.num_epoch):
             patience -= 1
             description = "Epoch:{} | Loss:{}".format(epoch, 0)
-            iterator = tqdm(self.train_dataloaders[0], desc=description)
+            iterator = self._progress_bar(self.train_dataloaders[0], desc=description)
             for i_batch, sample_batched in enumerate(iterator):
+                training_metrics.mark("data")
                 global_step += 1
                 # switch model to train mode, clear gradient accumulators
                 self.model.train()
@@ -321,19 +329,23 @@ class TADTrainingInstructor(BaseTrainingInstructor):
                         + self.config.args.get("adv_det_weight", 5) * adv_det_loss
                         + self.config.args.get("adv_train_weight", 5) * adv_train_loss
                     )
-                    losses.append(loss.item())
+                    training_metrics.update(loss, sample_batched)
+                    training_metrics.mark("forward")
 
                 if self.scaler:
                     self.scaler.scale(loss).backward()
+                    training_metrics.mark("backward")
                     self.scaler.step(self.optimizer)
                     self.scaler.update()
                 else:
                     loss.backward()
+                    training_metrics.mark("backward")
                     self.optimizer.step()
 
                 if self.config.warmup_step >= 0:
                     with self.warmup_scheduler.dampening():
                         self.lr_scheduler.step()
+                training_metrics.mark("optimizer")
 
                 # evaluate if test set is available
                 if global_step % self.config.log_step == 0:
@@ -357,6 +369,8 @@ class TADTrainingInstructor(BaseTrainingInstructor):
                                 test_adv_tr_f1,
                             ) = self._evaluate_acc_f1(self.test_dataloader)
 
+                        # a sweep may stop the trial here, see trial_pruner
+                        trial_pruner.report("eval", test_label_acc)
                         self.config.metrics_of_this_checkpoint[
                             "max_cls_test_acc"
                         ] = test_label_acc
@@ -409,15 +423,10 @@ class TADTrainingInstructor(BaseTrainingInstructor):
                                 max_adv_tr_fold_f1 = test_adv_tr_f1
 
                             if self.config.model_path_to_save:
-                                if not os.path.exists(self.config.model_path_to_save):
-                                    os.makedirs(self.config.model_path_to_save)
-                                if save_path:
-                                    try:
-                                        shutil.rmtree(save_path)
-                                        # logger.info('Remove sub-configimal trained model:', save_path)
-                                    except:
-                                        # logger.info('Can not remove sub-configimal trained model:', save_path)
-                                        pass
+                                os.makedirs(
+                                    self.config.model_path_to_save, exist_ok=True
+                                )
+                                # the sub-optimal checkpoints are pruned by the writer once the new one is committed
                                 save_path = (
                                     "{0}/{1}_{2}_cls_acc_{3}_cls_f1_{4}_adv_det_acc_{5}_adv_det_f1_{6}"
                                     "_adv_training_acc_{7}_adv_training_f1_{8}/".format(
@@ -484,8 +493,11 @@ class TADTrainingInstructor(BaseTrainingInstructor):
                                         "max_adv_tr_test_f1"
                                     ] = test_adv_tr_f1
 
-                                save_model(
-                                    self.config, self.model, self.tokenizer, save_path
+                                checkpoint_writer.save(
+                                    self.model,
+                                    self.tokenizer,
+                                    save_path,
+                                    metric=global_step,
                                 )
 
                         postfix = (
@@ -501,25 +513,20 @@ class TADTrainingInstructor(BaseTrainingInstructor):
                         )
                         iterator.set_postfix_str(postfix)
                     elif self.config.save_mode and epoch >= self.config.evaluate_begin:
-                        save_model(
-                            self.config,
+                        checkpoint_writer.save(
                             self.model,
                             self.tokenizer,
                             save_path + "_{}/".format(loss.item()),
                         )
                 else:
-                    if self.config.get("loss_display", "smooth") == "smooth":
-                        description = "Epoch:{:>3d} | Smooth Loss: {:>.4f}".format(
-                            epoch, round(np.nanmean(losses), 4)
-                        )
-                    else:
-                        description = "Epoch:{:>3d} | Batch Loss: {:>.4f}".format(
-                            epoch, round(loss.item(), 4)
-                        )
+                    description = training_metrics.description(epoch)
+                training_metrics.mark("evaluate")
                 iterator.set_description(description)
                 iterator.refresh()
             if patience == 0:
                 break
+        # the best checkpoint is reloaded or returned below, wait for it to be committed
+        checkpoint_writer.close()
 
         if not self.valid_dataloader:
             self.config.MV.log_metric(
@@ -613,11 +620,8 @@ class TADTrainingInstructor(BaseTrainingInstructor):
 
         self.config.logger.info(self.config.MV.summary(no_print=True))
 
-        rolling_intv = 5
-        df = pandas.DataFrame(losses)
-        losses = list(np.hstack(df.rolling(rolling_intv, min_periods=1).mean().values))
-        self.config.loss = losses[-1]
-        # self.config.loss = np.average(losses)
+        self.config.loss = training_metrics.loss
+        self.logger.info(training_metrics.summary())
 
         if self.valid_dataloader or self.config.save_mode:
             del self.train_dataloaders
@@ -7,6 +7,7 @@
 # ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
 # Copyright (C) 2022. All Rights Reserved.
 
+import numpy as np
 import tqdm
 from torch.utils.data import Dataset
 
@@ -32,7 +33,7 @@ class GloVeTCInferenceDataset(Dataset):
             self.process_data(self.parse_sample(text), ignore_error=ignore_error)
 
     def prepare_infer_dataset(self, infer_file, ignore_error):
-        lines = load_dataset_from_file(infer_file, config=self.config)
+        lines = load_dataset_from_file(infer_file, config=self.config, inference=True)
         samples = []
         for sample in lines:
             if sample:
@@ -62,13 +63,9 @@ class GloVeTCInferenceDataset(Dataset):
                 else:
                     label = LabelPaddingOption.LABEL_PADDING
 
-                text_indices = self.tokenizer.text_to_sequence(text)
-
                 data = {
                     "ex_id": ex_id,
-                    "text_indices": text_indices
-                    if "text_indices" in self.config.model.inputs
-                    else 0,
+                    "text_indices": 0,
                     "text_raw": text,
                     "label": label,
                 }
@@ -81,6 +78,14 @@ class GloVeTCInferenceDataset(Dataset):
                 else:
                     raise e
 
+        # the texts are encoded at once
+        if "text_indices" in self.config.model.inputs:
+            all_text_indices = self.tokenizer.encode_batch(
+                [data["text_raw"] for data in all_data], dtype=np.int64
+            )
+            for data, text_indices in zip(all_data, all_text_indices):
+                data["text_indices"] = text_indices
+
         self.data = all_data
 
         self.data = PyABSADataset.covert_to_tensor(self.data)
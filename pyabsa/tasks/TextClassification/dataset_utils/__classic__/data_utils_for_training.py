@@ -6,10 +6,11 @@
 # GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
 # ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
 # Copyright (C) 2022. All Rights Reserved.
+import numpy as np
 import tqdm
 
 from pyabsa.framework.dataset_class.dataset_template import PyABSADataset
-from pyabsa.utils.file_utils.file_utils import load_dataset_from_file
+from pyabsa.utils.file_utils.dataset_readers import load_dataset_records
 from pyabsa.utils.pyabsa_utils import check_and_fix_labels
 
 
@@ -18,23 +19,22 @@ class GloVeTCDataset(PyABSADataset):
         pass
 
     def load_data_from_file(self, dataset_file, **kwargs):
-        lines = load_dataset_from_file(
+        # the records of the text or columnar dataset files
+        records = load_dataset_records(
             self.config.dataset_file[self.dataset_type], config=self.config
         )
 
         all_data = []
+        texts = []
 
         label_set = set()
 
-        for i in tqdm.tqdm(range(len(lines)), desc="preparing dataloader"):
-            line = lines[i].strip().split("$LABEL$")
-            text, label = line[0], line[1]
-            text = text.strip().lower()
-            label = label.strip().lower()
-            text_indices = self.tokenizer.text_to_sequence(text)
+        for record in tqdm.tqdm(records, desc="preparing dataloader"):
+            text = str(record["text"]).strip().lower()
+            label = str(record["label"]).strip().lower()
+            texts.append(text)
 
             data = {
-                "text_indices": text_indices,
                 "label": label,
             }
 
@@ -42,6 +42,11 @@ class GloVeTCDataset(PyABSADataset):
 
             all_data.append(data)
 
+        # the texts are encoded at once
+        all_text_indices = self.tokenizer.encode_batch(texts, dtype=np.int64)
+        for data, text_indices in zip(all_data, all_text_indices):
+            data["text_indices"] = text_indices
+
         check_and_fix_labels(label_set, "label", all_data, self.config)
         self.config.output_dim = len(label_set)
 
@@ -10,7 +10,7 @@
 import tqdm
 
 from pyabsa.framework.dataset_class.dataset_template import PyABSADataset
-from pyabsa.utils.file_utils.file_utils import load_dataset_from_file
+from pyabsa.utils.file_utils.dataset_readers import load_dataset_records
 from pyabsa.utils.pyabsa_utils import check_and_fix_labels
 
 
@@ -19,7 +19,8 @@ class BERTTCDataset(PyABSADataset):
         pass
 
     def load_data_from_file(self, dataset_file, **kwargs):
-        lines = load_dataset_from_file(
+        # the records of the text or columnar dataset files
+        records = load_dataset_records(
             self.config.dataset_file[self.dataset_type], config=self.config
         )
 
@@ -27,11 +28,9 @@ class BERTTCDataset(PyABSADataset):
 
         label_set = set()
 
-        for i in tqdm.tqdm(range(len(lines)), desc="preparing dataloader"):
-            line = lines[i].strip().split("$LABEL$")
-            text, label = line[0], line[1]
-            text = text.strip()
-            label = label.strip()
+        for record in tqdm.tqdm(records, desc="preparing dataloader"):
+            text = str(record["text"]).strip()
+            label = str(record["label"]).strip()
             text_indices = self.tokenizer.text_to_sequence(
                 "{} {} {}".format(
                     self.tokenizer.tokenizer.cls_token,
@@ -7,7 +7,6 @@ import pickle
 from typing import Union
 
 import torch
-from findfile import find_file
 from torch.nn.utils.rnn import pad_sequence
 from torch.utils.data import DataLoader
 from tqdm import tqdm
@@ -19,10 +18,13 @@ from pyabsa.tasks.UniversalSentimentAnalysis.dataset_utils.data_utils_for_infere
 )
 from pyabsa.utils.data_utils.dataset_manager import detect_infer_dataset
 from pyabsa.utils.pyabsa_utils import fprint, set_device
+from pyabsa.framework.checkpoint_class.checkpoint_registry import find_checkpoint_files
 
 
 class USAPredictor(InferenceModel):
     task_code = TaskCodeOption.Universal_Sentiment_Analysis
+    # the batches are padded to their longest sentence
+    compile_fast_path = False
 
     def __init__(self, checkpoint=None, **kwargs):
         super().__init__(checkpoint, task_code=self.task_code, **kwargs)
@@ -32,18 +34,11 @@ class USAPredictor(InferenceModel):
             fprint("Load sentiment classifier from trainer")
             try:
                 fprint("Load text classifier from", self.checkpoint)
-                state_dict_path = find_file(
-                    self.checkpoint, key=".state_dict", exclude_key=["__MACOSX"]
-                )
-                model_path = find_file(
-                    self.checkpoint, key=".model", exclude_key=["__MACOSX"]
-                )
-                tokenizer_path = find_file(
-                    self.checkpoint, key=".tokenizer", exclude_key=["__MACOSX"]
-                )
-                config_path = find_file(
-                    self.checkpoint, key=".config", exclude_key=["__MACOSX"]
-                )
+                checkpoint_files = find_checkpoint_files(self.checkpoint)
+                state_dict_path = checkpoint_files["state_dict"]
+                model_path = checkpoint_files["model"]
+                tokenizer_path = checkpoint_files["tokenizer"]
+                config_path = checkpoint_files["config"]
 
                 fprint("config: {}".format(config_path))
                 fprint("state_dict: {}".format(state_dict_path))
@@ -189,7 +184,7 @@ class USAPredictor(InferenceModel):
     def _run_prediction(self, save_path=None, print_result=True, **kwargs):
         self.model.model.eval()
         all_results = []
-        with torch.no_grad():
+        with self._inference_context():
 
             def collate_fn(batch):
                 input_ids = [torch.tensor(example["input_ids"]) for example in batch]
@@ -59,7 +59,9 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
         self.train_dataloaders = []
         self.valid_dataloaders = []
 
-        torch.save(self.model.state_dict(), "./init_state_dict.bin")
+        self.init_state_dict = {
+            k: v.detach().clone() for k, v in self.model.state_dict().items()
+        }
 
         self.config.device = torch.device(self.config.device)
         if self.config.device.type == DeviceTypeOption.CUDA:
@@ -492,7 +494,7 @@ class RNACTrainingInstructor(BaseTrainingInstructor):
 
             # self.logger.info(self.config.MV.summary(no_print=True))
             self.logger.info(self.config.MV.raw_summary(no_print=True))
-            self._reload_model_state_dict("./init_state_dict.bin")
+            self._reload_model_state_dict()
 
         max_test_acc = numpy.max(fold_test_acc)
         max_test_f1 = numpy.mean(fold_test_f1)
@@ -58,10 +58,10 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
         self.train_dataloaders = []
         self.valid_dataloaders = []
 
-        if os.path.exists("./init_state_dict.bin"):
-            os.remove("./init_state_dict.bin")
         if self.config.cross_validate_fold > 0:
-            torch.save(self.model.state_dict(), "./init_state_dict.bin")
+            self.init_state_dict = {
+                k: v.detach().clone() for k, v in self.model.state_dict().items()
+            }
 
         self.config.device = torch.device(self.config.device)
         if self.config.device.type == DeviceTypeOption.CUDA:
@@ -152,8 +152,11 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
 
         self._init_misc()
 
-    def reload_model(self, ckpt="./init_state_dict.bin"):
-        if os.path.exists(ckpt):
+    def reload_model(self, ckpt=None):
+        if ckpt is None:
+            if self.init_state_dict is not None:
+                self.model.load_state_dict(self.init_state_dict, strict=False)
+        elif os.path.exists(ckpt):
             self.model.load_state_dict(
                 torch.load(find_file(ckpt, or_key=[".bin", "state_dict"])),
                 strict=False,
@@ -608,8 +611,7 @@ class RNARTrainingInstructor(BaseTrainingInstructor):
 
             # self.logger.info(self.config.MV.summary(no_print=True))
             self.logger.info(self.config.MV.raw_summary(no_print=True))
-            if os.path.exists("./init_state_dict.bin"):
-                self.reload_model()
+            self.reload_model()
 
         max_test_r2 = numpy.max(fold_test_r2)
 
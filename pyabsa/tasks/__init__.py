@@ -6,3 +6,8 @@
 # GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
 # ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
 # Copyright (C) 2022. All Rights Reserved.
+
+# the tasks are imported on first access (PEP 562), e.g., pyabsa.tasks.TextClassification
+from pyabsa.utils.import_utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__ = lazy_attributes(__name__, {})
@@ -5,20 +5,45 @@
 # github: https://github.com/yangheng95
 # Copyright (C) 2021. All Rights Reserved.
 
-from pyabsa.utils.data_utils.dataset_item import DatasetItem
-from pyabsa.utils.absa_utils.make_absa_dataset import make_ABSA_dataset
-from pyabsa.utils.absa_utils.absa_utils import (
-    generate_inference_set_for_apc,
-    convert_apc_set_to_atepc_set,
-)
-
-from pyabsa.utils.text_utils.word2vec import train_word2vec
-from pyabsa.utils.text_utils.bpe_tokenizer import train_bpe_tokenizer
+# the utils are imported on first access (PEP 562), so importing a submodule does not import all of them
+from pyabsa.utils.import_utils.lazy_import import lazy_attributes
 
-from pyabsa.utils.data_utils.dataset_manager import (
-    download_all_available_datasets,
-    download_dataset_by_name,
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "DatasetItem": ("pyabsa.utils.data_utils.dataset_item", "DatasetItem"),
+        "make_ABSA_dataset": (
+            "pyabsa.utils.absa_utils.make_absa_dataset",
+            "make_ABSA_dataset",
+        ),
+        "generate_inference_set_for_apc": (
+            "pyabsa.utils.absa_utils.absa_utils",
+            "generate_inference_set_for_apc",
+        ),
+        "convert_apc_set_to_atepc_set": (
+            "pyabsa.utils.absa_utils.absa_utils",
+            "convert_apc_set_to_atepc_set",
+        ),
+        "train_word2vec": ("pyabsa.utils.text_utils.word2vec", "train_word2vec"),
+        "train_bpe_tokenizer": (
+            "pyabsa.utils.text_utils.bpe_tokenizer",
+            "train_bpe_tokenizer",
+        ),
+        "download_all_available_datasets": (
+            "pyabsa.utils.data_utils.dataset_manager",
+            "download_all_available_datasets",
+        ),
+        "download_dataset_by_name": (
+            "pyabsa.utils.data_utils.dataset_manager",
+            "download_dataset_by_name",
+        ),
+        "load_dataset_from_file": (
+            "pyabsa.utils.file_utils.file_utils",
+            "load_dataset_from_file",
+        ),
+        "VoteEnsemblePredictor": (
+            "pyabsa.utils.ensemble_prediction.ensemble_prediction",
+            "VoteEnsemblePredictor",
+        ),
+    },
 )
-from pyabsa.utils.file_utils.file_utils import load_dataset_from_file
-
-from pyabsa.utils.ensemble_prediction.ensemble_prediction import VoteEnsemblePredictor
@@ -30,6 +30,8 @@ from pyabsa.framework.flag_class import (
 )
 from pyabsa.utils.check_utils.dataset_version_check import check_datasets_version
 from pyabsa.utils.data_utils.dataset_item import DatasetItem
+from pyabsa.utils.data_utils.dataset_registry import get_dataset_registry
+from pyabsa.utils.notification_utils.remote_checks import remote_checks_enabled
 from pyabsa.utils.pyabsa_utils import fprint
 
 filter_key_words = [
@@ -75,7 +77,9 @@ def detect_dataset(
     """
 
     logger = config.logger if config else kwargs.get("logger", None)
-    check_datasets_version(logger=logger)
+    # the version check queries the network, it is opt-in as the other remote checks
+    if remote_checks_enabled():
+        check_datasets_version(logger=logger)
     if not isinstance(dataset_name_or_path, DatasetItem):
         dataset_name_or_path = DatasetItem(dataset_name_or_path)
     dataset_file = {"train": [], "test": [], "valid": []}
@@ -110,11 +114,8 @@ def detect_dataset(
                         )
                     download_dataset_by_name(logger, task_code, dataset_name=d)
 
-            search_path = findfile.find_dir(
-                os.getcwd(),
-                [d, task_code, "dataset"],
-                exclude_key=["infer", "test."] + filter_key_words,
-                disable_alert=False,
+            search_path = _find_dataset_dir(
+                d, task_code, exclude_key=["infer", "test."] + filter_key_words
             )
             if not search_path:
                 raise ValueError(
@@ -139,22 +140,22 @@ def detect_dataset(
 
             # For pretraining checkpoints, we use all dataset set as trainer set
             if load_aug:
-                dataset_file["train"] += findfile.find_files(
+                dataset_file["train"] += _find_dataset_files(
                     search_path,
                     [d, "train", task_code],
                     exclude_key=[".inference", "test.", "valid."] + filter_key_words,
                 )
-                dataset_file["test"] += findfile.find_files(
+                dataset_file["test"] += _find_dataset_files(
                     search_path,
                     [d, "test", task_code],
                     exclude_key=[".inference", "train.", "valid."] + filter_key_words,
                 )
-                dataset_file["valid"] += findfile.find_files(
+                dataset_file["valid"] += _find_dataset_files(
                     search_path,
                     [d, "valid", task_code],
                     exclude_key=[".inference", "train.", "test."] + filter_key_words,
                 )
-                dataset_file["valid"] += findfile.find_files(
+                dataset_file["valid"] += _find_dataset_files(
                     search_path,
                     [d, "dev", task_code],
                     exclude_key=[".inference", "train.", "test."] + filter_key_words,
@@ -187,28 +188,28 @@ def detect_dataset(
                             )
                         )
             else:
-                dataset_file["train"] += findfile.find_files(
+                dataset_file["train"] += _find_dataset_files(
                     search_path,
                     [d, "train", task_code],
                     exclude_key=[".inference", "test.", "valid."]
                     + filter_key_words
                     + [".ignore"],
                 )
-                dataset_file["test"] += findfile.find_files(
+                dataset_file["test"] += _find_dataset_files(
                     search_path,
                     [d, "test", task_code],
                     exclude_key=[".inference", "train.", "valid."]
                     + filter_key_words
                     + [".ignore"],
                 )
-                dataset_file["valid"] += findfile.find_files(
+                dataset_file["valid"] += _find_dataset_files(
                     search_path,
                     [d, "valid", task_code],
                     exclude_key=[".inference", "train.", "test."]
                     + filter_key_words
                     + [".ignore"],
                 )
-                dataset_file["valid"] += findfile.find_files(
+                dataset_file["valid"] += _find_dataset_files(
                     search_path,
                     [d, "dev", task_code],
                     exclude_key=[".inference", "train.", "test."]
@@ -355,13 +356,8 @@ def detect_infer_dataset(
                         logger=logger, task_code=task_code, dataset_name=d
                     )
 
-            search_path = findfile.find_dir(
-                os.getcwd(),
-                [d, task_code, "dataset"],
-                exclude_key=filter_key_words,
-                disable_alert=False,
-            )
-            dataset_file += findfile.find_files(
+            search_path = _find_dataset_dir(d, task_code, exclude_key=filter_key_words)
+            dataset_file += _find_dataset_files(
                 search_path,
                 [".inference", d],
                 exclude_key=["train."] + filter_key_words,
@@ -396,6 +392,34 @@ def detect_infer_dataset(
     return dataset_file
 
 
+def _find_dataset_dir(dataset_name, task_code, exclude_key):
+    """
+    Find a dataset directory in the index of integrated_datasets, or search the working directory with findfile
+    if the dataset is not indexed (e.g., a custom dataset in another folder).
+    """
+    registry = get_dataset_registry()
+    if registry:
+        search_path = registry.find_dataset_dir(dataset_name, task_code, exclude_key)
+        if search_path:
+            return search_path
+    return findfile.find_dir(
+        os.getcwd(),
+        [dataset_name, task_code, "dataset"],
+        exclude_key=exclude_key,
+        disable_alert=False,
+    )
+
+
+def _find_dataset_files(search_path, key, exclude_key):
+    """
+    Find the files of a dataset directory in the index of integrated_datasets, or with findfile.
+    """
+    registry = get_dataset_registry(refresh=False)
+    if registry and search_path and registry.contains(search_path):
+        return registry.find_files(search_path, key, exclude_key)
+    return findfile.find_files(search_path, key, exclude_key=exclude_key)
+
+
 def download_all_available_datasets(**kwargs):
     """
     Download datasets from GitHub
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# file: dataset_registry.py
+# time: 20/10/2026 01:40
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+The index of the local datasets in integrated_datasets/, used by detect_dataset() and detect_infer_dataset() in place
+of searching the whole working directory with findfile.
+
+The index (integrated_datasets/.index/datasets.json) records the files and the mtime of every directory. It is built
+once, then refreshed incrementally: only the directories whose mtime changed (i.e., a file or a directory was added,
+removed or renamed in them, e.g., by a download or an augmentation) are listed again. The dataset directories are
+looked up by their names (e.g., "113.Laptop14" or "Laptop14") in a dict, and the split files are selected with the
+same keywords as findfile.
+"""
+
+import json
+import os
+import re
+
+# in a subdirectory, so that saving the index does not change the mtime of integrated_datasets
+INDEX_DIR = ".index"
+INDEX_FILE = "datasets.json"
+INDEX_VERSION = 1
+
+_registries = {}
+
+
+def get_dataset_registry(root="integrated_datasets", refresh=True):
+    """
+    :param root: the datasets directory, relative to the working directory
+    :param refresh: refresh the index of the changed directories
+    :return: the DatasetRegistry of the directory, or None if it does not exist
+    """
+    if not os.path.isdir(root):
+        return None
+    key = os.path.abspath(root)
+    if key not in _registries:
+        _registries[key] = DatasetRegistry(root)
+        refresh = True
+    registry = _registries[key]
+    if refresh:
+        registry.refresh()
+    return registry
+
+
+class DatasetRegistry:
+    def __init__(self, root="integrated_datasets"):
+        """
+        :param root: the datasets directory
+        """
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_DIR, INDEX_FILE)
+        self.dirs = {}  # relative dir -> {"mtime", "files", "dirs"}
+        self._aliases = None
+        try:
+            with open(self.index_path, mode="r", encoding="utf8") as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION:
+                self.dirs = index["dirs"]
+        except (OSError, ValueError, KeyError):
+            self.dirs = {}
+
+    def refresh(self):
+        """
+        List again the directories changed since the last refresh, and save the index if any.
+
+        :return: the number of directories listed
+        """
+        listed = 0
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        except OSError:
+            pass
+        if "" not in self.dirs:
+            listed += self._scan("")
+        for rel_dir in sorted(self.dirs):
+            if rel_dir not in self.dirs:  # removed with its parent
+                continue
+            try:
+                mtime = os.stat(self._path(rel_dir)).st_mtime
+            except OSError:
+                self._remove(rel_dir)
+                listed += 1
+                continue
+            if mtime != self.dirs[rel_dir]["mtime"]:
+                listed += self._scan(rel_dir)
+        if listed:
+            self._aliases = None
+            self._save()
+        return listed
+
+    def find_dataset_dir(self, dataset_name, task_code=None, exclude_key=()):
+        """
+        The equivalent of findfile.find_dir(os.getcwd(), [dataset_name, task_code, "dataset"], exclude_key).
+
+        :param dataset_name: the dataset name or id, e.g., "113.Laptop14" or "Laptop14"
+        :param task_code: the task code, e.g., "APC"
+        :param exclude_key: the keywords the directory path must not contain
+        :return: the dataset directory, or None if it is not indexed
+        """
+        if self._aliases is None:
+            self._build_aliases()
+        keys = [k for k in [dataset_name, task_code, "dataset"] if k]
+        for rel_dir in self._aliases.get(_alias(dataset_name), []):
+            path = self._path(rel_dir)
+            if _match(path, keys, exclude_key):
+                return path
+        return None
+
+    def contains(self, path):
+        """
+        :return: True if the path is in the datasets directory
+        """
+        root = os.path.abspath(self.root)
+        path = os.path.abspath(path)
+        return path == root or path.startswith(root + os.sep)
+
+    def find_files(self, dataset_dir, key, exclude_key=()):
+        """
+        The equivalent of findfile.find_files(dataset_dir, key, exclude_key) for an indexed dataset directory.
+
+        :param dataset_dir: a directory returned by find_dataset_dir()
+        :param key: the keywords the file paths must contain
+        :param exclude_key: the keywords the file paths must not contain
+        :return: the sorted file paths
+        """
+        rel_dir = os.path.relpath(dataset_dir, self.root).replace(os.sep, "/")
+        rel_dir = "" if rel_dir == "." else rel_dir
+        files = []
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            entry = self.dirs.get(current)
+            if entry is None:
+                continue
+            for file in entry["files"]:
+                path = self._path(_join(current, file))
+                if _match(path, key, exclude_key):
+                    files.append(path)
+            stack.extend(_join(current, d) for d in entry["dirs"])
+        return sorted(files)
+
+    def _scan(self, rel_dir):
+        # list a directory, and the new subdirectories recursively
+        listed = 0
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            try:
+                mtime = os.stat(self._path(current)).st_mtime
+                entries = list(os.scandir(self._path(current)))
+            except OSError:
+                self._remove(current)
+                continue
+            files, dirs = [], []
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir():
+                    dirs.append(entry.name)
+                else:
+                    files.append(entry.name)
+            old_dirs = set(self.dirs.get(current, {}).get("dirs", []))
+            for removed in old_dirs - set(dirs):
+                self._remove(_join(current, removed))
+            self.dirs[current] = {
+                "mtime": mtime,
+                "files": sorted(files),
+                "dirs": sorted(dirs),
+            }
+            listed += 1
+            stack.extend(
+                _join(current, d) for d in dirs if _join(current, d) not in self.dirs
+            )
+        return listed
+
+    def _remove(self, rel_dir):
+        entry = self.dirs.pop(rel_dir, None)
+        if entry:
+            for d in entry["dirs"]:
+                self._remove(_join(rel_dir, d))
+
+    def _build_aliases(self):
+        # the names of the dataset directories with and without the id, the least deep first
+        aliases = {}
+        for rel_dir in sorted(self.dirs, key=lambda d: (d.count("/"), d)):
+            if not rel_dir:
+                continue
+            name = rel_dir.rsplit("/", 1)[-1]
+            for alias in {_alias(name), _alias(re.sub(r"^\d+\.", "", name))}:
+                aliases.setdefault(alias, []).append(rel_dir)
+        self._aliases = aliases
+
+    def _path(self, rel_dir):
+        return os.path.join(self.root, *rel_dir.split("/")) if rel_dir else self.root
+
+    def _save(self):
+        tmp_path = "{}.{}.tmp".format(self.index_path, os.getpid())
+        try:
+            with open(tmp_path, mode="w", encoding="utf8") as f:
+                json.dump({"version": INDEX_VERSION, "dirs": self.dirs}, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            pass
+
+
+def _join(rel_dir, name):
+    return "{}/{}".format(rel_dir, name) if rel_dir else name
+
+
+def _alias(name):
+    return str(name).strip().lower()
+
+
+def _match(path, key, exclude_key):
+    # the keyword matching of findfile, case-insensitive
+    path = path.lower()
+    if isinstance(key, str):
+        key = [key]
+    if isinstance(exclude_key, str):
+        exclude_key = [exclude_key]
+    return all(str(k).lower() in path for k in key if k) and not any(
+        str(k).lower() in path for k in exclude_key if k
+    )
@@ -0,0 +1,460 @@
+# -*- coding: utf-8 -*-
+# file: dataset_readers.py
+# time: 20/10/2026 04:50
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+The readers of the columnar dataset files (JSONL, Parquet and Arrow IPC), streamed in record batches.
+
+A record is a dict of the fields of a task:
+
+- APC: text (with the $T$ placeholder of the aspect), aspect and label;
+- ATEPC: tokens, tags and polarities (lists, or whitespace-separated strings);
+- TC, TAD, RNAC, RNAR and PR: text and label;
+- CDD: func and target, and the optional feature.
+
+The columns of a file are mapped to the fields with config.dataset_columns, e.g., {"text": "review", "label": "stars"},
+the unmapped fields are read from the columns of the same name. The datasets read the records directly, or read them
+rendered as the lines of the text format of the task, so the columnar files are used as the text files. The inference
+files need only the inputs, i.e., the fields of INFERENCE_DATASET_FIELDS, and are rendered as the lines of the
+inference format, e.g., "the [B-ASP]food[E-ASP] is great$LABEL$Positive" per APC record. The text files are converted
+to the columnar files once with:
+
+    python -m pyabsa.utils.file_utils.dataset_readers APC train.apc.txt train.apc.parquet
+
+Parquet and Arrow need pyarrow: pip install pyarrow
+"""
+
+import argparse
+import itertools
+import json
+import os
+
+DATASET_FIELDS = {
+    "APC": ("text", "aspect", "label"),
+    "ATEPC": ("tokens", "tags", "polarities"),
+    "TC": ("text", "label"),
+    "TAD": ("text", "label"),
+    "RNAC": ("text", "label"),
+    "RNAR": ("text", "label"),
+    "PR": ("text", "label"),
+    "CDD": ("func", "target"),
+}
+# the fields read if the files have them
+OPTIONAL_DATASET_FIELDS = {
+    "CDD": ("feature",),
+}
+# the fields of the inference files, the other fields, e.g., the labels, are optional
+INFERENCE_DATASET_FIELDS = {
+    "APC": ("text", "aspect"),
+    "ATEPC": ("tokens",),
+    "TC": ("text",),
+    "TAD": ("text",),
+    "RNAC": ("text",),
+    "RNAR": ("text",),
+    "PR": ("text",),
+    "CDD": ("func",),
+}
+
+_READERS = {}
+_WRITERS = {}
+
+
+def register_dataset_reader(*extensions):
+    """
+    Register a reader of the files with the extensions, the reader is called as reader(path, columns, batch_size)
+    and yields the record batches as dicts of column lists.
+    """
+
+    def decorator(reader):
+        for extension in extensions:
+            _READERS[extension.lower()] = reader
+        return reader
+
+    return decorator
+
+
+def register_dataset_writer(*extensions):
+    """
+    Register a writer of the files with the extensions, the writer is called as writer(path, batches, columns).
+    """
+
+    def decorator(writer):
+        for extension in extensions:
+            _WRITERS[extension.lower()] = writer
+        return writer
+
+    return decorator
+
+
+def is_columnar_file(path):
+    """
+    :return: True if the file is read by a registered reader rather than as a text dataset file
+    """
+    return os.path.splitext(str(path))[1].lower() in _READERS
+
+
+def iter_record_batches(
+    path, task_code, column_map=None, batch_size=1024, inference=False
+):
+    """
+    :param path: the columnar dataset file
+    :param task_code: the task code of the fields, e.g., "APC"
+    :param column_map: the columns of the fields, default to the fields' names
+    :param batch_size: the number of records of a batch
+    :param inference: True if the file is an inference file, of which only the inputs are required
+    :return: an iterator of the record batches, dicts of the field lists
+    """
+    fields = _get_fields(task_code)
+    optional = OPTIONAL_DATASET_FIELDS.get(task_code, ())
+    if inference:
+        optional = (
+            tuple(f for f in fields if f not in INFERENCE_DATASET_FIELDS[task_code])
+            + optional
+        )
+        fields = INFERENCE_DATASET_FIELDS[task_code]
+    column_map = column_map or {}
+    columns = {field: column_map.get(field, field) for field in fields + optional}
+    reader = _READERS[os.path.splitext(str(path))[1].lower()]
+    for batch in reader(path, list(columns.values()), batch_size):
+        missing = [columns[field] for field in fields if columns[field] not in batch]
+        if missing:
+            raise KeyError("Missing columns {} in {}".format(missing, path))
+        yield {
+            field: batch[column] for field, column in columns.items() if column in batch
+        }
+
+
+def iter_dataset_records(
+    fname, config=None, task_code=None, batch_size=1024, inference=False
+):
+    """
+    Stream the records of the dataset files, the columnar files in record batches and the text files line by line.
+
+    :param fname: the dataset file or the list of files
+    :param config: the config of config.task_code and config.dataset_columns
+    :param task_code: the task code, default to config.task_code
+    :param batch_size: the number of records of a batch of the columnar files
+    :param inference: True if the files are columnar inference files, of which the labels are optional
+    :return: an iterator of the records
+    """
+    config = config or {}
+    task_code = task_code or config.get("task_code", None)
+    column_map = config.get("dataset_columns", None)
+    for f in [fname] if isinstance(fname, str) else fname:
+        if is_columnar_file(f):
+            for batch in iter_record_batches(
+                f, task_code, column_map, batch_size, inference
+            ):
+                fields = list(batch)
+                for values in zip(*batch.values()):
+                    yield dict(zip(fields, values))
+        else:
+            yield from _iter_text_records(f, task_code)
+
+
+def load_dataset_records(fname, config=None, task_code=None):
+    """
+    :return: the list of the records of the dataset files, up to config.data_num
+    """
+    config = config or {}
+    records = iter_dataset_records(fname, config, task_code)
+    return list(itertools.islice(records, config.get("data_num", None)))
+
+
+def records_to_lines(records, task_code, inference=False):
+    """
+    Render the records as the lines of the text format of a task, e.g., three lines per record of APC.
+
+    :param inference: True to render the lines of the inference format, i.e., a line per record
+    :return: an iterator of the lines
+    """
+    _get_fields(task_code)
+    if inference:
+        yield from _records_to_inference_lines(records, task_code)
+        return
+    for record in records:
+        if task_code == "APC":
+            yield str(record["text"]).strip()
+            yield str(record["aspect"]).strip()
+            yield str(record["label"]).strip()
+        elif task_code == "ATEPC":
+            for token, tag, polarity in zip(
+                _as_list(record["tokens"]),
+                _as_list(record["tags"]),
+                _as_list(record["polarities"]),
+            ):
+                yield "{} {} {}".format(token, tag, polarity)
+            yield ""
+        elif task_code == "CDD":
+            yield json.dumps(record, ensure_ascii=False)
+        else:
+            yield "{}$LABEL${}".format(
+                str(record["text"]).strip(), str(record["label"]).strip()
+            )
+
+
+def convert_dataset_file(src, dst, task_code, config=None, batch_size=1024):
+    """
+    Convert a dataset file to another format, e.g., a text APC dataset to Parquet, streaming in record batches.
+
+    :param src: the source file, a text or columnar dataset file
+    :param dst: the destination file, the format is inferred from its extension (.jsonl, .parquet or .arrow)
+    :param task_code: the task code of the dataset, e.g., "APC"
+    :param config: the config of config.dataset_columns of the source file
+    :param batch_size: the number of records of a batch
+    :return: the number of the converted records
+    """
+    extension = os.path.splitext(dst)[1].lower()
+    if extension not in _WRITERS:
+        raise ValueError(
+            "Unsupported dataset format: {}, available formats: {}".format(
+                extension, sorted(_WRITERS)
+            )
+        )
+    fields = _get_fields(task_code)
+    optional = OPTIONAL_DATASET_FIELDS.get(task_code, ())
+    records = iter_dataset_records(src, config, task_code, batch_size)
+    count = [0]
+
+    def batches():
+        while True:
+            batch = list(itertools.islice(records, batch_size))
+            if not batch:
+                return
+            count[0] += len(batch)
+            yield {
+                field: [record.get(field) for record in batch]
+                for field in fields + optional
+                if field in fields or any(field in record for record in batch)
+            }
+
+    tmp = "{}.{}.tmp{}".format(dst, os.getpid(), extension)
+    try:
+        _WRITERS[extension](tmp, batches(), fields)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return count[0]
+
+
+@register_dataset_reader(".jsonl")
+def _read_jsonl(path, columns, batch_size):
+    with open(path, mode="r", encoding="utf8") as f:
+        lines = (line for line in f if line.strip())
+        while True:
+            records = [json.loads(line) for line in itertools.islice(lines, batch_size)]
+            if not records:
+                return
+            yield {
+                column: [record.get(column) for record in records]
+                for column in columns
+                if any(column in record for record in records)
+            }
+
+
+@register_dataset_reader(".parquet")
+def _read_parquet(path, columns, batch_size):
+    parquet = _import_pyarrow("parquet")
+    for batch in parquet.ParquetFile(path).iter_batches(
+        batch_size=batch_size, columns=columns
+    ):
+        yield batch.to_pydict()
+
+
+@register_dataset_reader(".arrow", ".feather", ".ipc")
+def _read_arrow(path, columns, batch_size):
+    ipc = _import_pyarrow("ipc")
+    with open(path, "rb") as f:
+        try:
+            reader = ipc.open_file(f)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except Exception:
+            # the IPC streaming format
+            f.seek(0)
+            batches = iter(ipc.open_stream(f))
+        for batch in batches:
+            names = batch.schema.names
+            for start in range(0, batch.num_rows, batch_size):
+                chunk = batch.slice(start, batch_size)
+                yield {
+                    column: chunk.column(names.index(column)).to_pylist()
+                    for column in columns
+                    if column in names
+                }
+
+
+@register_dataset_writer(".jsonl")
+def _write_jsonl(path, batches, columns):
+    with open(path, mode="w", encoding="utf8") as f:
+        for batch in batches:
+            for values in zip(*(batch[column] for column in columns)):
+                f.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False))
+                f.write("\n")
+
+
+@register_dataset_writer(".parquet")
+def _write_parquet(path, batches, columns):
+    pyarrow = _import_pyarrow()
+    parquet = _import_pyarrow("parquet")
+    writer = None
+    try:
+        for batch in batches:
+            table = pyarrow.table(batch)
+            if writer is None:
+                writer = parquet.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+        if writer is None:
+            parquet.write_table(pyarrow.table({column: [] for column in columns}), path)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+@register_dataset_writer(".arrow", ".feather", ".ipc")
+def _write_arrow(path, batches, columns):
+    pyarrow = _import_pyarrow()
+    ipc = _import_pyarrow("ipc")
+    writer = None
+    with open(path, "wb") as f:
+        try:
+            for batch in batches:
+                record_batch = pyarrow.RecordBatch.from_pydict(batch)
+                if writer is None:
+                    writer = ipc.new_file(f, record_batch.schema)
+                writer.write_batch(record_batch)
+            if writer is None:
+                schema = pyarrow.table({column: [] for column in columns}).schema
+                writer = ipc.new_file(f, schema)
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+def _records_to_inference_lines(records, task_code):
+    for record in records:
+        if task_code == "ATEPC":
+            yield " ".join(str(token) for token in _as_list(record["tokens"]))
+        elif task_code == "CDD":
+            record = dict(record)
+            if record.get("target") is None:
+                # the padding label of the unlabelled examples
+                record["target"] = "-100"
+            yield json.dumps(record, ensure_ascii=False)
+        else:
+            text = str(record["text"]).strip()
+            if task_code == "APC":
+                aspect = "[B-ASP]{}[E-ASP]".format(str(record["aspect"]).strip())
+                text = text.replace("$T$", aspect, 1)
+            if record.get("label") is not None:
+                text = "{}$LABEL${}".format(text, str(record["label"]).strip())
+            yield text
+
+
+def _iter_text_records(path, task_code):
+    # the text dataset files, validated as load_dataset_from_file() does
+    _get_fields(task_code)
+    with open(path, mode="r", encoding="utf8") as f:
+        if task_code == "ATEPC":
+            yield from _iter_conll_records(f)
+            return
+        lines = _iter_lines(f, path)
+        if task_code == "APC":
+            for text in lines:
+                aspect, label = next(lines, None), next(lines, None)
+                if label is None:
+                    raise ValueError("incomplete APC example in {}".format(path))
+                yield {"text": text, "aspect": aspect, "label": label}
+        elif task_code == "CDD":
+            for line in lines:
+                yield json.loads(line)
+        else:
+            for line in lines:
+                text, _, label = line.partition("$LABEL$")
+                yield {"text": text.strip(), "label": label.strip()}
+
+
+def _iter_lines(f, path):
+    previous = None
+    for i, line in enumerate(f):
+        if not line.strip():
+            raise ValueError(
+                "empty line: #{} in {}, previous line: {}".format(i, path, previous)
+            )
+        previous = line
+        yield line.strip()
+
+
+def _iter_conll_records(f):
+    tokens, tags, polarities = [], [], []
+    for line in itertools.chain(f, [""]):
+        if not line.strip() or line.startswith("-DOCSTART"):
+            if tokens:
+                yield {"tokens": tokens, "tags": tags, "polarities": polarities}
+                tokens, tags, polarities = [], [], []
+            continue
+        splits = line.strip().split(" ")
+        tokens.append(splits[0])
+        tags.append(splits[-2])
+        polarities.append(splits[-1])
+
+
+def _as_list(value):
+    return value.split() if isinstance(value, str) else list(value)
+
+
+def _get_fields(task_code):
+    if task_code not in DATASET_FIELDS:
+        raise ValueError(
+            "The dataset records of task {} are not supported, available tasks: {}".format(
+                task_code, sorted(DATASET_FIELDS)
+            )
+        )
+    return DATASET_FIELDS[task_code]
+
+
+def _import_pyarrow(module=None):
+    try:
+        import pyarrow
+
+        if module:
+            import importlib
+
+            return importlib.import_module("pyarrow." + module)
+        return pyarrow
+    except ImportError:
+        raise ImportError(
+            "The Parquet and Arrow datasets need pyarrow, please install it: pip install pyarrow"
+        )
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Convert a PyABSA dataset file to JSONL, Parquet or Arrow."
+    )
+    parser.add_argument("task_code", choices=sorted(DATASET_FIELDS))
+    parser.add_argument("src", help="the text or columnar dataset file")
+    parser.add_argument("dst", help="the .jsonl, .parquet or .arrow file")
+    parser.add_argument(
+        "--column",
+        action="append",
+        default=[],
+        metavar="FIELD=COLUMN",
+        help="the column of a field in a columnar source file",
+    )
+    parser.add_argument("--batch-size", type=int, default=1024)
+    args = parser.parse_args(args)
+
+    config = {"dataset_columns": dict(column.split("=", 1) for column in args.column)}
+    count = convert_dataset_file(
+        args.src, args.dst, args.task_code, config, args.batch_size
+    )
+    print("Converted {} records: {} -> {}".format(count, args.src, args.dst))
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,11 @@ import tqdm
 from findfile import find_files, find_cwd_file
 from termcolor import colored
 
+from pyabsa.utils.file_utils.dataset_readers import (
+    is_columnar_file,
+    iter_dataset_records,
+    records_to_lines,
+)
 from pyabsa.utils.pyabsa_utils import save_args, fprint
 
 
@@ -266,13 +271,15 @@ def load_jsonl(file_path, **kwargs):
     return dic_list
 
 
-def load_dataset_from_file(fname, config):
+def load_dataset_from_file(fname, config, inference=False):
     """
-    Loads a dataset from one or multiple files.
+    Loads a dataset from one or multiple files. The columnar files (JSONL, Parquet and Arrow) are streamed and
+    rendered as the lines of the text format of config.task_code, see dataset_readers.py.
 
     Args:
         fname (str or List[str]): The name of the file(s) containing the dataset.
         config (dict): The configuration dictionary containing the logger (optional) and the maximum number of data to load (optional).
+        inference (bool): True to render the columnar files as the lines of the inference format, one line per example.
 
     Returns:
         A list of strings containing the loaded dataset.
@@ -291,17 +298,23 @@ def load_dataset_from_file(fname, config):
             logger.info("Load dataset from {}".format(f))
         else:
             fprint("Load dataset from {}".format(f))
-        fin = open(f, "r", encoding="utf-8")
-        _lines_ = fin.readlines()
-        for i, line in enumerate(_lines_):
-            if not line.strip():
-                raise ValueError(
-                    "empty line: #{} in {}, previous line: {}".format(
-                        i, f, _lines_[i - 1]
+        if is_columnar_file(f):
+            records = iter_dataset_records(f, config, inference=inference)
+            lines.extend(
+                records_to_lines(records, config.get("task_code", None), inference)
+            )
+            continue
+        with open(f, "r", encoding="utf-8") as fin:
+            previous = None
+            for i, line in enumerate(fin):
+                if not line.strip():
+                    raise ValueError(
+                        "empty line: #{} in {}, previous line: {}".format(
+                            i, f, previous
+                        )
                     )
-                )
-            lines.append(line.strip())
-        fin.close()
+                previous = line
+                lines.append(line.strip())
     lines = lines[: config.get("data_num", None)]
     return lines
 
@@ -444,6 +457,11 @@ def save_model(config, model, tokenizer, save_path, **kwargs):
         save_path (str): The path where to save the model, config, and tokenizer.
         **kwargs: Additional keyword arguments.
     """
+    from pyabsa.framework.instructor_class.distributed import is_main_process
+
+    # the weights are identical on all the DDP ranks, only rank 0 writes
+    if not is_main_process():
+        return
     if (
         hasattr(model, "module")
         or hasattr(model, "core")
@@ -495,6 +513,14 @@ def save_model(config, model, tokenizer, save_path, **kwargs):
         else:
             tokenizer.save_pretrained(model_output_dir)
 
+    elif config.save_mode == 4:
+        # Save the weights in safetensors, the config in JSON and the tokenizer in save_pretrained() layout.
+        from pyabsa.framework.checkpoint_class.checkpoint_format import (
+            save_safetensors_checkpoint,
+        )
+
+        save_safetensors_checkpoint(config, model_to_save, tokenizer, save_path)
+
     else:
         raise ValueError("Invalid save_mode: {}".format(config.save_mode))
     model.to(config.device)
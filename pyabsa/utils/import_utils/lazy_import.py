@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# file: lazy_import.py
+# time: 20/10/2026 01:10
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+PEP 562 lazy loading of the package attributes, so that "import pyabsa" does not import the tasks (and transformers,
+spacy, sklearn, pandas, etc.) until they are used. This module must only import the standard library.
+"""
+
+import importlib
+import sys
+
+
+def lazy_attributes(package_name, attributes):
+    """
+    Build the module __getattr__ and __dir__ of a package whose attributes are imported on first access. The
+    attributes which are not listed are loaded as the submodules of the package, e.g., pyabsa.tasks.TextClassification.
+
+    :param package_name: the __name__ of the package
+    :param attributes: a dict of attribute name -> (module name, name in the module), the name in the module is None
+        for the module itself
+    :return: the __getattr__ and __dir__ functions of the package
+    """
+    package = sys.modules[package_name]
+
+    def __getattr__(name):
+        if name in attributes:
+            module_name, attribute = attributes[name]
+            value = importlib.import_module(module_name)
+            if attribute:
+                value = getattr(value, attribute)
+        elif not name.startswith("_"):
+            submodule_name = "{}.{}".format(package_name, name)
+            try:
+                value = importlib.import_module(submodule_name)
+            except ModuleNotFoundError as e:
+                if e.name != submodule_name:
+                    raise
+                raise AttributeError(
+                    "module {!r} has no attribute {!r}".format(package_name, name)
+                ) from None
+        else:
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(package_name, name)
+            )
+        # the next accesses do not go through __getattr__
+        setattr(package, name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(package)) | set(attributes))
+
+    return __getattr__, __dir__
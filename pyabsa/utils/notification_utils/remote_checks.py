@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# file: remote_checks.py
+# time: 20/10/2026 01:10
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+The remote checks of PyABSA: the emergency notification and the release check.
+
+They are opt-in, with the environment variable PYABSA_REMOTE_CHECKS=1 (then they start at "import pyabsa"), or with
+start_remote_checks(). They run in a daemon thread, so neither the import nor the program ever waits for the network,
+and their results are cached in ~/.cache/pyabsa/remote_checks.json for PYABSA_REMOTE_CHECKS_TTL seconds (one day by
+default), an unreachable network included, so the network is queried at most once per TTL.
+"""
+
+import json
+import os
+import threading
+import time
+
+from pyabsa import __version__ as pyabsa_version
+from pyabsa.framework.flag_class.flag_template import PyABSAMaterialHostAddress
+
+REMOTE_CHECKS_ENV = "PYABSA_REMOTE_CHECKS"
+REMOTE_CHECKS_TTL_ENV = "PYABSA_REMOTE_CHECKS_TTL"
+DEFAULT_TTL = 24 * 3600
+REQUEST_TIMEOUT = 3
+
+
+def remote_checks_enabled():
+    """
+    :return: True if the remote checks are enabled by PYABSA_REMOTE_CHECKS
+    """
+    return os.environ.get(REMOTE_CHECKS_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def start_remote_checks(ttl=None):
+    """
+    Run the remote checks in a daemon thread.
+
+    :param ttl: the lifetime of the cached results in seconds, default to PYABSA_REMOTE_CHECKS_TTL or one day
+    :return: the thread
+    """
+    thread = threading.Thread(
+        target=_run_quietly, args=(ttl,), name="pyabsa-remote-checks", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def run_remote_checks(ttl=None, force=False):
+    """
+    Run the remote checks in this thread, the cached results are used if they are not expired.
+
+    :param ttl: the lifetime of the cached results in seconds, default to PYABSA_REMOTE_CHECKS_TTL or one day
+    :param force: query the network even if the cached results are not expired
+    :return: a dict of the notification, the released versions and the time of the query
+    """
+    if ttl is None:
+        ttl = float(os.environ.get(REMOTE_CHECKS_TTL_ENV, DEFAULT_TTL))
+    results = _load_cache()
+    if force or time.time() - results.get("time", 0) > ttl:
+        results = {
+            "time": time.time(),
+            "notification": _query(_fetch_notification, results.get("notification")),
+            "releases": _query(_fetch_releases, results.get("releases")),
+        }
+        _save_cache(results)
+    _report(results)
+    return results
+
+
+def _run_quietly(ttl):
+    try:
+        run_remote_checks(ttl)
+    except Exception:
+        pass
+
+
+def _query(fetch, cached):
+    try:
+        return fetch()
+    except Exception:
+        return cached
+
+
+def _fetch_notification():
+    import requests
+
+    response = requests.get(
+        PyABSAMaterialHostAddress + "resolve/main/emergency_notification.txt",
+        timeout=REQUEST_TIMEOUT,
+    )
+    return response.text.strip() if response.status_code == 200 else ""
+
+
+def _fetch_releases():
+    import requests
+
+    response = requests.get(
+        "https://pypi.org/pypi/pyabsa/json", timeout=REQUEST_TIMEOUT
+    )
+    if response.status_code != 200:
+        return None
+    return list(response.json()["releases"].keys())
+
+
+def _report(results):
+    messages = []
+    if results.get("notification"):
+        messages.append(
+            "PyABSA({}): {}".format(pyabsa_version, results["notification"])
+        )
+    if results.get("releases") and pyabsa_version not in results["releases"]:
+        messages.append(
+            "You are using a DEPRECATED or TEST version of PyABSA. Consider update using pip install -U pyabsa!"
+        )
+    if not messages:
+        return
+
+    from termcolor import colored
+    from pyabsa.utils.pyabsa_utils import fprint
+
+    for message in messages:
+        fprint(colored(message, "red"))
+
+
+def _cache_path():
+    cache_home = os.environ.get(
+        "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+    )
+    return os.path.join(cache_home, "pyabsa", "remote_checks.json")
+
+
+def _load_cache():
+    try:
+        with open(_cache_path(), mode="r", encoding="utf8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(results):
+    path = _cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        with open(tmp_path, mode="w", encoding="utf8") as f:
+            json.dump(results, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+# file: profiler.py
+# time: 20/10/2026 06:20
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+"""
+The per-stage profiling of the predictors and the training instructors.
+
+A Profiler times named spans (e.g., "tokenize", "spacy_parse", "lcf_vectors", "h2d", "forward") and counts the
+examples and tokens processed in them. Entering a span of a Profiler makes it the active profiler of the context,
+so the spans opened by the featurization code with profile_span() or @profiled are recorded to the profiler of the
+predictor or the instructor calling it. A disabled profiler, and profile_span() without an active profiler, return
+a shared no-op span, so the instrumentation only costs a context variable lookup when the profiling is off.
+
+The summaries are exported to the exporters of the profiler:
+
+- MemoryExporter: keeps the summaries in a list;
+- JsonExporter: appends the summaries to a JSON lines file;
+- TorchProfilerExporter: runs torch.profiler and writes a Chrome trace per export, the spans are recorded as
+  torch.profiler.record_function() ranges of the trace.
+"""
+
+import contextvars
+import functools
+import json
+import math
+import os
+import threading
+import time
+
+_ACTIVE_PROFILER = contextvars.ContextVar("pyabsa_profiler", default=None)
+
+
+class _NullSpan:
+    enabled = False
+
+    def add(self, examples=0, tokens=0):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = (
+        "profiler",
+        "name",
+        "examples",
+        "tokens",
+        "_start",
+        "_token",
+        "_ranges",
+    )
+    enabled = True
+
+    def __init__(self, profiler, name, examples=0, tokens=0):
+        self.profiler = profiler
+        self.name = name
+        self.examples = examples
+        self.tokens = tokens
+
+    def add(self, examples=0, tokens=0):
+        """
+        Count the examples and the tokens processed in the span.
+        """
+        self.examples += examples
+        self.tokens += tokens
+
+    def __enter__(self):
+        self._token = _ACTIVE_PROFILER.set(self.profiler)
+        self._ranges = [
+            r.__enter__()
+            for r in (e.range(self.name) for e in self.profiler.exporters)
+            if r is not None
+        ]
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        if self.profiler.sync_cuda:
+            _synchronize_cuda()
+        elapsed = time.perf_counter() - self._start
+        for r in reversed(self._ranges):
+            r.__exit__(None, None, None)
+        _ACTIVE_PROFILER.reset(self._token)
+        self.profiler.record(self.name, elapsed, self.examples, self.tokens)
+        return False
+
+
+class Profiler:
+
+    def __init__(
+        self, enabled=True, exporters=None, sync_cuda=False, keep_timings=False
+    ):
+        """
+        :param enabled: False to make all the spans no-ops
+        :param exporters: the exporters of the summaries, ProfileExporter objects or their specs, see make_exporter()
+        :param sync_cuda: synchronize the CUDA device at the end of each span, so the spans measure the kernels
+            instead of their launches (at the cost of the overlap of the host and the device)
+        :param keep_timings: keep the duration of each span, so the summaries report the p50/p99 latencies
+        """
+        self.enabled = enabled
+        self.sync_cuda = sync_cuda
+        self.keep_timings = keep_timings
+        self.exporters = [make_exporter(e) for e in (exporters or [])]
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._started = False
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        :param config: the configuration, "profile", "profile_exporters", "profile_sync_cuda" and
+            "profile_keep_timings" are used
+        :return: the Profiler, disabled unless config.profile is set
+        """
+        return cls(
+            enabled=bool(config.get("profile", False)),
+            exporters=config.get("profile_exporters", None),
+            sync_cuda=config.get("profile_sync_cuda", False),
+            keep_timings=config.get("profile_keep_timings", False),
+        )
+
+    def span(self, name, examples=0, tokens=0):
+        """
+        :param name: the name of the stage
+        :param examples: the number of the examples processed in the span, more can be added with span.add()
+        :param tokens: the number of the tokens processed in the span
+        :return: a context manager timing the span, and a no-op if the profiler is disabled
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        if not self._started:
+            self.start()
+        return _Span(self, name, examples, tokens)
+
+    def record(self, name, seconds, examples=0, tokens=0):
+        """
+        Record a span timed elsewhere, e.g., by the training loops.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = {
+                    "count": 0,
+                    "total_s": 0.0,
+                    "min_s": seconds,
+                    "max_s": seconds,
+                    "examples": 0,
+                    "tokens": 0,
+                    "timings": [],
+                }
+            stats["count"] += 1
+            stats["total_s"] += seconds
+            stats["min_s"] = min(stats["min_s"], seconds)
+            stats["max_s"] = max(stats["max_s"], seconds)
+            stats["examples"] += examples
+            stats["tokens"] += tokens
+            if self.keep_timings:
+                stats["timings"].append(seconds)
+
+    def summary(self):
+        """
+        :return: a dict of the wall time since the profiler was started or reset, and the statistics of the spans:
+            the count, the total/mean/min/max times, the examples and the tokens and their throughput, and the
+            p50/p99 times if keep_timings is set
+        """
+        with self._lock:
+            items = [
+                (name, dict(stats, timings=list(stats["timings"])))
+                for name, stats in self._stats.items()
+            ]
+        spans = {}
+        for name, stats in items:
+            total = stats["total_s"]
+            spans[name] = {
+                "count": stats["count"],
+                "total_s": round(total, 6),
+                "mean_ms": round(1000 * total / stats["count"], 4),
+                "min_ms": round(1000 * stats["min_s"], 4),
+                "max_ms": round(1000 * stats["max_s"], 4),
+                "examples": stats["examples"],
+                "tokens": stats["tokens"],
+                "examples_per_s": stats["examples"] / total if total > 0 else 0.0,
+                "tokens_per_s": stats["tokens"] / total if total > 0 else 0.0,
+            }
+            if stats["timings"]:
+                timings = sorted(stats["timings"])
+                spans[name]["p50_ms"] = round(1000 * _percentile(timings, 50), 4)
+                spans[name]["p99_ms"] = round(1000 * _percentile(timings, 99), 4)
+        return {
+            "wall_time_s": round(time.perf_counter() - self._start, 6),
+            "spans": spans,
+        }
+
+    def reset(self):
+        """
+        Clear the statistics of the spans.
+        """
+        with self._lock:
+            self._stats = {}
+            self._start = time.perf_counter()
+
+    def start(self):
+        """
+        Start the exporters, e.g., the torch.profiler session, called on the first span.
+        """
+        self._started = True
+        for exporter in self.exporters:
+            exporter.start()
+
+    def export(self, **extra):
+        """
+        :param extra: the fields added to the summary, e.g., the task and the model name
+        :return: the summary exported to all the exporters
+        """
+        summary = self.summary()
+        summary.update(extra)
+        for exporter in self.exporters:
+            exporter.export(summary)
+        return summary
+
+    def close(self):
+        """
+        Stop the exporters.
+        """
+        for exporter in self.exporters:
+            exporter.close()
+        self._started = False
+
+    def __repr__(self):
+        return "Profiler(enabled={}, exporters={})".format(
+            self.enabled, [type(e).__name__ for e in self.exporters]
+        )
+
+
+def current_profiler():
+    """
+    :return: the profiler of the innermost span of the context, or None
+    """
+    return _ACTIVE_PROFILER.get()
+
+
+def profile_span(name, examples=0, tokens=0):
+    """
+    :return: a span of the active profiler, or a no-op span if there is no active profiler
+    """
+    profiler = _ACTIVE_PROFILER.get()
+    if profiler is None:
+        return NULL_SPAN
+    return profiler.span(name, examples, tokens)
+
+
+def profiled(name):
+    """
+    Time the calls of a function as the spans of the active profiler.
+
+    :param name: the name of the spans
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _ACTIVE_PROFILER.get()
+            if profiler is None or not profiler.enabled:
+                return func(*args, **kwargs)
+            with profiler.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class ProfileExporter:
+    def start(self):
+        pass
+
+    def range(self, name):
+        """
+        :return: a context manager entered with each span, or None
+        """
+        return None
+
+    def export(self, summary):
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+
+class MemoryExporter(ProfileExporter):
+    def __init__(self):
+        self.summaries = []
+
+    def export(self, summary):
+        self.summaries.append(summary)
+
+
+class JsonExporter(ProfileExporter):
+    def __init__(self, path):
+        """
+        :param path: the JSON lines file, a summary is appended per export
+        """
+        self.path = path
+
+    def export(self, summary):
+        record = dict(summary, time=time.strftime("%Y-%m-%d %H:%M:%S"))
+        with open(self.path, mode="a", encoding="utf8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class TorchProfilerExporter(ProfileExporter):
+    def __init__(self, trace_dir="profiler_traces", record_shapes=False):
+        """
+        :param trace_dir: the directory of the Chrome traces, viewed in chrome://tracing or Perfetto
+        :param record_shapes: record the input shapes of the operators
+        """
+        self.trace_dir = trace_dir
+        self.record_shapes = record_shapes
+        self.traces = []
+        self._profile = None
+
+    def start(self):
+        import torch
+
+        activities = [torch.profiler.ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(torch.profiler.ProfilerActivity.CUDA)
+        self._profile = torch.profiler.profile(
+            activities=activities, record_shapes=self.record_shapes
+        )
+        self._profile.__enter__()
+
+    def range(self, name):
+        if self._profile is None:
+            return None
+        import torch
+
+        return torch.profiler.record_function(name)
+
+    def export(self, summary):
+        if self._profile is None:
+            return
+        self._profile.__exit__(None, None, None)
+        os.makedirs(self.trace_dir, exist_ok=True)
+        path = os.path.join(
+            self.trace_dir,
+            "trace.{}.{}.json".format(os.getpid(), len(self.traces)),
+        )
+        self._profile.export_chrome_trace(path)
+        self.traces.append(path)
+        summary["trace"] = path
+        # the next trace starts from here
+        self.start()
+
+    def close(self):
+        if self._profile is not None:
+            self._profile.__exit__(None, None, None)
+            self._profile = None
+
+
+def make_exporter(spec):
+    """
+    :param spec: a ProfileExporter, "memory", "torch" or "torch:<trace dir>", or the path of a JSON lines file
+    :return: the ProfileExporter
+    """
+    if isinstance(spec, ProfileExporter):
+        return spec
+    spec = str(spec)
+    if spec == "memory":
+        return MemoryExporter()
+    if spec == "torch" or spec.startswith("torch:"):
+        return TorchProfilerExporter(spec[len("torch:") :] or "profiler_traces")
+    if spec.endswith(".json") or spec.endswith(".jsonl"):
+        return JsonExporter(spec)
+    raise ValueError(
+        "Unknown profile exporter: {}, use 'memory', 'torch[:<dir>]' or a .jsonl path".format(
+            spec
+        )
+    )
+
+
+def _percentile(values, q):
+    # the nearest-rank percentile of the sorted values
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def _synchronize_cuda():
+    import torch
+
+    if torch.cuda.is_available() and torch.cuda.is_initialized():
+        torch.cuda.synchronize()
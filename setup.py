@@ -54,12 +54,25 @@ extras["optional"] = [
     "tensorflow_hub",
 ]
 
+# Packages required for the ONNX export and the ONNX Runtime inference backend.
+extras["onnx"] = [
+    "onnx",
+    "onnxruntime",
+]
+
+# Packages required for the Parquet and Arrow datasets.
+extras["columnar"] = [
+    "pyarrow",
+]
+
 # For developers, install development tools along with all optional dependencies.
 extras["dev"] = (
     extras["docs"]
     + extras["test"]
     + extras["tensorflow"]
     + extras["optional"]
+    + extras["onnx"]
+    + extras["columnar"]
     + extras["deploy"]
 )
 
@@ -99,6 +112,7 @@ setup(
         "sentencepiece",
         "protobuf<4.0.0",
         "pandas",
+        "safetensors",
     ],
     extras_require=extras,
 )
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# file: test_11_onnx_export.py
+# time: 19/10/2026 23:59
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import os
+import pickle
+
+import numpy as np
+import pytest
+import torch
+from torch.utils.data import DataLoader, Dataset
+
+from pyabsa.framework.checkpoint_class.checkpoint_registry import (
+    find_checkpoint_files,
+)
+from pyabsa.framework.configuration_class.configuration_template import (
+    ConfigManager,
+)
+from pyabsa.framework.flag_class.flag_template import TaskCodeOption
+from pyabsa.framework.prediction_class.predictor_template import InferenceModel
+
+pytest.importorskip("onnxruntime")
+
+examples = [
+    "The food is good",
+    "The food is bad",
+    "The food is not bad, but the service is terrible",
+    "Although the coffee was cold, the staff were friendly and quick",
+]
+
+
+class ToyTokenizer:
+    def text_to_sequence(self, text):
+        return [sum(map(ord, word)) % 127 + 1 for word in text.split()]
+
+
+class ToyDataset(Dataset):
+    """
+    The examples are padded to the longest example of the batch, so the sequence axis of the graph is dynamic.
+    """
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.data = []
+
+    def prepare_infer_sample(self, texts, ignore_error=True):
+        sequences = [self.tokenizer.text_to_sequence(text) for text in texts]
+        max_len = max(len(sequence) for sequence in sequences)
+        self.data = [
+            {
+                "text_indices": torch.tensor(
+                    sequence + [0] * (max_len - len(sequence))
+                ),
+                "label": -100,
+            }
+            for sequence in sequences
+        ]
+
+    def __getitem__(self, index):
+        return self.data[index]
+
+    def __len__(self):
+        return len(self.data)
+
+
+class ToyModel(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.embed = torch.nn.Embedding(128, 16, padding_idx=0)
+        self.dense = torch.nn.Linear(16, 3)
+
+    def forward(self, inputs):
+        indices = inputs["text_indices"]
+        mask = (indices != 0).unsqueeze(-1).float()
+        hidden = (self.embed(indices) * mask).sum(1) / mask.sum(1)
+        return {"logits": self.dense(hidden), "hidden": hidden}
+
+
+class ToyClassifier(InferenceModel):
+    """
+    A sentiment classifier loaded from a trainer or from a checkpoint as the task predictors are, the exported
+    checkpoints are run with onnxruntime.
+    """
+
+    task_code = TaskCodeOption.Text_Classification
+    inputs_as_dict = True
+
+    def __init__(self, checkpoint=None, **kwargs):
+        super().__init__(checkpoint, task_code=self.task_code, **kwargs)
+        if not isinstance(self.checkpoint, str):
+            self.model, self.config, self.tokenizer = self.checkpoint
+        else:
+            checkpoint_files = find_checkpoint_files(self.checkpoint)
+            with open(checkpoint_files["config"], mode="rb") as f:
+                self.config = pickle.load(f)
+            with open(checkpoint_files["tokenizer"], mode="rb") as f:
+                self.tokenizer = pickle.load(f)
+            self.model = self._load_onnx_model(**kwargs)
+        self.dataset = ToyDataset(self.tokenizer)
+        self.__post_init__()
+
+    def batch_predict(self, texts):
+        self.dataset.prepare_infer_sample(texts)
+        batch = next(iter(DataLoader(self.dataset, batch_size=len(texts))))
+        with self._inference_context():
+            self.model.eval()
+            outputs = self._forward(
+                {"text_indices": batch["text_indices"].to(self.config.device)}
+            )
+        return [
+            {
+                "sentiment": self.config.index_to_label[int(probs.argmax())],
+                "probs": probs.tolist(),
+            }
+            for probs in torch.softmax(outputs["logits"], -1)
+        ]
+
+
+def _classifier():
+    torch.manual_seed(1)
+    config = ConfigManager(
+        {
+            "model_name": "toy",
+            "device": "cpu",
+            "inputs_cols": ["text_indices", "label"],
+            "label_to_index": {"Negative": 0, "Neutral": 1, "Positive": 2},
+            "index_to_label": {0: "Negative", 1: "Neutral", 2: "Positive"},
+        }
+    )
+    return ToyClassifier((ToyModel(), config, ToyTokenizer()))
+
+
+def test_onnx_parity(tmp_path):
+    classifier = _classifier()
+    onnx_checkpoint = classifier.export_onnx(
+        examples[0], save_path=str(tmp_path / "toy_onnx")
+    )
+    assert sorted(os.listdir(onnx_checkpoint)) == [
+        "toy.config",
+        "toy.onnx",
+        "toy.onnx.json",
+        "toy.tokenizer",
+    ]
+    onnx_classifier = ToyClassifier(onnx_checkpoint)
+
+    # the batch and sequence axes are dynamic, so the examples of other lengths and batch sizes are checked
+    for texts in [[text] for text in examples] + [examples]:
+        results = classifier.batch_predict(texts)
+        onnx_results = onnx_classifier.batch_predict(texts)
+        for result, onnx_result in zip(results, onnx_results):
+            assert result["sentiment"] == onnx_result["sentiment"]
+            assert np.allclose(result["probs"], onnx_result["probs"], atol=1e-4)
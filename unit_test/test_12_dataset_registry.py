@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# file: test_12_dataset_registry.py
+# time: 20/10/2026 01:40
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import os
+
+from pyabsa.utils.data_utils.dataset_registry import DatasetRegistry
+
+exclude_train = [".inference", "test.", "valid."]
+
+
+def _touch(root, path):
+    path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+
+
+def test_dataset_registry(tmp_path):
+    root = str(tmp_path / "integrated_datasets")
+    _touch(root, "apc_datasets/110.SemEval/113.laptop14/Laptops_Train.xml.seg")
+    _touch(root, "apc_datasets/110.SemEval/113.laptop14/Laptops_Test_Gold.xml.seg")
+    _touch(root, "apc_datasets/110.SemEval/111.ARTS_Laptop14/arts.train.apc")
+    _touch(root, "atepc_datasets/110.SemEval/113.laptop14/Laptops.train.txt.atepc")
+
+    registry = DatasetRegistry(root)
+    assert registry.refresh() > 0
+    assert registry.refresh() == 0
+
+    # the dataset ids and names resolve to the same directory, in the directory of the task
+    laptop14 = registry.find_dataset_dir("113.Laptop14", "APC")
+    assert laptop14 == registry.find_dataset_dir("Laptop14", "APC")
+    assert laptop14.endswith(
+        os.path.join("apc_datasets", "110.SemEval", "113.laptop14")
+    )
+    assert "atepc_datasets" in registry.find_dataset_dir("Laptop14", "ATEPC")
+    assert registry.find_dataset_dir("Restaurant14", "APC") is None
+
+    train = registry.find_files(laptop14, ["Laptop14", "train", "APC"], exclude_train)
+    assert [os.path.basename(f) for f in train] == ["Laptops_Train.xml.seg"]
+    semeval = registry.find_dataset_dir("SemEval", "APC")
+    assert (
+        len(registry.find_files(semeval, ["SemEval", "train", "APC"], exclude_train))
+        == 2
+    )
+
+    # the index is saved, and only the changed directories are listed again
+    _touch(root, "apc_datasets/110.SemEval/113.laptop14/Laptops.valid.apc")
+    registry = DatasetRegistry(root)
+    assert registry.refresh() == 1
+    assert registry.find_files(laptop14, ["Laptop14", "valid", "APC"])
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# file: test_13_checkpoint_registry.py
+# time: 20/10/2026 02:10
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import os
+import time
+import zipfile
+
+from pyabsa.framework.checkpoint_class.checkpoint_registry import (
+    CheckpointRegistry,
+    find_checkpoint_files,
+)
+
+
+def _zip_checkpoint(path):
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("fast_lsa_t_v2_english/fast_lsa_t_v2.config", "config")
+        z.writestr("fast_lsa_t_v2_english/fast_lsa_t_v2.state_dict", "weights")
+        z.writestr("fast_lsa_t_v2_english/fast_lsa_t_v2.tokenizer", "tokenizer")
+        z.writestr("__MACOSX/fast_lsa_t_v2_english/._fast_lsa_t_v2.config", "")
+
+
+def test_checkpoint_extraction(tmp_path):
+    zip_path = str(tmp_path / "english.zip")
+    _zip_checkpoint(zip_path)
+    registry = CheckpointRegistry(str(tmp_path / "cache"))
+
+    path = registry.extract(zip_path)
+    files = registry.indexed_files(path)
+    assert files["config"].endswith("fast_lsa_t_v2.config")
+    assert "__MACOSX" not in files["config"]
+    assert files["model"] is None
+    assert files == find_checkpoint_files(path)
+
+    # extracted once, the index is shared with the other processes
+    mtime = os.stat(path).st_mtime
+    assert CheckpointRegistry(str(tmp_path / "cache")).extract(zip_path) == path
+    assert os.stat(path).st_mtime == mtime
+
+
+def test_manifest_revalidation(tmp_path):
+    registry = CheckpointRegistry(str(tmp_path / "cache"))
+    fetched = []
+
+    def fetch(cached):
+        # 304 Not Modified
+        fetched.append(cached.get("etag"))
+        return dict(cached, time=time.time())
+
+    registry._fetch_manifest = lambda cached: {
+        "checkpoints": {"2.0.0": {}},
+        "etag": "v1",
+        "time": time.time(),
+    }
+    assert registry.manifest() == {"2.0.0": {}}
+
+    # cached in the registry until the TTL expires, then revalidated with the ETag
+    registry = CheckpointRegistry(str(tmp_path / "cache"))
+    registry._fetch_manifest = fetch
+    assert registry.manifest() == {"2.0.0": {}}
+    assert fetched == []
+    assert registry.manifest(ttl=0) == {"2.0.0": {}}
+    assert fetched == ["v1"]
+
+
+def test_unreachable_manifest_is_retried_after_the_ttl(tmp_path, monkeypatch):
+    # no manifest of the former versions in the working directory
+    monkeypatch.chdir(str(tmp_path))
+    fetched = []
+
+    def fetch(cached):
+        fetched.append(cached)
+        raise ConnectionError("unreachable")
+
+    registry = CheckpointRegistry(str(tmp_path / "cache"))
+    registry._fetch_manifest = fetch
+    assert registry.manifest() == {}
+    assert len(fetched) == 1
+
+    # the failed fetch is recorded, the other processes do not retry it until the TTL expires
+    registry = CheckpointRegistry(str(tmp_path / "cache"))
+    registry._fetch_manifest = fetch
+    assert registry.manifest() == {}
+    assert len(fetched) == 1
+    assert registry.manifest(ttl=0) == {}
+    assert len(fetched) == 2
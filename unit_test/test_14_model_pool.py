@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# file: test_14_model_pool.py
+# time: 20/10/2026 02:50
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import torch
+import torch.nn as nn
+from transformers import BertConfig, BertModel
+
+from pyabsa.framework.prediction_class.model_pool import ModelPool
+
+torch.manual_seed(0)
+backbone_config = BertConfig(
+    vocab_size=100,
+    hidden_size=16,
+    num_hidden_layers=1,
+    num_attention_heads=2,
+    intermediate_size=32,
+)
+frozen_backbone = BertModel(backbone_config).state_dict()
+
+
+class _Model(nn.Module):
+    def __init__(self, checkpoint):
+        super().__init__()
+        self.bert = BertModel(backbone_config)
+        if checkpoint.startswith("frozen"):
+            self.bert.load_state_dict(frozen_backbone)
+        self.dense = nn.Linear(16, 3)
+
+
+class _Predictor:
+    # a predictor with a PLM backbone, fine-tuned heads on a frozen backbone for the "frozen" checkpoints
+    def __init__(self, checkpoint, **kwargs):
+        self.model = _Model(checkpoint)
+
+
+def test_model_pool():
+    pool = ModelPool(_Predictor, max_models=3)
+    first = pool.get("frozen_restaurant")
+    second = pool.get("frozen_laptop")
+    assert first.model.bert is second.model.bert
+    assert first.model.dense is not second.model.dense
+    assert pool.get("frozen_restaurant") is first
+
+    backbone_size = sum(p.numel() * 4 for p in first.model.bert.parameters())
+    head_size = sum(p.numel() * 4 for p in first.model.dense.parameters())
+    assert pool.memory() < 2 * backbone_size + head_size
+
+    # the least recently used checkpoint is evicted
+    pool.get("custom")
+    pool.get("multilingual")
+    assert "frozen_laptop" not in pool and "frozen_restaurant" in pool
+
+    metrics = pool.metrics()
+    assert metrics["hits"] == 1 and metrics["misses"] == 4
+    assert metrics["evictions"] == 1 and metrics["shared_backbones"] == 1
+    assert metrics["checkpoints"] == ["frozen_restaurant", "custom", "multilingual"]
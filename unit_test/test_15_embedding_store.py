@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# file: test_15_embedding_store.py
+# time: 20/10/2026 03:30
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import os
+
+import numpy as np
+
+from pyabsa.framework.tokenizer_class.embedding_store import open_embedding_store
+
+lines = [
+    "3 4",  # the header of the word2vec files
+    "food 0.1 0.2 0.3 0.4",
+    ". . . 1 2 3 4",  # a word with spaces
+    "service -1 -2 -3 -4",
+    "food 1 1 1 1",  # duplicated, the last one is used
+]
+
+
+def test_embedding_store(tmp_path):
+    path = str(tmp_path / "glove.test.4d.txt")
+    with open(path, "w", encoding="utf8") as f:
+        f.write("\n".join(lines))
+
+    store = open_embedding_store(path, 4)
+    assert len(store) == 4
+    word2idx = {"service": 1, "food": 2, "unknown": 3, ". . .": 4}
+    matrix = store.build_matrix(word2idx)
+    assert matrix.dtype == np.float32 and matrix.shape == (5, 4)
+    assert np.allclose(matrix[0], 0) and np.allclose(matrix[3], 0)
+    assert np.allclose(matrix[1], [-1, -2, -3, -4])
+    assert np.allclose(matrix[2], [1, 1, 1, 1])
+    assert np.allclose(matrix[4], [1, 2, 3, 4])
+
+    # converted once, and again when the embedding file changes
+    mtime = os.stat(os.path.join(path + ".store", "vectors.npy")).st_mtime
+    assert open_embedding_store(path, 4).is_valid(path, 4)
+    assert os.stat(os.path.join(path + ".store", "vectors.npy")).st_mtime == mtime
+    with open(path, "a", encoding="utf8") as f:
+        f.write("\nlaptop 5 5 5 5\n")
+    assert len(open_embedding_store(path, 4)) == 5
+    assert len(open_embedding_store(path, 4, dtype="float16")) == 5
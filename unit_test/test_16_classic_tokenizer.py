@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# file: test_16_classic_tokenizer.py
+# time: 20/10/2026 04:10
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import pickle
+from collections import Counter
+
+import numpy as np
+
+from pyabsa.tasks.AspectPolarityClassification import APCConfigManager
+from pyabsa.framework.tokenizer_class.tokenizer_class import Tokenizer, pad_batch
+
+
+def test_classic_tokenizer():
+    config = APCConfigManager.get_apc_config_glove()
+    config.max_seq_len = 5
+    config.do_lower_case = True
+    tokenizer = Tokenizer(config)
+    tokenizer.fit_on_counter(
+        Counter("the food the service the food was rare".split()), min_freq=2
+    )
+    assert tokenizer.word2idx == {"the": 1, "food": 2}
+
+    ids = tokenizer.encode_batch(["The food", "", "the food the service the food"])
+    assert ids.dtype == np.int32
+    assert ids.tolist() == [[1, 2, 0, 0, 0], [0, 0, 0, 0, 0], [1, 2, 1, 0, 1]]
+    assert tokenizer.text_to_sequence("The food") == [1, 2, 0, 0, 0]
+    assert tokenizer.encode_batch(["the food", "the"], padding="longest").shape == (
+        2,
+        2,
+    )
+
+    # the vocabulary is pickled as a string, the former pickles are still loaded
+    restored = pickle.loads(pickle.dumps(tokenizer))
+    assert restored.word2idx == tokenizer.word2idx
+    assert restored.idx2word == tokenizer.idx2word
+    former = Tokenizer.__new__(Tokenizer)
+    former.__setstate__(dict(tokenizer.__dict__))
+    assert former.text_to_sequence("the food") == [1, 2, 0, 0, 0]
+
+
+def test_pad_batch():
+    sequences = [[1, 2, 3], [4], [], np.array([5, 6, 7, 8])]
+    ids, lengths, mask = pad_batch(sequences, 3, value=-1)
+    assert ids.dtype == np.int64
+    assert ids.tolist() == [[1, 2, 3], [4, -1, -1], [-1, -1, -1], [5, 6, 7]]
+    assert lengths.tolist() == [3, 1, 0, 3]
+    assert mask.sum() == 7
+
+    ids, lengths, mask = pad_batch(
+        sequences, 3, padding="left", truncation="left", dtype=np.int32
+    )
+    assert ids.tolist() == [[1, 2, 3], [0, 0, 4], [0, 0, 0], [6, 7, 8]]
+    assert mask[1].tolist() == [False, False, True]
+    assert pad_batch(sequences)[0].shape == (4, 4)
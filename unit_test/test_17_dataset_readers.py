@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# file: test_17_dataset_readers.py
+# time: 20/10/2026 04:50
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import json
+
+import pytest
+
+from pyabsa.utils.file_utils.dataset_readers import (
+    convert_dataset_file,
+    iter_dataset_records,
+    load_dataset_records,
+    records_to_lines,
+)
+
+apc_lines = [
+    "the $T$ is great",
+    "food",
+    "Positive",
+    "the $T$ is slow",
+    "service",
+    "Negative",
+]
+
+
+def test_apc_dataset_conversion(tmp_path):
+    src = str(tmp_path / "restaurant.train.apc.txt")
+    with open(src, "w", encoding="utf8") as f:
+        f.write("\n".join(apc_lines) + "\n")
+
+    dst = str(tmp_path / "restaurant.train.apc.jsonl")
+    assert convert_dataset_file(src, dst, "APC", batch_size=1) == 2
+    records = load_dataset_records(dst, {"task_code": "APC"})
+    assert records[1] == {
+        "text": "the $T$ is slow",
+        "aspect": "service",
+        "label": "Negative",
+    }
+    assert list(records_to_lines(records, "APC")) == apc_lines
+
+    for extension in (".parquet", ".arrow"):
+        pytest.importorskip("pyarrow")
+        columnar = str(tmp_path / ("restaurant.train.apc" + extension))
+        convert_dataset_file(dst, columnar, "APC")
+        assert load_dataset_records(columnar, {"task_code": "APC"}) == records
+
+
+def test_column_mapping(tmp_path):
+    path = str(tmp_path / "reviews.train.tc.jsonl")
+    with open(path, "w", encoding="utf8") as f:
+        for review, stars in [("good", 5), ("bad", 1), ("fine", 3)]:
+            f.write(json.dumps({"review": review, "stars": stars, "id": 0}) + "\n")
+
+    config = {
+        "task_code": "TC",
+        "dataset_columns": {"text": "review", "label": "stars"},
+        "data_num": 2,
+    }
+    records = load_dataset_records(path, config)
+    assert records == [{"text": "good", "label": 5}, {"text": "bad", "label": 1}]
+    assert list(records_to_lines(records, "TC")) == ["good$LABEL$5", "bad$LABEL$1"]
+    with pytest.raises(KeyError):
+        list(iter_dataset_records(path, {"task_code": "TC"}))
+
+
+def test_inference_files(tmp_path):
+    from pyabsa.tasks.AspectPolarityClassification.dataset_utils.__lcf__.data_utils_for_inference import (
+        parse_sample,
+    )
+    from pyabsa.tasks.AspectTermExtraction.dataset_utils.__lcf__.atepc_utils import (
+        load_atepc_inference_datasets,
+    )
+    from pyabsa.tasks.AspectTermExtraction.dataset_utils.__lcf__.data_utils_for_inference import (
+        parse_examples,
+    )
+    from pyabsa.utils.file_utils.file_utils import load_dataset_from_file
+
+    # the labels are optional in the inference files
+    apc_records = [
+        {"text": "the $T$ is great", "aspect": "food", "label": "Positive"},
+        {"text": "the $T$ is slow", "aspect": "service"},
+    ]
+    atepc_records = [
+        {"tokens": ["the", "food", "is", "great"]},
+        {"tokens": "the service is slow", "tags": "O B-ASP O O"},
+    ]
+    paths = []
+    for name, records in [("apc", apc_records), ("atepc", atepc_records)]:
+        path = str(tmp_path / "restaurant.test.{}.jsonl".format(name))
+        with open(path, "w", encoding="utf8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        paths.append(path)
+    apc_file, atepc_file = paths
+
+    lines = load_dataset_from_file(apc_file, {"task_code": "APC"}, inference=True)
+    assert lines == [
+        "the [B-ASP]food[E-ASP] is great$LABEL$Positive",
+        "the [B-ASP]service[E-ASP] is slow",
+    ]
+    samples = [sample for line in lines for sample in parse_sample(line)]
+    assert samples == [
+        "the [ASP]food[ASP] is great$LABEL$Positive",
+        "the [ASP]service[ASP] is slow",
+    ]
+
+    texts = load_atepc_inference_datasets(atepc_file, {"task_code": "ATEPC"})
+    assert texts == ["the food is great", "the service is slow"]
+    assert [tokens for tokens, _, _ in parse_examples(texts)] == [
+        ["the", "food", "is", "great"],
+        ["the", "service", "is", "slow"],
+    ]
+
+    pyarrow = pytest.importorskip("pyarrow")
+    from pyarrow import parquet
+
+    parquet_file = str(tmp_path / "restaurant.test.apc.parquet")
+    parquet.write_table(
+        pyarrow.table(
+            {
+                "review": [r["text"] for r in apc_records],
+                "aspect": [r["aspect"] for r in apc_records],
+            }
+        ),
+        parquet_file,
+    )
+    config = {"task_code": "APC", "dataset_columns": {"text": "review"}}
+    assert load_dataset_from_file(parquet_file, config, inference=True) == [
+        "the [B-ASP]food[E-ASP] is great",
+        "the [B-ASP]service[E-ASP] is slow",
+    ]
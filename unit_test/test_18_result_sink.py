@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# file: test_18_result_sink.py
+# time: 20/10/2026 05:30
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import json
+
+import numpy as np
+import pytest
+
+from pyabsa.framework.prediction_class.result_sink import open_result_sink
+
+results = [
+    {
+        "text": "the food is great",
+        "aspect": ["food"],
+        "sentiment": ["Positive"],
+        "confidence": [np.float64(0.9)],
+        "probs": [np.array([0.05, 0.05, 0.9])],
+    },
+    {
+        "text": "the service is slow",
+        "aspect": ["service"],
+        "sentiment": ["Negative"],
+        "confidence": [0.8],
+        "probs": [np.array([0.8, 0.1, 0.1])],
+    },
+]
+
+
+def test_jsonl_result_sink(tmp_path):
+    path = str(tmp_path / "apc.result.jsonl")
+    with open_result_sink(path, batch_size=1) as sink:
+        sink.write(results[0])
+        # flushed in batches
+        with open(path, encoding="utf8") as f:
+            assert len(f.readlines()) == 1
+        sink.write(results[1:])
+    assert sink.count == 2
+
+    with open(path, encoding="utf8") as f:
+        records = [json.loads(line) for line in f]
+    assert records[1]["sentiment"] == ["Negative"]
+    assert np.allclose(records[0]["probs"], [[0.05, 0.05, 0.9]])
+    assert records[0]["confidence"] == [0.9]
+
+
+@pytest.mark.parametrize("extension", [".parquet", ".arrow"])
+def test_columnar_result_sink(tmp_path, extension):
+    pyarrow = pytest.importorskip("pyarrow")
+    path = str(tmp_path / ("apc.result" + extension))
+    with open_result_sink(path, batch_size=1) as sink:
+        sink.write(results)
+
+    if extension == ".parquet":
+        import pyarrow.parquet
+
+        table = pyarrow.parquet.read_table(path)
+    else:
+        import pyarrow.ipc
+
+        with pyarrow.ipc.open_file(path) as reader:
+            table = reader.read_all()
+    assert table.num_rows == 2
+    assert table.schema.field("probs").type == pyarrow.list_(
+        pyarrow.list_(pyarrow.float32())
+    )
+    assert table.column("aspect").to_pylist() == [["food"], ["service"]]
+
+
+def test_json_result_sink(tmp_path):
+    path = str(tmp_path / "apc.result.json")
+    with open_result_sink(path, batch_size=1) as sink:
+        sink.write(results)
+    with open(path, encoding="utf8") as f:
+        records = json.load(f)
+    assert [record["text"] for record in records] == [r["text"] for r in results]
+    assert np.allclose(records[1]["probs"], [[0.8, 0.1, 0.1]])
+
+    path = str(tmp_path / "empty.result.json")
+    open_result_sink(path).close()
+    with open(path, encoding="utf8") as f:
+        assert json.load(f) == []
+
+
+@pytest.mark.parametrize("extension", [".parquet", ".arrow"])
+def test_columnar_result_sink_null_first_batch(tmp_path, extension):
+    pyarrow = pytest.importorskip("pyarrow")
+    path = str(tmp_path / ("tc.result" + extension))
+    records = [
+        {"text": "the food is great", "label": "Positive", "ref_label": None},
+        {"text": "the service is slow", "label": "Negative", "ref_label": None},
+        {"text": "the staff", "label": "Neutral", "ref_label": "Neutral"},
+        {"text": "the view", "label": "Positive"},
+    ]
+    with open_result_sink(path, batch_size=2) as sink:
+        # the reference labels of the first batch are all None
+        sink.write(records)
+
+    if extension == ".parquet":
+        import pyarrow.parquet
+
+        table = pyarrow.parquet.read_table(path)
+    else:
+        import pyarrow.ipc
+
+        with pyarrow.ipc.open_file(path) as reader:
+            table = reader.read_all()
+    assert table.schema.field("ref_label").type == pyarrow.string()
+    assert table.column("ref_label").to_pylist() == [None, None, "Neutral", None]
+
+    # a column that is never typed is written when the sink is closed
+    path = str(tmp_path / ("empty.result" + extension))
+    with open_result_sink(path, batch_size=1) as sink:
+        sink.write(records[:2])
+    if extension == ".parquet":
+        table = pyarrow.parquet.read_table(path)
+    else:
+        with pyarrow.ipc.open_file(path) as reader:
+            table = reader.read_all()
+    assert table.num_rows == 2
+    assert table.column("ref_label").null_count == 2
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# file: test_19_profiler.py
+# time: 20/10/2026 06:20
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import json
+
+from pyabsa.utils.profile_utils.profiler import (
+    NULL_SPAN,
+    MemoryExporter,
+    Profiler,
+    current_profiler,
+    profile_span,
+    profiled,
+)
+
+
+@profiled("tokenize")
+def tokenize(text):
+    with profile_span("lookup", tokens=len(text.split())):
+        return text.split()
+
+
+def test_nested_spans(tmp_path):
+    path = str(tmp_path / "profile.jsonl")
+    memory = MemoryExporter()
+    profiler = Profiler(exporters=[memory, path])
+
+    with profiler.span("featurize") as span:
+        assert current_profiler() is profiler
+        for text in ["the food is great", "the service is slow"]:
+            tokenize(text)
+        span.add(examples=2)
+    assert current_profiler() is None
+
+    stats = profiler.summary()["spans"]
+    assert stats["featurize"]["examples"] == 2
+    assert stats["tokenize"]["count"] == 2
+    assert stats["lookup"]["tokens"] == 8
+    assert stats["featurize"]["total_s"] >= stats["tokenize"]["total_s"]
+
+    summary = profiler.export(model="LCF_BERT")
+    assert memory.summaries == [summary]
+    with open(path, encoding="utf8") as f:
+        assert json.loads(f.readline())["spans"]["lookup"]["count"] == 2
+
+    profiler.reset()
+    assert profiler.summary()["spans"] == {}
+
+
+def test_disabled_profiler():
+    profiler = Profiler(enabled=False)
+    assert profiler.span("forward") is NULL_SPAN
+    with profiler.span("forward"):
+        # the featurization spans are not recorded without an enabled profiler
+        assert profile_span("tokenize") is NULL_SPAN
+        tokenize("the food is great")
+    profiler.record("train/forward", 1.0)
+    assert profiler.summary()["spans"] == {}
+
+
+def test_span_percentiles():
+    profiler = Profiler(keep_timings=True)
+    for ms in range(1, 101):
+        profiler.record("forward", ms / 1000, examples=1)
+    stats = profiler.summary()["spans"]["forward"]
+    assert stats["p50_ms"] == 50
+    assert stats["p99_ms"] == 99
+
+    profiler = Profiler()
+    profiler.record("forward", 0.001)
+    assert "p50_ms" not in profiler.summary()["spans"]["forward"]
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# file: test_20_benchmark.py
+# time: 20/10/2026 07:10
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import random
+
+from pyabsa.benchmark import BENCHMARK_TASKS, compare_results
+from pyabsa.benchmark import synthetic
+
+
+def test_synthetic_inputs():
+    rng = random.Random(1)
+    lines = synthetic.apc_lines(rng, 5, 12, 3)
+    assert len(lines) == 15
+    assert all("$T$" in text for text in lines[::3])
+    assert all(aspect in synthetic.ASPECTS for aspect in lines[1::3])
+
+    texts = synthetic.apc_inference_texts(rng, 2, 12, 3)
+    assert all(text.count("[B-ASP]") == 3 for text in texts)
+
+    lines = synthetic.atepc_lines(rng, 2, 10, 2)
+    assert len(lines) == 22 and lines[10] == ""
+    assert sum(" B-ASP " in line for line in lines) == 4
+
+    sequence, _, label = synthetic.rna_regression_lines(rng, 1, 20)[0].partition(
+        "$LABEL$"
+    )
+    assert len(sequence.split()) == 20 and 0 <= float(label) < 1
+
+    # the inputs of every family are covered by the vocabulary of the tiny backbones
+    vocabulary = set(synthetic.vocabulary())
+    for task in BENCHMARK_TASKS.values():
+        for text in task.inference_texts(rng, 4, 16, 2):
+            text = text.partition("$LABEL$")[0]
+            text = text.replace("[B-ASP]", "").replace("[E-ASP]", "")
+            assert set(text.split()) <= vocabulary, task.name
+
+
+def test_compare_results():
+    def report(steps_per_s, p99_ms):
+        return {
+            "results": [
+                {
+                    "task": "apc",
+                    "model": "FAST_LCF_BERT",
+                    "length": 32,
+                    "aspects": 1,
+                    "batch_size": 16,
+                    "error": None,
+                    "train": {"steps_per_s": steps_per_s},
+                    "forward": {"p50_ms": 2.0, "p99_ms": p99_ms},
+                    "peak_rss_mb": 500,
+                }
+            ]
+        }
+
+    assert compare_results(report(10, 3.0), report(9.5, 3.2)) == []
+    regressions = compare_results(report(10, 3.0), report(8, 4.0), tolerance=0.1)
+    assert [r["metric"] for r in regressions] == ["train.steps_per_s", "forward.p99_ms"]
+    assert regressions[0]["change"] == -0.2
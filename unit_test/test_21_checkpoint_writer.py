@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# file: test_21_checkpoint_writer.py
+# time: 20/10/2026 09:10
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import os
+import subprocess
+import sys
+
+import torch
+
+from pyabsa.framework.checkpoint_class.checkpoint_writer import (
+    CheckpointWriter,
+    remove_stale_checkpoints,
+)
+from pyabsa.framework.configuration_class.configuration_template import (
+    ConfigManager,
+)
+from pyabsa.framework.flag_class.flag_template import ModelSaveOption
+
+# the writer is killed after the files are written and before the checkpoint is renamed to its path
+interrupted_write = """
+import os, sys
+import torch
+from pyabsa.framework.checkpoint_class import checkpoint_writer
+from pyabsa.framework.configuration_class.configuration_template import ConfigManager
+
+config = ConfigManager(
+    {"model_name": "linear", "save_mode": 1, "model_path_to_save": sys.argv[1]}
+)
+checkpoint_writer._atomic_replace_dir = lambda src, dst: os._exit(1)
+writer = checkpoint_writer.CheckpointWriter(config, asynchronous=False)
+writer.save(torch.nn.Linear(2, 2), {}, os.path.join(sys.argv[1], "linear_best"))
+"""
+
+
+def _config(path):
+    return ConfigManager(
+        {
+            "model_name": "linear",
+            "save_mode": ModelSaveOption.SAVE_MODEL_STATE_DICT,
+            "model_path_to_save": path,
+        }
+    )
+
+
+def test_checkpoint_writer(tmp_path):
+    config = _config(str(tmp_path))
+    model = torch.nn.Linear(2, 2)
+    writer = CheckpointWriter(config)
+    writer.save(model, {}, str(tmp_path / "linear_acc_50/"), metric=1)
+    writer.flush()
+    with torch.no_grad():
+        model.weight.add_(1)
+    writer.save(model, {}, str(tmp_path / "linear_acc_60/"), metric=2)
+    writer.close()
+
+    # the sub-optimal checkpoint is pruned once the new one is committed
+    assert not os.path.exists(str(tmp_path / "linear_acc_50"))
+    assert sorted(os.listdir(str(tmp_path))) == ["linear_acc_60"]
+    assert writer.saved_checkpoints == [(2, str(tmp_path / "linear_acc_60/"))]
+    assert writer.best_checkpoint == str(tmp_path / "linear_acc_60/")
+    files = sorted(os.listdir(str(tmp_path / "linear_acc_60")))
+    assert files == [
+        "linear.args.txt",
+        "linear.config",
+        "linear.state_dict",
+        "linear.tokenizer",
+    ]
+    state_dict = torch.load(str(tmp_path / "linear_acc_60" / "linear.state_dict"))
+    assert torch.equal(state_dict["weight"], model.weight)
+
+
+def test_keep_best_k_checkpoints(tmp_path):
+    writer = CheckpointWriter(_config(str(tmp_path)), keep_best_k=2, asynchronous=False)
+    model = torch.nn.Linear(2, 2)
+    for name, metric in [("a", 3), ("b", 1), ("c", 2), ("d", 0.5)]:
+        writer.save(model, {}, str(tmp_path / name), metric=metric)
+    writer.close()
+
+    # only the directories of the best two checkpoints are left
+    assert sorted(os.listdir(str(tmp_path))) == ["a", "c"]
+    assert sorted(writer.saved_checkpoints) == [
+        (2, str(tmp_path / "c")),
+        (3, str(tmp_path / "a")),
+    ]
+
+
+def test_interrupted_checkpoint_write(tmp_path):
+    path = str(tmp_path)
+    model = torch.nn.Linear(2, 2)
+    writer = CheckpointWriter(_config(path), asynchronous=False)
+    writer.save(model, {}, os.path.join(path, "linear_best"))
+
+    process = subprocess.Popen([sys.executable, "-c", interrupted_write, path])
+    assert process.wait() == 1
+    tmp_dir = "linear_best.tmp-{}-".format(process.pid)
+    stale = [name for name in os.listdir(path) if name.startswith(tmp_dir)]
+    assert len(stale) == 1
+
+    # the committed checkpoint is intact, and the stale one is removed on startup
+    CheckpointWriter(_config(path), asynchronous=False)
+    assert os.listdir(path) == ["linear_best"]
+    state_dict = torch.load(os.path.join(path, "linear_best", "linear.state_dict"))
+    assert torch.equal(state_dict["weight"], model.weight)
+
+    # a checkpoint moved aside by an interrupted replacement is restored
+    os.rename(
+        os.path.join(path, "linear_best"),
+        os.path.join(path, "linear_best.old-{}-1700000000000".format(process.pid)),
+    )
+    assert remove_stale_checkpoints(path) == []
+    assert os.listdir(path) == ["linear_best"]
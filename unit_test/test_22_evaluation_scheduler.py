@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# file: test_22_evaluation_scheduler.py
+# time: 20/10/2026 09:40
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import logging
+from collections import Counter
+
+import pytest
+import torch
+from torch.utils.data import DataLoader
+
+from pyabsa.framework.configuration_class.configuration_template import (
+    ConfigManager,
+)
+from pyabsa.framework.instructor_class.evaluation_scheduler import (
+    EvaluationScheduler,
+    EvaluationStrategyOption,
+)
+
+
+class Instructor:
+    """
+    The model, config and evaluate function of a training instructor.
+    """
+
+    def __init__(self, eval_strategy, **kwargs):
+        self.config = ConfigManager(
+            dict(
+                eval_strategy=eval_strategy,
+                seed=1,
+                device="cpu",
+                logger=logging.getLogger(__name__),
+                **kwargs
+            )
+        )
+        self.model = torch.nn.Linear(2, 1)
+
+    def _evaluate_acc_f1(self, dataloader):
+        # the evaluated weights, and the label counts of the evaluated examples
+        labels = Counter(int(batch["polarity"]) for batch in dataloader.dataset)
+        return self.model.weight.sum().item(), dict(labels)
+
+
+def _dataloader(labels):
+    dataset = [{"polarity": torch.tensor(label)} for label in labels]
+    return DataLoader(dataset, batch_size=4)
+
+
+def test_sampled_evaluation():
+    instructor = Instructor(
+        EvaluationStrategyOption.SAMPLED, eval_sample_size=0.5, eval_full_interval=3
+    )
+    dataloader = _dataloader([0] * 12 + [1] * 4 + [2] * 4)
+    evaluator = EvaluationScheduler(instructor, instructor._evaluate_acc_f1)
+
+    # the first sampled result is the best so far, it is confirmed on the full set
+    evaluator.submit(dataloader)
+    results = list(evaluator.completed())
+    assert [is_full for _, is_full, _ in results] == [False, True]
+    # the fixed subsample is stratified by label
+    assert results[0][0][1] == {0: 6, 1: 2, 2: 2}
+    assert results[1][0][1] == {0: 12, 1: 4, 2: 4}
+
+    evaluator.submit(dataloader)
+    assert [is_full for _, is_full, _ in evaluator.completed()] == [False]
+    # every eval_full_interval evaluations, the full set is evaluated
+    evaluator.submit(dataloader)
+    assert [is_full for _, is_full, _ in evaluator.completed()] == [True]
+    evaluator.close()
+
+
+def test_async_evaluation_snapshot():
+    instructor = Instructor(EvaluationStrategyOption.ASYNC)
+    dataloader = _dataloader([0, 1, 1])
+    evaluator = EvaluationScheduler(
+        instructor, instructor._evaluate_acc_f1, dataloaders=[dataloader]
+    )
+    evaluated = instructor.model.weight.sum().item()
+    evaluator.submit(dataloader)
+    # the training continues while the snapshot is evaluated in the worker
+    with torch.no_grad():
+        instructor.model.weight.add_(1)
+
+    results = list(evaluator.completed(wait=True))
+    evaluator.close()
+    assert len(results) == 1
+    (weights, labels), is_full, eval_model = results[0]
+    assert is_full and labels == {0: 1, 1: 2}
+    assert weights == pytest.approx(evaluated)
+    # the snapshot holds the evaluated weights, the model of the training loop is never swapped
+    assert eval_model is not instructor.model
+    assert eval_model.weight.sum().item() == pytest.approx(evaluated)
+    assert instructor.model.weight.sum().item() == pytest.approx(evaluated + 2)
+
+
+def test_unsupported_evaluation_strategy():
+    config = ConfigManager({"eval_strategy": "async", "task_name": "TC"})
+    with pytest.raises(ValueError):
+        EvaluationStrategyOption.check(config, [EvaluationStrategyOption.FULL])
+    EvaluationStrategyOption.check(
+        config, [EvaluationStrategyOption.FULL, EvaluationStrategyOption.ASYNC]
+    )
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# file: test_23_distributed.py
+# time: 20/10/2026 10:20
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import json
+import os
+
+import pytest
+import torch
+
+from pyabsa.framework.checkpoint_class.checkpoint_writer import CheckpointWriter
+from pyabsa.framework.configuration_class.configuration_template import (
+    ConfigManager,
+)
+from pyabsa.framework.flag_class.flag_template import ModelSaveOption
+from pyabsa.framework.instructor_class import distributed
+from pyabsa.framework.instructor_class.instructor_template import (
+    BaseTrainingInstructor,
+)
+
+
+def _train_step(config, path):
+    """
+    One training step of a rank, the rank records what it did in path/ranks.
+    """
+    rank = distributed.get_rank()
+    # the ranks start from different weights, DDP broadcasts the weights of rank 0
+    torch.manual_seed(rank)
+    model = distributed.wrap_model(torch.nn.Linear(2, 1), config)
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.1)
+    instructor = object.__new__(BaseTrainingInstructor)
+    iterator = instructor._progress_bar([torch.full((4, 2), rank + 1.0)])
+    # tqdm sets disable when the bar is closed at the end of the iteration
+    disable = iterator.disable
+    for inputs in iterator:
+        optimizer.zero_grad()
+        model(inputs).sum().backward()
+        optimizer.step()
+
+    CheckpointWriter(config, asynchronous=False).save(
+        model, {}, os.path.join(path, "linear_best")
+    )
+    record = {
+        "disable": disable,
+        "weight": model.module.weight.tolist(),
+        "result": distributed.all_reduce_result({"acc": rank}, config.device),
+    }
+    with open(os.path.join(path, "ranks", "{}.json".format(rank)), "w") as f:
+        json.dump(record, f)
+    return {"rank": rank, "world_size": distributed.get_world_size()}
+
+
+@pytest.mark.skipif(
+    not torch.distributed.is_available(), reason="torch.distributed is unavailable"
+)
+def test_two_process_training(tmp_path):
+    path = str(tmp_path)
+    os.makedirs(os.path.join(path, "ranks"))
+    config = ConfigManager(
+        {
+            "model_name": "linear",
+            "save_mode": ModelSaveOption.SAVE_MODEL_STATE_DICT,
+            "model_path_to_save": path,
+            "device": "cpu",
+            "ddp_backend": "gloo",
+            "ddp_world_size": 2,
+        }
+    )
+    result = distributed.launch(_train_step, config, config, path)
+    # only the plain result of rank 0 is returned
+    assert result == {"rank": 0, "world_size": 2}
+
+    records = []
+    for rank in range(2):
+        with open(os.path.join(path, "ranks", "{}.json".format(rank))) as f:
+            records.append(json.load(f))
+    # only rank 0 displays the progress bar
+    assert [record["disable"] for record in records] == [False, True]
+    # the gradients are averaged, the weights stay identical on both ranks
+    assert records[0]["weight"] == records[1]["weight"]
+    assert records[0]["result"] == records[1]["result"] == {"acc": 0.5}
+
+    # only rank 0 writes the checkpoint
+    assert sorted(os.listdir(path)) == ["linear_best", "ranks"]
+    state_dict = torch.load(os.path.join(path, "linear_best", "linear.state_dict"))
+    assert state_dict["weight"].tolist() == records[0]["weight"]
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# file: test_24_safetensors.py
+# time: 20/10/2026 10:50
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import os
+import threading
+
+import torch
+from transformers import BertConfig, BertModel
+
+from pyabsa.framework.checkpoint_class.checkpoint_format import (
+    build_task_model,
+    init_empty_parameters,
+    is_safetensors_checkpoint,
+    load_safetensors_checkpoint,
+    save_safetensors_checkpoint,
+)
+from pyabsa.framework.configuration_class.configuration_template import (
+    ConfigManager,
+)
+from pyabsa.framework.flag_class.flag_template import ModelSaveOption
+
+
+class TinyClassifier(torch.nn.Module):
+    def __init__(self, bert, config):
+        super().__init__()
+        self.config = config
+        self.bert = bert
+        self.dense = torch.nn.Linear(config.hidden_dim, config.output_dim)
+
+    def forward(self, input_ids):
+        return self.dense(self.bert(input_ids)["pooler_output"])
+
+
+def test_safetensors_save_and_reload(tmp_path, monkeypatch):
+    # the checkpoint is outside the working directory, as in the registry of the user cache
+    checkpoint = str(tmp_path / "checkpoints" / "tiny")
+    os.makedirs(checkpoint)
+    os.makedirs(str(tmp_path / "cwd"))
+    monkeypatch.chdir(str(tmp_path / "cwd"))
+
+    config = ConfigManager(
+        {
+            "model": TinyClassifier,
+            "model_name": "tiny",
+            "save_mode": ModelSaveOption.SAVE_SAFETENSORS,
+            "hidden_dim": 8,
+            "output_dim": 3,
+            "label_to_index": {"negative": 0, "positive": 1},
+        }
+    )
+    bert = BertModel(
+        BertConfig(
+            vocab_size=32,
+            hidden_size=8,
+            num_hidden_layers=1,
+            num_attention_heads=2,
+            intermediate_size=16,
+        )
+    )
+    model = TinyClassifier(bert, config).eval()
+    save_safetensors_checkpoint(config, model, None, checkpoint)
+    assert sorted(os.listdir(checkpoint)) == [
+        "tiny.args.json",
+        "tiny.args.txt",
+        "tiny.pretrained",
+        "tiny.safetensors",
+        "tiny.tokenizer",
+    ]
+
+    assert is_safetensors_checkpoint(checkpoint)
+    assert is_safetensors_checkpoint(os.path.join(checkpoint, "tiny.safetensors"))
+    assert not is_safetensors_checkpoint(str(tmp_path / "cwd"))
+    loaded, loaded_config, tokenizer = load_safetensors_checkpoint(
+        checkpoint, build_task_model
+    )
+    loaded.eval()
+    assert tokenizer is None
+    assert loaded_config.model is TinyClassifier
+    assert loaded_config.label_to_index == {"negative": 0, "positive": 1}
+    assert not any(p.is_meta for p in loaded.parameters())
+    assert not any(b.is_meta for b in loaded.buffers())
+    input_ids = torch.tensor([[2, 5, 7, 3]])
+    with torch.no_grad():
+        assert torch.allclose(model(input_ids), loaded(input_ids))
+
+
+def test_empty_parameters_are_thread_local():
+    models = []
+    with init_empty_parameters():
+        thread = threading.Thread(target=lambda: models.append(torch.nn.Linear(2, 2)))
+        thread.start()
+        thread.join()
+        empty = torch.nn.Linear(2, 2)
+    assert empty.weight.is_meta
+    # the models built by the other threads are initialized as usual
+    assert not models[0].weight.is_meta
+    assert not torch.nn.Linear(2, 2).weight.is_meta
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# file: test_25_encoder_cache.py
+# time: 20/10/2026 11:20
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import os
+
+import torch
+from torch.utils.data import DataLoader
+from transformers import BertConfig, BertModel
+
+from pyabsa.framework.configuration_class.configuration_template import (
+    ConfigManager,
+)
+from pyabsa.framework.instructor_class.encoder_cache import (
+    EncoderCachePoolingOption,
+    FrozenEncoderCache,
+)
+
+
+class Encoder(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(1)
+        self.bert = BertModel(
+            BertConfig(
+                vocab_size=32,
+                hidden_size=8,
+                num_hidden_layers=1,
+                num_attention_heads=2,
+                intermediate_size=16,
+            )
+        )
+
+    def forward(self, input_ids):
+        return self.bert(input_ids)["last_hidden_state"]
+
+
+# the sequences are padded with 0, the padding positions are encoded as well
+sequences = torch.tensor([[2, 5, 7, 3, 0, 0], [2, 9, 3, 0, 0, 0], [2, 4, 4, 6, 8, 3]])
+
+
+def _cache(tmp_path, pooling=EncoderCachePoolingOption.FULL):
+    return FrozenEncoderCache(
+        ConfigManager(
+            {
+                "encoder_cache_pooling": pooling,
+                "encoder_cache_dir": str(tmp_path),
+                "encoder_cache_batch_size": 2,
+            }
+        )
+    )
+
+
+def _build(cache, model):
+    assert cache.attach(model) == 1
+    cache.build(model, [DataLoader(sequences, batch_size=2)], lambda batch: batch)
+
+
+def test_cached_features_equal_encoder_outputs(tmp_path):
+    model = Encoder().eval()
+    with torch.no_grad():
+        expected = model(sequences)
+        unseen = torch.tensor([[2, 11, 12, 3, 0, 0]])
+        expected_unseen = model(unseen)
+
+        cache = _cache(tmp_path)
+        _build(cache, model)
+        assert not any(p.requires_grad for p in model.bert.parameters())
+        # the cached features of all the positions, including the padding ones, are the encoder outputs
+        assert torch.allclose(model(sequences), expected, atol=1e-2)
+        assert (cache.hits, cache.misses) == (1, 0)
+        # a sequence missing from the cache runs the encoder
+        assert torch.equal(model(unseen), expected_unseen)
+        assert (cache.hits, cache.misses) == (1, 1)
+        cache.detach()
+        assert torch.equal(model(sequences), expected)
+
+
+def test_cls_features(tmp_path):
+    model = Encoder().eval()
+    with torch.no_grad():
+        expected = model(sequences)[:, :1]
+        cache = _cache(tmp_path, EncoderCachePoolingOption.CLS)
+        _build(cache, model)
+        assert torch.allclose(model(sequences), expected, atol=1e-2)
+        cache.detach()
+
+
+def test_cache_is_keyed_by_weights(tmp_path):
+    model = Encoder().eval()
+    cache = _cache(tmp_path)
+    _build(cache, model)
+    cache.detach()
+    assert len(os.listdir(str(tmp_path))) == 1
+
+    # the same weights reuse the features
+    model = Encoder().eval()
+    cache = _cache(tmp_path)
+    _build(cache, model)
+    cache.detach()
+    assert len(os.listdir(str(tmp_path))) == 1
+
+    # any change of the weights, even one that keeps their sum, is a new cache
+    with torch.no_grad():
+        model.bert.pooler.dense.bias[0] += 1
+        model.bert.pooler.dense.bias[1] -= 1
+    cache = _cache(tmp_path)
+    _build(cache, model)
+    cache.detach()
+    assert len(os.listdir(str(tmp_path))) == 2
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# file: test_26_trial_pruner.py
+# time: 20/10/2026 11:50
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import logging
+import os
+
+import pytest
+import torch
+
+from pyabsa.framework.checkpoint_class.checkpoint_writer import CheckpointWriter
+from pyabsa.framework.configuration_class.configuration_template import (
+    ConfigManager,
+)
+from pyabsa.framework.flag_class.flag_template import ModelSaveOption
+from pyabsa.framework.instructor_class.instructor_template import (
+    BaseTrainingInstructor,
+)
+from pyabsa.framework.sweep_class import trial_pruner
+from pyabsa.framework.sweep_class.trial_pruner import (
+    ASHAPruner,
+    MedianPruner,
+    TrialPruned,
+    TrialReporter,
+)
+
+
+def test_median_pruner():
+    pruner = MedianPruner(mode="max", warmup_reports=1, min_trials=2)
+    for trial_id, value in [(0, 0.5), (1, 0.7)]:
+        assert not pruner(trial_id, 1, value)
+        assert not pruner(trial_id, 2, value + 0.1)
+    # never stopped during the warmup
+    assert not pruner(2, 1, 0.1)
+    # the best value so far (0.1) is below the median of the others at report 2 (0.6 and 0.8)
+    assert pruner(2, 2, 0.05)
+    # a trial above the median continues
+    assert not pruner(3, 1, 0.9)
+    assert not pruner(3, 2, 0.75)
+
+    pruner = MedianPruner(metric="loss", mode="min", warmup_reports=0, min_trials=1)
+    assert not pruner(0, 1, 1.0)
+    assert pruner(1, 1, 2.0)
+    assert not pruner(2, 1, 0.5)
+
+
+def test_asha_pruner():
+    pruner = ASHAPruner(mode="max", min_resource=1, reduction_factor=2)
+    assert [pruner._is_rung(i) for i in range(1, 9)] == [
+        True,
+        True,
+        False,
+        True,
+        False,
+        False,
+        False,
+        True,
+    ]
+    # the first trial of a rung is always promoted
+    assert not pruner(0, 1, 0.5)
+    # the top half of the rung is promoted
+    assert pruner(1, 1, 0.4)
+    assert not pruner(2, 1, 0.9)
+    # the reports between the rungs are never judged
+    assert not pruner(1, 3, 0.0)
+
+
+def test_trial_reporter():
+    decisions = []
+
+    def should_prune(trial_id, report_index, value):
+        decisions.append((trial_id, report_index, value))
+        return value < 0.5
+
+    reporter = TrialReporter(7, metric="eval", should_prune=should_prune)
+    reporter("loss", 0.1)
+    reporter("eval", 0.6)
+    with pytest.raises(TrialPruned):
+        reporter("eval", 0.4)
+    # only the watched metric is judged
+    assert decisions == [(7, 1, 0.6), (7, 2, 0.4)]
+    assert reporter.reports == [("loss", 1, 0.1), ("eval", 1, 0.6), ("eval", 2, 0.4)]
+
+
+class Instructor(BaseTrainingInstructor):
+    """
+    A training loop saving a checkpoint asynchronously, then reporting an evaluation pruned by the sweep.
+    """
+
+    def _prepare_env(self):
+        self.model = torch.nn.Linear(2, 2)
+
+    def _prepare_dataloader(self):
+        pass
+
+    def _resume_from_checkpoint(self):
+        pass
+
+    def _train_and_evaluate(self, criterion):
+        self.checkpoint_writer = self._closing(CheckpointWriter(self.config))
+        self.checkpoint_writer.save(
+            self.model,
+            {},
+            os.path.join(self.config.model_path_to_save, "linear_best"),
+            metric=1,
+        )
+        trial_pruner.report("eval", 0.1)
+
+
+def test_pruned_trial_closes_its_resources(tmp_path):
+    config = ConfigManager(
+        {
+            "model_name": "linear",
+            "save_mode": ModelSaveOption.SAVE_MODEL_STATE_DICT,
+            "model_path_to_save": str(tmp_path),
+            "async_checkpoint": True,
+            "seed": 1,
+            "use_amp": False,
+            "warmup_step": -1,
+            "logger": logging.getLogger(__name__),
+        }
+    )
+    instructor = Instructor(config)
+    trial_pruner.set_reporter(
+        TrialReporter(0, metric="eval", should_prune=lambda *args: True)
+    )
+    try:
+        with pytest.raises(TrialPruned):
+            instructor._train(criterion=None)
+    finally:
+        trial_pruner.set_reporter(None)
+
+    # the checkpoint writer is closed, its pending write is committed
+    assert instructor._open_resources == []
+    assert instructor.checkpoint_writer._thread is None
+    assert os.listdir(str(tmp_path)) == ["linear_best"]
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# file: test_27_seed_runner.py
+# time: 20/10/2026 12:20
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from pyabsa.framework.configuration_class.configuration_template import (
+    ConfigManager,
+)
+from pyabsa.framework.dataset_class import feature_store
+from pyabsa.framework.trainer_class.seed_runner import SeedRunner
+
+
+class Instructor:
+    """
+    A training instructor changing its config, as the instructors do when featurizing and training.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        config.label_to_index = {"negative": 0, "positive": 1}
+
+    def run(self):
+        self.config.max_test_metrics = {"acc": self.config.seed / 10}
+        return "checkpoint-{}-{}".format(self.config.seed, self.config.device)
+
+
+class DyingInstructor(Instructor):
+    """
+    The worker of the second seed dies without sending its result, e.g., killed by the OOM killer.
+    """
+
+    def run(self):
+        if self.config.seed == 2:
+            os._exit(1)
+        return super().run()
+
+
+class MetricVisualizer:
+    def __init__(self):
+        self.metrics = []
+
+    def log_metric(self, model_name, name, value):
+        self.metrics.append((name, round(value)))
+
+
+def _config():
+    return ConfigManager(
+        {
+            "model_name": "model",
+            "seed": [1, 2, 3],
+            "seed_workers": 2,
+            "checkpoint_save_mode": 1,
+            "device": "cpu",
+            "overwrite_cache": True,
+            "logger": logging.getLogger(__name__),
+            "MV": MetricVisualizer(),
+        }
+    )
+
+
+def _train_dying_seeds():
+    try:
+        SeedRunner(DyingInstructor, _config()).run([1, 2, 3])
+    except RuntimeError as e:
+        return str(e)
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="fork is unavailable"
+)
+def test_parallel_seeds_keep_the_config():
+    config = _config()
+    args = dict(config.args)
+    results = SeedRunner(Instructor, config).run([1, 2, 3])
+
+    assert [r["checkpoint"] for r in results] == [
+        "checkpoint-1-cpu",
+        "checkpoint-2-cpu",
+        "checkpoint-3-cpu",
+    ]
+    assert [r["metrics"] for r in results] == [{"acc": 0.1}, {"acc": 0.2}, {"acc": 0.3}]
+    assert sorted(config.MV.metrics) == [
+        ("Seed1-acc", 10),
+        ("Seed2-acc", 20),
+        ("Seed3-acc", 30),
+    ]
+    # the workers and the featurization run with copies of the config
+    assert config.args == args
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="fork is unavailable"
+)
+def test_dead_seed_worker_raises():
+    # the workers are forked only if autograd has not been used in the process,
+    # so the runner is tested in a fresh process regardless of the tests run before
+    with ProcessPoolExecutor(
+        1, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        error = executor.submit(_train_dying_seeds).result()
+    assert error == "Seed 2 died in worker process with exit code 1"
+
+
+def test_featurization_args_tell_the_classes_apart():
+    def args(**kwargs):
+        return feature_store.featurization_args(
+            ConfigManager({"seed": 1, "max_seq_len": 80, **kwargs})
+        )
+
+    assert args(model=Instructor) == args(model=Instructor, seed=2)
+    assert args(model=Instructor) != args(model=DyingInstructor)
+    assert args(model=Instructor)["model"] == "{}.Instructor".format(__name__)
+    assert args(tokenizer=MetricVisualizer()) == args(tokenizer=MetricVisualizer())
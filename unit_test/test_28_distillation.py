@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# file: test_28_distillation.py
+# time: 20/10/2026 12:50
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import os
+
+import torch
+import torch.nn.functional as F
+
+from pyabsa.framework.configuration_class.configuration_template import (
+    ConfigManager,
+)
+from pyabsa.framework.flag_class.flag_template import LabelPaddingOption
+from pyabsa.tasks.AspectPolarityClassification.instructor.distillation_instructor import (
+    APCDistillationInstructor,
+)
+
+
+class Teacher:
+    """
+    A teacher predicting the softmax of a linear layer over the length of the text and of the aspect.
+    """
+
+    def __init__(self):
+        torch.manual_seed(1)
+        self.model = torch.nn.Linear(2, 2)
+        self.config = ConfigManager(
+            {"label_to_index": {"positive": 0, "negative": 1}, "max_seq_len": 80}
+        )
+        self.checkpoint = None
+        self.num_predictions = 0
+
+    def predict(self, texts, **kwargs):
+        self.num_predictions += 1
+        results = []
+        for text in texts:
+            aspect = text.split("[B-ASP]")[1].split("[E-ASP]")[0]
+            with torch.no_grad():
+                probs = torch.softmax(
+                    self.model(
+                        torch.tensor([len(text), len(aspect)], dtype=torch.float)
+                    ),
+                    dim=-1,
+                )
+            results.append(
+                {
+                    "text": text.replace("[B-ASP]", "").replace("[E-ASP]", ""),
+                    "aspect": aspect,
+                    "probs": probs.tolist(),
+                }
+            )
+        return results
+
+
+def _instructor(tmp_path, teacher, alpha=0.5, temperature=2.0):
+    instructor = object.__new__(APCDistillationInstructor)
+    instructor.config = ConfigManager(
+        {
+            "device": "cpu",
+            "output_dim": 2,
+            "label_to_index": {"negative": 0, "positive": 1},
+            "index_to_label": {0: "negative", 1: "positive"},
+            "dataset_name": "toy",
+            "distill_cache_dir": str(tmp_path),
+            "distill_alpha": alpha,
+            "distill_temperature": temperature,
+        }
+    )
+    instructor.teachers = [teacher]
+    return instructor
+
+
+def test_distillation_loss(tmp_path):
+    instructor = _instructor(tmp_path, Teacher(), alpha=0.3, temperature=2.0)
+    logits = torch.tensor([[1.0, -1.0], [0.5, 2.0]])
+    teacher_probs = torch.tensor([[0.8, 0.2], [0.4, 0.6]])
+    polarity = torch.tensor([0, LabelPaddingOption.SENTIMENT_PADDING])
+    criterion = torch.nn.CrossEntropyLoss(
+        ignore_index=LabelPaddingOption.SENTIMENT_PADDING
+    )
+
+    loss = instructor._compute_loss(
+        criterion,
+        {"logits": logits},
+        {"teacher_probs": teacher_probs, "polarity": polarity},
+    )
+    soft_targets = teacher_probs**0.5 / (teacher_probs**0.5).sum(-1, keepdim=True)
+    kd_loss = (
+        soft_targets * (soft_targets.log() - F.log_softmax(logits / 2, dim=-1))
+    ).sum(-1).mean() * 4
+    # the unlabeled example only contributes to the KL term
+    ce_loss = F.cross_entropy(logits[:1], polarity[:1])
+    assert torch.allclose(loss, 0.3 * kd_loss + 0.7 * ce_loss)
+
+    # a batch of unlabeled examples is only distilled
+    loss = instructor._compute_loss(
+        criterion,
+        {"logits": logits},
+        {
+            "teacher_probs": teacher_probs,
+            "polarity": torch.full((2,), LabelPaddingOption.SENTIMENT_PADDING),
+        },
+    )
+    assert torch.allclose(loss, 0.3 * kd_loss)
+
+
+def test_soft_labels_are_keyed_by_teacher_weights(tmp_path):
+    texts = ["the [B-ASP]food[E-ASP] is great", "the [B-ASP]service[E-ASP] is slow"]
+    teacher = Teacher()
+    soft_labels = _instructor(tmp_path, teacher)._soft_labels(texts)
+    assert teacher.num_predictions == 1
+    assert len(soft_labels) == 2
+    # the probabilities are in the label order of the student
+    probs = teacher.predict(texts[:1])[0]["probs"]
+    assert soft_labels["thefoodisgreat\tfood"].tolist() == [
+        torch.tensor(probs[1]).item(),
+        torch.tensor(probs[0]).item(),
+    ]
+
+    # a teacher with the same weights reuses the soft labels
+    teacher = Teacher()
+    assert (
+        _instructor(tmp_path, teacher)._soft_labels(texts).keys() == soft_labels.keys()
+    )
+    assert teacher.num_predictions == 0
+    assert len(os.listdir(str(tmp_path))) == 1
+
+    # the re-trained teacher is labeled again, even if it is saved to the same checkpoint
+    with torch.no_grad():
+        teacher.model.bias[0] += 1
+    _instructor(tmp_path, teacher)._soft_labels(texts)
+    assert teacher.num_predictions == 1
+    assert len(os.listdir(str(tmp_path))) == 2
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# file: test_29_fast_path.py
+# time: 20/10/2026 13:20
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import pytest
+import torch
+
+from pyabsa.framework.configuration_class.configuration_template import (
+    ConfigManager,
+)
+from pyabsa.framework.prediction_class.fast_path import (
+    CompiledModel,
+    batch_buckets,
+    warmup,
+)
+from pyabsa.framework.prediction_class.predictor_template import InferenceModel
+
+
+class Model(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(1)
+        self.dense = torch.nn.Linear(4, 3)
+
+    def forward(self, inputs, scale=None):
+        logits = self.dense(inputs["text_indices"].float())
+        if scale is not None:
+            logits = logits * scale
+        return {"logits": logits, "loss": logits.new_zeros(())}
+
+
+def test_batch_buckets():
+    assert batch_buckets(1) == [1]
+    assert batch_buckets(16) == [1, 2, 4, 8, 16]
+    assert batch_buckets(20) == [1, 2, 4, 8, 16, 20]
+
+
+def test_compiled_model_pads_to_buckets():
+    model = Model().eval()
+    compiled = CompiledModel(model, batch_buckets(8), backend="eager")
+    with torch.inference_mode():
+        for batch_size in [1, 3, 8, 12]:
+            inputs = {"text_indices": torch.randint(0, 10, (batch_size, 4))}
+            outputs = compiled(inputs)
+            # the padding rows are sliced off, the batches larger than the buckets run eagerly
+            assert outputs["logits"].shape == (batch_size, 3)
+            assert torch.allclose(outputs["logits"], model(inputs)["logits"])
+            assert outputs["loss"].dim() == 0
+
+
+def test_cache_size_limit_covers_the_buckets(monkeypatch):
+    dynamo_config = torch._dynamo.config
+    monkeypatch.setattr(dynamo_config, "cache_size_limit", 2)
+    if hasattr(dynamo_config, "accumulated_cache_size_limit"):
+        monkeypatch.setattr(dynamo_config, "accumulated_cache_size_limit", 2)
+    compiled = CompiledModel(Model().eval(), batch_buckets(8), backend="eager")
+    inputs = {"text_indices": torch.randint(0, 10, (3, 4))}
+    with torch.inference_mode():
+        compiled(inputs)
+        assert dynamo_config.cache_size_limit == 4
+        compiled(inputs)
+        assert dynamo_config.cache_size_limit == 4
+        # a second call signature compiles other graphs
+        compiled(inputs, scale=2.0)
+    assert dynamo_config.cache_size_limit == 8
+    if hasattr(dynamo_config, "accumulated_cache_size_limit"):
+        assert dynamo_config.accumulated_cache_size_limit == 8
+
+
+class Predictor:
+    warmup_text = "The [B-ASP]food[E-ASP] is good"
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, texts, **kwargs):
+        self.batches.append((texts, kwargs["eval_batch_size"]))
+
+
+def test_warmup_runs_every_bucket_twice():
+    predictor = Predictor()
+    metrics = warmup(predictor, [1, 2, 4])
+    assert [(len(texts), batch_size) for texts, batch_size in predictor.batches] == [
+        (1, 4),
+        (1, 4),
+        (2, 4),
+        (2, 4),
+        (4, 4),
+        (4, 4),
+    ]
+    assert all(text == Predictor.warmup_text for text in predictor.batches[0][0])
+    assert sorted(metrics["bucket_latency_ms"]) == [1, 2, 4]
+
+
+def _inference_model(model):
+    inference_model = object.__new__(InferenceModel)
+    inference_model.config = ConfigManager({"eval_batch_size": 4})
+    inference_model.model = model
+    inference_model._compiled_model = None
+    inference_model.fast_path_metrics = None
+    return inference_model
+
+
+def test_predictors_without_warmup_text_compile_lazily():
+    inference_model = _inference_model(Model())
+    inference_model.enable_fast_path(backend="eager")
+    assert inference_model._compiled_model.buckets == [1, 2, 4, 8, 16, 32]
+    assert inference_model.fast_path_metrics is None
+
+    inputs = {"text_indices": torch.randint(0, 10, (3, 4))}
+    with inference_model._inference_context():
+        outputs = inference_model._forward(inputs)
+    assert torch.allclose(outputs["logits"], Model()(inputs)["logits"])
+
+
+@pytest.mark.parametrize(
+    "module, name",
+    [
+        (
+            "pyabsa.tasks.AspectPolarityClassification.prediction.sentiment_classifier",
+            "SentimentClassifier",
+        ),
+        (
+            "pyabsa.tasks.AspectTermExtraction.prediction.aspect_extractor",
+            "AspectExtractor",
+        ),
+        (
+            "pyabsa.tasks.TextClassification.prediction.text_classifier",
+            "TextClassifier",
+        ),
+        (
+            "pyabsa.tasks.TextAdversarialDefense.prediction.tad_classifier",
+            "TADTextClassifier",
+        ),
+        (
+            "pyabsa.tasks.CodeDefectDetection.prediction.code_defect_detector",
+            "CodeDefectDetector",
+        ),
+        (
+            "pyabsa.tasks.RNAClassification.prediction.rna_classifier",
+            "RNAClassifier",
+        ),
+        (
+            "pyabsa.tasks.RNARegression.prediction.rna_regressor",
+            "RNARegressor",
+        ),
+    ],
+)
+def test_compiled_predictors_have_warmup_texts(module, name):
+    predictor = getattr(__import__(module, fromlist=[name]), name)
+    assert predictor.compile_fast_path
+    assert predictor.warmup_text
+
+
+def test_predictors_padded_per_batch_are_not_compiled():
+    inference_model = _inference_model(Model())
+    inference_model.compile_fast_path = False
+    inference_model.enable_fast_path(backend="eager")
+    assert inference_model.config.fast_path
+    assert inference_model._compiled_model is None
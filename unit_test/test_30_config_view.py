@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# file: test_30_config_view.py
+# time: 20/10/2026 13:50
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import pytest
+
+from pyabsa.framework.configuration_class.configuration_template import (
+    ConfigManager,
+)
+
+
+def test_frozen_view():
+    config = ConfigManager({"device": "cpu", "log_step": 10, "max_seq_len": 80})
+    view = config.frozen_view("device", "log_step", "evaluate_begin")
+    assert view.device == "cpu"
+    assert view.get("log_step", 5) == 10
+
+    # the parameters not set in the config are None, or the default of get()
+    assert view.evaluate_begin is None
+    assert view.get("evaluate_begin", 0) == 0
+    assert config.args_call_count == {"device": 1, "log_step": 1, "max_seq_len": 0}
+
+    with pytest.raises(AttributeError):
+        view.max_seq_len
+    with pytest.raises(AttributeError):
+        view.device = "cuda:0"
+
+    # the view is a snapshot
+    config.device = "cuda:0"
+    assert view.device == "cpu"
+
+
+def test_frozen_view_of_all_parameters():
+    config = ConfigManager({"device": "cpu", "class": 1, "1st": 2})
+    view = config.frozen_view()
+    assert view.device == "cpu"
+    assert view.get("class") is None
+    assert repr(view) == "FrozenConfigView(device='cpu')"
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+# file: test_31_quantization.py
+# time: 20/10/2026 14:20
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import os
+import pickle
+
+import pytest
+import torch
+
+from pyabsa.framework.checkpoint_class.checkpoint_registry import (
+    find_checkpoint_files,
+)
+from pyabsa.framework.configuration_class.configuration_template import (
+    ConfigManager,
+)
+from pyabsa.framework.flag_class.flag_template import (
+    QuantizationOption,
+    TaskCodeOption,
+)
+from pyabsa.framework.prediction_class.predictor_template import InferenceModel
+from pyabsa.framework.prediction_class.quantization import (
+    accuracy,
+    flatten_predictions,
+    is_quantized,
+    model_size,
+    quantize_model,
+)
+
+pytestmark = pytest.mark.skipif(
+    not torch.backends.quantized.supported_engines
+    or torch.backends.quantized.supported_engines == ["none"],
+    reason="no quantized engine is available",
+)
+
+
+class ToyClassifier(InferenceModel):
+    """
+    A classifier of feature vectors, loaded from a trainer or from a checkpoint as the task predictors are.
+    """
+
+    task_code = TaskCodeOption.Text_Classification
+
+    def __init__(self, checkpoint=None, **kwargs):
+        super().__init__(checkpoint, task_code=self.task_code, **kwargs)
+        if not isinstance(self.checkpoint, str):
+            self.model, self.config, self.tokenizer = self.checkpoint
+        else:
+            checkpoint_files = find_checkpoint_files(self.checkpoint)
+            with open(checkpoint_files["config"], mode="rb") as f:
+                self.config = pickle.load(f)
+            with open(checkpoint_files["tokenizer"], mode="rb") as f:
+                self.tokenizer = pickle.load(f)
+            self.model = torch.load(
+                checkpoint_files["model"], map_location="cpu", weights_only=False
+            )
+        self.__post_init__()
+
+    def batch_predict(self, target_file=None, **kwargs):
+        features = torch.stack([x for x, _ in target_file])
+        with self._inference_context():
+            self.model.eval()
+            logits = self._forward(features.to(self.config.device))
+        return [
+            {
+                "label": self.config.index_to_label[int(i)],
+                "ref_label": label,
+            }
+            for i, (_, label) in zip(logits.argmax(-1), target_file)
+        ]
+
+
+def _classifier():
+    torch.manual_seed(1)
+    model = torch.nn.Sequential(
+        torch.nn.Linear(64, 256), torch.nn.ReLU(), torch.nn.Linear(256, 2)
+    )
+    config = ConfigManager(
+        {
+            "model_name": "toy",
+            "device": "cpu",
+            "label_to_index": {"negative": 0, "positive": 1},
+            "index_to_label": {0: "negative", 1: "positive"},
+        }
+    )
+    return ToyClassifier((model, config, None))
+
+
+def _examples():
+    torch.manual_seed(2)
+    features = torch.randn(32, 64)
+    return [(x, "positive" if x[0] > 0 else "negative") for x in features]
+
+
+def test_quantize_model():
+    model = torch.nn.Sequential(torch.nn.Linear(256, 256), torch.nn.Linear(256, 2))
+    quantized = quantize_model(model)
+    assert is_quantized(quantized)
+    assert not is_quantized(model)
+    assert model_size(quantized) < model_size(model)
+    inputs = torch.randn(4, 256)
+    with torch.no_grad():
+        assert torch.allclose(quantized(inputs), model(inputs), atol=0.1)
+    with pytest.raises(ValueError):
+        quantize_model(model, "static_int4")
+
+
+def test_flatten_predictions():
+    pairs = flatten_predictions(
+        [
+            {"sentiment": ["Positive", "Negative"], "ref_sentiment": ["Positive", ""]},
+            {"label": "1", "ref_label": "0"},
+            {"label": "1", "ref_label": -100},
+            {"aspect": ["food"], "sentiment": ["Positive"]},
+        ]
+    )
+    assert pairs == [
+        ("Positive", "Positive"),
+        ("Negative", None),
+        ("1", "0"),
+        ("1", None),
+        ("(['food'], ['Positive'])", None),
+    ]
+    assert accuracy(pairs) == 0.5
+    assert accuracy([("1", None)]) is None
+
+
+def test_quantize_save_and_reload(tmp_path):
+    classifier = _classifier()
+    examples = _examples()
+    float_results = classifier.batch_predict(examples)
+
+    report = classifier.quantization_report(examples)
+    # the model is left unchanged
+    assert not is_quantized(classifier.model)
+    assert report["mode"] == QuantizationOption.DYNAMIC_INT8
+    assert report["examples"] == 32
+    assert report["float_acc"] == accuracy(flatten_predictions(float_results))
+    assert report["acc_delta"] == report["quantized_acc"] - report["float_acc"]
+    assert report["agreement"] >= 0.8
+    assert report["quantized_size_mb"] < report["float_size_mb"]
+
+    with pytest.raises(RuntimeError):
+        classifier.save_quantized(str(tmp_path))
+    classifier.quantize()
+    assert is_quantized(classifier.model)
+    assert classifier.config.quantize == QuantizationOption.DYNAMIC_INT8
+    with pytest.raises(RuntimeError):
+        classifier.quantize()
+    quantized_results = classifier.batch_predict(examples)
+
+    save_path = classifier.save_quantized(str(tmp_path / "toy_dynamic_int8"))
+    assert classifier.config.get("save_mode") is None
+    assert sorted(os.listdir(save_path)) == [
+        "toy.args.txt",
+        "toy.config",
+        "toy.model",
+        "toy.tokenizer",
+    ]
+
+    # the quantized checkpoint is loaded as a quantized model, and is not quantized again
+    reloaded = ToyClassifier(save_path)
+    assert is_quantized(reloaded.model)
+    assert reloaded.config.quantize == QuantizationOption.DYNAMIC_INT8
+    assert reloaded.batch_predict(examples) == quantized_results
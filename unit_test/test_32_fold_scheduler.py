@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# file: test_32_fold_scheduler.py
+# time: 20/10/2026 14:50
+# author: YANG, HENG <hy345@exeter.ac.uk> (杨恒)
+# github: https://github.com/yangheng95
+# GScholar: https://scholar.google.com/citations?user=NPq5a_0AAAAJ&hl=en
+# ResearchGate: https://www.researchgate.net/profile/Heng-Yang-17/research
+# Copyright (C) 2026. All Rights Reserved.
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+import torch
+
+from pyabsa.framework.configuration_class.configuration_template import (
+    ConfigManager,
+)
+from pyabsa.framework.instructor_class.fold_scheduler import (
+    FoldScheduler,
+    is_parallel,
+)
+from pyabsa.framework.instructor_class.instructor_template import (
+    BaseTrainingInstructor,
+)
+
+
+class Instructor(BaseTrainingInstructor):
+    """
+    Train a linear model on the folds of a toy dataset, one SGD step per batch.
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.model = torch.nn.Linear(2, 1)
+        self.optimizer = torch.optim.SGD(self.model.parameters(), lr=0.1)
+        torch.manual_seed(config.seed)
+        data = torch.randn(12, 2)
+        folds = [data[:4], data[4:8], data[8:]]
+        for fold in range(3):
+            self.train_dataloaders.append([x for i, x in enumerate(folds) if i != fold])
+            self.valid_dataloaders.append([folds[fold]])
+
+    def _train_fold(self, fold, train_dataloader, valid_dataloader, criterion):
+        for inputs in train_dataloader:
+            self.optimizer.zero_grad()
+            # the random targets are drawn from the seed of the fold
+            noise = torch.randn(inputs.size(0), 1)
+            criterion(self.model(inputs), noise).backward()
+            self.optimizer.step()
+        return {
+            "weight": self.model.weight.tolist(),
+            "pid": os.getpid(),
+        }
+
+
+class DyingInstructor(Instructor):
+    """
+    The worker of the second fold dies without sending its result, e.g., killed by the OOM killer.
+    """
+
+    def _train_fold(self, fold, train_dataloader, valid_dataloader, criterion):
+        if fold == 1:
+            os._exit(1)
+        return super()._train_fold(fold, train_dataloader, valid_dataloader, criterion)
+
+
+def _config(fold_workers):
+    return ConfigManager(
+        {
+            "model_name": "linear",
+            "seed": 1,
+            "use_amp": False,
+            "warmup_step": -1,
+            "device": "cpu",
+            "auto_device": False,
+            "cross_validate_fold": 3,
+            "fold_workers": fold_workers,
+            "verbose": False,
+            "logger": logging.getLogger(__name__),
+        }
+    )
+
+
+def _train_folds():
+    results = {}
+    # the workers are forked before any backward pass in this process, then the folds
+    # fall back to this process since autograd has been used by the sequential run
+    for run, fold_workers in [("parallel", 2), ("sequential", 1), ("fallback", 2)]:
+        instructor = Instructor(_config(fold_workers))
+        assert is_parallel(instructor.config) == (fold_workers > 1)
+        instructor._prepare_env()
+        # the initial weights of the folds are snapshotted, the model stays on CPU before forking the workers
+        assert instructor.model.weight.device.type == "cpu"
+        assert torch.equal(
+            instructor.init_state_dict["weight"], instructor.model.weight
+        )
+        results[run] = FoldScheduler(instructor).run(
+            instructor._train_fold, torch.nn.MSELoss()
+        )
+    return os.getpid(), results
+
+
+def _train_dying_folds():
+    instructor = DyingInstructor(_config(2))
+    instructor._prepare_env()
+    try:
+        FoldScheduler(instructor).run(instructor._train_fold, torch.nn.MSELoss())
+    except RuntimeError as e:
+        return str(e)
+
+
+def _in_fresh_process(fn):
+    # whether the workers can be forked depends on the autograd state of the process,
+    # so the schedulers are tested in a fresh process regardless of the tests run before
+    with ProcessPoolExecutor(
+        1, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        return executor.submit(fn).result()
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="fork is unavailable"
+)
+def test_parallel_folds_match_sequential_folds():
+    pid, results = _in_fresh_process(_train_folds)
+
+    # the folds do not depend on the order or the process in which they run
+    weights = [r["weight"] for r in results["sequential"]]
+    assert [r["weight"] for r in results["parallel"]] == weights
+    assert [r["weight"] for r in results["fallback"]] == weights
+    assert pid not in {r["pid"] for r in results["parallel"]}
+    assert {r["pid"] for r in results["sequential"]} == {pid}
+    assert {r["pid"] for r in results["fallback"]} == {pid}
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="fork is unavailable"
+)
+def test_dead_fold_worker_raises():
+    error = _in_fresh_process(_train_dying_folds)
+    assert error == "Fold 1 died in worker process with exit code 1"